@@ -2,9 +2,13 @@
 from .config import settings, get_settings
 from .security import verify_supabase_jwt, SupabaseUser
 from .dependencies import get_current_user, get_optional_user, get_db, Database
+from .http_client import SharedHttpClient
+from .llm_gateway import llm_gateway, LLMGateway, LLMUnavailableError
 
 __all__ = [
     "settings", "get_settings",
     "verify_supabase_jwt", "SupabaseUser",
     "get_current_user", "get_optional_user", "get_db", "Database",
+    "SharedHttpClient",
+    "llm_gateway", "LLMGateway", "LLMUnavailableError",
 ]
@@ -24,6 +24,23 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str = ""
     SUPABASE_JWT_SECRET: str = ""
 
+    # 공용 HTTP 커넥션 풀 (Supabase REST / Kakao 등 외부 호출 공유)
+    HTTP_POOL_MAX_CONNECTIONS: int = 100
+    HTTP_POOL_MAX_KEEPALIVE: int = 20
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_POOL_HTTP2: bool = True
+    HTTP_POOL_DEFAULT_TIMEOUT: float = 30.0
+
+    # places 인메모리 공간 인덱스 (반경/근접 질의를 Supabase 왕복 없이 처리)
+    PLACE_INDEX_ENABLED: bool = True
+    PLACE_INDEX_CELL_DEG: float = 0.01
+    PLACE_INDEX_REFRESH_SECONDS: int = 300
+
+    # places id 조회 프로세스 캐시 (LRU 항목 수, TTL, 없는 id 기억 시간). TTL 0 이면 비활성
+    PLACE_CACHE_MAX_ENTRIES: int = 20000
+    PLACE_CACHE_TTL_SECONDS: int = 600
+    PLACE_CACHE_NEGATIVE_TTL_SECONDS: int = 60
+
     # Security
     SECRET_KEY: str = "dev-secret-key"
     ALGORITHM: str = "HS256"
@@ -31,21 +48,112 @@ class Settings(BaseSettings):
 
     # AI
     ANTHROPIC_API_KEY: str = ""
+    # 비우면 공식 엔드포인트. 로컬 스텁 서버로 부하 테스트할 때 지정.
+    ANTHROPIC_BASE_URL: str = ""
+    # LLM 게이트웨이: 전역 동시 호출 한도, 슬롯 대기 한도(초과 시 폴백), 호출 타임아웃
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    LLM_CALL_TIMEOUT_SECONDS: float = 20.0
+    LLM_MAX_RETRIES: int = 1
+    # 장소 서사 캐시 (인메모리 LRU 항목 수) + 야간 사전 생성 대상 수/동시 생성 수
+    NARRATIVE_CACHE_MAX_ENTRIES: int = 5000
+    NARRATIVE_PREWARM_LIMIT: int = 200
+    NARRATIVE_PREWARM_CONCURRENCY: int = 4
+    # 사전 생성 후보 노출 집계를 공유 테이블(narrative_demand)에 합산하는 주기 (워커마다)
+    NARRATIVE_DEMAND_FLUSH_SECONDS: int = 60
 
     # Kakao Maps
     KAKAO_REST_API_KEY: str = ""
     KAKAO_API_KEY: str = ""  # Alias for services
+    # Kakao 호출 1건 타임아웃, 앱 전체 동시 호출 한도, 추천 1건의 카테고리 검색 전체 마감(초)
+    KAKAO_TIMEOUT_SECONDS: float = 3.0
+    KAKAO_MAX_CONCURRENCY: int = 16
+    RECOMMENDATION_KAKAO_DEADLINE_SECONDS: float = 2.5
+    # 추천 파이프라인 단계별 타임아웃(초): 날씨, 완료 장소·취향 이력 조회. 초과 시 해당 데이터 없이 진행
+    RECOMMENDATION_WEATHER_TIMEOUT_SECONDS: float = 2.0
+    RECOMMENDATION_HISTORY_TIMEOUT_SECONDS: float = 1.5
     
     # OpenWeatherMap — 실제 날씨만 사용 (비우면 추천/날씨 API 503)
     OPENWEATHER_API_KEY: str = ""
-    # 좌표(소수 2자리) 단위 메모리 캐시, 초 단위. 0이면 캐시 안 함.
+    # 격자 타일(WEATHER_TILE_DEG, 0.03° ≈ 3km) 단위 메모리 캐시, 초 단위. 0이면 캐시 안 함.
+    # TTL 이후 STALE 초까지는 기존 값 응답 + 백그라운드 갱신. 타일 수 상한(LRU).
     WEATHER_CACHE_TTL_SECONDS: int = 600
+    WEATHER_STALE_SECONDS: int = 1800
+    WEATHER_TILE_DEG: float = 0.03
+    WEATHER_CACHE_MAX_TILES: int = 2000
+    # 권역 타일 주기적 선조회 (워커마다 실행 → 호출 수 = 타일 수 × 워커 수 / 주기). 범위: 남,서,북,동 (기본 서울)
+    WEATHER_PREFETCH_ENABLED: bool = False
+    WEATHER_PREFETCH_BBOX: str = "37.41,126.76,37.72,127.19"
+    WEATHER_PREFETCH_PER_MINUTE: int = 50
     # 추천 POST 응답 메모리 캐시 (같은 위치·역할·기분·유저). 랜덤 스코어는 캐시 히트 시 고정됨.
     RECOMMENDATION_CACHE_TTL_SECONDS: int = 120
+    # 추천 캐시 백엔드: memory (프로세스 내 LRU) | redis (워커 간 공유, redis 패키지 필요)
+    RECOMMENDATION_CACHE_BACKEND: str = "memory"
+    RECOMMENDATION_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    RECOMMENDATION_CACHE_MAX_ENTRIES: int = 5000
+    # 추천 후보 공유 캐시: Kakao 카테고리 검색을 격자 셀(기본 0.008도 ≈ 900m) 단위로 공유.
+    # 셀이 클수록 공유율↑, 사용자 기준 최근접 후보 포함률↓ (scripts/bench_candidate_cache.py)
+    RECOMMENDATION_CELL_DEG: float = 0.008
+    RECOMMENDATION_CANDIDATE_TTL_SECONDS: int = 1800
+    RECOMMENDATION_CANDIDATE_PAGES: int = 2
+    RECOMMENDATION_CANDIDATE_MAX_ENTRIES: int = 20000
+
+    # 홈 피드 인박스 (fan-out-on-write): 소유자별 최대 보관 수, 이 팔로워 수를 넘으면 읽기 시 병합(셀럽),
+    # 새로 팔로우할 때 인박스에 채울 상대의 최근 활동 수
+    FEED_INBOX_MAX_ITEMS: int = 500
+    FEED_CELEBRITY_FOLLOWERS: int = 1000
+    FEED_FOLLOW_BACKFILL: int = 50
+
+    # 사용자 통계 집계(user_stats) 야간 대사: 한 번에 재계산할 사용자 수
+    USER_STATS_RECONCILE_BATCH: int = 200
+
+    # 예약 작업 실행권(job_runs lease): lease 길이, 연장 주기, 만료된 실행 이어받기 점검 주기, 이어받을 최대 경과 시간
+    JOB_LEASE_SECONDS: int = 120
+    JOB_HEARTBEAT_SECONDS: int = 30
+    JOB_RESUME_CHECK_SECONDS: int = 300
+    JOB_RESUME_MAX_AGE_HOURS: int = 6
 
     # Web Push (VAPID) - optional; 없으면 푸시 전송 스킵
     VAPID_PRIVATE_KEY: str = ""
     VAPID_EMAIL: str = "mailto:admin@wherehere.app"
+    # 일괄 발송 엔진: 동시 전송 수(= 푸시 서비스 커넥션 풀 크기), 구독 조회 페이지, 요청 타임아웃,
+    # 푸시 서비스 보관 시간(TTL 헤더, 0 = 기기가 오프라인이면 폐기), 429/5xx 재시도 횟수, 페이로드 암호화 스레드
+    PUSH_MAX_CONCURRENCY: int = 64
+    PUSH_PAGE_SIZE: int = 1000
+    PUSH_TIMEOUT_SECONDS: float = 10.0
+    PUSH_TTL_SECONDS: int = 0
+    PUSH_MAX_RETRIES: int = 1
+    PUSH_ENCRYPT_THREADS: int = 2
+
+    # 실시간 채널 (WebSocket /api/v1/realtime/ws, SSE /api/v1/realtime/stream): 알림·채팅·presence 서버 푸시
+    # 브로커: memory (프로세스 내, 워커 1개) | redis (Redis Stream 공유 → 다중 워커, redis 패키지 필요)
+    # 재접속 재전송 버퍼 이벤트 수, 연결당 미전송 상한(초과 시 resync), keep-alive 주기(초), 연결당 채널 수
+    REALTIME_BACKEND: str = "memory"
+    REALTIME_REDIS_URL: str = "redis://localhost:6379/0"
+    REALTIME_BUFFER_SIZE: int = 5000
+    REALTIME_QUEUE_SIZE: int = 200
+    REALTIME_HEARTBEAT_SECONDS: int = 25
+    REALTIME_MAX_CHANNELS: int = 50
+
+    # 장소 presence 인메모리 인덱스 (presence API 를 visits 질의 없이 응답): 보관 최대 시간, 만료 버킷(초),
+    # 체크인 장소에서 이 거리(미터) 이상 벗어나면 퇴장, 새 visits 반영 주기(초), 표시용 프로필 캐시 TTL(초)
+    PRESENCE_INDEX_ENABLED: bool = True
+    PRESENCE_MAX_HOURS: int = 6
+    PRESENCE_BUCKET_SECONDS: int = 300
+    PRESENCE_LEAVE_METERS: int = 300
+    PRESENCE_REFRESH_SECONDS: int = 60
+    PRESENCE_PROFILE_TTL_SECONDS: int = 600
+
+    # 소셜 매칭 근처 활동 사용자 인메모리 격자 인덱스: 셀 크기(도), 활동으로 보는 시간(초, 넘으면 만료),
+    # 위치 핑 DB 일괄 기록 주기(초), DB 최근 위치 반영 주기(초, 다중 워커 수렴), 매칭 후보 최대 수,
+    # update_user_locations RPC 미배포 시 행별 PATCH 동시 요청 수
+    ACTIVE_USERS_ENABLED: bool = True
+    ACTIVE_USERS_CELL_DEG: float = 0.01
+    ACTIVE_USERS_TTL_SECONDS: int = 900
+    ACTIVE_USERS_FLUSH_SECONDS: int = 5
+    ACTIVE_USERS_REFRESH_SECONDS: int = 60
+    ACTIVE_USERS_MAX_CANDIDATES: int = 50
+    ACTIVE_USERS_PATCH_CONCURRENCY: int = 8
 
     # CORS
     ALLOWED_ORIGINS: Union[List[str], str] = [
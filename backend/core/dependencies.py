@@ -9,6 +9,7 @@ import asyncpg
 
 from .security import verify_supabase_jwt, SupabaseUser
 from .config import settings
+from .http_client import SharedHttpClient
 
 
 security = HTTPBearer()
@@ -42,6 +43,14 @@ class Database:
     connected: bool = False
     helpers: Optional[object] = None
     supabase_client: Optional[object] = None
+    http: Optional[SharedHttpClient] = None
+
+    @classmethod
+    def get_http(cls) -> SharedHttpClient:
+        """앱 수명 동안 공유하는 HTTP 커넥션 풀 (mock 모드에서도 외부 API용으로 사용)"""
+        if cls.http is None:
+            cls.http = SharedHttpClient.from_settings(settings)
+        return cls.http
 
     @classmethod
     async def connect(cls):
@@ -56,7 +65,7 @@ class Database:
         # Supabase REST API 사용 (PostgreSQL 연결 문제 우회)
         try:
             from db.rest_helpers import RestDatabaseHelpers
-            cls.helpers = RestDatabaseHelpers()
+            cls.helpers = RestDatabaseHelpers(http=cls.get_http())
             cls.connected = True
             cls.supabase_client = cls.helpers  # 호환성
             
@@ -73,6 +82,9 @@ class Database:
             cls.connected = False
             cls.helpers = None
             print("Database disconnected")
+        if cls.http:
+            await cls.http.aclose()
+            cls.http = None
 
     @classmethod
     def is_connected(cls) -> bool:
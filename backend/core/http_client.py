@@ -0,0 +1,185 @@
+"""
+앱 전체 공용 HTTP 커넥션 풀 (httpx.AsyncClient 1개를 앱 수명 동안 재사용).
+- Supabase REST / Kakao / 외부 API 호출마다 새 TCP+TLS 핸드셰이크를 하지 않도록 keep-alive 풀 공유.
+- HTTP/2 사용 가능 시(h2 설치) 같은 호스트 요청을 하나의 커넥션에 다중화.
+- 엔드포인트(host + path)별 요청 수·동시 요청·지연 시간을 기록해 풀 크기 조정에 사용.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "errors", "in_flight", "peak_in_flight", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "avg_ms": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class _Session:
+    """`async with http.session(timeout=...) as client:` 형태로 기존 httpx 호출부를 그대로 쓰기 위한 래퍼.
+    블록을 빠져나가도 공용 클라이언트는 닫지 않는다."""
+
+    def __init__(self, owner: "SharedHttpClient", timeout: Optional[float]):
+        self._owner = owner
+        self._timeout = timeout
+
+    async def __aenter__(self) -> "_Session":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return await self._owner.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+class SharedHttpClient:
+    """keep-alive 커넥션 풀을 가진 공용 AsyncClient + 엔드포인트별 메트릭"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 30.0,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats: Dict[str, _EndpointStats] = {}
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "SharedHttpClient":
+        return cls(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+            http2=settings.HTTP_POOL_HTTP2,
+            timeout=settings.HTTP_POOL_DEFAULT_TIMEOUT,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """첫 사용 시 생성 (이벤트 루프 안에서 만들어지도록 지연 생성)"""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            try:
+                self._client = httpx.AsyncClient(
+                    http2=self.http2, limits=limits, timeout=self.timeout
+                )
+            except ImportError:
+                # h2 미설치 → HTTP/1.1 keep-alive 로 동작
+                logger.warning("[HTTP] h2 not installed - falling back to HTTP/1.1 keep-alive pool")
+                self.http2 = False
+                self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        return self._client
+
+    def session(self, timeout: Optional[float] = None) -> _Session:
+        return _Session(self, timeout if timeout is not None else self.timeout)
+
+    @staticmethod
+    def _endpoint_key(url: str) -> str:
+        parts = urlsplit(str(url))
+        return f"{parts.netloc}{parts.path}"
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        key = self._endpoint_key(url)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _EndpointStats()
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        start = time.perf_counter()
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.in_flight -= 1
+            self._in_flight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        open_connections = None
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            try:
+                open_connections = len(pool.connections)
+            except Exception:
+                open_connections = None
+        return {
+            "limits": {
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry": self.keepalive_expiry,
+                "http2": self.http2,
+            },
+            "open_connections": open_connections,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "endpoints": {k: v.as_dict() for k, v in sorted(self._stats.items())},
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
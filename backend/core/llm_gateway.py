@@ -0,0 +1,261 @@
+"""
+앱 전체 공용 비동기 LLM 게이트웨이 (Anthropic Messages API).
+- 동기 클라이언트가 이벤트 루프를 막지 않도록 AsyncAnthropic 하나를 앱 수명 동안 공유.
+- 전역 세마포어로 동시 호출 수 제한. 슬롯을 일정 시간 안에 못 잡으면 LLMSaturatedError →
+  호출부의 기존 except 폴백(템플릿/휴리스틱)이 그대로 동작.
+- 호출별 타임아웃, 클라이언트 연결이 끊기면 진행 중인 호출 취소.
+- 호출 지점(call site)별 지연 히스토그램·결과 카운터 (/health/llm).
+- ANTHROPIC_BASE_URL 로 로컬 스텁 서버를 가리키면 실제 API 없이 부하 테스트 가능.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from anthropic import AsyncAnthropic
+from fastapi import Request
+from starlette.requests import HTTPConnection
+
+from core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# 지연 히스토그램 버킷 상한 (ms). 마지막 버킷은 +Inf.
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+# 현재 요청 (연결 끊김 감지용). bind_llm_request 의존성이 채운다.
+_current_request: contextvars.ContextVar[Optional[Request]] = contextvars.ContextVar(
+    "llm_current_request", default=None
+)
+
+
+class LLMUnavailableError(Exception):
+    """LLM 호출을 하지 않았거나 끝내지 못함 → 호출부 폴백 사용"""
+
+
+class LLMSaturatedError(LLMUnavailableError):
+    """동시 호출 한도 초과 (대기 시간 내 슬롯 확보 실패)"""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """호출 타임아웃"""
+
+
+class LLMCancelledError(LLMUnavailableError):
+    """클라이언트 연결 끊김으로 호출 취소"""
+
+
+async def bind_llm_request(connection: HTTPConnection):
+    """FastAPI 의존성: 요청 객체를 컨텍스트에 묶어 게이트웨이가 연결 끊김을 감지하게 한다.
+    앱 전역 의존성이라 WebSocket 라우트에도 적용됨 → HTTP 요청만 묶음."""
+    token = _current_request.set(connection if isinstance(connection, Request) else None)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+class _CallSiteStats:
+    __slots__ = ("buckets", "count", "total_ms", "max_ms", "outcomes", "in_flight", "queue_ms")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.outcomes: Dict[str, int] = {}
+        self.in_flight = 0
+        self.queue_ms = 0.0
+
+    def observe(self, outcome: str, elapsed_ms: Optional[float] = None) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if elapsed_ms is None:
+            return
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, upper in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= upper:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{int(b)}ms" for b in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "calls": self.count,
+            "in_flight": self.in_flight,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "avg_queue_ms": round(self.queue_ms / max(1, sum(self.outcomes.values())), 2),
+            "outcomes": dict(self.outcomes),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class LLMGateway:
+    """동시성 제한 + 타임아웃 + 취소 + 메트릭을 가진 공용 AsyncAnthropic 래퍼"""
+
+    def __init__(
+        self,
+        api_key: str = "",
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        queue_timeout: float = 2.0,
+        call_timeout: float = 20.0,
+        max_retries: int = 1,
+        disconnect_poll_interval: float = 0.5,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.disconnect_poll_interval = disconnect_poll_interval
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._stats: Dict[str, _CallSiteStats] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "LLMGateway":
+        return cls(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+            call_timeout=settings.LLM_CALL_TIMEOUT_SECONDS,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key) and self.api_key != "your_anthropic_api_key_here"
+
+    @property
+    def client(self):
+        """첫 사용 시 생성 (이벤트 루프 안에서 만들어지도록 지연 생성)"""
+        if self._client is None:
+            self._client = AsyncAnthropic(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=self.max_retries,
+                timeout=self.call_timeout,
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _site(self, call_site: str) -> _CallSiteStats:
+        stats = self._stats.get(call_site)
+        if stats is None:
+            stats = self._stats[call_site] = _CallSiteStats()
+        return stats
+
+    async def create(
+        self,
+        call_site: str,
+        timeout: Optional[float] = None,
+        request: Optional[Request] = None,
+        **kwargs,
+    ):
+        """
+        messages.create 와 같은 인자로 호출하고 응답(Message)을 반환.
+        사용 불가/포화/타임아웃/취소 시 LLMUnavailableError 하위 예외를 던진다.
+        """
+        stats = self._site(call_site)
+        if not self.enabled:
+            stats.observe("disabled")
+            raise LLMUnavailableError("ANTHROPIC_API_KEY not configured")
+
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            stats.queue_ms += (time.perf_counter() - queued) * 1000
+            stats.observe("saturated")
+            raise LLMSaturatedError(f"{call_site}: {self.max_concurrency} calls already in flight")
+        stats.queue_ms += (time.perf_counter() - queued) * 1000
+
+        stats.in_flight += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._run(
+                self.client.messages.create(**kwargs),
+                timeout if timeout is not None else self.call_timeout,
+                request or _current_request.get(),
+            )
+            outcome = "ok"
+            return response
+        except LLMTimeoutError:
+            outcome = "timeout"
+            raise
+        except LLMCancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            stats.observe(outcome, (time.perf_counter() - start) * 1000)
+            stats.in_flight -= 1
+            self._in_flight -= 1
+            self.semaphore.release()
+
+    async def _run(self, coro, timeout: float, request: Optional[Request]):
+        call = asyncio.ensure_future(coro)
+        watcher = asyncio.ensure_future(self._wait_disconnect(request)) if request is not None else None
+        waiters = {call} if watcher is None else {call, watcher}
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if call in done:
+                return call.result()
+            if watcher is not None and watcher in done:
+                raise LLMCancelledError("client disconnected")
+            raise LLMTimeoutError(f"no response within {timeout:.1f}s")
+        finally:
+            for task in (call, watcher):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _wait_disconnect(self, request: Request) -> None:
+        while True:
+            try:
+                if await request.is_disconnected():
+                    return
+            except Exception:
+                # 수신 채널을 더 못 읽는 경우 → 감지 포기 (타임아웃만 적용)
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.disconnect_poll_interval)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "base_url": self.base_url or "default",
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "queue_timeout_s": self.queue_timeout,
+                "call_timeout_s": self.call_timeout,
+            },
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "call_sites": {k: v.as_dict() for k, v in sorted(self._stats.items())},
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+
+
+llm_gateway = LLMGateway.from_settings(settings)
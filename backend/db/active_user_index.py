@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+활동 중 사용자 인메모리 위치 인덱스 (소셜 매칭 "지금 내 근처에 누가 있나").
+- 격자 셀(ACTIVE_USERS_CELL_DEG, 기본 0.01도 ≈ 1.1km) → {user_id}, user_id → 마지막 위치.
+  위치가 바뀌어도 셀이 같으면 좌표만 교체, 셀이 바뀌면 셀 집합 두 개만 수정.
+- 만료: 마지막 위치 시각의 시간 버킷에 등록해 두고 ACTIVE_USERS_TTL_SECONDS 보다 오래된 버킷만 통째로 비움
+  (presence 인덱스와 같은 db/time_buckets.BucketExpiry → 정리 비용은 만료되는 사용자 수에 비례).
+- 수집: POST /api/v1/visits/location 은 인덱스만 갱신하고 DB 쓰기는 사용자별 마지막 위치로 모아 두었다가
+  ACTIVE_USERS_FLUSH_SECONDS 마다 update_user_locations RPC 한 번으로 반영 (핑마다 users PATCH 하던 것 대체).
+- 시작 시 / ACTIVE_USERS_REFRESH_SECONDS 마다 DB 의 최근 위치(last_location_at 커서 이후)를 반영
+  → 재시작 직후 빈 인덱스 보완, 워커가 여러 개여도 이 주기 안에 수렴.
+- 지표: GET /health/active-users
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import settings
+from db.geo import METERS_PER_DEG_LAT, bounding_box, haversine_m
+from db.time_buckets import BucketExpiry, parse_epoch
+
+logger = logging.getLogger("uvicorn.error")
+
+# 반경이 이 셀 수를 넘으면 셀 순회 대신 전체 순회
+_MAX_CELLS_PER_QUERY = 400
+
+
+def _epoch(value: Any) -> Optional[float]:
+    """last_location_at(TIMESTAMPTZ) → epoch 초 (오프셋 없는 값은 UTC 로 기록한 _iso 값)"""
+    return parse_epoch(value, naive_tz=timezone.utc)
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+class _Position:
+    __slots__ = ("latitude", "longitude", "cell", "seen")
+
+    def __init__(self, latitude: float, longitude: float, cell: Tuple[int, int], seen: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.cell = cell
+        self.seen = seen
+
+
+class ActiveUserGrid:
+    """격자 셀 → {user_id} + user_id → 마지막 위치, 시간 버킷 만료"""
+
+    def __init__(self, cell_deg: float = 0.01, ttl_seconds: float = 900, bucket_seconds: float = 60):
+        self.cell_deg = cell_deg
+        self.ttl_seconds = ttl_seconds
+        self._expiry = BucketExpiry(bucket_seconds)
+        self.bucket_seconds = self._expiry.bucket_seconds
+        self.loaded = False
+        self._started = time.monotonic()
+        # 증분 갱신 커서 (last_location_at, user_id)
+        self.cursor: Tuple[Optional[str], Optional[str]] = (None, None)
+        self._lock = asyncio.Lock()
+        self._users: Dict[str, _Position] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+        # DB 미반영 위치 (사용자별 마지막 값만)
+        self._pending: Dict[str, Tuple[float, float, float]] = {}
+        self.counters = {
+            "updates": 0, "cell_moves": 0, "stale_ignored": 0, "expired": 0, "queries": 0,
+            "flushed": 0, "flushes": 0, "flush_failures": 0, "loaded_rows": 0, "last_refresh_at": None,
+        }
+
+    @property
+    def ready(self) -> bool:
+        """DB 에서 적재했거나, 시작 후 TTL 이 지나 핑만으로 활동 사용자가 모두 채워졌으면 True"""
+        return self.loaded or time.monotonic() - self._started >= self.ttl_seconds
+
+    # ---------- 변경 ----------
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg)
+
+    def _leave_cell(self, user_id: str, cell: Tuple[int, int]) -> None:
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self._cells[cell]
+
+    def _remove(self, user_id: str) -> Optional[_Position]:
+        entry = self._users.pop(user_id, None)
+        if entry is not None:
+            self._leave_cell(user_id, entry.cell)
+        return entry
+
+    def update(self, user_id: str, latitude: float, longitude: float, ts: Optional[float] = None) -> bool:
+        """위치 반영. 이미 더 최근 위치가 있거나 TTL 보다 오래된 값이면 무시"""
+        ts = ts if ts is not None else time.time()
+        if ts < time.time() - self.ttl_seconds:
+            return False
+        entry = self._users.get(user_id)
+        if entry is not None and entry.seen >= ts:
+            self.counters["stale_ignored"] += 1
+            return False
+        cell = self._cell(latitude, longitude)
+        if entry is None:
+            self._users[user_id] = _Position(latitude, longitude, cell, ts)
+            self._cells.setdefault(cell, set()).add(user_id)
+        else:
+            if entry.cell != cell:
+                self._leave_cell(user_id, entry.cell)
+                self._cells.setdefault(cell, set()).add(user_id)
+                entry.cell = cell
+                self.counters["cell_moves"] += 1
+            entry.latitude, entry.longitude = latitude, longitude
+            if self._expiry.bucket(ts) == self._expiry.bucket(entry.seen):
+                entry.seen = ts
+                self.counters["updates"] += 1
+                return True
+            entry.seen = ts
+        self._expiry.track(user_id, ts)
+        self.counters["updates"] += 1
+        return True
+
+    def ingest(self, rows: Iterable[Tuple[str, float, float, Optional[float]]]) -> int:
+        """(user_id, lat, lon, ts) 묶음 반영. 반영한 수"""
+        return sum(1 for user_id, lat, lon, ts in rows if self.update(user_id, lat, lon, ts))
+
+    def report(self, user_id: str, latitude: float, longitude: float) -> None:
+        """위치 핑: 인덱스 즉시 반영 + DB 쓰기는 다음 flush 로 미룸"""
+        now = time.time()
+        if self.update(user_id, latitude, longitude, now):
+            self._pending[user_id] = (latitude, longitude, now)
+
+    def remove(self, user_id: str) -> bool:
+        self._pending.pop(user_id, None)
+        return self._remove(user_id) is not None
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """TTL 보다 오래된 버킷 정리. 제거한 사용자 수"""
+        cutoff = (now or time.time()) - self.ttl_seconds
+        removed = 0
+        for members in self._expiry.pop_expired(cutoff):
+            for user_id in members:
+                entry = self._users.get(user_id)
+                if entry is not None and entry.seen < cutoff:
+                    self._remove(user_id)
+                    removed += 1
+        self.counters["expired"] += removed
+        return removed
+
+    # ---------- 조회 ----------
+
+    def where(self, user_id: str) -> Optional[Tuple[float, float, float]]:
+        entry = self._users.get(user_id)
+        return (entry.latitude, entry.longitude, entry.seen) if entry is not None else None
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_meters: float,
+        exclude: Iterable[str] = (),
+        limit: int = 50,
+        within_seconds: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        반경 내 활동 사용자 [{user_id, latitude, longitude, distance_meters, last_location_at}] 가까운 순 limit 명.
+        중심 셀에서 고리(ring) 단위로 넓혀 가며, 다음 고리의 최소 거리가 limit 번째 거리보다 멀면 중단
+        → 밀집 지역에서도 가까운 셀 몇 개만 확인.
+        """
+        self.expire()
+        self.counters["queries"] += 1
+        if limit <= 0:
+            return []
+        cutoff = time.time() - (within_seconds if within_seconds is not None else self.ttl_seconds)
+        excluded = set(exclude)
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_meters)
+        y0, x0 = self._cell(min_lat, min_lon)
+        y1, x1 = self._cell(max_lat, max_lon)
+        # 최대 거리 힙 (-거리, user_id) → heap[0] 이 현재 limit 번째
+        heap: List[Tuple[float, str]] = []
+
+        def consider(members: Iterable[str]) -> None:
+            for user_id in members:
+                entry = self._users[user_id]
+                if entry.seen < cutoff or user_id in excluded:
+                    continue
+                if not (min_lat <= entry.latitude <= max_lat and min_lon <= entry.longitude <= max_lon):
+                    continue
+                distance = haversine_m(latitude, longitude, entry.latitude, entry.longitude)
+                if distance > radius_meters:
+                    continue
+                item = (-distance, user_id)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > _MAX_CELLS_PER_QUERY:
+            consider(list(self._users))
+        else:
+            cy, cx = self._cell(latitude, longitude)
+            meters_per_deg_lon = METERS_PER_DEG_LAT * max(math.cos(math.radians(latitude)), 0.01)
+            for ring in range(max(cy - y0, y1 - cy, cx - x0, x1 - cx) + 1):
+                for y in range(max(y0, cy - ring), min(y1, cy + ring) + 1):
+                    edge = y in (cy - ring, cy + ring)
+                    for x in range(max(x0, cx - ring), min(x1, cx + ring) + 1):
+                        if (edge or x in (cx - ring, cx + ring)) and (y, x) in self._cells:
+                            consider(self._cells[(y, x)])
+                if len(heap) == limit:
+                    # 다음 고리까지의 최소 거리 (셀 블록 경계까지, 약간 보수적으로)
+                    bound = min(
+                        (latitude - (cy - ring) * self.cell_deg) * METERS_PER_DEG_LAT,
+                        ((cy + ring + 1) * self.cell_deg - latitude) * METERS_PER_DEG_LAT,
+                        (longitude - (cx - ring) * self.cell_deg) * meters_per_deg_lon,
+                        ((cx + ring + 1) * self.cell_deg - longitude) * meters_per_deg_lon,
+                    ) * 0.995
+                    if -heap[0][0] <= bound:
+                        break
+        found = sorted((-neg, user_id) for neg, user_id in heap)
+        return [
+            {
+                "user_id": user_id,
+                "latitude": self._users[user_id].latitude,
+                "longitude": self._users[user_id].longitude,
+                "distance_meters": round(distance, 1),
+                "last_location_at": _iso(self._users[user_id].seen),
+            }
+            for distance, user_id in found
+        ]
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "loaded": self.loaded,
+            "active_users": len(self._users),
+            "cells": len(self._cells),
+            "buckets": len(self._expiry),
+            "pending_writes": len(self._pending),
+            "ttl_seconds": self.ttl_seconds,
+            "cell_deg": self.cell_deg,
+            **self.counters,
+        }
+
+    # ---------- DB 동기화 ----------
+
+    async def flush(self, db, batch_size: int = 1000) -> int:
+        """모아 둔 위치를 DB 에 반영 (배치당 RPC 1회). 실패한 배치는 더 새 값이 없으면 다음 flush 에 재시도"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        written = 0
+        for i in range(0, len(items), batch_size):
+            chunk = items[i:i + batch_size]
+            rows = [
+                {"user_id": user_id, "latitude": lat, "longitude": lon, "seen_at": _iso(ts)}
+                for user_id, (lat, lon, ts) in chunk
+            ]
+            try:
+                await db.update_user_locations(rows)
+                written += len(chunk)
+            except Exception as e:
+                self.counters["flush_failures"] += 1
+                logger.warning("[ActiveUsers] location flush failed (%d rows): %s", len(chunk), e)
+                for user_id, value in chunk:
+                    self._pending.setdefault(user_id, value)
+        self.counters["flushed"] += written
+        self.counters["flushes"] += 1
+        return written
+
+    async def load(self, db, page_size: int = 1000) -> None:
+        """최근 TTL 동안 위치가 갱신된 사용자로 채움 (이미 받은 핑보다 오래된 행은 무시)"""
+        since = (datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)).isoformat()
+        async with self._lock:
+            loaded = await self._apply_pages(db, (since, None), page_size)
+            self.loaded = True
+        logger.info("[ActiveUsers] loaded %d recent locations, %d users active", loaded, len(self))
+
+    async def refresh(self, db, page_size: int = 1000) -> int:
+        """마지막 커서 이후 DB 위치만 반영 (다른 워커가 받은 핑). 반영한 행 수"""
+        if not self.loaded:
+            await self.load(db, page_size)
+            return len(self)
+        floor = (datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)).isoformat()
+        cursor = self.cursor if self.cursor[0] and self.cursor[0] > floor else (floor, None)
+        async with self._lock:
+            applied = await self._apply_pages(db, cursor, page_size)
+        self.expire()
+        return applied
+
+    async def _apply_pages(self, db, cursor: Tuple[Optional[str], Optional[str]], page_size: int) -> int:
+        applied = 0
+        while True:
+            page = await db.get_active_user_locations(cursor[0], cursor[1], limit=page_size)
+            self.ingest(
+                (str(row["user_id"]), float(row["latitude"]), float(row["longitude"]), _epoch(row.get("last_location_at")))
+                for row in page
+                if row.get("user_id") and row.get("latitude") is not None and row.get("longitude") is not None
+            )
+            applied += len(page)
+            if page:
+                last = page[-1]
+                cursor = self.cursor = (str(last.get("last_location_at")), str(last.get("user_id")))
+            if len(page) < page_size:
+                break
+        self.counters["loaded_rows"] += applied
+        self.counters["last_refresh_at"] = datetime.now().isoformat(timespec="seconds")
+        return applied
+
+
+active_user_index = ActiveUserGrid(
+    cell_deg=settings.ACTIVE_USERS_CELL_DEG,
+    ttl_seconds=settings.ACTIVE_USERS_TTL_SECONDS,
+)
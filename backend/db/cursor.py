@@ -0,0 +1,71 @@
+"""
+불투명(opaque) 커서 기반 keyset 페이지네이션 (created_at, id).
+- 커서는 마지막 행의 (정렬 시각, id) 를 base64url(JSON) 로 감싼 문자열. 클라이언트는 그대로 돌려주기만 한다.
+- PostgREST 필터: 내림차순이면 created_at < t OR (created_at = t AND id < id) → 깊이 스크롤해도 O(페이지).
+- limit+1 행을 받아 다음 페이지 존재 여부를 판단 (count 쿼리 없음).
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """디코딩할 수 없는 커서 (라우트에서 400 으로 변환)"""
+
+
+def encode_cursor(created_at: Any, row_id: Any) -> str:
+    raw = json.dumps([str(created_at), str(row_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(created_at), str(row_id)
+    except Exception as e:
+        raise InvalidCursorError("invalid cursor") from e
+
+
+def _quote(value: str) -> str:
+    # PostgREST 논리 필터 안의 예약 문자(, . : ( ))가 들어간 값은 큰따옴표로 감싼다
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_params(
+    cursor: Optional[str],
+    created_col: str = "created_at",
+    id_col: str = "id",
+    descending: bool = True,
+) -> Dict[str, str]:
+    """정렬(order) + 커서 이후 행만 고르는 PostgREST 쿼리 파라미터"""
+    direction = "desc" if descending else "asc"
+    params = {"order": f"{created_col}.{direction},{id_col}.{direction}"}
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, row_id = position
+        op = "lt" if descending else "gt"
+        params["or"] = (
+            f"({created_col}.{op}.{_quote(created_at)},"
+            f"and({created_col}.eq.{_quote(created_at)},{id_col}.{op}.{_quote(row_id)}))"
+        )
+    return params
+
+
+def paginate(
+    rows: List[Dict[str, Any]],
+    limit: int,
+    created_col: str = "created_at",
+    id_col: str = "id",
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """limit+1 로 받은 행 → (페이지, 다음 커서 또는 None)"""
+    page = rows[:limit]
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.get(created_col), last.get(id_col))
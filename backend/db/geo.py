@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+좌표 계산 유틸 (haversine 거리, 반경 바운딩 박스)
+"""
+
+import math
+from typing import Tuple
+
+EARTH_RADIUS_M = 6371000.0
+# 위도 1도 ≈ 111.19km (haversine 과 같은 구 반지름 기준. 111.32km 를 쓰면 바운딩 박스가 반경 끝 장소를 놓침)
+METERS_PER_DEG_LAT = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """두 좌표 사이 거리(미터)"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_meters: float) -> Tuple[float, float, float, float]:
+    """반경을 감싸는 (min_lat, max_lat, min_lon, max_lon). 인덱스 범위 스캔용 1차 필터."""
+    dlat = radius_meters / METERS_PER_DEG_LAT
+    dlon = radius_meters / (METERS_PER_DEG_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
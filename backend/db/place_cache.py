@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+places 행 프로세스 캐시 (id → 행, read-through).
+- RestDatabaseHelpers.get_places_by_ids / get_place_by_id 가 먼저 조회하고, 미스만 places?id=in.(...) 한 번으로 채운다.
+- OrderedDict LRU + 항목별 만료. 없는 id 도 짧게(negative TTL) 기억해 같은 미스를 반복 조회하지 않음.
+- 이 프로세스에서 places 를 쓰는 경로(upsert_place_minimal, Kakao 장소 저장)는 invalidate 로 즉시 무효화,
+  그 밖의 변경은 TTL 안에서만 늦게 보일 수 있다.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.config import settings
+
+# 없는 id 표시 (negative 항목)
+_MISSING: Dict[str, Any] = {}
+
+
+class PlaceCache:
+    """LRU + TTL. await 없이 동작하므로 락 불필요."""
+
+    def __init__(self, max_entries: int = 20000, ttl_seconds: float = 600, negative_ttl_seconds: float = 60):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._store: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get_many(self, place_ids: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """(캐시에 있는 장소 { id: 행 }, 조회가 필요한 id 목록). 없는 것으로 기억된 id 는 어느 쪽에도 없음."""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        for pid in place_ids:
+            item = self._store.get(pid)
+            if item is not None and now >= item[0]:
+                del self._store[pid]
+                self.expired += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                missing.append(pid)
+                continue
+            self._store.move_to_end(pid)
+            if item[1] is _MISSING:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+                found[pid] = item[1]
+        return found, missing
+
+    def put_many(self, places: Dict[str, Dict[str, Any]], missing: Iterable[str] = ()) -> None:
+        """조회 결과 저장. missing 은 DB 에도 없던 id (negative 항목)."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        for pid, place in places.items():
+            self._set(pid, now + self.ttl_seconds, place)
+        if self.negative_ttl_seconds > 0:
+            for pid in missing:
+                if pid not in places:
+                    self._set(pid, now + self.negative_ttl_seconds, _MISSING)
+
+    def _set(self, pid: str, expires: float, value: Dict[str, Any]) -> None:
+        self._store[pid] = (expires, value)
+        self._store.move_to_end(pid)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, place_ids: Iterable[Optional[str]]) -> None:
+        for pid in place_ids:
+            if pid:
+                self._store.pop(pid, None)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._store),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+place_cache = PlaceCache(
+    max_entries=settings.PLACE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PLACE_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.PLACE_CACHE_NEGATIVE_TTL_SECONDS,
+)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+장소 presence 인메모리 인덱스 (place_id → 지금 그 장소에 있는 사용자).
+- 사용자당 항목 하나 (가장 최근 체크인 장소). 다른 장소에 체크인하면 이전 장소에서 빠짐.
+- 만료는 시간 버킷(PRESENCE_BUCKET_SECONDS) 단위: 마지막 확인 시각의 버킷에 등록해 두고,
+  PRESENCE_MAX_HOURS 보다 오래된 버킷만 통째로 비움 → 정리 비용은 만료되는 항목 수에 비례.
+- 갱신 경로
+  · 체크인(create_visit) / 위치 갱신(update_user_location) 이 실시간 허브에 presence 이벤트 발행 →
+    add_listener 로 받아 반영. redis 브로커면 다른 워커의 체크인도 즉시 반영.
+  · 위치 갱신: 체크인 장소에서 PRESENCE_LEAVE_METERS 이상 벗어나면 left, 아니면 버킷이 바뀔 때만 here(만료 연장).
+  · 시작 시 최근 PRESENCE_MAX_HOURS 시간 visits 로 재구성, 이후 PRESENCE_REFRESH_SECONDS 마다 새 visits 만 반영
+    (memory 브로커로 워커가 여러 개여도 이 주기 안에 수렴).
+- 표시용 프로필(username, 사진)은 TTL 캐시 → 인기 장소 조회가 DB 를 치지 않음.
+- 지표: GET /health/presence
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.config import settings
+from db.cursor import encode_cursor
+from db.geo import haversine_m
+from db.time_buckets import BucketExpiry, parse_epoch
+from services.realtime import place_channel, publish_event
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _epoch(value: Any) -> Optional[float]:
+    """visited_at / checked_in_at / seen_at → epoch 초 (오프셋 없으면 서버 현지 시각으로 기록된 값)"""
+    return parse_epoch(value, naive_tz=None)
+
+
+class _Presence:
+    __slots__ = ("place_id", "checked_in_at", "checked_in_ts", "last_seen")
+
+    def __init__(self, place_id: str, checked_in_at: str, checked_in_ts: float, last_seen: float):
+        self.place_id = place_id
+        self.checked_in_at = checked_in_at
+        self.checked_in_ts = checked_in_ts
+        self.last_seen = last_seen
+
+
+class PlacePresenceIndex:
+    """place_id → {user_id} + user_id → 현재 presence, 시간 버킷 만료"""
+
+    def __init__(self, max_age_seconds: float = 6 * 3600, bucket_seconds: float = 300,
+                 profile_ttl_seconds: float = 600, profile_max_entries: int = 20000):
+        self.max_age_seconds = max_age_seconds
+        self._expiry = BucketExpiry(bucket_seconds)
+        self.bucket_seconds = self._expiry.bucket_seconds
+        self.profile_ttl_seconds = profile_ttl_seconds
+        self.profile_max_entries = max(1, profile_max_entries)
+        self.ready = False
+        # 증분 갱신 커서 (visited_at, id 오름차순)
+        self.cursor: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._users: Dict[str, _Presence] = {}
+        self._places: Dict[str, Set[str]] = {}
+        self._profiles: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.counters = {
+            "checkins": 0, "refreshes": 0, "departures": 0, "expired": 0, "queries": 0,
+            "profile_hits": 0, "profile_misses": 0, "loaded_visits": 0, "last_refresh_at": None,
+        }
+
+    # ---------- 변경 ----------
+
+    def _remove(self, user_id: str) -> Optional[_Presence]:
+        entry = self._users.pop(user_id, None)
+        if entry is not None:
+            users = self._places.get(entry.place_id)
+            if users is not None:
+                users.discard(user_id)
+                if not users:
+                    del self._places[entry.place_id]
+        return entry
+
+    def checkin(self, user_id: str, place_id: str, checked_in_at: str, ts: Optional[float] = None) -> bool:
+        """
+        체크인 반영. 같은 장소의 더 최근 체크인이나 다른 장소에서 더 최근에 확인된 기록이 있으면 무시
+        (재구성 행과 실시간 이벤트가 어떤 순서로 와도 같은 결과).
+        """
+        ts = ts if ts is not None else (_epoch(checked_in_at) or time.time())
+        if ts < time.time() - self.max_age_seconds:
+            return False
+        current = self._users.get(user_id)
+        last_seen = ts
+        if current is not None:
+            if current.place_id == place_id:
+                if current.checked_in_ts >= ts:
+                    return False
+                last_seen = max(ts, current.last_seen)
+            elif current.last_seen >= ts:
+                return False
+        self._remove(user_id)
+        self._users[user_id] = _Presence(place_id, checked_in_at, ts, last_seen)
+        self._places.setdefault(place_id, set()).add(user_id)
+        self._expiry.track(user_id, last_seen)
+        self.counters["checkins"] += 1
+        return True
+
+    def touch(self, user_id: str, place_id: str, ts: Optional[float] = None) -> bool:
+        """아직 그 장소에 있음 → 만료 연장"""
+        entry = self._users.get(user_id)
+        if entry is None or entry.place_id != place_id:
+            return False
+        ts = ts or time.time()
+        if ts > entry.last_seen:
+            entry.last_seen = ts
+            self._expiry.track(user_id, ts)
+            self.counters["refreshes"] += 1
+        return True
+
+    def leave(self, user_id: str, place_id: str) -> bool:
+        entry = self._users.get(user_id)
+        if entry is None or entry.place_id != place_id:
+            return False
+        self._remove(user_id)
+        self.counters["departures"] += 1
+        return True
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """max_age 보다 오래된 버킷 정리. 제거한 항목 수"""
+        cutoff = (now or time.time()) - self.max_age_seconds
+        removed = 0
+        for members in self._expiry.pop_expired(cutoff):
+            for user_id in members:
+                entry = self._users.get(user_id)
+                if entry is not None and entry.last_seen < cutoff:
+                    self._remove(user_id)
+                    removed += 1
+        self.counters["expired"] += removed
+        return removed
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """실시간 허브 리스너: place:<id> 채널의 presence 이벤트 반영"""
+        if event.get("type") != "presence" or not str(event.get("channel", "")).startswith("place:"):
+            return
+        data = event.get("data") or {}
+        user_id, place_id = data.get("user_id"), data.get("place_id")
+        if not user_id or not place_id:
+            return
+        state = data.get("state", "checkin")
+        if state == "checkin":
+            self.checkin(user_id, place_id, data.get("checked_in_at") or datetime.now().isoformat())
+        elif state == "here":
+            self.touch(user_id, place_id, _epoch(data.get("seen_at")))
+        elif state == "left":
+            self.leave(user_id, place_id)
+
+    # ---------- 조회 ----------
+
+    def where(self, user_id: str) -> Optional[Tuple[str, float]]:
+        entry = self._users.get(user_id)
+        return (entry.place_id, entry.last_seen) if entry is not None else None
+
+    def present(self, place_id: str, within_seconds: float, exclude: Optional[str] = None) -> List[Tuple[str, str]]:
+        """장소에 있는 사용자 [(user_id, checked_in_at)] 최근 체크인 순"""
+        self.expire()
+        self.counters["queries"] += 1
+        cutoff = time.time() - within_seconds
+        entries = [
+            (uid, self._users[uid]) for uid in self._places.get(place_id, ())
+            if uid != exclude and self._users[uid].last_seen >= cutoff
+        ]
+        entries.sort(key=lambda item: item[1].checked_in_ts, reverse=True)
+        return [(uid, entry.checked_in_at) for uid, entry in entries]
+
+    async def profiles(self, db, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """표시용 프로필 (TTL 캐시, 미스만 users?user_id=in.(...) 한 번)"""
+        now = time.monotonic()
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for uid in user_ids:
+            item = self._profiles.get(uid)
+            if item is not None and item[0] > now:
+                self._profiles.move_to_end(uid)
+                found[uid] = item[1]
+            else:
+                missing.append(uid)
+        self.counters["profile_hits"] += len(found)
+        self.counters["profile_misses"] += len(missing)
+        if missing:
+            fetched = await db.get_user_display_profiles(missing)
+            for uid in missing:
+                # 프로필 없는 사용자도 빈 값으로 기억 (같은 미스 반복 방지)
+                profile = fetched.get(uid, {})
+                self._profiles[uid] = (now + self.profile_ttl_seconds, profile)
+                self._profiles.move_to_end(uid)
+                found[uid] = profile
+            while len(self._profiles) > self.profile_max_entries:
+                self._profiles.popitem(last=False)
+        return found
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "present_users": len(self._users),
+            "places": len(self._places),
+            "buckets": len(self._expiry),
+            "profiles_cached": len(self._profiles),
+            "max_age_hours": round(self.max_age_seconds / 3600, 2),
+            "bucket_seconds": self.bucket_seconds,
+            **self.counters,
+        }
+
+    # ---------- DB 동기화 ----------
+
+    async def load(self, db, page_size: int = 1000) -> None:
+        """최근 max_age 동안의 visits 로 재구성 (이미 받은 실시간 이벤트보다 오래된 행은 무시)"""
+        since = (datetime.now() - timedelta(seconds=self.max_age_seconds)).isoformat()
+        async with self._lock:
+            loaded = await self._apply_pages(db, since, None, page_size)
+            self.ready = True
+        logger.info("[PresenceIndex] loaded %d recent visits, %d users present", loaded, len(self))
+
+    async def refresh(self, db, page_size: int = 1000) -> int:
+        """마지막 커서 이후 visits 만 반영. 반영한 행 수"""
+        if not self.ready:
+            await self.load(db, page_size)
+            return len(self)
+        since = (datetime.now() - timedelta(seconds=self.max_age_seconds)).isoformat()
+        async with self._lock:
+            applied = await self._apply_pages(db, since, self.cursor, page_size)
+        self.expire()
+        return applied
+
+    async def _apply_pages(self, db, since: str, cursor: Optional[str], page_size: int) -> int:
+        applied = 0
+        while True:
+            page = await db.get_visits_since(since, cursor, limit=page_size)
+            for row in page:
+                if row.get("user_id") and row.get("place_id"):
+                    self.checkin(str(row["user_id"]), str(row["place_id"]), str(row.get("visited_at")))
+            applied += len(page)
+            if page:
+                last = page[-1]
+                cursor = self.cursor = encode_cursor(last.get("visited_at"), last.get("id"))
+            if len(page) < page_size:
+                break
+        self.counters["loaded_visits"] += applied
+        self.counters["last_refresh_at"] = datetime.now().isoformat(timespec="seconds")
+        return applied
+
+
+async def report_location(db, user_id: str, latitude: float, longitude: float) -> Optional[str]:
+    """
+    위치 갱신을 presence 로 반영: 체크인 장소에서 벗어났으면 left, 아직 근처면 버킷이 바뀔 때만 here.
+    발행한 상태(left/here) 또는 None.
+    """
+    current = presence_index.where(user_id)
+    if current is None:
+        return None
+    place_id, last_seen = current
+    place = await db.get_place_by_id(place_id) if db is not None else None
+    now = time.time()
+    if place and place.get("latitude") is not None and place.get("longitude") is not None:
+        distance = haversine_m(latitude, longitude, float(place["latitude"]), float(place["longitude"]))
+        if distance > settings.PRESENCE_LEAVE_METERS:
+            publish_event(place_channel(place_id), "presence", {"place_id": place_id, "user_id": user_id, "state": "left"})
+            return "left"
+    if presence_index._expiry.bucket(now) == presence_index._expiry.bucket(last_seen):
+        return None
+    publish_event(place_channel(place_id), "presence", {
+        "place_id": place_id, "user_id": user_id, "state": "here", "seen_at": datetime.now().isoformat(),
+    })
+    return "here"
+
+
+presence_index = PlacePresenceIndex(
+    max_age_seconds=settings.PRESENCE_MAX_HOURS * 3600,
+    bucket_seconds=settings.PRESENCE_BUCKET_SECONDS,
+    profile_ttl_seconds=settings.PRESENCE_PROFILE_TTL_SECONDS,
+)
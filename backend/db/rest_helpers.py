@@ -4,17 +4,28 @@ Supabase REST API 기반 DB 헬퍼
 asyncpg 대신 HTTP API 사용
 """
 
-import httpx
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import asyncio
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
 from core.config import settings
+from core.dependencies import Database
+from core.http_client import SharedHttpClient
+from db.cursor import encode_cursor, keyset_params
+from db.geo import bounding_box, haversine_m
+from db.place_cache import place_cache
+from db.place_index import place_index
+from services.realtime import conversation_channel, publish_event, user_channel
+from services.user_stats import load_user_stats, present
 
 
 class RestDatabaseHelpers:
     """Supabase REST API를 통한 DB 작업"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[SharedHttpClient] = None):
+        # 앱 공용 커넥션 풀 (Database 소유). 호출마다 새 AsyncClient를 만들지 않음
+        self.http = http or Database.get_http()
         self.base_url = settings.SUPABASE_URL
         self.api_key = settings.SUPABASE_SERVICE_ROLE_KEY
         self.headers = {
@@ -24,6 +35,17 @@ class RestDatabaseHelpers:
             "Prefer": "return=representation"
         }
     
+    # 추천 스코어러가 쓰는 컬럼만 조회 (select=* 대신)
+    PLACE_CANDIDATE_COLUMNS = (
+        "id,name,address,latitude,longitude,primary_category,vibe_tags,description,"
+        "average_rating,is_hidden_gem,typical_crowd_level,average_price"
+    )
+    # RPC가 없을 때 바운딩 박스를 id 순 키셋 페이지로 끝까지 읽음 (페이지당 행 수)
+    BBOX_PAGE_SIZE = 1000
+    # places_within_radius RPC가 404(미배포)면 이 시간(초) 동안 RPC를 건너뛰고, 지나면 다시 확인 (배포 후 자동 복귀)
+    RADIUS_RPC_RETRY_SECONDS = 300.0
+    _radius_rpc_missing_until = 0.0
+
     async def get_places_nearby(
         self,
         latitude: float,
@@ -31,37 +53,266 @@ class RestDatabaseHelpers:
         radius_meters: int = 3000,
         limit: int = 200
     ) -> List[Dict[str, Any]]:
-        """주변 장소 조회 (추천 3곳 채우기 위해 기본 200건)"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{self.base_url}/rest/v1/places"
+        """
+        반경 내 장소 조회 (가까운 순, distance_meters 포함)
+        1) places_within_radius RPC (DB에서 바운딩 박스 + haversine + 정렬)
+        2) RPC가 없으면 lat/lon 바운딩 박스를 id 키셋 페이지로 전부 읽어 파이썬 haversine 필터·정렬
+           (박스 일부만 받으면 밀집 구역에서 가까운 장소를 놓침. 404를 받으면 RADIUS_RPC_RETRY_SECONDS 동안
+           RPC 왕복 없이 바로 바운딩 박스로)
+        인메모리 공간 인덱스가 로드되어 있으면 네트워크 없이 인덱스에서 응답.
+        """
+        if place_index.ready:
+            return place_index.query_radius(latitude, longitude, radius_meters, limit)
+        places = []
+        async with self.http.session(timeout=30.0) as client:
+            if time.monotonic() >= RestDatabaseHelpers._radius_rpc_missing_until:
+                response = await client.post(
+                    f"{self.base_url}/rest/v1/rpc/places_within_radius",
+                    headers=self.headers,
+                    json={
+                        "user_lat": latitude,
+                        "user_lon": longitude,
+                        "radius_meters": radius_meters,
+                        "p_limit": limit,
+                    },
+                )
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code == 404:
+                    RestDatabaseHelpers._radius_rpc_missing_until = time.monotonic() + self.RADIUS_RPC_RETRY_SECONDS
+
+            # RPC 미배포 → 바운딩 박스 1차 필터 (idx_places_lat_lon 범위 스캔), 짧은 페이지가 올 때까지 키셋 페이지
+            min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_meters)
             params = {
-                "select": "*",
+                "select": self.PLACE_CANDIDATE_COLUMNS,
                 "is_active": "eq.true",
-                "limit": limit
+                "and": f"(latitude.gte.{min_lat},latitude.lte.{max_lat},longitude.gte.{min_lon},longitude.lte.{max_lon})",
+                "order": "id.asc",
+                "limit": self.BBOX_PAGE_SIZE,
             }
+            while True:
+                response = await client.get(f"{self.base_url}/rest/v1/places", headers=self.headers, params=params)
+                if response.status_code != 200:
+                    return []
+                page = response.json()
+                for p in page:
+                    if p.get("latitude") is None or p.get("longitude") is None:
+                        continue
+                    dist = haversine_m(latitude, longitude, float(p["latitude"]), float(p["longitude"]))
+                    if dist <= radius_meters:
+                        p["distance_meters"] = dist
+                        places.append(p)
+                if len(page) < self.BBOX_PAGE_SIZE:
+                    break
+                params["id"] = f"gt.{page[-1]['id']}"
+
+        places.sort(key=lambda p: p["distance_meters"])
+        return places[:limit]
+    
+    async def find_nearby_places(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 1.0,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """근처 장소 검색 (DatabaseHelpers.find_nearby_places 와 같은 시그니처)"""
+        return await self.get_places_nearby(latitude, longitude, int(radius_km * 1000), limit)
+
+    async def get_places_updated_since(
+        self,
+        since: Optional[str] = None,
+        after_id: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """(updated_at, id) 이후 변경된 장소 (공간 인덱스 로드/증분 갱신용, 비활성 포함)"""
+        params: Dict[str, Any] = {
+            "select": self.PLACE_CANDIDATE_COLUMNS + ",is_active,updated_at",
+            "order": "updated_at.asc,id.asc",
+            "limit": limit,
+        }
+        if since:
+            if after_id:
+                params["or"] = f'(updated_at.gt."{since}",and(updated_at.eq."{since}",id.gt."{after_id}"))'
+            else:
+                params["updated_at"] = f"gt.{since}"
+        async with self.http.session(timeout=30.0) as client:
+            response = await client.get(f"{self.base_url}/rest/v1/places", headers=self.headers, params=params)
+            if response.status_code == 200:
+                return response.json()
+            return []
+
+    # 방문 스트리밍 한 페이지 행 수
+    VISIT_PAGE_SIZE = 500
+
+    @staticmethod
+    def _visits_since(days: Optional[int]) -> Optional[str]:
+        """최근 days 일 하한 (UTC ISO). days 가 없거나 0 이하면 제한 없음"""
+        if not days or days <= 0:
+            return None
+        return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    def _visit_params(
+        self, user_id: str, select: str, limit: int, cursor: Optional[str], since: Optional[str]
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "select": select,
+            "user_id": f"eq.{user_id}",
+            "limit": limit,
+            **keyset_params(cursor, created_col="visited_at"),
+        }
+        if since:
+            params["visited_at"] = f"gte.{since}"
+        return params
+
+    async def get_user_visits(
+        self,
+        user_id: str,
+        days: Optional[int] = 90,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        select: str = "*",
+    ) -> List[Dict[str, Any]]:
+        """사용자 방문 기록 한 페이지 (최근 days 일, visited_at, id 내림차순, cursor 이후부터)"""
+        async with self.http.session(timeout=30.0) as client:
+            url = f"{self.base_url}/rest/v1/visits"
+            params = self._visit_params(user_id, select, limit, cursor, self._visits_since(days))
             
             response = await client.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 return response.json()
             return []
-    
-    async def get_user_visits(self, user_id: str, days: int = 90) -> List[Dict[str, Any]]:
-        """사용자 방문 기록 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+
+    async def iter_user_visits(
+        self,
+        user_id: str,
+        days: Optional[int] = None,
+        select: str = "*",
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        사용자 방문 기록 전체를 최신순으로 한 행씩 (async for).
+        - 기간(days)은 서버에서 거르고, select 로 필요한 컬럼만 받음 (커서용 id, visited_at 은 자동 포함)
+        - keyset 으로 page_size 행씩 받아 넘기므로 이력 길이와 무관하게 한 페이지 분량만 메모리에 둠
+        - 집계용이라 중간 페이지가 실패하면 잘린 결과 대신 예외 (httpx.HTTPStatusError)
+        """
+        if select != "*":
+            columns = [c for c in select.split(",") if c]
+            select = ",".join(dict.fromkeys(columns + ["id", "visited_at"]))
+        page_size = max(1, page_size or self.VISIT_PAGE_SIZE)
+        since = self._visits_since(days)
+        url = f"{self.base_url}/rest/v1/visits"
+        cursor: Optional[str] = None
+        while True:
+            async with self.http.session(timeout=30.0) as client:
+                params = self._visit_params(user_id, select, page_size, cursor, since)
+                response = await client.get(url, headers=self.headers, params=params)
+                response.raise_for_status()
+                page = response.json()
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            cursor = encode_cursor(last.get("visited_at"), last.get("id"))
+
+    async def get_visits_since(
+        self,
+        since: str,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        select: str = "id,user_id,place_id,visited_at",
+    ) -> List[Dict[str, Any]]:
+        """
+        전체 사용자 방문 한 페이지 (since 이후, visited_at, id 오름차순, cursor 다음부터).
+        presence 인덱스 적재·증분 갱신용. 실패 시 예외 (httpx.HTTPStatusError)
+        """
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/visits"
             params = {
-                "select": "*",
-                "user_id": f"eq.{user_id}",
-                "order": "visited_at.desc",
-                "limit": 100
+                "select": select,
+                "visited_at": f"gte.{since}",
+                "limit": limit,
+                **keyset_params(cursor, created_col="visited_at", descending=False),
             }
-            
             response = await client.get(url, headers=self.headers, params=params)
-            
+            response.raise_for_status()
+            return response.json()
+
+    async def get_user_display_profiles(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 사용자 표시용 프로필 { user_id: {username, profile_image_url} } (요청 한 번)"""
+        ids = [u for u in dict.fromkeys(user_ids) if u]
+        if not ids:
+            return {}
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/users"
+            params = {"user_id": self._in_filter(ids), "select": "user_id,username,profile_image_url"}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code != 200:
+                return {}
+            return {str(row["user_id"]): row for row in response.json() if row.get("user_id")}
+
+    async def get_user_personalities(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 사용자 성향 행 { user_id: user_personality 행 } (요청 한 번)"""
+        ids = [u for u in dict.fromkeys(user_ids) if u]
+        if not ids:
+            return {}
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/user_personality"
+            params = {"user_id": self._in_filter(ids), "select": "*"}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code != 200:
+                return {}
+            return {str(row["user_id"]): row for row in response.json() if row.get("user_id")}
+
+    async def update_user_locations(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        사용자 위치 일괄 반영 [{user_id, latitude, longitude, seen_at}] → 반영 행 수.
+        update_user_locations RPC 1회, 미배포(404)면 행별 PATCH 를 ACTIVE_USERS_PATCH_CONCURRENCY 개씩 동시에.
+        그 외 실패 시 예외 (호출 측이 재시도)
+        """
+        if not rows:
+            return 0
+        async with self.http.session(timeout=30.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/update_user_locations",
+                headers=self.headers,
+                json={"p_updates": rows},
+            )
             if response.status_code == 200:
-                return response.json()
-            return []
+                return int(response.json() or 0)
+            if response.status_code != 404:
+                response.raise_for_status()
+            url = f"{self.base_url}/rest/v1/users"
+            gate = asyncio.Semaphore(max(1, settings.ACTIVE_USERS_PATCH_CONCURRENCY))
+
+            async def _patch(row: Dict[str, Any]) -> bool:
+                body = {
+                    "last_location": f"POINT({row['longitude']} {row['latitude']})",
+                    "last_active_date": row["seen_at"],
+                }
+                async with gate:
+                    resp = await client.patch(url, headers=self.headers, json=body, params={"user_id": f"eq.{row['user_id']}"})
+                return resp.status_code in (200, 204)
+
+            return sum(await asyncio.gather(*[_patch(row) for row in rows]))
+
+    async def get_active_user_locations(
+        self, after_at: str, after_id: Optional[str] = None, limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        (last_location_at, user_id) 커서 이후 사용자 위치 한 페이지 (오름차순).
+        활동 사용자 인덱스 적재·증분 갱신용. 실패 시 예외 (httpx.HTTPStatusError)
+        """
+        async with self.http.session(timeout=30.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/active_user_locations",
+                headers=self.headers,
+                json={"p_after_at": after_at, "p_after_id": after_id, "p_limit": limit},
+            )
+            response.raise_for_status()
+            return response.json()
 
     async def get_location_history(self, user_id: str, days: int = 90) -> List[Dict[str, Any]]:
         """위치 이력 조회 (미구현 시 빈 목록 반환)"""
@@ -69,7 +320,7 @@ class RestDatabaseHelpers:
 
     async def get_user_profile(self, user_id: str) -> Dict[str, Any]:
         """사용자 프로필 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/user_personality"
             params = {
                 "select": "*",
@@ -91,7 +342,7 @@ class RestDatabaseHelpers:
         companion_style: Dict[str, Any]
     ) -> bool:
         """성격 분석 결과 저장"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/user_personality"
             
             data = {
@@ -113,7 +364,7 @@ class RestDatabaseHelpers:
     
     async def insert_visit(self, visit_data: Dict[str, Any]) -> Dict[str, Any]:
         """방문 기록 저장 (visits 테이블 사용 - REAL_DATA_SCHEMA와 일치)"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/visits"
             headers = {**self.headers, "Prefer": "return=representation"}
             response = await client.post(url, headers=headers, json=visit_data)
@@ -124,7 +375,7 @@ class RestDatabaseHelpers:
     
     async def create_challenge(self, challenge_data: Dict[str, Any]) -> Dict[str, Any]:
         """챌린지 생성"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/challenges"
             
             response = await client.post(url, headers=self.headers, json=challenge_data)
@@ -135,7 +386,7 @@ class RestDatabaseHelpers:
     
     async def get_challenge(self, challenge_id: str) -> Optional[Dict[str, Any]]:
         """챌린지 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/challenges"
             params = {
                 "select": "*",
@@ -152,7 +403,7 @@ class RestDatabaseHelpers:
     
     async def get_completed_places(self, user_id: str) -> List[str]:
         """사용자가 완료한 장소 ID 목록"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/visits"
             params = {
                 "select": "place_id",
@@ -167,107 +418,27 @@ class RestDatabaseHelpers:
             return []
     
     async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
-        """사용자 통계 (기본)"""
-        visits = await self.get_user_visits(user_id, 365)
+        """사용자 통계 (기본) — user_stats 집계 한 행"""
+        aggregate = await load_user_stats(self, user_id)
         return {
-            "total_visits": len(visits),
-            "unique_places": len(set(v.get("place_id") for v in visits if v.get("place_id"))),
-            "total_xp": sum(v.get("xp_earned", 0) for v in visits)
+            "total_visits": aggregate["total_visits"],
+            "unique_places": aggregate["unique_places"],
+            "total_xp": aggregate["total_xp"],
         }
 
-    @staticmethod
-    def _compute_streak(visited_dates: list) -> tuple:
-        """visited_dates: list of date strings (YYYY-MM-DD), sorted desc. Returns (current_streak, longest_streak)."""
-        if not visited_dates:
-            return 0, 0
-        from datetime import datetime, timedelta
-        try:
-            dates = sorted(set(visited_dates), reverse=True)
-            # longest streak
-            longest = 1
-            current = 1
-            for i in range(1, len(dates)):
-                d_prev = datetime.strptime(dates[i - 1], "%Y-%m-%d").date()
-                d_curr = datetime.strptime(dates[i], "%Y-%m-%d").date()
-                if (d_prev - d_curr).days == 1:
-                    current += 1
-                else:
-                    longest = max(longest, current)
-                    current = 1
-            longest = max(longest, current)
-            # current streak: from today or most recent visit
-            today = datetime.utcnow().date()
-            first_d = datetime.strptime(dates[0], "%Y-%m-%d").date()
-            if (today - first_d).days > 1:
-                return 0, longest
-            cur = 1
-            for i in range(1, len(dates)):
-                d_prev = datetime.strptime(dates[i - 1], "%Y-%m-%d").date()
-                d_curr = datetime.strptime(dates[i], "%Y-%m-%d").date()
-                if (d_prev - d_curr).days == 1:
-                    cur += 1
-                else:
-                    break
-            return cur, longest
-        except Exception:
-            return 0, 0
-
-    # 레벨 1~10 누적 XP 기준 (해당 레벨 도달에 필요한 최소 total_xp)
-    XP_FOR_LEVEL = (0, 150, 400, 750, 1200, 1750, 2400, 3150, 4000, 5000)  # Lv1~Lv10
-
     async def get_user_stats_full(self, user_id: str) -> Dict[str, Any]:
-        """레벨/XP/스트릭 등 상세 통계 (visits 기반 실데이터). 레벨 1~10 보상 체계."""
-        visits = await self.get_user_visits(user_id, 365)
-        total_xp = sum(v.get("xp_earned", 0) for v in visits)
-        unique_places = len(set(v.get("place_id") for v in visits if v.get("place_id")))
-        # 레벨: XP_FOR_LEVEL 기준 (1580 XP → Lv5, 다음 레벨까지 170 XP)
-        level = 1
-        for i in range(1, 10):
-            if total_xp >= self.XP_FOR_LEVEL[i]:
-                level = i + 1
-            else:
-                break
-        # 다음 레벨까지 필요한 XP (Lv10이면 0)
-        xp_to_next_level = max(0, self.XP_FOR_LEVEL[level] - total_xp) if level < 10 else 0
-        current_level_min_xp = self.XP_FOR_LEVEL[level - 1] if level >= 1 else 0
-        # 스트릭: 방문일 기준
-        visited_dates = []
-        for v in visits:
-            at = v.get("visited_at")
-            if at:
-                if isinstance(at, str) and "T" in at:
-                    visited_dates.append(at[:10])
-                else:
-                    visited_dates.append(str(at)[:10])
-        current_streak, longest_streak = self._compute_streak(visited_dates)
-        # 업적 뱃지: 첫 방문, 7일 연속, 10곳 방문
-        badges = []
-        if len(visits) >= 1:
-            badges.append({"id": "first_visit", "name": "첫 방문", "icon": "🌟"})
-        if longest_streak >= 7:
-            badges.append({"id": "streak_7", "name": "7일 연속", "icon": "🔥"})
-        if unique_places >= 10:
-            badges.append({"id": "places_10", "name": "10곳 방문", "icon": "📍"})
-        return {
-            "level": level,
-            "total_xp": total_xp,
-            "xp_to_next_level": xp_to_next_level,
-            "current_level_min_xp": current_level_min_xp,
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "completed_quests": len(visits),
-            "total_places_visited": unique_places,
-            "total_visits": len(visits),
-            "unique_places": unique_places,
-            "badges": badges,
-        }
-    
+        """
+        레벨/XP/스트릭 등 상세 통계. 레벨 1~10 보상 체계.
+        방문마다 증분 갱신되는 user_stats 한 행에서 파생 (집계가 없으면 visits 로 계산해 채움).
+        """
+        return present(await load_user_stats(self, user_id))
+
     async def upsert_place_minimal(
         self, place_id: str, name: str, primary_category: str = "기타",
         latitude: float = 37.5665, longitude: float = 126.9780
     ) -> bool:
         """장소 id/이름/카테고리만으로 places 테이블 upsert (Kakao 등 외부 장소용)"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/places"
             payload = {
                 "id": place_id,
@@ -276,31 +447,54 @@ class RestDatabaseHelpers:
                 "is_active": True,
                 "latitude": latitude,
                 "longitude": longitude,
+                # merge-duplicates 는 UPDATE 트리거가 없는 스키마에서 updated_at 을 건드리지 않음 → 공간 인덱스 증분 갱신용
+                "updated_at": datetime.now(timezone.utc).isoformat(),
             }
             headers = {**self.headers, "Prefer": "resolution=merge-duplicates"}
             resp = await client.post(url, headers=headers, json=payload)
+            place_cache.invalidate([place_id])
             return resp.status_code in (200, 201)
 
+    @staticmethod
+    def _in_filter(values: List[str]) -> str:
+        """PostgREST in.(...) 필터. 값이 클라이언트가 보낸 임의 문자열(장소 id, endpoint URL)일 수 있어 큰따옴표로 감싼다"""
+        quoted = (v.replace("\\", "\\\\").replace('"', '\\"') for v in values)
+        return "in.(" + ",".join(f'"{v}"' for v in quoted) + ")"
+
+    # places id in.(...) 한 요청에 넣을 최대 id 수
+    PLACE_IN_CHUNK = 100
+
     async def get_place_by_id(self, place_id: str) -> Optional[Dict[str, Any]]:
-        """장소 상세 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{self.base_url}/rest/v1/places"
-            params = {
-                "select": "*",
-                "id": f"eq.{place_id}",
-                "limit": 1
-            }
-            
-            response = await client.get(url, headers=self.headers, params=params)
-            
-            if response.status_code == 200:
-                results = response.json()
-                return results[0] if results else None
+        """장소 상세 조회 (프로세스 캐시 read-through)"""
+        if not place_id:
             return None
+        return (await self.get_places_by_ids([place_id])).get(place_id)
+
+    async def get_places_by_ids(self, place_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 장소 상세를 한 번에 { place_id: 행 } (없는 id 는 빠짐).
+        프로세스 캐시(LRU+TTL)에 없는 id 만 places?id=in.(...) 로 PLACE_IN_CHUNK 개씩 조회해 채운다.
+        """
+        ids = [str(p) for p in dict.fromkeys(place_ids) if p]
+        found, missing = place_cache.get_many(ids)
+        if not missing:
+            return found
+        async with self.http.session(timeout=30.0) as client:
+            url = f"{self.base_url}/rest/v1/places"
+            for i in range(0, len(missing), self.PLACE_IN_CHUNK):
+                chunk = missing[i:i + self.PLACE_IN_CHUNK]
+                params = {"select": "*", "id": self._in_filter(chunk)}
+                response = await client.get(url, headers=self.headers, params=params)
+                if response.status_code != 200:
+                    continue
+                fetched = {str(row["id"]): row for row in response.json() if row.get("id") is not None}
+                place_cache.put_many(fetched, missing=chunk)
+                found.update(fetched)
+        return found
     
     async def get_all_places(self, limit: int = 100) -> List[Dict[str, Any]]:
         """모든 장소 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/places"
             params = {
                 "select": "*",
@@ -317,7 +511,7 @@ class RestDatabaseHelpers:
     # ---------- 알림 ----------
     async def get_notifications(self, user_id: str, limit: int = 50, unread_only: bool = False) -> List[Dict[str, Any]]:
         """사용자 알림 목록"""
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with self.http.session(timeout=15.0) as client:
             url = f"{self.base_url}/rest/v1/notifications"
             params = {
                 "select": "*",
@@ -334,7 +528,7 @@ class RestDatabaseHelpers:
 
     async def create_notification(self, user_id: str, type_: str, title: str, body: str = "", extra: Optional[Dict] = None) -> Optional[Dict]:
         """알림 생성"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/notifications"
             payload = {
                 "user_id": user_id,
@@ -347,20 +541,56 @@ class RestDatabaseHelpers:
             response = await client.post(url, headers=self.headers, json=payload)
             if response.status_code in (200, 201):
                 out = response.json()
-                return out[0] if isinstance(out, list) else out
+                notification = out[0] if isinstance(out, list) else out
+                # 사용자 채널로 푸시 → 알림 벨 폴링 불필요
+                publish_event(user_channel(user_id), "notification", notification)
+                return notification
             return None
 
     async def mark_notification_read(self, notification_id: str) -> bool:
         """알림 읽음 처리"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/notifications?id=eq.{notification_id}"
             response = await client.patch(url, headers=self.headers, json={"read": True})
             return response.status_code in (200, 204)
 
+    @staticmethod
+    def _content_range_total(response) -> Optional[int]:
+        """Prefer: count=exact 응답의 Content-Range (0-N/Total, */Total) 에서 Total"""
+        cr = response.headers.get("content-range", "")
+        if "/" in cr:
+            try:
+                return int(cr.split("/")[1])
+            except ValueError:
+                pass
+        return None
+
+    async def count_unread_notifications(self, user_id: str) -> int:
+        """안 읽은 알림 수: 행은 받지 않고 HEAD + count=exact (부분 인덱스 idx_notifications_unread)"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/notifications"
+            params = {"select": "id", "user_id": f"eq.{user_id}", "read": "eq.false"}
+            headers = {**self.headers, "Prefer": "count=exact"}
+            response = await client.head(url, headers=headers, params=params)
+            if response.status_code in (200, 206):
+                return self._content_range_total(response) or 0
+            return 0
+
+    async def mark_all_notifications_read(self, user_id: str) -> Optional[int]:
+        """사용자의 안 읽은 알림 전부 읽음 처리 (UPDATE 한 번). 바뀐 행 수, 실패 시 None"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/notifications"
+            params = {"user_id": f"eq.{user_id}", "read": "eq.false"}
+            headers = {**self.headers, "Prefer": "return=minimal,count=exact"}
+            response = await client.patch(url, headers=headers, params=params, json={"read": True})
+            if response.status_code in (200, 204):
+                return self._content_range_total(response) or 0
+            return None
+
     # ---------- Web Push 구독 ----------
     async def get_push_subscriptions(self, user_id: str) -> List[Dict[str, Any]]:
         """사용자 푸시 구독 목록"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/push_subscriptions"
             params = {"user_id": f"eq.{user_id}", "select": "endpoint,p256dh,auth"}
             response = await client.get(url, headers=self.headers, params=params)
@@ -372,7 +602,7 @@ class RestDatabaseHelpers:
         self, user_id: str, endpoint: str, p256dh: str, auth: str
     ) -> bool:
         """푸시 구독 저장 (endpoint 기준 upsert)"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             # 기존 동일 endpoint 있으면 삭제 후 삽입 (간단 upsert)
             del_url = f"{self.base_url}/rest/v1/push_subscriptions?endpoint=eq.{quote(endpoint, safe='')}"
             await client.delete(del_url, headers=self.headers)
@@ -386,26 +616,65 @@ class RestDatabaseHelpers:
             response = await client.post(url, headers=self.headers, json=payload)
             return response.status_code in (200, 201)
 
+    async def iter_push_subscriptions(
+        self, select: str = "id,user_id,endpoint,p256dh,auth", page_size: int = 1000, after: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """전체 푸시 구독을 id 순 keyset 페이지로 한 행씩 (일괄 발송·집계용, select 에 id 자동 포함, after 다음부터)"""
+        if select != "*" and "id" not in select.split(","):
+            select = f"id,{select}"
+        url = f"{self.base_url}/rest/v1/push_subscriptions"
+        while True:
+            params = {"select": select, "order": "id.asc", "limit": page_size}
+            if after:
+                params["id"] = f"gt.{after}"
+            async with self.http.session(timeout=30.0) as client:
+                response = await client.get(url, headers=self.headers, params=params)
+                response.raise_for_status()
+                page = response.json()
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            after = str(page[-1]["id"])
+
+    async def get_all_push_subscriptions(self) -> List[Dict[str, Any]]:
+        """전체 푸시 구독 (관리용 집계. 일괄 발송은 iter_push_subscriptions 로 스트리밍)"""
+        return [row async for row in self.iter_push_subscriptions(select="id,user_id,endpoint")]
+
+    async def delete_push_subscriptions(self, endpoints: List[str]) -> int:
+        """만료된(404/410) endpoint 구독 삭제. 삭제 요청한 endpoint 수 반환"""
+        unique = [e for e in dict.fromkeys(endpoints) if e]
+        deleted = 0
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/push_subscriptions"
+            headers = {**self.headers, "Prefer": "return=minimal"}
+            for i in range(0, len(unique), 100):
+                chunk = unique[i:i + 100]
+                response = await client.delete(url, headers=headers, params={"endpoint": self._in_filter(chunk)})
+                if response.status_code in (200, 204):
+                    deleted += len(chunk)
+        return deleted
+
     # ---------- 소셜: 팔로우 ----------
     async def follow_user(self, follower_id: str, following_id: str) -> bool:
         """팔로우 추가 (자기 자신은 불가)"""
         if follower_id == following_id:
             return False
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/follows"
             response = await client.post(url, headers=self.headers, json={"follower_id": follower_id, "following_id": following_id})
             return response.status_code in (200, 201)
 
     async def unfollow_user(self, follower_id: str, following_id: str) -> bool:
         """팔로우 해제"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/follows?follower_id=eq.{follower_id}&following_id=eq.{following_id}"
             response = await client.delete(url, headers=self.headers)
             return response.status_code in (200, 204)
 
     async def get_following_ids(self, user_id: str) -> List[str]:
         """내가 팔로우하는 사람 ID 목록"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/follows"
             params = {"select": "following_id", "follower_id": f"eq.{user_id}"}
             response = await client.get(url, headers=self.headers, params=params)
@@ -414,9 +683,35 @@ class RestDatabaseHelpers:
                 return [r["following_id"] for r in rows if r.get("following_id")]
             return []
 
+    async def get_follower_ids(self, user_id: str, limit: int = 1000) -> List[str]:
+        """나를 팔로우하는 사람 ID 목록 (최대 limit명)"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/follows"
+            params = {"select": "follower_id", "following_id": f"eq.{user_id}", "limit": limit}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                return [r["follower_id"] for r in response.json() if r.get("follower_id")]
+            return []
+
+    async def get_followed_among(self, user_id: str, candidate_ids: List[str]) -> List[str]:
+        """candidate_ids 중 user_id 가 팔로우하는 사람 (팔로우 목록 전체를 받지 않음)"""
+        if not candidate_ids:
+            return []
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/follows"
+            params = {
+                "select": "following_id",
+                "follower_id": f"eq.{user_id}",
+                "following_id": f"in.({','.join(candidate_ids)})",
+            }
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                return [r["following_id"] for r in response.json() if r.get("following_id")]
+            return []
+
     async def get_follower_count(self, user_id: str) -> int:
         """팔로워 수"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/follows"
             params = {"select": "id", "following_id": f"eq.{user_id}", "limit": 1}
             response = await client.get(url, headers=self.headers, params=params)
@@ -426,35 +721,120 @@ class RestDatabaseHelpers:
 
     # ---------- 소셜: 피드 활동 ----------
     async def create_feed_activity(self, user_id: str, type_: str, place_id: Optional[str] = None, place_name: Optional[str] = None, xp_earned: Optional[int] = None, content: Optional[str] = None) -> Optional[Dict]:
-        """피드 활동 생성 (체크인 시 호출)"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        """피드 활동 생성 (체크인 시 호출). 저장되면 팔로워 피드 인박스로 백그라운드 fan-out."""
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/feed_activities"
             payload = {"user_id": user_id, "type": type_, "place_id": place_id or "", "place_name": place_name or "", "xp_earned": xp_earned, "content": content or ""}
             response = await client.post(url, headers=self.headers, json=payload)
             if response.status_code in (200, 201):
                 out = response.json()
-                return out[0] if isinstance(out, list) else out
+                activity = out[0] if isinstance(out, list) else out
+                from services.feed_fanout import schedule_fan_out
+                schedule_fan_out(self, activity)
+                return activity
             return None
 
-    async def get_feed_activities(self, user_ids: List[str], limit: int = 50) -> List[Dict[str, Any]]:
-        """여러 사용자의 피드 활동 (팔로우 피드용)"""
+    async def get_feed_activities(self, user_ids: List[str], limit: int = 50, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """여러 사용자의 피드 활동 (created_at, id 내림차순, cursor 이후부터)"""
         if not user_ids:
             return []
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with self.http.session(timeout=15.0) as client:
             url = f"{self.base_url}/rest/v1/feed_activities"
             # PostgREST: user_id=in.(id1,id2,id3)
             in_val = "in.(" + ",".join(user_ids) + ")"
             params = {
                 "select": "*",
-                "order": "created_at.desc",
                 "limit": limit,
                 "user_id": in_val,
+                **keyset_params(cursor),
             }
             response = await client.get(url, headers=self.headers, params=params)
             if response.status_code != 200:
                 return []
             return response.json()
 
+    # ---------- 소셜: 피드 인박스 (fan-out-on-write) ----------
+    async def insert_feed_inbox(self, rows: List[Dict[str, Any]], chunk: int = 500) -> bool:
+        """인박스 행 일괄 추가 (owner_id, activity_id, actor_id, created_at). 중복은 무시. 테이블 없으면 False"""
+        if not rows:
+            return True
+        async with self.http.session(timeout=15.0) as client:
+            url = f"{self.base_url}/rest/v1/feed_inbox"
+            headers = {**self.headers, "Prefer": "resolution=ignore-duplicates,return=minimal"}
+            for i in range(0, len(rows), chunk):
+                response = await client.post(url, headers=headers, json=rows[i:i + chunk])
+                if response.status_code not in (200, 201, 204):
+                    return False
+        return True
+
+    async def trim_feed_inbox(self, owner_ids: Optional[List[str]], keep: int) -> int:
+        """인박스를 소유자별 최신 keep개로 자름 (owner_ids=None 이면 전체). 삭제 행 수"""
+        async with self.http.session(timeout=30.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/trim_feed_inbox",
+                headers=self.headers,
+                json={"p_owner_ids": owner_ids, "p_keep": keep},
+            )
+            if response.status_code == 200:
+                try:
+                    return int(response.json() or 0)
+                except (TypeError, ValueError):
+                    return 0
+            return 0
+
+    async def get_feed_inbox(self, owner_id: str, limit: int = 50, cursor: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        내 피드 인박스 (활동 임베드, created_at·activity_id 내림차순, cursor 이후부터).
+        반환 행은 활동 자체 (feed_activities 컬럼). 인박스 테이블이 없으면 None.
+        """
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/feed_inbox"
+            params = {
+                "select": "activity_id,created_at,feed_activities(*)",
+                "owner_id": f"eq.{owner_id}",
+                "limit": limit,
+                **keyset_params(cursor, id_col="activity_id"),
+            }
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code != 200:
+                return None
+            return [r["feed_activities"] for r in response.json() if r.get("feed_activities")]
+
+    async def backfill_feed_inbox(self, owner_id: str, actor_id: str, limit: int = 50) -> bool:
+        """새로 팔로우한 사람의 최근 활동을 내 인박스에 채움"""
+        activities = await self.get_feed_activities([actor_id], limit=limit)
+        return await self.insert_feed_inbox([
+            {"owner_id": owner_id, "activity_id": a["id"], "actor_id": actor_id, "created_at": a.get("created_at")}
+            for a in activities if a.get("id")
+        ])
+
+    async def remove_feed_inbox_actor(self, owner_id: str, actor_id: str) -> bool:
+        """언팔로우 시 내 인박스에서 해당 사용자 활동 제거"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/feed_inbox"
+            params = {"owner_id": f"eq.{owner_id}", "actor_id": f"eq.{actor_id}"}
+            response = await client.delete(url, headers=self.headers, params=params)
+            return response.status_code in (200, 204)
+
+    async def upsert_feed_celebrity(self, user_id: str, follower_count: int) -> bool:
+        """팔로워가 많아 fan-out-on-read 로 읽을 계정 등록"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/feed_celebrities"
+            headers = {**self.headers, "Prefer": "resolution=merge-duplicates,return=minimal"}
+            payload = {"user_id": user_id, "follower_count": follower_count, "updated_at": datetime.utcnow().isoformat()}
+            response = await client.post(url, headers=headers, json=payload)
+            return response.status_code in (200, 201, 204)
+
+    async def get_feed_celebrities(self, limit: int = 500) -> List[str]:
+        """fan-out-on-read 대상 계정 ID (팔로워 많은 순)"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/feed_celebrities"
+            params = {"select": "user_id", "order": "follower_count.desc", "limit": limit}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                return [r["user_id"] for r in response.json() if r.get("user_id")]
+            return []
+
     # ---------- 로컬 피드: local_posts / local_comments ----------
     async def create_local_post(
         self,
@@ -470,7 +850,7 @@ class RestDatabaseHelpers:
         area_name: str = "",
     ) -> Optional[Dict[str, Any]]:
         """동네 게시글 생성 (story/review/gathering)"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/local_posts"
             payload = {
                 "author_id": author_id,
@@ -498,15 +878,17 @@ class RestDatabaseHelpers:
         following_ids: Optional[List[str]] = None,
         author_id: Optional[str] = None,
         limit: int = 50,
+        cursor: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         scope=neighborhood: area_name 기준 (비어 있으면 전체)
         scope=following: user_id + following_ids 작성 글만
         scope=user + author_id: 해당 사용자 작성 글만 (프로필 피드)
+        created_at, id 내림차순, cursor 이후부터
         """
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with self.http.session(timeout=15.0) as client:
             url = f"{self.base_url}/rest/v1/local_posts"
-            params = {"select": "*", "order": "created_at.desc", "limit": limit}
+            params = {"select": "*", "limit": limit, **keyset_params(cursor)}
             if scope == "neighborhood" and area_name:
                 params["area_name"] = f"eq.{area_name}"
             elif scope == "following" and user_id and following_ids is not None:
@@ -521,7 +903,7 @@ class RestDatabaseHelpers:
 
     async def create_local_comment(self, post_id: str, author_id: str, body: str) -> Optional[Dict[str, Any]]:
         """댓글 생성"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/local_comments"
             payload = {"post_id": post_id, "author_id": author_id, "body": body}
             response = await client.post(url, headers=self.headers, json=payload)
@@ -530,15 +912,15 @@ class RestDatabaseHelpers:
                 return out[0] if isinstance(out, list) else out
             return None
 
-    async def list_local_comments(self, post_id: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """게시글별 댓글 목록 (시간순)"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+    async def list_local_comments(self, post_id: str, limit: int = 100, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """게시글별 댓글 목록 (created_at, id 오름차순, cursor 이후부터)"""
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/local_comments"
             params = {
                 "select": "*",
                 "post_id": f"eq.{post_id}",
-                "order": "created_at.asc",
                 "limit": limit,
+                **keyset_params(cursor, descending=False),
             }
             response = await client.get(url, headers=self.headers, params=params)
             if response.status_code != 200:
@@ -554,7 +936,7 @@ class RestDatabaseHelpers:
         """
         if not user_a_id or not user_b_id or user_a_id == user_b_id:
             return None
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             base = f"{self.base_url}/rest/v1/conversations"
             # 1) (user_a_id, user_b_id) 조합 검색
             async def _find(a: str, b: str) -> Optional[Dict[str, Any]]:
@@ -591,7 +973,7 @@ class RestDatabaseHelpers:
         """대화 한 건 조회"""
         if not conversation_id:
             return None
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/conversations"
             params = {"select": "*", "id": f"eq.{conversation_id}", "limit": 1}
             resp = await client.get(url, headers=self.headers, params=params)
@@ -600,19 +982,19 @@ class RestDatabaseHelpers:
             rows = resp.json()
             return rows[0] if rows else None
 
-    async def get_messages(self, conversation_id: str, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
-        """대화의 메시지 목록"""
+    async def get_messages(self, conversation_id: str, limit: int = 50, before: Optional[str] = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """대화의 메시지 목록 (created_at, id 내림차순, cursor 이후부터). before(시각)는 이전 클라이언트 호환용"""
         if not conversation_id:
             return []
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/messages"
             params: Dict[str, Any] = {
                 "select": "*",
                 "conversation_id": f"eq.{conversation_id}",
-                "order": "created_at.desc",
                 "limit": limit,
+                **keyset_params(cursor),
             }
-            if before:
+            if before and not cursor:
                 params["created_at"] = f"lt.{before}"
             resp = await client.get(url, headers=self.headers, params=params)
             if resp.status_code != 200:
@@ -623,7 +1005,7 @@ class RestDatabaseHelpers:
         """메시지 한 건 저장"""
         if not conversation_id or not sender_id or not body:
             return None
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/messages"
             payload = {
                 "conversation_id": conversation_id,
@@ -640,7 +1022,10 @@ class RestDatabaseHelpers:
                 headers=self.headers,
                 json={"last_message_at": datetime.utcnow().isoformat()},
             )
-            return out[0] if isinstance(out, list) else out
+            message = out[0] if isinstance(out, list) else out
+            # 대화방 구독자(WebSocket/SSE)에게 푸시 → 채팅 화면 폴링 불필요
+            publish_event(conversation_channel(conversation_id), "message", message)
+            return message
 
     # ---------- 소셜: 사용자 검색 & 프로필 ----------
     async def search_public_users(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -650,7 +1035,7 @@ class RestDatabaseHelpers:
         """
         if not query:
             return []
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/users"
             # username 또는 display_name 에 부분 일치
             like = f"*{query}*"
@@ -669,7 +1054,7 @@ class RestDatabaseHelpers:
         """여러 사용자의 display_name, profile_image_url 조회. 반환: { user_id: { display_name, profile_image_url } }"""
         if not user_ids:
             return {}
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             in_val = "in.(" + ",".join(user_ids[:50]) + ")"
             url = f"{self.base_url}/rest/v1/users"
             params = {"select": "id,display_name,profile_image_url", "id": in_val}
@@ -688,7 +1073,7 @@ class RestDatabaseHelpers:
         
         try:
             # 이미 존재하는지 확인
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with self.http.session(timeout=10.0) as client:
                 url = f"{self.base_url}/rest/v1/users"
                 params = {"id": f"eq.{user_id}", "select": "id"}
                 response = await client.get(url, headers=self.headers, params=params)
@@ -718,7 +1103,7 @@ class RestDatabaseHelpers:
         """
         if not user_id:
             return False
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/users"
             payload: Dict[str, Any] = {"id": user_id}
             if display_name is not None:
@@ -729,10 +1114,69 @@ class RestDatabaseHelpers:
             response = await client.post(url, headers=headers, json=payload)
             return response.status_code in (200, 201, 204)
 
+    # ---------- 소셜: 협동 퀘스트 (group_quests / group_quest_participants) ----------
+    # in.(...) 한 요청에 넣을 퀘스트 ID 수 (URL 길이 제한 대비)
+    GROUP_QUEST_IN_CHUNK = 100
+
+    async def get_group_quest_participants(
+        self,
+        quest_ids: List[str],
+        select: str = "group_quest_id,user_id,checked_in",
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """여러 협동 퀘스트의 참여자를 in.(...) 로 한 번에 조회. 반환: { quest_id: [참여자, ...] } (참여자 없으면 빈 목록)"""
+        ids = [str(q) for q in dict.fromkeys(quest_ids) if q]
+        grouped: Dict[str, List[Dict[str, Any]]] = {qid: [] for qid in ids}
+        if not ids:
+            return grouped
+        if "group_quest_id" not in select.split(","):
+            select = f"group_quest_id,{select}"
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/group_quest_participants"
+            for i in range(0, len(ids), self.GROUP_QUEST_IN_CHUNK):
+                chunk = ids[i:i + self.GROUP_QUEST_IN_CHUNK]
+                params = {"select": select, "group_quest_id": f"in.({','.join(chunk)})"}
+                response = await client.get(url, headers=self.headers, params=params)
+                if response.status_code != 200:
+                    continue
+                for row in response.json():
+                    grouped.setdefault(str(row.get("group_quest_id")), []).append(row)
+        return grouped
+
+    async def get_group_quest_with_participants(
+        self,
+        quest_id: str,
+        quest_select: str = "*",
+        participant_select: str = "user_id,joined_at,checked_in,checked_in_at",
+    ) -> Optional[Dict[str, Any]]:
+        """퀘스트 + 참여자 목록을 임베디드 리소스로 한 요청에 조회. 참여자는 quest["participants"]. 없으면 None"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/group_quests"
+            params = {
+                "id": f"eq.{quest_id}",
+                "select": f"{quest_select},group_quest_participants({participant_select})",
+            }
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code != 200:
+                return None
+            rows = response.json()
+            if not rows:
+                return None
+            quest = rows[0]
+            quest["participants"] = quest.pop("group_quest_participants", None) or []
+            return quest
+
+    @staticmethod
+    def summarize_group_quest(quest: Dict[str, Any], participants: List[Dict[str, Any]], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """참여자 목록으로 current_participants / checked_in_count / is_joined 채움 (메모리 계산)"""
+        quest["current_participants"] = len(participants)
+        quest["checked_in_count"] = sum(1 for p in participants if p.get("checked_in"))
+        quest["is_joined"] = bool(user_id) and any(p.get("user_id") == user_id for p in participants)
+        return quest
+
     # ---------- 크리에이터: 장소 제안 ----------
     async def create_place_suggestion(self, user_id: str, name: str, address: str = "", latitude: Optional[float] = None, longitude: Optional[float] = None, category: str = "", description: str = "") -> Optional[Dict]:
         """장소 제안 생성 (UGC)"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/place_suggestions"
             payload = {
                 "user_id": user_id,
@@ -754,7 +1198,7 @@ class RestDatabaseHelpers:
 
     async def toggle_post_like(self, post_id: str, user_id: str) -> Dict[str, Any]:
         """좋아요 토글. 이미 눌렀으면 취소, 없으면 추가. 최종 liked 상태와 카운트 반환."""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             # 현재 좋아요 여부 확인
             check_url = f"{self.base_url}/rest/v1/post_likes"
             params = {"post_id": f"eq.{post_id}", "user_id": f"eq.{user_id}", "select": "id", "limit": 1}
@@ -777,25 +1221,19 @@ class RestDatabaseHelpers:
 
     async def get_post_like_count(self, post_id: str) -> int:
         """게시글 좋아요 수"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/post_likes"
             params = {"post_id": f"eq.{post_id}", "select": "id"}
             headers = {**self.headers, "Prefer": "count=exact"}
             resp = await client.get(url, headers=headers, params=params)
             if resp.status_code == 200:
-                # Content-Range: 0-N/Total
-                cr = resp.headers.get("content-range", "")
-                if "/" in cr:
-                    try:
-                        return int(cr.split("/")[1])
-                    except Exception:
-                        pass
-                return len(resp.json())
+                total = self._content_range_total(resp)
+                return total if total is not None else len(resp.json())
             return 0
 
     async def is_post_liked(self, post_id: str, user_id: str) -> bool:
         """특정 유저가 해당 게시글에 좋아요 눌렀는지"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/post_likes"
             params = {"post_id": f"eq.{post_id}", "user_id": f"eq.{user_id}", "select": "id", "limit": 1}
             resp = await client.get(url, headers=self.headers, params=params)
@@ -803,12 +1241,358 @@ class RestDatabaseHelpers:
                 return len(resp.json()) > 0
             return False
 
+    # 좋아요 수 폴백 집계 한 페이지 행 수 (PostgREST max-rows 이하)
+    LIKE_PAGE_SIZE = 1000
+
+    async def get_like_counts(self, post_ids: List[str]) -> Dict[str, int]:
+        """
+        여러 게시글의 좋아요 수를 한 번에 조회. 반환: { post_id: count } (좋아요 없으면 0)
+        1) post_like_counts RPC (DB에서 GROUP BY)
+        2) RPC가 없으면 post_likes in.(...) 를 id keyset 페이지로 조회 후 파이썬 집계
+        """
+        ids = [str(p) for p in dict.fromkeys(post_ids) if p]
+        counts: Dict[str, int] = {pid: 0 for pid in ids}
+        if not ids:
+            return counts
+        async with self.http.session(timeout=10.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/post_like_counts",
+                headers=self.headers,
+                json={"p_post_ids": ids},
+            )
+            if response.status_code == 200:
+                for row in response.json():
+                    counts[str(row.get("post_id"))] = int(row.get("like_count") or 0)
+                return counts
+
+            # RPC 미배포 → 좋아요 행의 post_id 만 id keyset 페이지로 받아 집계
+            # (한 번에 받으면 PostgREST max-rows(기본 1000)에서 잘려 인기 글 좋아요 수가 모자람)
+            after_id: Optional[str] = None
+            while True:
+                params = {
+                    "select": "id,post_id",
+                    "post_id": f"in.({','.join(ids)})",
+                    "order": "id.asc",
+                    "limit": self.LIKE_PAGE_SIZE,
+                }
+                if after_id:
+                    params["id"] = f"gt.{after_id}"
+                response = await client.get(f"{self.base_url}/rest/v1/post_likes", headers=self.headers, params=params)
+                if response.status_code != 200:
+                    break
+                page = response.json()
+                for row in page:
+                    pid = str(row.get("post_id"))
+                    counts[pid] = counts.get(pid, 0) + 1
+                if len(page) < self.LIKE_PAGE_SIZE:
+                    break
+                after_id = page[-1].get("id")
+        return counts
+
+    async def get_liked_set(self, post_ids: List[str], user_id: str) -> set:
+        """post_ids 중 user_id 가 좋아요 누른 게시글 ID 집합 (한 요청)"""
+        ids = [str(p) for p in dict.fromkeys(post_ids) if p]
+        if not ids or not user_id:
+            return set()
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/post_likes"
+            params = {"select": "post_id", "user_id": f"eq.{user_id}", "post_id": f"in.({','.join(ids)})"}
+            resp = await client.get(url, headers=self.headers, params=params)
+            if resp.status_code == 200:
+                return {str(r.get("post_id")) for r in resp.json()}
+            return set()
+
     async def get_place_suggestions_by_user(self, user_id: str) -> List[Dict[str, Any]]:
         """내 장소 제안 목록"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.http.session(timeout=10.0) as client:
             url = f"{self.base_url}/rest/v1/place_suggestions"
             params = {"select": "*", "user_id": f"eq.{user_id}", "order": "created_at.desc"}
             response = await client.get(url, headers=self.headers, params=params)
             if response.status_code == 200:
                 return response.json()
             return []
+
+    # ---------- 서사 캐시 (narratives) ----------
+    async def get_narrative(self, cache_key: str) -> Optional[str]:
+        """캐시 키로 저장된 서사 조회"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/narratives"
+            params = {"select": "narrative", "cache_key": f"eq.{cache_key}", "limit": 1}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                rows = response.json()
+                return rows[0].get("narrative") if rows else None
+            return None
+
+    async def save_narrative(self, cache_key: str, narrative: str, fields: Dict[str, Any]) -> bool:
+        """서사 저장 (cache_key 기준 upsert). fields: place_id, role_type, mood_bucket, weather, time_of_day"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/narratives"
+            payload = {"cache_key": cache_key, "narrative": narrative, **fields}
+            headers = {**self.headers, "Prefer": "resolution=merge-duplicates"}
+            response = await client.post(url, headers=headers, json=payload)
+            return response.status_code in (200, 201, 204)
+
+    async def increment_narrative_demand(self, rows: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        사전 생성 후보 노출 횟수 합산 [{cache_key, hits, generate_kwargs}] → 반영 행 수.
+        increment_narrative_demand RPC 미배포(404)면 None, 그 외 실패 시 예외 (호출 측이 재시도)
+        """
+        if not rows:
+            return 0
+        async with self.http.session(timeout=10.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/increment_narrative_demand",
+                headers=self.headers,
+                json={"p_rows": rows},
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return int(response.json() or 0)
+
+    async def top_narrative_demand(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """노출 많은 순, 아직 서사가 저장되지 않은 조합 [{cache_key, hits, generate_kwargs}]. RPC 미배포(404)면 None"""
+        async with self.http.session(timeout=10.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/top_narrative_demand",
+                headers=self.headers,
+                json={"p_limit": limit},
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json() or []
+
+    async def decay_narrative_demand(self) -> Optional[int]:
+        """공유 집계 절반 감쇠 → 남은 조합 수. RPC 미배포(404)면 None"""
+        async with self.http.session(timeout=10.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/decay_narrative_demand",
+                headers=self.headers,
+                json={},
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return int(response.json() or 0)
+
+    # ---------- 사용자 통계 집계 (user_stats) ----------
+    USER_STATS_COLUMNS = "user_id,total_xp,total_visits,unique_places,current_streak,longest_streak,last_visit_date"
+
+    async def get_user_stats_row(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """집계 한 행 (없거나 테이블 미배포면 None)"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/user_stats"
+            params = {"select": self.USER_STATS_COLUMNS, "user_id": f"eq.{user_id}", "limit": 1}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                rows = response.json()
+                return rows[0] if rows else None
+            return None
+
+    async def get_user_stats_rows(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 사용자의 집계 행 { user_id: row }"""
+        ids = [str(u) for u in dict.fromkeys(user_ids) if u]
+        if not ids:
+            return {}
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/user_stats"
+            params = {"select": self.USER_STATS_COLUMNS, "user_id": f"in.({','.join(ids)})"}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                return {str(r.get("user_id")): r for r in response.json()}
+            return {}
+
+    async def list_user_stats_ids(self, after: Optional[str] = None, limit: int = 200) -> List[str]:
+        """집계가 있는 사용자 ID (user_id 오름차순, after 다음부터)"""
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/user_stats"
+            params = {"select": "user_id", "order": "user_id.asc", "limit": limit}
+            if after:
+                params["user_id"] = f"gt.{after}"
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                return [str(r["user_id"]) for r in response.json() if r.get("user_id")]
+            return []
+
+    async def upsert_user_stats(self, rows: List[Dict[str, Any]]) -> bool:
+        """집계 행 upsert (user_id 기준)"""
+        if not rows:
+            return True
+        columns = self.USER_STATS_COLUMNS.split(",")
+        payload = [{**{k: r.get(k) for k in columns}, "updated_at": datetime.utcnow().isoformat()} for r in rows]
+        async with self.http.session(timeout=10.0) as client:
+            url = f"{self.base_url}/rest/v1/user_stats"
+            headers = {**self.headers, "Prefer": "resolution=merge-duplicates,return=minimal"}
+            response = await client.post(url, headers=headers, json=payload)
+            return response.status_code in (200, 201, 204)
+
+    async def apply_user_stats_visit(
+        self, user_id: str, place_id: Optional[str], xp: int, visit_date: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        apply_user_stats_visit RPC: 방문 1건을 집계에 원자적으로 반영.
+        반환: [갱신된 행] / [] (집계 없음·과거 날짜 → 재계산 필요) / None (RPC 미배포)
+        """
+        async with self.http.session(timeout=5.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/apply_user_stats_visit",
+                headers=self.headers,
+                json={"p_user_id": user_id, "p_place_id": place_id, "p_xp": xp, "p_visit_date": visit_date},
+            )
+            if response.status_code == 200:
+                return response.json() or []
+            return None
+
+    async def count_user_place_visits(self, user_id: str, place_id: str, cap: int = 2) -> int:
+        """사용자의 해당 장소 방문 수 (cap 개까지만 셈)"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/visits"
+            params = {"select": "id", "user_id": f"eq.{user_id}", "place_id": f"eq.{place_id}", "limit": cap}
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code == 200:
+                return len(response.json())
+            return 0
+
+    # ---------- 백그라운드 작업 실행 기록 (job_runs) ----------
+
+    JOB_RUN_COLUMNS = (
+        "job_name,run_key,status,owner,lease_until,attempts,checkpoint,result,error,"
+        "started_at,heartbeat_at,finished_at"
+    )
+
+    async def claim_job_run(
+        self, job_name: str, run_key: str, owner: str, lease_seconds: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        claim_job_run RPC: (job_name, run_key) 실행권을 lease_seconds 동안 획득.
+        반환: [실행 행(checkpoint 포함)] / [] (다른 워커가 실행 중·이미 완료) / None (RPC 미배포, 404).
+        그 밖의 실패는 예외 (httpx.HTTPStatusError) → 호출 측은 실행하지 않음
+        """
+        async with self.http.session(timeout=5.0) as client:
+            response = await client.post(
+                f"{self.base_url}/rest/v1/rpc/claim_job_run",
+                headers=self.headers,
+                json={"p_job_name": job_name, "p_run_key": run_key, "p_owner": owner, "p_lease_seconds": lease_seconds},
+            )
+            if response.status_code == 200:
+                return response.json() or []
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return None
+
+    async def update_job_run(self, job_name: str, run_key: str, owner: str, fields: Dict[str, Any]) -> bool:
+        """실행권을 가진 owner 일 때만 갱신 (lease 연장·checkpoint·완료). 행이 안 바뀌면 실행권을 잃은 것."""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/job_runs"
+            params = {"job_name": f"eq.{job_name}", "run_key": f"eq.{run_key}", "owner": f"eq.{owner}", "select": "run_key"}
+            headers = {**self.headers, "Prefer": "return=representation"}
+            response = await client.patch(url, headers=headers, params=params, json=fields)
+            response.raise_for_status()
+            return bool(response.json())
+
+    async def list_job_runs(
+        self, limit: int = 20, status: Optional[str] = None, lease_before: Optional[str] = None,
+        started_after: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """최근 실행 기록 (started_at 내림차순). status / lease 만료 / 시작 시각으로 거름"""
+        params: Dict[str, Any] = {"select": self.JOB_RUN_COLUMNS, "order": "started_at.desc", "limit": limit}
+        if status:
+            params["status"] = f"eq.{status}"
+        if lease_before:
+            params["lease_until"] = f"lt.{lease_before}"
+        if started_after:
+            params["started_at"] = f"gte.{started_after}"
+        async with self.http.session(timeout=5.0) as client:
+            response = await client.get(f"{self.base_url}/rest/v1/job_runs", headers=self.headers, params=params)
+            if response.status_code == 200:
+                return response.json()
+            return []
+
+    # ---------- 퀘스트 / 챌린지 상태 (user_quests / challenge_progress / challenge_claims) ----------
+
+    async def insert_user_quest(self, quest: Dict[str, Any]) -> Dict[str, Any]:
+        """수락한 퀘스트 저장"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/user_quests"
+            headers = {**self.headers, "Prefer": "return=representation"}
+            response = await client.post(url, headers=headers, json=quest)
+            response.raise_for_status()
+            rows = response.json()
+            return rows[0] if rows else quest
+
+    async def get_user_quest(self, quest_id: str) -> Optional[Dict[str, Any]]:
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/user_quests"
+            params = {"select": "*", "quest_id": f"eq.{quest_id}", "limit": 1}
+            response = await client.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            rows = response.json()
+            return rows[0] if rows else None
+
+    async def complete_user_quest(self, quest_id: str, completed_at: str) -> Optional[Dict[str, Any]]:
+        """진행 중 → 완료 (조건부 UPDATE 한 번). 이번 호출이 완료시켰으면 행, 없거나 이미 완료면 None"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/user_quests"
+            params = {"quest_id": f"eq.{quest_id}", "status": "eq.in_progress"}
+            headers = {**self.headers, "Prefer": "return=representation"}
+            response = await client.patch(
+                url, headers=headers, params=params, json={"status": "completed", "completed_at": completed_at}
+            )
+            response.raise_for_status()
+            rows = response.json()
+            return rows[0] if rows else None
+
+    async def list_user_quests(self, user_id: str, status: str = "in_progress") -> List[Dict[str, Any]]:
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/user_quests"
+            params = {"select": "*", "user_id": f"eq.{user_id}", "status": f"eq.{status}", "order": "accepted_at.asc"}
+            response = await client.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            return response.json()
+
+    async def get_challenge_progress_rows(self, user_id: str) -> List[Dict[str, Any]]:
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/challenge_progress"
+            params = {"select": "challenge_id,progress,total,last_updated", "user_id": f"eq.{user_id}"}
+            response = await client.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            return response.json()
+
+    async def get_challenge_claim_rows(self, user_id: str, challenge_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/challenge_claims"
+            params = {"select": "challenge_id,completed_at,xp_awarded", "user_id": f"eq.{user_id}"}
+            if challenge_id:
+                params["challenge_id"] = f"eq.{challenge_id}"
+            response = await client.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            return response.json()
+
+    async def upsert_challenge_progress(self, user_id: str, challenge_id: str, progress: int, total: int) -> None:
+        """(user_id, challenge_id) 진행도 upsert (INSERT ... ON CONFLICT DO UPDATE 한 문장)"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/challenge_progress"
+            headers = {**self.headers, "Prefer": "resolution=merge-duplicates,return=minimal"}
+            response = await client.post(url, headers=headers, json={
+                "user_id": user_id, "challenge_id": challenge_id, "progress": progress, "total": total,
+                "last_updated": datetime.utcnow().isoformat(),
+            })
+            response.raise_for_status()
+
+    async def insert_challenge_claim(
+        self, user_id: str, challenge_id: str, xp_awarded: int, completed_at: str
+    ) -> Optional[Dict[str, Any]]:
+        """보상 수령 기록 (PK 충돌은 무시). 이번 요청이 기록했으면 행, 이미 수령했으면 None"""
+        async with self.http.session(timeout=5.0) as client:
+            url = f"{self.base_url}/rest/v1/challenge_claims"
+            headers = {**self.headers, "Prefer": "resolution=ignore-duplicates,return=representation"}
+            response = await client.post(url, headers=headers, json={
+                "user_id": user_id, "challenge_id": challenge_id, "xp_awarded": xp_awarded,
+                "completed_at": completed_at,
+            })
+            response.raise_for_status()
+            rows = response.json()
+            return rows[0] if rows else None
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+퀘스트 / 챌린지 진행 상태 저장소.
+- MemoryStateStore: 프로세스 dict (DB 없을 때·스크립트 검증용). await 없이 바뀌므로 한 프로세스 안에서는 원자적.
+- SupabaseStateStore: user_quests / challenge_progress / challenge_claims 테이블 → 워커·인스턴스가 같은 상태를 봄.
+  상태 전이는 한 문장으로 원자적:
+    퀘스트 완료 = status=eq.in_progress 조건부 UPDATE (동시 완료 요청 중 하나만 성공)
+    진행도 = (user_id, challenge_id) upsert
+    보상 수령 = PK 충돌 무시 INSERT (중복 수령 불가)
+  조회·생성·진행도는 테이블 미배포·일시 오류면 경고 후 메모리 저장소로 동작.
+  퀘스트 완료·보상 수령은 메모리로 넘기지 않고 StateStoreUnavailableError (라우트에서 503):
+  메모리 수령은 다른 워커가 모르므로 같은 보상을 워커마다 한 번씩 더 받게 됨.
+- 라우트는 Depends(get_state_store) 로 받음.
+"""
+
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.dependencies import Database
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class StateStoreUnavailableError(Exception):
+    """공유 저장소에 상태 전이(퀘스트 완료·보상 수령)를 기록할 수 없을 때"""
+
+    def __init__(self, message: str, status_code: int = 503):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class StateStore(ABC):
+    """퀘스트·챌린지 상태 인터페이스"""
+
+    @abstractmethod
+    async def create_quest(self, quest: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def get_quest(self, quest_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def complete_quest(self, quest_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """(퀘스트, 이번 호출로 완료됐는지). 없는 퀘스트면 (None, False)"""
+
+    @abstractmethod
+    async def active_quests(self, user_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def challenge_state(self, user_id: str) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        """({challenge_id: 수령 기록}, {challenge_id: 진행도})"""
+
+    @abstractmethod
+    async def set_progress(self, user_id: str, challenge_id: str, progress: int, total: int) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def claim_reward(self, user_id: str, challenge_id: str, xp: int) -> Tuple[Dict[str, Any], bool]:
+        """(수령 기록, 이번 호출이 수령했는지). 이미 수령했으면 기존 기록과 False"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class MemoryStateStore(StateStore):
+    def __init__(self) -> None:
+        self.quests: Dict[str, Dict[str, Any]] = {}
+        # {user_id: {challenge_id: {"claimed": bool, "completed_at": str, "xp_awarded": int}}}
+        self.claims: Dict[str, Dict[str, dict]] = {}
+        # {user_id: {challenge_id: {"progress": int, "total": int, "last_updated": str}}}
+        self.progress: Dict[str, Dict[str, dict]] = {}
+
+    async def create_quest(self, quest: Dict[str, Any]) -> Dict[str, Any]:
+        self.quests[quest["quest_id"]] = quest
+        return quest
+
+    async def get_quest(self, quest_id: str) -> Optional[Dict[str, Any]]:
+        return self.quests.get(quest_id)
+
+    async def complete_quest(self, quest_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        quest = self.quests.get(quest_id)
+        if quest is None or quest["status"] != "in_progress":
+            return quest, False
+        quest["status"] = "completed"
+        quest["completed_at"] = _now()
+        return quest, True
+
+    async def active_quests(self, user_id: str) -> List[Dict[str, Any]]:
+        return [q for q in self.quests.values() if q["user_id"] == user_id and q["status"] == "in_progress"]
+
+    async def challenge_state(self, user_id: str) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        return self.claims.get(user_id, {}), self.progress.get(user_id, {})
+
+    async def set_progress(self, user_id: str, challenge_id: str, progress: int, total: int) -> Dict[str, Any]:
+        entry = {"progress": progress, "total": total, "last_updated": _now()}
+        self.progress.setdefault(user_id, {})[challenge_id] = entry
+        return entry
+
+    async def claim_reward(self, user_id: str, challenge_id: str, xp: int) -> Tuple[Dict[str, Any], bool]:
+        user_claims = self.claims.setdefault(user_id, {})
+        existing = user_claims.get(challenge_id)
+        if existing and existing.get("claimed"):
+            return existing, False
+        entry = {"claimed": True, "completed_at": _now(), "xp_awarded": xp}
+        user_claims[challenge_id] = entry
+        return entry, True
+
+
+class SupabaseStateStore(StateStore):
+    def __init__(self, db: Any, fallback: MemoryStateStore) -> None:
+        self.db = db
+        self.fallback = fallback
+
+    def _degraded(self, op: str, error: Exception) -> MemoryStateStore:
+        logger.warning("[StateStore] %s failed, using process memory: %s", op, error)
+        return self.fallback
+
+    @staticmethod
+    def _unavailable(op: str, error: Exception) -> StateStoreUnavailableError:
+        logger.warning("[StateStore] %s failed, rejecting (no memory fallback for transitions): %s", op, error)
+        return StateStoreUnavailableError("진행 상태를 저장할 수 없어요. 잠시 후 다시 시도해 주세요.")
+
+    async def create_quest(self, quest: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self.db.insert_user_quest(quest)
+        except Exception as e:
+            return await self._degraded("create_quest", e).create_quest(quest)
+
+    async def get_quest(self, quest_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.db.get_user_quest(quest_id) or await self.fallback.get_quest(quest_id)
+        except Exception as e:
+            return await self._degraded("get_quest", e).get_quest(quest_id)
+
+    async def complete_quest(self, quest_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        try:
+            quest = await self.db.complete_user_quest(quest_id, _now())
+            if quest is not None:
+                return quest, True
+            quest = await self.db.get_user_quest(quest_id)
+        except Exception as e:
+            raise self._unavailable("complete_quest", e) from e
+        if quest is None:
+            # DB 장애 중 메모리에만 저장됐던 퀘스트 (공유 상태가 없으니 이 프로세스에서 완료)
+            return await self.fallback.complete_quest(quest_id)
+        return quest, False
+
+    async def active_quests(self, user_id: str) -> List[Dict[str, Any]]:
+        try:
+            return await self.db.list_user_quests(user_id) + await self.fallback.active_quests(user_id)
+        except Exception as e:
+            return await self._degraded("active_quests", e).active_quests(user_id)
+
+    async def challenge_state(self, user_id: str) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        try:
+            claim_rows = await self.db.get_challenge_claim_rows(user_id)
+            progress_rows = await self.db.get_challenge_progress_rows(user_id)
+        except Exception as e:
+            return await self._degraded("challenge_state", e).challenge_state(user_id)
+        mem_claims, mem_progress = await self.fallback.challenge_state(user_id)
+        claims = {
+            **mem_claims,
+            **{
+                r["challenge_id"]: {"claimed": True, "completed_at": r.get("completed_at"), "xp_awarded": r.get("xp_awarded", 0)}
+                for r in claim_rows
+            },
+        }
+        progress = {
+            **mem_progress,
+            **{
+                r["challenge_id"]: {"progress": r.get("progress", 0), "total": r.get("total", 0), "last_updated": r.get("last_updated")}
+                for r in progress_rows
+            },
+        }
+        return claims, progress
+
+    async def set_progress(self, user_id: str, challenge_id: str, progress: int, total: int) -> Dict[str, Any]:
+        try:
+            await self.db.upsert_challenge_progress(user_id, challenge_id, progress, total)
+            return {"progress": progress, "total": total, "last_updated": _now()}
+        except Exception as e:
+            return await self._degraded("set_progress", e).set_progress(user_id, challenge_id, progress, total)
+
+    async def claim_reward(self, user_id: str, challenge_id: str, xp: int) -> Tuple[Dict[str, Any], bool]:
+        try:
+            row = await self.db.insert_challenge_claim(user_id, challenge_id, xp, _now())
+            if row is not None:
+                return {"claimed": True, "completed_at": row.get("completed_at"), "xp_awarded": row.get("xp_awarded", xp)}, True
+            existing = await self.db.get_challenge_claim_rows(user_id, challenge_id)
+        except Exception as e:
+            raise self._unavailable("claim_reward", e) from e
+        first = existing[0] if existing else {}
+        return {"claimed": True, "completed_at": first.get("completed_at"), "xp_awarded": first.get("xp_awarded", 0)}, False
+
+
+_memory_store = MemoryStateStore()
+
+
+async def get_state_store() -> StateStore:
+    """DB 연결 시 Supabase 저장소, 아니면 프로세스 메모리 (FastAPI Depends 용)"""
+    if Database.is_connected():
+        return SupabaseStateStore(Database.get_helpers(), _memory_store)
+    return _memory_store
@@ -4,15 +4,17 @@ Supabase REST API 클라이언트
 PostgreSQL 직접 연결이 안 될 때 HTTP API 사용
 """
 
-import httpx
 from typing import List, Dict, Any, Optional
 from core.config import settings
+from core.dependencies import Database
+from core.http_client import SharedHttpClient
 
 
 class SupabaseClient:
     """Supabase REST API를 통한 DB 접근"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[SharedHttpClient] = None):
+        self.http = http or Database.get_http()
         self.base_url = settings.SUPABASE_URL
         self.api_key = settings.SUPABASE_SERVICE_ROLE_KEY
         self.headers = {
@@ -31,7 +33,7 @@ class SupabaseClient:
         """
         주변 장소 검색 (REST API)
         """
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             # Supabase PostgREST API
             url = f"{self.base_url}/rest/v1/rpc/nearby_places"
             
@@ -62,7 +64,7 @@ class SupabaseClient:
         """
         일반 테이블 쿼리 (필터링 없이)
         """
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/places"
             params = {
                 "select": "*",
@@ -83,7 +85,7 @@ class SupabaseClient:
     
     async def insert_visit(self, visit_data: Dict[str, Any]) -> Dict[str, Any]:
         """방문 기록 저장"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/user_visits"
             
             response = await client.post(
@@ -99,7 +101,7 @@ class SupabaseClient:
     
     async def get_user_visits(self, user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
         """사용자 방문 기록 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/user_visits"
             params = {
                 "select": "*,places(*)",
@@ -121,7 +123,7 @@ class SupabaseClient:
     
     async def upsert_personality(self, user_id: str, personality_data: Dict[str, Any]) -> bool:
         """성격 분석 결과 저장"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/user_personality"
             
             data = {"user_id": user_id, **personality_data}
@@ -136,7 +138,7 @@ class SupabaseClient:
     
     async def get_personality(self, user_id: str) -> Optional[Dict[str, Any]]:
         """성격 프로필 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self.http.session(timeout=30.0) as client:
             url = f"{self.base_url}/rest/v1/user_personality"
             params = {
                 "select": "*",
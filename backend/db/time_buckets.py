@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+시간 유틸 (타임스탬프 파싱, 시간 버킷 만료)
+- presence 인덱스(db/presence_index.py)와 활동 사용자 인덱스(db/active_user_index.py)가 함께 사용.
+"""
+
+from datetime import datetime, tzinfo
+from typing import Any, Dict, List, Optional, Set
+
+
+def parse_epoch(value: Any, *, naive_tz: Optional[tzinfo]) -> Optional[float]:
+    """
+    ISO 시각 → epoch 초 (없거나 형식이 틀리면 None).
+    오프셋이 없는 값은 naive_tz 로 해석 (None 이면 서버 현지 시각: datetime.now().isoformat() 으로 기록한 값).
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None and naive_tz is not None:
+        parsed = parsed.replace(tzinfo=naive_tz)
+    return parsed.timestamp()
+
+
+class BucketExpiry:
+    """
+    키 → 마지막 확인 시각의 시간 버킷 등록, 기준보다 오래된 버킷만 통째로 꺼내 만료
+    → 정리 비용은 만료되는 키 수에 비례.
+    키가 더 최근 버킷으로 옮겨가도 이전 버킷 등록은 남겨 두고, 만료 시 실제 마지막 확인 시각으로 다시 확인.
+    """
+
+    def __init__(self, bucket_seconds: float):
+        self.bucket_seconds = max(1.0, bucket_seconds)
+        self._buckets: Dict[int, Set[str]] = {}
+        self._oldest: Optional[int] = None
+
+    def bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def track(self, key: str, ts: float) -> None:
+        bucket = self.bucket(ts)
+        self._buckets.setdefault(bucket, set()).add(key)
+        if self._oldest is None or bucket < self._oldest:
+            self._oldest = bucket
+
+    def pop_expired(self, cutoff: float) -> List[Set[str]]:
+        """
+        cutoff 이전 버킷을 모두 꺼내 반환. 꺼낸 키 중 실제로 만료할지는 호출 측이
+        자기 마지막 확인 시각(< cutoff)으로 판단 (이미 없거나 최근 버킷으로 옮겨간 키가 섞여 있음)
+        """
+        if self._oldest is None:
+            return []
+        last_expired = self.bucket(cutoff) - 1
+        popped = [
+            members for members in (self._buckets.pop(b, None) for b in range(self._oldest, last_expired + 1))
+            if members
+        ]
+        if last_expired >= self._oldest:
+            self._oldest = min(self._buckets) if self._buckets else None
+        return popped
+
+    def __len__(self) -> int:
+        return len(self._buckets)
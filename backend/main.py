@@ -18,13 +18,14 @@ if sys.platform == 'win32':
     if hasattr(sys.stderr, 'buffer'):
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 import time
 
 from core import settings, Database
+from core.llm_gateway import bind_llm_request, llm_gateway
 from routes import users_router, recommendations_router, quests_router
 from routes.ai_features import router as ai_features_router
 from routes.challenges import router as challenges_router
@@ -35,41 +36,146 @@ from routes.notifications import router as notifications_router
 from routes.place_suggestions import router as place_suggestions_router
 from routes.push import router as push_router
 from routes.local_feed import router as local_feed_router
+from routes.realtime import router as realtime_router
 
 
-async def _send_daily_push_job():
-    """APScheduler 매일 오전 8시(KST) 실행 — 오늘의 한 곳 푸시 발송."""
-    import logging, httpx
+async def _prefetch_weather_job():
+    """서울 권역 날씨 타일 선조회 (프로세스별 캐시라 워커마다 실행)"""
+    import logging
+    from services.weather_service import prefetch_weather
+    try:
+        await prefetch_weather()
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("[Scheduler] Weather prefetch failed: %s", e)
+
+
+async def _pick_daily_place() -> dict:
+    """오늘의 한 곳: 서울 중심 기준 추천 1곳 (추천 API 를 프로세스 안에서 직접 호출)"""
+    from routes.recommendations import get_recommendations_simple
+    try:
+        result = await get_recommendations_simple(
+            lat=37.5665, lng=126.9780, role="explorer", mood="curious", user_id="", limit=1
+        )
+        recs = result.recommendations
+    except Exception as e:
+        import logging
+        logging.getLogger("uvicorn.error").warning("[Scheduler] Daily place pick failed: %s", e)
+        recs = []
+    if not recs:
+        return {"place_name": "오늘의 추천 장소", "place_address": "", "message": ""}
+    return {"place_name": recs[0].name, "place_address": recs[0].address, "message": recs[0].reason}
+
+
+async def _daily_push_job(ctx):
+    """매일 오전 8시(KST) 오늘의 한 곳 푸시 — 구독 페이지마다 checkpoint, 중단되면 다음 페이지부터 이어서."""
+    import logging
+    from routes.push import broadcast_memory_subscriptions
+    from services.push_service import broadcast, daily_message
     logger = logging.getLogger("uvicorn.error")
+
+    place = ctx.checkpoint.get("place")
+    if place is None:
+        # 고른 장소도 저장 → 이어서 보낼 때 같은 메시지
+        place = await _pick_daily_place()
+        await ctx.save({"place": place})
+    title, body = daily_message(**place)
+
+    if Database.is_connected():
+        async def checkpoint(after: str, report: dict) -> None:
+            await ctx.save({"place": place, "after": after, "report": report})
+
+        report = await broadcast(
+            Database.get_helpers(), title, body,
+            after=ctx.checkpoint.get("after"), on_batch=checkpoint, previous=ctx.checkpoint.get("report"),
+        )
+    else:
+        report = await broadcast_memory_subscriptions(title, body)
+    logger.info("[Scheduler] Daily push sent for place: %s (%s)", place["place_name"], report)
+    return {"place": place, "report": report}
+
+
+async def _prewarm_narratives_job(ctx):
+    """많이 추천된 장소·조건 조합의 AI 서사를 미리 생성 (야간)"""
+    import logging
+    from services.narrative_generator import prewarm_narratives
+    count = await prewarm_narratives()
+    logging.getLogger("uvicorn.error").info("[Scheduler] Narrative pre-warm done: %d combinations", count)
+    return {"combinations": count}
+
+
+async def _flush_narrative_demand_job():
+    """사전 생성 후보 노출 집계를 공유 테이블에 합산 (프로세스별 집계라 워커마다 실행)"""
+    from services.narrative_cache import narrative_cache
+    await narrative_cache.flush_demand()
+
+
+async def _refresh_presence_index_job():
+    """새 visits 를 presence 인덱스에 반영 (프로세스별 인덱스라 워커마다 실행)"""
+    import logging
+    from db.presence_index import presence_index
     try:
-        # 오늘의 추천 장소는 로컬 recommendations API에서 서울 중심 기준으로 가져옴
-        base_url = "http://localhost:8000"
-        async with httpx.AsyncClient(timeout=10) as client:
-            # 1) 추천 장소 한 개 조회 (서울 중심 좌표 기준)
-            rec_res = await client.get(
-                f"{base_url}/api/v1/recommendations",
-                params={"lat": 37.5665, "lng": 126.9780, "role": "explorer", "mood": "curious", "limit": 1},
-            )
-            rec_data = rec_res.json() if rec_res.status_code == 200 else {}
-            recs = rec_data.get("recommendations", [])
-            place_name = recs[0].get("name", "오늘의 추천 장소") if recs else "오늘의 추천 장소"
-            place_address = recs[0].get("address", "") if recs else ""
-            message = recs[0].get("reason", "앱을 열어 오늘의 한 곳을 확인해보세요!") if recs else ""
-
-            # 2) 일일 푸시 발송
-            secret = settings.DAILY_PUSH_SECRET if hasattr(settings, "DAILY_PUSH_SECRET") else ""
-            await client.post(
-                f"{base_url}/api/v1/push/send-daily",
-                json={
-                    "place_name": place_name,
-                    "place_address": place_address,
-                    "message": message,
-                    "secret": secret or "",
-                },
-            )
-        logger.info("[Scheduler] Daily push sent for place: %s", place_name)
+        await presence_index.refresh(Database.get_helpers())
     except Exception as e:
-        logger.warning("[Scheduler] Daily push job failed: %s", e)
+        logging.getLogger("uvicorn.error").warning("[PresenceIndex] refresh failed: %s", e)
+
+
+async def _flush_active_users_job():
+    """위치 핑을 DB 에 일괄 기록 (사용자별 마지막 위치, RPC 1회)"""
+    from db.active_user_index import active_user_index
+    await active_user_index.flush(Database.get_helpers())
+
+
+async def _refresh_active_users_job():
+    """DB 의 최근 위치를 활동 사용자 인덱스에 반영 (첫 실행은 TTL 구간 적재, 워커마다 실행)"""
+    import logging
+    from db.active_user_index import active_user_index
+    try:
+        await active_user_index.refresh(Database.get_helpers())
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("[ActiveUsers] refresh failed: %s", e)
+
+
+async def _refresh_place_index_job():
+    """places 공간 인덱스 증분 갱신 (updated_at 커서 이후 변경분만)"""
+    import logging
+    from db.place_index import place_index
+    try:
+        await place_index.refresh(Database.get_helpers())
+    except Exception as e:
+        logging.getLogger("uvicorn.error").warning("[Scheduler] Place index refresh failed: %s", e)
+
+
+async def _reconcile_user_stats_job(ctx):
+    """user_stats 집계를 원본 visits 로 재계산해 어긋난 행 복구 (야간, 배치마다 checkpoint)"""
+    import logging
+    from services.user_stats import reconcile_user_stats
+
+    async def checkpoint(after: str, progress: dict) -> None:
+        await ctx.save({"after": after, "progress": progress})
+
+    result = await reconcile_user_stats(
+        Database.get_helpers(),
+        after=ctx.checkpoint.get("after"), on_batch=checkpoint, previous=ctx.checkpoint.get("progress"),
+    )
+    logging.getLogger("uvicorn.error").info(
+        "[Scheduler] User stats reconcile done: %d checked, %d drifted", result["checked"], result["drift"]
+    )
+    return result
+
+
+def _scheduled(job_name: str):
+    """APScheduler 트리거 → job_runner (실행권을 얻은 워커 하나만 실행)"""
+    async def trigger():
+        from services.jobs import job_runner
+        await job_runner.run(job_name)
+    trigger.__name__ = f"job_{job_name}"
+    return trigger
+
+
+async def _resume_stale_jobs_job():
+    """다른 워커가 실행하다 멈춘(lease 만료) 작업을 checkpoint 부터 이어서 실행"""
+    from services.jobs import job_runner
+    await job_runner.resume_stale()
 
 
 @asynccontextmanager
@@ -86,16 +192,93 @@ async def lifespan(app: FastAPI):
         logger.warning("Database: Not connected (Mock data mode)")
         logger.info("All APIs work with sample data!")
 
+    # places 공간 인덱스: 백그라운드 로드 (로드 전까지는 Supabase 질의로 동작)
+    place_index_task = None
+    if Database.is_connected() and settings.PLACE_INDEX_ENABLED:
+        import asyncio
+        from db.place_index import place_index
+        place_index_task = asyncio.create_task(place_index.load(Database.get_helpers()))
+
+    # 실시간 허브 (redis 브로커면 스트림 수신 시작) + presence 인덱스: 이벤트로 갱신, 최근 visits 로 백그라운드 재구성
+    from services.realtime import realtime_hub
+    await realtime_hub.start()
+    presence_task = None
+    if Database.is_connected() and settings.PRESENCE_INDEX_ENABLED:
+        import asyncio
+        from db.presence_index import presence_index
+        realtime_hub.add_listener(presence_index.apply_event)
+        presence_task = asyncio.create_task(presence_index.load(Database.get_helpers()))
+
+    # 소셜 매칭 활동 사용자 인덱스: 위치 핑으로 갱신, 최근 위치는 백그라운드 적재
+    active_users_task = None
+    if Database.is_connected() and settings.ACTIVE_USERS_ENABLED:
+        import asyncio
+        active_users_task = asyncio.create_task(_refresh_active_users_job())
+
     # APScheduler: 매일 오전 8시(KST = UTC+9) 일일 푸시 발송
     scheduler = None
     try:
         from apscheduler.schedulers.asyncio import AsyncIOScheduler
         from apscheduler.triggers.cron import CronTrigger
+        from apscheduler.triggers.interval import IntervalTrigger
+        from services.jobs import job_runner
+        # 워커마다 트리거되지만 job_runs 실행권을 얻은 하나만 실행 (상태: /health/jobs)
+        job_runner.register("daily_push", _daily_push_job)
+        job_runner.register("narrative_prewarm", _prewarm_narratives_job)
+        if Database.is_connected():
+            job_runner.register("user_stats_reconcile", _reconcile_user_stats_job)
         scheduler = AsyncIOScheduler()
         # KST 08:00 = UTC 23:00 (전날)
-        scheduler.add_job(_send_daily_push_job, CronTrigger(hour=23, minute=0, timezone="UTC"))
+        scheduler.add_job(_scheduled("daily_push"), CronTrigger(hour=23, minute=0, timezone="UTC"), max_instances=1)
+        # KST 03:00 = UTC 18:00: 서사 캐시 사전 생성
+        scheduler.add_job(_scheduled("narrative_prewarm"), CronTrigger(hour=18, minute=0, timezone="UTC"), max_instances=1)
+        # KST 04:00 = UTC 19:00: 사용자 통계 집계 대사
+        if Database.is_connected():
+            scheduler.add_job(_scheduled("user_stats_reconcile"), CronTrigger(hour=19, minute=0, timezone="UTC"), max_instances=1)
+            scheduler.add_job(
+                _resume_stale_jobs_job,
+                IntervalTrigger(seconds=max(30, settings.JOB_RESUME_CHECK_SECONDS)),
+                max_instances=1,
+            )
         scheduler.start()
         logger.info("[Scheduler] Daily push job registered (KST 08:00 / UTC 23:00)")
+        if settings.WEATHER_PREFETCH_ENABLED:
+            from datetime import datetime
+            scheduler.add_job(
+                _prefetch_weather_job,
+                IntervalTrigger(seconds=max(60, settings.WEATHER_CACHE_TTL_SECONDS // 2)),
+                next_run_time=datetime.now(),
+                max_instances=1,
+            )
+        scheduler.add_job(
+            _flush_narrative_demand_job,
+            IntervalTrigger(seconds=max(10, settings.NARRATIVE_DEMAND_FLUSH_SECONDS)),
+            max_instances=1,
+        )
+        if presence_task is not None:
+            scheduler.add_job(
+                _refresh_presence_index_job,
+                IntervalTrigger(seconds=max(10, settings.PRESENCE_REFRESH_SECONDS)),
+                max_instances=1,
+            )
+        if active_users_task is not None:
+            scheduler.add_job(
+                _flush_active_users_job,
+                IntervalTrigger(seconds=max(1, settings.ACTIVE_USERS_FLUSH_SECONDS)),
+                max_instances=1,
+            )
+            scheduler.add_job(
+                _refresh_active_users_job,
+                IntervalTrigger(seconds=max(10, settings.ACTIVE_USERS_REFRESH_SECONDS)),
+                max_instances=1,
+            )
+        if place_index_task is not None:
+            # 프로세스별 메모리 인덱스라 워커마다 실행
+            scheduler.add_job(
+                _refresh_place_index_job,
+                IntervalTrigger(seconds=max(30, settings.PLACE_INDEX_REFRESH_SECONDS)),
+                max_instances=1,
+            )
     except ImportError:
         logger.warning("[Scheduler] apscheduler not installed — daily push disabled. Run: pip install apscheduler")
     except Exception as e:
@@ -109,6 +292,26 @@ async def lifespan(app: FastAPI):
 
     if scheduler and scheduler.running:
         scheduler.shutdown(wait=False)
+    if place_index_task and not place_index_task.done():
+        place_index_task.cancel()
+    if presence_task and not presence_task.done():
+        presence_task.cancel()
+    if active_users_task is not None:
+        if not active_users_task.done():
+            active_users_task.cancel()
+        # 아직 기록하지 못한 위치 핑 반영
+        await _flush_active_users_job()
+    # 아직 합산하지 못한 서사 사전 생성 후보 집계 반영
+    await _flush_narrative_demand_job()
+    await llm_gateway.aclose()
+    from services.candidate_cache import candidate_cache
+    from services.recommendation_cache import recommendation_cache
+    await recommendation_cache.aclose()
+    await candidate_cache.aclose()
+    from services.push_service import aclose_push
+    await aclose_push()
+    from services.realtime import realtime_hub
+    await realtime_hub.aclose()
     await Database.disconnect()
     print("👋 WhereHere API Shutdown")
 
@@ -118,6 +321,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="초개인화 AI 장소 추천 시스템 - WhereHere",
     lifespan=lifespan,
+    # LLM 호출이 클라이언트 연결 끊김을 감지할 수 있도록 요청을 컨텍스트에 바인딩
+    dependencies=[Depends(bind_llm_request)],
 )
 
 
@@ -154,6 +359,7 @@ app.include_router(notifications_router)
 app.include_router(place_suggestions_router)
 app.include_router(push_router)
 app.include_router(local_feed_router)
+app.include_router(realtime_router)
 
 
 # OPTIONS는 라우터 등록 뒤에 두어야 함. 앞에 두면 /{full_path:path}가 먼저 매칭되어 GET/POST가 405 발생
@@ -196,6 +402,106 @@ async def health():
     }
 
 
+@app.get("/health/http-pool")
+async def http_pool_metrics():
+    """공용 HTTP 커넥션 풀 상태 (엔드포인트별 요청 수·동시 요청·지연)"""
+    return Database.get_http().metrics()
+
+
+@app.get("/health/llm")
+async def llm_metrics():
+    """LLM 게이트웨이 상태 (호출 지점별 지연 히스토그램·포화/타임아웃/취소 횟수)"""
+    return llm_gateway.metrics()
+
+
+@app.get("/health/place-cache")
+async def place_cache_metrics():
+    """places id 조회 캐시 크기·히트(없는 id 포함)/미스·축출·만료"""
+    from db.place_cache import place_cache
+    return place_cache.metrics()
+
+
+@app.get("/health/jobs")
+async def job_status():
+    """예약 작업 실행 상태: 이 워커의 실행 중 작업·최근 결과, job_runs 최근 실행(진행 checkpoint·시도 횟수·lease)"""
+    from services.jobs import job_runner
+    return await job_runner.status()
+
+
+@app.get("/health/weather")
+async def weather_cache_metrics():
+    """날씨 타일 캐시: fresh/stale 적중·미스·합쳐진 동시 요청·OpenWeather 호출·축출, 선조회 상태"""
+    from services.weather_service import weather_metrics
+    return weather_metrics()
+
+
+@app.get("/health/realtime")
+async def realtime_metrics():
+    """실시간 채널: 브로커(memory/redis)·연결/채널 수·발행/fan-out·재전송/resync·느린 연결 overflow"""
+    from services.realtime import realtime_hub
+    return realtime_hub.metrics()
+
+
+@app.get("/health/presence")
+async def presence_index_metrics():
+    """장소 presence 인덱스: 현재 인원·장소 수·체크인/연장/퇴장/만료 횟수·프로필 캐시 적중, 마지막 visits 반영 시각"""
+    from db.presence_index import presence_index
+    return presence_index.metrics()
+
+
+@app.get("/health/active-users")
+async def active_users_metrics():
+    """근처 활동 사용자 인덱스: 활동 사용자·셀 수, 위치 반영/셀 이동/만료 횟수, 미기록 위치 수·일괄 기록 횟수"""
+    from db.active_user_index import active_user_index
+    return active_user_index.metrics()
+
+
+@app.get("/health/push")
+async def push_dispatch_metrics():
+    """Web Push 일괄 발송 마지막 리포트(총/성공/만료 삭제/실패, 초당 처리량)와 푸시 커넥션 풀 지표"""
+    from services.push_service import push_metrics
+    return push_metrics()
+
+
+@app.get("/health/recommendation-cache")
+async def recommendation_cache_metrics():
+    """추천 캐시(응답 / 셀 단위 Kakao 후보) 백엔드·히트/미스/축출·single-flight 병합 횟수"""
+    from services.candidate_cache import candidate_cache
+    from services.recommendation_cache import recommendation_cache
+    return {
+        "responses": await recommendation_cache.metrics(),
+        "candidates": await candidate_cache.metrics(),
+    }
+
+
+@app.get("/health/pipelines")
+async def pipeline_stage_metrics():
+    """요청 파이프라인 단계별 지연 히스토그램·p50/p99·타임아웃/오류 횟수 (추천 API 등)"""
+    from services.request_pipeline import pipeline_metrics
+    return pipeline_metrics()
+
+
+@app.get("/health/feed")
+async def feed_metrics():
+    """홈 피드 인박스 fan-out 횟수·기록 행·셀럽 건너뜀·trim·인박스/폴백 읽기 횟수"""
+    from services.feed_fanout import feed_metrics as _feed_metrics
+    return _feed_metrics()
+
+
+@app.get("/health/user-stats")
+async def user_stats_metrics():
+    """사용자 통계 집계 증분 갱신(RPC/폴백)·재계산·대사 drift 횟수, 마지막 대사 시각"""
+    from services.user_stats import stats_metrics
+    return stats_metrics()
+
+
+@app.get("/health/narratives")
+async def narrative_cache_metrics():
+    """AI 서사 캐시 적중률·크기·사전 생성 후보 수"""
+    from services.narrative_cache import narrative_cache
+    return narrative_cache.metrics()
+
+
 # Global error handler
 @app.exception_handler(Exception)
 async def global_handler(request: Request, exc: Exception):
@@ -23,6 +23,9 @@ from core.dependencies import get_db
 
 router = APIRouter(prefix="/api/v1/ai", tags=["AI Features"])
 
+# 성향 휴리스틱·재분석 판단에 쓰는 최신 방문 표본 수 (집계는 전체 이력)
+PERSONALITY_VISIT_SAMPLE = 100
+
 
 # ============================================================
 # Request/Response Models
@@ -268,19 +271,25 @@ async def get_personality(user_id: str):
         from db.rest_helpers import RestDatabaseHelpers
         helpers = RestDatabaseHelpers()
 
-        visits = await helpers.get_user_visits(user_id)
         profile = await helpers.get_user_profile(user_id)
 
-        total_visits = len(visits)
-        durations = [v.get("duration_minutes", 0) for v in visits if v.get("duration_minutes")]
-        avg_duration = int(sum(durations) / len(durations)) if durations else 60
-        social_visits = sum(1 for v in visits if (v.get("companions", 1) or 1) > 1)
-        social_ratio = round(social_visits / total_visits, 2) if total_visits > 0 else 0.5
-
+        # 방문 이력 전체를 스트리밍으로 집계하고, 성향 휴리스틱·재분석 판단에는 최신 표본만 보관
+        visits: List[Dict[str, Any]] = []
+        total_visits = social_visits = duration_sum = duration_count = 0
         category_counts: Dict[str, int] = {}
-        for v in visits:
+        async for v in helpers.iter_user_visits(user_id):
+            total_visits += 1
+            if len(visits) < PERSONALITY_VISIT_SAMPLE:
+                visits.append(v)
+            if v.get("duration_minutes"):
+                duration_sum += v["duration_minutes"]
+                duration_count += 1
+            if (v.get("companions", 1) or 1) > 1:
+                social_visits += 1
             cat = v.get("category", "기타") or "기타"
             category_counts[cat] = category_counts.get(cat, 0) + 1
+        avg_duration = int(duration_sum / duration_count) if duration_count else 60
+        social_ratio = round(social_visits / total_visits, 2) if total_visits > 0 else 0.5
         preferred_categories = [k for k, _ in sorted(category_counts.items(), key=lambda x: x[1], reverse=True)[:3]]
 
         has_stored = bool(profile and all(profile.get(k) is not None for k in [
@@ -427,14 +436,14 @@ async def analyze_pattern(request: PatternAnalysisRequest):
         helpers = RestDatabaseHelpers()
         
                 # 사용자 방문 기록 가져오기 (Supabase 등 DB에서 직접 반환)
-        raw_visits = await helpers.get_user_visits(request.user_id)
-        visits = raw_visits if isinstance(raw_visits, list) else (raw_visits.get("visits") or [])
+        visits = [v async for v in helpers.iter_user_visits(request.user_id, days=request.days)]
         
-                # 방문별 카테고리: places 테이블에서 조회 (없으면 기타)
+                # 방문별 카테고리: places 테이블에서 일괄 조회 (없으면 기타)
+        places = await helpers.get_places_by_ids([v.get("place_id") for v in visits if not v.get("category")])
         for v in visits:
             if v.get("category"):
                 continue
-            place = await helpers.get_place_by_id(v.get("place_id") or "")
+            place = places.get(v.get("place_id") or "")
             v["category"] = (place.get("primary_category") or "기타") if place else "기타"
         
                 # 데이터량 부족한 경우
@@ -591,10 +600,10 @@ async def analyze_pattern_rich(request: PatternAnalysisRequest):
         from db.rest_helpers import RestDatabaseHelpers
         from core.config import settings
         helpers = RestDatabaseHelpers()
-        raw_visits = await helpers.get_user_visits(request.user_id)
-        visits = raw_visits if isinstance(raw_visits, list) else (raw_visits.get("visits") or [])
+        visits = [v async for v in helpers.iter_user_visits(request.user_id, days=request.days)]
+        places = await helpers.get_places_by_ids([v.get("place_id") for v in visits])
         for v in visits:
-            place = await helpers.get_place_by_id(v.get("place_id") or "")
+            place = places.get(v.get("place_id") or "")
             if place:
                 v["category"] = v.get("category") or place.get("primary_category") or "기타"
                 v["latitude"] = place.get("latitude") or v.get("latitude")
@@ -668,16 +677,14 @@ async def parse_recommendation_intent(request: RecommendationIntentRequest):
     자연어 질의(예: "조용한 카페 추천해줘")를 role_type, mood 등 추천 API 파라미터로 변환.
     """
     try:
-        from core.config import settings
-        from anthropic import Anthropic
-        if not getattr(settings, "ANTHROPIC_API_KEY", None):
+        from core.llm_gateway import llm_gateway
+        if not llm_gateway.enabled:
             return {
                 "role_type": "explorer",
                 "mood": "curious",
                 "radius_meters": 2000,
                 "parsed": False,
             }
-        client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         prompt = f"""다음 사용자 말을 WhereHere 추천 API 파라미터로 변환해줘.
 사용자 말: "{request.query}"
 
@@ -687,7 +694,9 @@ async def parse_recommendation_intent(request: RecommendationIntentRequest):
 JSON만 출력 (다른 설명 없이):
 {{"role_type": "...", "mood": "...", "radius_meters": 2000}}
 """
-        response = client.messages.create(
+        response = await llm_gateway.create(
+            "ai_features.recommendation_intent",
+            timeout=5.0,
             model="claude-3-5-haiku-20241022",
             max_tokens=128,
             messages=[{"role": "user", "content": prompt}],
@@ -1,30 +1,22 @@
 # -*- coding: utf-8 -*-
 """
 챌린지 API 라우트 — 서버 사이드 영구 기록 지원
-Challenge progress is tracked in-memory per user session,
-and persists to DB when connected.
+Challenge progress / reward claims live in the shared state store
+(Supabase when connected, process memory otherwise — db/state_store.py).
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional, Dict, List
+from typing import Optional, List
 from pydantic import BaseModel
-from datetime import datetime, timedelta
 import uuid
 
 from services.challenge_maker import ChallengeMakerService
 from core.dependencies import get_db
+from db.state_store import StateStore, StateStoreUnavailableError, get_state_store
 
 
 router = APIRouter(prefix="/api/v1/challenges", tags=["Challenges"])
 
-# ── In-memory stores (Phase 1 / DB 없을 때) ──────────────────────────────────
-# {user_id: {challenge_id: {"claimed": bool, "completed_at": str, "xp_awarded": int}}}
-_user_challenge_claims: Dict[str, Dict[str, dict]] = {}
-
-# {user_id: {challenge_id: {"progress": int, "total": int, "last_updated": str}}}
-_user_challenge_progress: Dict[str, Dict[str, dict]] = {}
-
-
 class GenerateChallengeRequest(BaseModel):
     user_id: str
 
@@ -147,13 +139,12 @@ async def complete_challenge(request: CompleteChallengeRequest, db=Depends(get_d
 # ── 유저 챌린지 진행 현황 ─────────────────────────────────────────────────────
 
 @router.get("/user/{user_id}/all-progress")
-async def get_user_all_challenge_progress(user_id: str):
+async def get_user_all_challenge_progress(user_id: str, store: StateStore = Depends(get_state_store)):
     """
     유저의 모든 챌린지 진행/수령 현황 반환.
     프론트에서 새로고침할 때마다 호출하여 서버 기록과 동기화.
     """
-    claims = _user_challenge_claims.get(user_id, {})
-    progress = _user_challenge_progress.get(user_id, {})
+    claims, progress = await store.challenge_state(user_id)
     return {
         "user_id": user_id,
         "claims": claims,      # {challenge_id: {claimed, completed_at, xp_awarded}}
@@ -162,53 +153,42 @@ async def get_user_all_challenge_progress(user_id: str):
 
 
 @router.post("/user/{user_id}/update-progress")
-async def update_challenge_progress(user_id: str, req: UpdateProgressRequest):
+async def update_challenge_progress(
+    user_id: str, req: UpdateProgressRequest, store: StateStore = Depends(get_state_store)
+):
     """
     유저 챌린지 진행도 갱신.
     프론트에서 userStats 변경 시 호출.
     """
-    if user_id not in _user_challenge_progress:
-        _user_challenge_progress[user_id] = {}
-    _user_challenge_progress[user_id][req.challenge_id] = {
-        "progress": req.progress,
-        "total": req.total,
-        "last_updated": datetime.now().isoformat(),
-    }
+    await store.set_progress(user_id, req.challenge_id, req.progress, req.total)
     return {"success": True, "challenge_id": req.challenge_id, "progress": req.progress}
 
 
 @router.post("/claim-reward")
-async def claim_challenge_reward(req: ClaimRewardRequest, db=Depends(get_db)):
+async def claim_challenge_reward(
+    req: ClaimRewardRequest, db=Depends(get_db), store: StateStore = Depends(get_state_store)
+):
     """
     챌린지 완료 보상 수령.
-    - 중복 수령 방지
+    - 중복 수령 방지 (수령 기록 저장이 원자적: 동시 요청 중 하나만 XP 지급)
     - XP를 유저에게 부여 (DB 연결 시)
-    - in-memory에 수령 기록 저장
+    - 수령 기록을 공유 저장소에 남기지 못하면 503 (XP 지급 없음)
     """
     user_id = req.user_id
     challenge_id = req.challenge_id
 
-    # 중복 수령 방지
-    if user_id in _user_challenge_claims and challenge_id in _user_challenge_claims[user_id]:
-        existing = _user_challenge_claims[user_id][challenge_id]
-        if existing.get("claimed"):
-            return {
-                "success": False,
-                "already_claimed": True,
-                "message": "이미 수령한 보상이에요.",
-                "completed_at": existing.get("completed_at"),
-            }
-
-    # 기록 저장
-    if user_id not in _user_challenge_claims:
-        _user_challenge_claims[user_id] = {}
-
-    completed_at = datetime.now().isoformat()
-    _user_challenge_claims[user_id][challenge_id] = {
-        "claimed": True,
-        "completed_at": completed_at,
-        "xp_awarded": req.xp_to_award,
-    }
+    try:
+        claim, claimed_now = await store.claim_reward(user_id, challenge_id, req.xp_to_award)
+    except StateStoreUnavailableError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    if not claimed_now:
+        return {
+            "success": False,
+            "already_claimed": True,
+            "message": "이미 수령한 보상이에요.",
+            "completed_at": claim.get("completed_at"),
+        }
+    completed_at = claim.get("completed_at")
 
     # DB 연결 시 XP 부여
     xp_note = ""
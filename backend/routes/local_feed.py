@@ -3,11 +3,14 @@
 로컬 피드 API: 동네 게시글(local_posts) + 댓글(local_comments)
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 
 from core.dependencies import get_db
+from db.cursor import InvalidCursorError, decode_cursor, paginate
 
 router = APIRouter(prefix="/api/v1/local", tags=["local_feed"])
 
@@ -41,15 +44,19 @@ async def list_posts(
     user_id: Optional[str] = None,
     author_id: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db=Depends(get_db),
 ):
     """
     scope=neighborhood: area_name 기준 (없으면 전체 최신순)
     scope=following: user_id 필수, 내가 팔로우한 사람 + 나의 게시글만
     scope=user + author_id: 해당 사용자 작성 게시글만 (프로필 피드용)
+    다음 페이지는 응답의 next_cursor 를 cursor 로 전달.
     """
     if db is None:
-        return {"posts": []}
+        return {"posts": [], "next_cursor": None}
+    limit = max(1, min(limit, 100))
+    _check_cursor(cursor)
     following_ids = []
     if scope == "following" and user_id:
         following_ids = await db.get_following_ids(user_id)
@@ -59,28 +66,38 @@ async def list_posts(
         user_id=user_id,
         following_ids=following_ids if scope == "following" else None,
         author_id=author_id,
-        limit=limit,
+        limit=limit + 1,
+        cursor=cursor,
     )
-    # 소셜 프로필: 작성자 display_name, profile_image_url 붙이기
+    posts, next_cursor = paginate(posts, limit)
+    # 작성자 프로필·좋아요 수·내 좋아요 여부를 페이지 단위로 한 번씩 동시에 조회 (게시글 수와 무관한 왕복 수)
     author_ids = list({p.get("author_id") for p in posts if p.get("author_id")})
-    users_map = await db.get_users_basic(author_ids) if author_ids else {}
-    # 좋아요 수 붙이기
+    post_ids = [str(p["id"]) for p in posts if p.get("id")]
+    users_map, like_counts, liked_ids = await asyncio.gather(
+        db.get_users_basic(author_ids) if author_ids else _empty({}),
+        db.get_like_counts(post_ids) if post_ids else _empty({}),
+        db.get_liked_set(post_ids, user_id) if post_ids and user_id else _empty(set()),
+    )
     for p in posts:
         aid = p.get("author_id")
         u = users_map.get(aid) or users_map.get(str(aid)) if aid else {}
         p["author_display_name"] = u.get("display_name")
         p["author_avatar_url"] = u.get("profile_image_url")
-        pid = p.get("id")
-        if pid:
-            p["like_count"] = await db.get_post_like_count(pid)
-            if user_id:
-                p["liked_by_me"] = await db.is_post_liked(pid, user_id)
-            else:
-                p["liked_by_me"] = False
-        else:
-            p["like_count"] = 0
-            p["liked_by_me"] = False
-    return {"posts": posts}
+        pid = str(p["id"]) if p.get("id") else None
+        p["like_count"] = like_counts.get(pid, 0) if pid else 0
+        p["liked_by_me"] = pid in liked_ids if pid else False
+    return {"posts": posts, "next_cursor": next_cursor}
+
+
+async def _empty(value):
+    return value
+
+
+def _check_cursor(cursor: Optional[str]) -> None:
+    try:
+        decode_cursor(cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
 
 
 @router.post("/posts")
@@ -108,12 +125,15 @@ async def create_post(req: CreateLocalPostRequest, db=Depends(get_db)):
 
 
 @router.get("/posts/{post_id}/comments")
-async def list_comments(post_id: str, limit: int = 100, db=Depends(get_db)):
-    """게시글 댓글 목록"""
+async def list_comments(post_id: str, limit: int = 100, cursor: Optional[str] = None, db=Depends(get_db)):
+    """게시글 댓글 목록 (시간순). 다음 페이지는 next_cursor 를 cursor 로 전달"""
     if db is None:
-        return {"comments": []}
-    comments = await db.list_local_comments(post_id=post_id, limit=limit)
-    return {"comments": comments}
+        return {"comments": [], "next_cursor": None}
+    limit = max(1, min(limit, 200))
+    _check_cursor(cursor)
+    comments = await db.list_local_comments(post_id=post_id, limit=limit + 1, cursor=cursor)
+    comments, next_cursor = paginate(comments, limit)
+    return {"comments": comments, "next_cursor": next_cursor}
 
 
 @router.post("/posts/{post_id}/comments")
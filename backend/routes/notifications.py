@@ -3,6 +3,8 @@
 알림 API - in-app 알림 센터
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from typing import Optional, List
@@ -21,19 +23,39 @@ class CreateNotificationRequest(BaseModel):
     extra: Optional[dict] = None
 
 
+class MarkAllReadRequest(BaseModel):
+    user_id: str
+
+
 @router.get("")
 async def list_notifications(user_id: str, limit: int = 50, unread_only: bool = False, db=Depends(get_db)):
-    """사용자 알림 목록"""
+    """사용자 알림 목록 (unread_count 는 limit 과 무관한 전체 안 읽은 수)"""
     if db is None:
         return {"notifications": [], "unread_count": 0}
-    notifications = await db.get_notifications(user_id, limit=limit, unread_only=unread_only)
-    if unread_only:
-        return {"notifications": notifications, "unread_count": len(notifications)}
-    all_list = await db.get_notifications(user_id, limit=limit, unread_only=False)
-    unread_count = sum(1 for n in all_list if n.get("read") is False)
+    notifications, unread_count = await asyncio.gather(
+        db.get_notifications(user_id, limit=limit, unread_only=unread_only),
+        db.count_unread_notifications(user_id),
+    )
     return {"notifications": notifications, "unread_count": unread_count}
 
 
+@router.get("/unread-count")
+async def unread_count(user_id: str, db=Depends(get_db)):
+    """알림 벨 폴링용: 목록 없이 안 읽은 수만 (HEAD count 쿼리 1회)"""
+    if db is None:
+        return {"unread_count": 0}
+    return {"unread_count": await db.count_unread_notifications(user_id)}
+
+
+@router.post("/read-all")
+async def mark_all_read(req: MarkAllReadRequest, db=Depends(get_db)):
+    """사용자 알림 전체 읽음 처리 (UPDATE 1회)"""
+    if db is None:
+        return {"success": False, "updated": 0}
+    updated = await db.mark_all_notifications_read(req.user_id)
+    return {"success": updated is not None, "updated": updated or 0}
+
+
 @router.post("")
 async def create_notification(req: CreateNotificationRequest, db=Depends(get_db)):
     """알림 생성 (내부/퀘스트 완료 시 등)"""
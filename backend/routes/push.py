@@ -9,7 +9,9 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict
 
 from core.dependencies import get_db
-from services.push_service import send_push_for_user
+from services.push_service import (
+    PushDispatcher, broadcast, daily_message, send_push_for_user, valid_endpoint, vapid_configured,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +43,8 @@ async def subscribe_push(req: PushSubscribeRequest, db=Depends(get_db)):
     auth = keys.get("auth") or ""
     if not endpoint or not p256dh or not auth:
         return {"success": False, "error": "missing endpoint or keys"}
+    if not valid_endpoint(endpoint):
+        return {"success": False, "error": "invalid endpoint"}
 
     # DB 연결 시 DB에 저장
     if db is not None:
@@ -72,53 +76,51 @@ async def send_daily_notification(req: SendDailyRequest, background_tasks: Backg
     if expected and req.secret != expected:
         return {"success": False, "error": "unauthorized"}
 
-    place = req.place_name or "오늘의 추천 장소"
-    addr = req.place_address
-    body = req.message or (f"📍 {addr}" if addr else "앱을 열어 오늘의 한 곳을 확인해보세요!")
-    title = f"☀️ {place}"
+    title, body = daily_message(req.place_name, req.place_address, req.message)
 
-    # 구독자 목록 수집
-    user_ids: List[str] = []
+    # DB 구독: id 순 페이지로 읽으며 워커 풀로 발송, 404/410 구독은 삭제
+    report = None
     if db is not None:
         try:
-            all_subs = await db.get_all_push_subscriptions()
-            user_ids = list({s.get("user_id") for s in (all_subs or []) if s.get("user_id")})
+            report = await broadcast(db, title, body)
         except Exception as e:
-            logger.warning("get_all_push_subscriptions failed: %s", e)
+            logger.warning("daily push broadcast failed, falling back to memory: %s", e)
 
     # Memory fallback
-    if not user_ids:
-        user_ids = list(_subscriptions.keys())
-
-    sent = 0
-    errors = 0
-    for uid in user_ids:
-        try:
-            if db is not None:
-                await send_push_for_user(db, uid, title, body)
+    if report is None or (not report.get("total") and not report.get("skipped")):
+        report = await broadcast_memory_subscriptions(title, body)
+
+    logger.info("Daily push sent=%s errors=%s", report.get("sent"), report.get("failed"))
+    return {
+        "success": True,
+        "sent": report.get("sent", 0),
+        "errors": report.get("failed", 0),
+        "removed": report.get("removed", 0),
+        "report": report,
+        "title": title,
+        "body": body,
+    }
+
+
+async def broadcast_memory_subscriptions(title: str, body: str) -> dict:
+    """메모리 구독으로 발송 (DB 없을 때). 만료 구독은 메모리에서 제거."""
+    if not vapid_configured():
+        return {"skipped": "vapid_not_configured", "total": 0, "sent": 0, "failed": 0}
+
+    async def remove_gone(endpoints: List[str]) -> int:
+        gone = set(endpoints)
+        removed = 0
+        for uid in list(_subscriptions):
+            kept = [s for s in _subscriptions[uid] if s["endpoint"] not in gone]
+            removed += len(_subscriptions[uid]) - len(kept)
+            if kept:
+                _subscriptions[uid] = kept
             else:
-                # memory 구독으로 직접 발송
-                subs = _subscriptions.get(uid, [])
-                if subs:
-                    from core.config import settings as s
-                    if getattr(s, "VAPID_PRIVATE_KEY", None):
-                        for sub in subs:
-                            import asyncio, json
-                            vapid_claims = {"sub": getattr(s, "VAPID_EMAIL", "mailto:admin@wherehere.app")}
-                            payload = json.dumps({"title": title, "body": body})
-                            loop = asyncio.get_event_loop()
-                            await loop.run_in_executor(
-                                None,
-                                lambda: __import__("services.push_service", fromlist=["_send_one_sync"])
-                                        ._send_one_sync(sub, payload, s.VAPID_PRIVATE_KEY, vapid_claims)
-                            )
-            sent += 1
-        except Exception as e:
-            logger.warning("daily push failed for %s: %s", uid, e)
-            errors += 1
+                del _subscriptions[uid]
+        return removed
 
-    logger.info("Daily push sent=%d errors=%d", sent, errors)
-    return {"success": True, "sent": sent, "errors": errors, "title": title, "body": body}
+    subs = [s for user_subs in _subscriptions.values() for s in user_subs]
+    return await PushDispatcher().dispatch(subs, title, body, remove_gone=remove_gone)
 
 
 class ProximityNotifyRequest(BaseModel):
@@ -143,9 +145,13 @@ async def get_subscriber_count(db=Depends(get_db)):
     """구독자 수 조회 (관리용)."""
     if db is not None:
         try:
-            all_subs = await db.get_all_push_subscriptions()
-            users = len({s.get("user_id") for s in (all_subs or []) if s.get("user_id")})
-            return {"total_subscriptions": len(all_subs or []), "unique_users": users}
+            total = 0
+            users = set()
+            async for s in db.iter_push_subscriptions(select="id,user_id"):
+                total += 1
+                users.add(s.get("user_id"))
+            users.discard(None)
+            return {"total_subscriptions": total, "unique_users": len(users)}
         except Exception:
             pass
     return {"total_subscriptions": sum(len(v) for v in _subscriptions.values()), "unique_users": len(_subscriptions)}
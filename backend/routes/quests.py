@@ -3,16 +3,15 @@ Quest Routes - 퀘스트 관리
 로그인 없이도 작동하는 Mock-First 구조
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Optional
 from datetime import datetime
 import uuid
 
-router = APIRouter(prefix="/api/v1/quests", tags=["quests"])
+from db.state_store import StateStore, StateStoreUnavailableError, get_state_store
 
-# In-memory quest storage (Phase 1, DB 없이 작동)
-_active_quests: Dict[str, dict] = {}
+router = APIRouter(prefix="/api/v1/quests", tags=["quests"])
 
 
 class QuestCreateRequest(BaseModel):
@@ -32,7 +31,7 @@ class QuestCompleteRequest(BaseModel):
 
 
 @router.post("/accept")
-async def accept_quest(request: QuestCreateRequest):
+async def accept_quest(request: QuestCreateRequest, store: StateStore = Depends(get_state_store)):
     """퀘스트 수락"""
     quest_id = str(uuid.uuid4())[:8]
 
@@ -52,14 +51,19 @@ async def accept_quest(request: QuestCreateRequest):
         ],
     }
 
-    _active_quests[quest_id] = quest
-    return quest
+    return await store.create_quest(quest)
 
 
 @router.post("/complete")
-async def complete_quest(request: QuestCompleteRequest):
-    """퀘스트 완료"""
-    quest = _active_quests.get(request.quest_id)
+async def complete_quest(request: QuestCompleteRequest, store: StateStore = Depends(get_state_store)):
+    """
+    퀘스트 완료 (동시에 여러 번 요청돼도 완료 처리는 한 번: 이후 요청은 already_completed)
+    완료를 공유 저장소에 기록하지 못하면 503
+    """
+    try:
+        quest, completed_now = await store.complete_quest(request.quest_id)
+    except StateStoreUnavailableError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
 
     if not quest:
         return {
@@ -80,11 +84,9 @@ async def complete_quest(request: QuestCompleteRequest):
     if request.duration_minutes and request.duration_minutes >= 30:
         bonus_xp += 50
 
-    quest["status"] = "completed"
-    quest["completed_at"] = datetime.now().isoformat()
-
     return {
         "success": True,
+        "already_completed": not completed_now,
         "quest_id": request.quest_id,
         "xp_earned": base_xp,
         "bonus_xp": bonus_xp,
@@ -100,10 +102,6 @@ async def complete_quest(request: QuestCompleteRequest):
 
 
 @router.get("/active/{user_id}")
-async def get_active_quests(user_id: str = "anonymous"):
+async def get_active_quests(user_id: str = "anonymous", store: StateStore = Depends(get_state_store)):
     """활성 퀘스트 조회"""
-    user_quests = [
-        q for q in _active_quests.values()
-        if q["user_id"] == user_id and q["status"] == "in_progress"
-    ]
-    return {"quests": user_quests}
+    return {"quests": await store.active_quests(user_id)}
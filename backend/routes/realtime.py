@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+실시간 채널 API - 알림·채팅·presence 서버 푸시 (폴링 대체)
+- WebSocket /api/v1/realtime/ws?user_id=&channels=&cursor=
+  연결 하나로 여러 채널 구독, 접속 후 {"op": "subscribe" | "unsubscribe", "channels": [...]} 로 변경.
+- SSE GET /api/v1/realtime/stream?user_id=&channels=&cursor= (WebSocket 이 막힌 환경용, 채널 변경은 재접속)
+  EventSource 자동 재접속 시 Last-Event-ID 헤더를 cursor 로 사용.
+- 채널: user:<본인 id> (항상 구독), conversation:<id> (대화 참여자만), place:<place_id>
+- 핸드셰이크: cursor 를 주면 그 이후 놓친 이벤트를 먼저 보내고 실시간으로 이어감.
+  재전송 버퍼를 넘었으면 resync 이벤트 → 클라이언트는 REST 로 목록을 다시 조회.
+"""
+
+import asyncio
+import json
+from typing import List, Optional, Set, Tuple
+
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from core.config import settings
+from core.dependencies import get_db
+from services.realtime import CHANNEL_KINDS, SubscriptionOverflow, realtime_hub, user_channel
+
+router = APIRouter(prefix="/api/v1/realtime", tags=["realtime"])
+
+
+def _parse_channels(raw) -> List[str]:
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return [c.strip() for c in (raw or []) if isinstance(c, str) and c.strip()]
+
+
+async def _authorize(user_id: str, channels: List[str], db) -> Tuple[Set[str], List[str]]:
+    """(허용 채널, 거절 채널). 다른 사용자 채널·참여하지 않은 대화는 거절"""
+    allowed: Set[str] = set()
+    rejected: List[str] = []
+    for channel in channels:
+        kind, _, target = channel.partition(":")
+        ok = False
+        if kind not in CHANNEL_KINDS or not target:
+            pass
+        elif kind == "user":
+            ok = target == user_id
+        elif kind == "place":
+            ok = True
+        elif kind == "conversation" and db is not None:
+            try:
+                conv = await db.get_conversation(target)
+            except Exception:
+                conv = None
+            ok = bool(conv) and user_id in (str(conv.get("user_a_id")), str(conv.get("user_b_id")))
+        if ok and len(allowed) < settings.REALTIME_MAX_CHANNELS:
+            allowed.add(channel)
+        else:
+            rejected.append(channel)
+    return allowed, rejected
+
+
+def _hello(channels: Set[str], rejected: List[str], cursor: Optional[str], replayed: int, resync: bool) -> dict:
+    return {
+        "type": "hello",
+        "channels": sorted(channels),
+        "rejected": rejected,
+        "cursor": realtime_hub.broker.latest_cursor(),
+        "resumed_from": cursor,
+        "replayed": replayed,
+        "resync": resync,
+    }
+
+
+@router.websocket("/ws")
+async def realtime_ws(
+    websocket: WebSocket,
+    user_id: str,
+    channels: str = "",
+    cursor: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """WebSocket 게이트웨이 (사용자별 다중 채널)"""
+    await websocket.accept()
+    requested = [user_channel(user_id)] + _parse_channels(channels)
+    allowed, rejected = await _authorize(user_id, requested, db)
+    sub, backlog, resync = await realtime_hub.subscribe(allowed, cursor)
+    heartbeat = max(1, settings.REALTIME_HEARTBEAT_SECONDS)
+
+    async def reader() -> None:
+        try:
+            while True:
+                await handle(await websocket.receive_text())
+        finally:
+            sub.wake()
+
+    async def handle(text: str) -> None:
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        op = msg.get("op") if isinstance(msg, dict) else None
+        if op == "subscribe":
+            ok, bad = await _authorize(user_id, _parse_channels(msg.get("channels")), db)
+            ok -= sub.channels
+            realtime_hub.add_channels(sub, ok)
+            missed, again = await realtime_hub.replay(sub, ok, msg.get("cursor"))
+            await websocket.send_json({"type": "subscribed", "channels": sorted(ok), "rejected": bad, "resync": again})
+            for event in missed:
+                await websocket.send_json(event)
+        elif op == "unsubscribe":
+            # 본인 user 채널은 유지
+            drop = [c for c in _parse_channels(msg.get("channels")) if c != user_channel(user_id)]
+            realtime_hub.remove_channels(sub, drop)
+            await websocket.send_json({"type": "unsubscribed", "channels": drop})
+        elif op == "ping":
+            await websocket.send_json({"type": "pong"})
+
+    reader_task = asyncio.ensure_future(reader())
+    try:
+        await websocket.send_json(_hello(sub.channels, rejected, cursor, len(backlog), resync))
+        for event in backlog:
+            await websocket.send_json(event)
+        while not reader_task.done():
+            try:
+                event = await sub.next(heartbeat)
+            except SubscriptionOverflow:
+                await websocket.send_json({"type": "resync", "reason": "overflow"})
+                await websocket.close(code=1013)
+                break
+            if event is None:
+                if reader_task.done():
+                    break
+                event = {"type": "ping"}
+            await websocket.send_json(event)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        reader_task.cancel()
+        realtime_hub.close(sub)
+
+
+def _sse(event: dict, name: Optional[str] = None) -> str:
+    lines = []
+    # id 는 채널 이벤트에만 (hello 의 최신 cursor 가 Last-Event-ID 가 되면 재전송분을 건너뜀)
+    if event.get("channel") and event.get("cursor"):
+        lines.append(f"id: {event['cursor']}")
+    lines.append(f"event: {name or event.get('type', 'message')}")
+    lines.append("data: " + json.dumps(event, ensure_ascii=False, default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def realtime_stream(
+    request: Request,
+    user_id: str,
+    channels: str = "",
+    cursor: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """SSE 게이트웨이 (단방향, 채널 변경은 재접속)"""
+    cursor = cursor or request.headers.get("last-event-id")
+    requested = [user_channel(user_id)] + _parse_channels(channels)
+    allowed, rejected = await _authorize(user_id, requested, db)
+    sub, backlog, resync = await realtime_hub.subscribe(allowed, cursor)
+    heartbeat = max(1, settings.REALTIME_HEARTBEAT_SECONDS)
+
+    async def events():
+        try:
+            yield "retry: 3000\n" + _sse(_hello(sub.channels, rejected, cursor, len(backlog), resync), "hello")
+            for event in backlog:
+                yield _sse(event)
+            while True:
+                try:
+                    event = await sub.next(heartbeat)
+                except SubscriptionOverflow:
+                    yield _sse({"type": "resync", "reason": "overflow"}, "resync")
+                    return
+                if event is None:
+                    if await request.is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                else:
+                    yield _sse(event)
+        finally:
+            realtime_hub.close(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
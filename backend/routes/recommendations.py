@@ -15,9 +15,12 @@ from mock.mock_data import (
     get_mock_recommendations,
     ROLE_NARRATIVES,
 )
-from services.weather_service import get_weather, get_time_of_day
-from services.narrative_generator import generate_narrative
+from core.config import settings
+from services.weather_service import WeatherUnavailableError, get_weather, get_time_of_day
+from services.narrative_generator import generate_narrative, note_recommended_places
 from services.kakao_places import KakaoPlacesService
+from services.candidate_cache import get_candidates
+from services.request_pipeline import StagePipeline
 
 router = APIRouter(
     prefix="/api/v1/recommendations",
@@ -167,11 +170,17 @@ class NarrativeRequest(BaseModel):
     user_mood: Optional[str] = None
     vibe_tags: List[str] = []
     is_hidden_gem: bool = False
+    # 서사 캐시 키 (추천 응답의 place_id / weather.condition / time_of_day 그대로 전달)
+    place_id: Optional[str] = None
+    weather: Optional[str] = None
+    time_of_day: Optional[str] = None
+    # "재생성" 버튼: 캐시를 건너뛰고 새로 생성해 캐시 항목 교체
+    regenerate: bool = False
 
 
 @router.post("/narrative")
 async def get_narrative_for_place(request: NarrativeRequest):
-    """클릭한 장소 1곳에 대해 AI 서사 1건만 생성 (토큰 절감)"""
+    """클릭한 장소 1곳에 대해 AI 서사 1건만 생성 (토큰 절감, 캐시 우선)"""
     narrative = await generate_narrative(
         place_name=request.place_name,
         category=request.category,
@@ -179,22 +188,20 @@ async def get_narrative_for_place(request: NarrativeRequest):
         vibe_tags=request.vibe_tags or [],
         is_hidden_gem=request.is_hidden_gem,
         user_mood=request.user_mood,
+        place_id=request.place_id,
+        weather=request.weather,
+        time_of_day=request.time_of_day,
+        regenerate=request.regenerate,
     )
     return {"narrative": narrative}
 
 
-async def _try_recommendation_cache(request: RecommendationRequest) -> Optional[RecommendationResponse]:
-    """짧은 TTL 동안 동일 조건 추천 응답 재사용."""
-    from core.config import settings
-
-    ttl = max(0, int(getattr(settings, "RECOMMENDATION_CACHE_TTL_SECONDS", 120) or 0))
-    if ttl <= 0:
-        return None
-    from services.recommendation_cache import make_recommendation_cache_key, get_cached
+def _recommendation_cache_key(request: RecommendationRequest) -> str:
+    from services.recommendation_cache import make_recommendation_cache_key
 
     mood_t = (request.mood.mood_text or "") if request.mood else ""
     mi = float(request.mood.intensity) if request.mood else 0.0
-    key = make_recommendation_cache_key(
+    return make_recommendation_cache_key(
         request.current_location.latitude,
         request.current_location.longitude,
         request.role_type,
@@ -203,32 +210,6 @@ async def _try_recommendation_cache(request: RecommendationRequest) -> Optional[
         request.user_id or "anon",
         request.user_level,
     )
-    cached = await get_cached(key, ttl)
-    if cached is None:
-        return None
-    return RecommendationResponse(**cached)
-
-
-async def _store_recommendation_cache(request: RecommendationRequest, out: RecommendationResponse) -> None:
-    from core.config import settings
-
-    ttl = max(0, int(getattr(settings, "RECOMMENDATION_CACHE_TTL_SECONDS", 120) or 0))
-    if ttl <= 0:
-        return
-    from services.recommendation_cache import make_recommendation_cache_key, set_cached
-
-    mood_t = (request.mood.mood_text or "") if request.mood else ""
-    mi = float(request.mood.intensity) if request.mood else 0.0
-    key = make_recommendation_cache_key(
-        request.current_location.latitude,
-        request.current_location.longitude,
-        request.role_type,
-        mood_t,
-        mi,
-        request.user_id or "anon",
-        request.user_level,
-    )
-    await set_cached(key, ttl, out.model_dump())
 
 
 @router.post("", response_model=RecommendationResponse)
@@ -241,19 +222,107 @@ async def get_recommendations(request: RecommendationRequest):
     2) DB 미연결 시: Mock 데이터로 즉시 응답
     """
 
-    # 날씨 & 시간 자동 감지
+    # 날씨는 캐시 조회와 겹쳐 미리 시작. 나머지 I/O 단계는 캐시 미스일 때만 _build_recommendations 에서 시작.
+    time_now = request.time_of_day or get_time_of_day()
+    pipeline = StagePipeline("recommendations")
+    user_lat = request.current_location.latitude
+    user_lon = request.current_location.longitude
+    pipeline.stage(
+        "weather",
+        lambda: get_weather(user_lat, user_lon),
+        timeout=settings.RECOMMENDATION_WEATHER_TIMEOUT_SECONDS,
+        default=None,
+        fatal=(WeatherUnavailableError,),
+    )
+
+    # 짧은 TTL 동안 동일 조건 추천 응답 재사용. 동시 미스는 한 번만 계산 (single-flight).
+    from services.recommendation_cache import recommendation_cache
+
     try:
-        weather_data = await get_weather(
-            request.current_location.latitude,
-            request.current_location.longitude,
-        )
+        ttl = max(0, int(getattr(settings, "RECOMMENDATION_CACHE_TTL_SECONDS", 120) or 0))
+        if ttl <= 0:
+            return await _build_recommendations(request, pipeline, time_now)
+
+        async def _compute() -> Dict:
+            return (await _build_recommendations(request, pipeline, time_now)).model_dump()
+
+        payload = await recommendation_cache.get_or_compute(_recommendation_cache_key(request), ttl, _compute)
+        return RecommendationResponse(**payload)
     except WeatherUnavailableError as e:
         raise HTTPException(status_code=e.status_code, detail=e.message) from e
-    time_now = request.time_of_day or get_time_of_day()
+    finally:
+        # 캐시 적중이면 남은 날씨 단계 취소. 단계별 소요 시간 기록.
+        pipeline.finish()
+
+
+async def _fetch_completed_place_ids(user_id: Optional[str]) -> Set[str]:
+    """방문 이력: 이미 완료한 장소는 추천에서 제외"""
+    if not user_id:
+        return set()
+    from db.rest_helpers import RestDatabaseHelpers
+
+    return set(await RestDatabaseHelpers().get_completed_places(user_id))
+
+
+async def _fetch_category_preferences(user_id: Optional[str]) -> Dict[str, float]:
+    """
+    개인 취향 점수 — 방문 이력 기반 카테고리 선호도 (카테고리 → 평균 별점).
+    사용자가 별점 높게 준 카테고리에 스코어링에서 추가 보너스 부여.
+    """
+    if not user_id or user_id in ("anonymous", "user-demo-001"):
+        return {}
+    from db.rest_helpers import RestDatabaseHelpers
+
+    raw_visits = await RestDatabaseHelpers().get_user_visits(user_id, days=None, limit=50) or []
+    cat_scores: Dict[str, list] = {}
+    for v in raw_visits:
+        cat = (v.get("primary_category") or v.get("category") or "").strip()
+        rating = float(v.get("rating") or 0)
+        if cat and rating >= 1:
+            cat_scores.setdefault(cat, []).append(rating)
+    return {cat: sum(ratings) / len(ratings) for cat, ratings in cat_scores.items()}
+
+
+async def _build_recommendations(
+    request: RecommendationRequest,
+    pipeline: StagePipeline,
+    time_now: str,
+) -> RecommendationResponse:
+    """
+    캐시 미스 시 실제 추천 계산 (Kakao 후보 + 스코어링, 실패 시 Mock).
+    완료 장소·취향 이력·Kakao 후보는 서로 독립이라 동시에 조회하고, 각 단계는 타임아웃 시
+    빈 값으로 진행한다 (완료 장소 미제외 / 취향 미반영 / 부분 후보).
+    """
+    user_lat = request.current_location.latitude
+    user_lon = request.current_location.longitude
+    kakao = KakaoPlacesService()
+    radius = ROLE_RADIUS_MAP.get(request.role_type, 2000)
+    category_codes = ROLE_TO_KAKAO_CODES.get(request.role_type, ["FD6", "CE7"])
+    history_timeout = settings.RECOMMENDATION_HISTORY_TIMEOUT_SECONDS
+
+    pipeline.stage(
+        "completed_places",
+        lambda: _fetch_completed_place_ids(request.user_id),
+        timeout=history_timeout,
+        default=set(),
+    )
+    pipeline.stage(
+        "preferences",
+        lambda: _fetch_category_preferences(request.user_id),
+        timeout=history_timeout,
+        default={},
+    )
+    # Kakao Local API: 격자 셀 단위 공유 캐시 — 근처 사용자끼리 같은 Kakao 결과 재사용.
+    # get_candidates 가 자체 마감(부분 결과)을 가지므로 단계 타임아웃은 그보다 약간 길게.
+    pipeline.stage(
+        "candidates",
+        lambda: get_candidates(kakao, user_lat, user_lon, category_codes, radius),
+        timeout=settings.RECOMMENDATION_KAKAO_DEADLINE_SECONDS + 1.0,
+        default=[],
+    )
 
-    cached_resp = await _try_recommendation_cache(request)
-    if cached_resp is not None:
-        return cached_resp
+    # 날씨 API 키 없음/응답 오류는 기존처럼 호출부에서 HTTP 오류, 시간 초과면 날씨 없이 진행
+    weather_data = await pipeline.result("weather")
 
     # 기분 텍스트 기반 선호 카테고리/분위기 키워드 계산
     mood_text = (request.mood.mood_text or "").lower() if request.mood else ""
@@ -284,86 +353,9 @@ async def get_recommendations(request: RecommendationRequest):
 
     # Kakao Local API 기반 추천 (DB는 유저 행동 로그/캐시로만 사용)
     try:
-        user_lat = request.current_location.latitude
-        user_lon = request.current_location.longitude
-
-        # 방문 이력: 이미 완료한 장소는 추천에서 제외 (가능할 때만)
-        completed_place_ids: set[str] = set()
-        try:
-            from db.rest_helpers import RestDatabaseHelpers
-
-            helpers = RestDatabaseHelpers()
-            if request.user_id:
-                completed_ids = await helpers.get_completed_places(request.user_id)
-                completed_place_ids = set(completed_ids)
-        except Exception:
-            completed_place_ids = set()
-
-        # ── 1단계: 개인 취향 점수 — 방문 이력 기반 카테고리 선호도 ──────────────────
-        # 사용자가 별점 4이상 준 카테고리에 추가 보너스 점수 부여
-        category_preferences: Dict[str, float] = {}
-        try:
-            if request.user_id and request.user_id not in ("anonymous", "user-demo-001"):
-                from db.rest_helpers import RestDatabaseHelpers as _RH
-                _helpers = _RH()
-                raw_visits = []
-                if hasattr(_helpers, "get_user_visits"):
-                    raw_visits = await _helpers.get_user_visits(request.user_id, limit=50) or []
-                elif hasattr(_helpers, "get_user_visit_history"):
-                    raw_visits = await _helpers.get_user_visit_history(request.user_id) or []
-                else:
-                    # Supabase REST 직접 조회
-                    from core.config import settings
-                    import httpx
-                    url = f"{settings.SUPABASE_URL}/rest/v1/visits"
-                    headers = {
-                        "apikey": settings.SUPABASE_ANON_KEY,
-                        "Authorization": f"Bearer {settings.SUPABASE_ANON_KEY}",
-                    }
-                    async with httpx.AsyncClient(timeout=5) as hc:
-                        resp = await hc.get(url, headers=headers,
-                            params={"user_id": f"eq.{request.user_id}", "select": "primary_category,rating", "limit": "50"})
-                        if resp.status_code == 200:
-                            raw_visits = resp.json()
-                cat_scores: Dict[str, list] = {}
-                for v in raw_visits:
-                    cat = (v.get("primary_category") or v.get("category") or "").strip()
-                    rating = float(v.get("rating") or 0)
-                    if cat and rating >= 1:
-                        cat_scores.setdefault(cat, []).append(rating)
-                for cat, ratings in cat_scores.items():
-                    category_preferences[cat] = sum(ratings) / len(ratings)
-        except Exception:
-            pass  # 취향 데이터 없으면 기본 점수로 진행
-
-        # 1단계: Kakao Local API로 역할에 맞는 카테고리 주변 장소 조회
-        kakao = KakaoPlacesService()
-        radius = ROLE_RADIUS_MAP.get(request.role_type, 2000)
-        category_codes = ROLE_TO_KAKAO_CODES.get(request.role_type, ["FD6", "CE7"])
-
-        kakao_docs: list[Dict] = []
-        for code in category_codes:
-            try:
-                result = await kakao.search_by_category(
-                    x=user_lon,
-                    y=user_lat,
-                    category_group_code=code,
-                    radius=radius,
-                    size=15,
-                )
-                kakao_docs.extend(result.get("documents", []))
-            except Exception:
-                continue
-
-        # 중복 제거
-        seen_ids: set[str] = set()
-        unique_docs: list[Dict] = []
-        for doc in kakao_docs:
-            doc_id = doc.get("id")
-            if not doc_id or doc_id in seen_ids:
-                continue
-            seen_ids.add(doc_id)
-            unique_docs.append(doc)
+        completed_place_ids: Set[str] = await pipeline.result("completed_places")
+        category_preferences: Dict[str, float] = await pipeline.result("preferences")
+        unique_docs = await pipeline.result("candidates")
 
         if not unique_docs:
             raise RuntimeError("No Kakao places found")
@@ -397,9 +389,10 @@ async def get_recommendations(request: RecommendationRequest):
             coords = mapped["location"]["coordinates"]
             place_lon = float(coords[0])
             place_lat = float(coords[1])
-            distance = mapped.get("distance_meters")
-            if distance is None:
-                distance = _haversine_distance(user_lat, user_lon, place_lat, place_lon)
+            # 공유 후보의 distance 는 셀 중심 기준 → 사용자 위치로 다시 계산하고 반경 밖은 제외
+            distance = _haversine_distance(user_lat, user_lon, place_lat, place_lon)
+            if distance > radius:
+                continue
 
             place_id = f"kakao-{mapped['external_id']}"
             if place_id in completed_place_ids:
@@ -410,7 +403,7 @@ async def get_recommendations(request: RecommendationRequest):
                     "id": place_id,
                     "name": mapped["name"],
                     "address": mapped.get("road_address") or mapped.get("address") or "",
-                    "            primary_category": mapped.get("category") or "기타",
+                    "primary_category": mapped.get("category") or "기타",
                     "secondary_categories": [],
                     "average_price": _estimate_cost_from_category(mapped.get("category") or "기타"),
                     "vibe_tags": [],  # Kakao만으로는 vibe 태그 없음 (나중에 AI 태깅)
@@ -591,6 +584,15 @@ async def get_recommendations(request: RecommendationRequest):
                 )
             )
 
+        # 노출된 장소·조건을 서사 사전 생성 후보로 집계
+        note_recommended_places(
+            [w["place"] for w in selected_wrapped],
+            request.role_type,
+            user_mood=request.mood.mood_text if request.mood else None,
+            weather=(weather_data or {}).get("condition"),
+            time_of_day=time_now,
+        )
+
         # 개인화 여부: 별점 3.5 이상 카테고리가 1개 이상이면 개인화 추천 활성
         personalized_cats = [cat for cat, avg in category_preferences.items() if avg >= 3.5]
 
@@ -606,7 +608,6 @@ async def get_recommendations(request: RecommendationRequest):
             has_personalization=bool(personalized_cats),
             personalized_categories=personalized_cats[:3],
         )
-        await _store_recommendation_cache(request, out)
         return out
     except Exception as e:
         import logging
@@ -628,7 +629,6 @@ async def get_recommendations(request: RecommendationRequest):
     mock_result["time_of_day"] = time_now
 
     out = RecommendationResponse(**mock_result)
-    await _store_recommendation_cache(request, out)
     return out
 
 
@@ -900,7 +900,7 @@ async def get_friend_picks(
 
             visits: List[dict] = []
             if hasattr(helpers, "get_user_visits"):
-                visits = await helpers.get_user_visits(fid, limit=20) or []
+                visits = await helpers.get_user_visits(fid, days=None, limit=20) or []
             else:
                 from core.config import settings
                 import httpx
@@ -86,7 +86,10 @@ async def get_db_recommendations_rest(helpers, request, weather_data, time_now):
         
         logger.info(f"[REST] Place: {place.get('name')}, Lat: {place_lat}, Lon: {place_lon}")
         
-        if place_lat and place_lon:
+        if place.get("distance_meters") is not None:
+            # get_places_nearby 가 반경 필터링하면서 계산한 거리
+            distance = float(place["distance_meters"])
+        elif place_lat and place_lon:
             distance = calculate_distance(
                 request.current_location.latitude,
                 request.current_location.longitude,
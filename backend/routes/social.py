@@ -6,6 +6,7 @@
 - 매칭 시스템
 """
 
+import asyncio
 import httpx
 import json
 from fastapi import APIRouter, HTTPException, Depends
@@ -15,7 +16,9 @@ from pydantic import BaseModel
 
 from services.social_matching import SocialMatchingService
 from services.social_share import SocialShareService
-from core.dependencies import get_db
+from core.dependencies import get_db, Database
+from db.cursor import InvalidCursorError, decode_cursor, paginate
+from services.feed_fanout import read_home_feed, schedule_follow_sync
 from services.push_service import send_push_for_user
 
 
@@ -219,14 +222,22 @@ async def get_share_data(
 # ============================================================
 
 @router.get("/feed")
-async def get_feed(user_id: str, limit: int = 50, db=Depends(get_db)):
-    """팔로우한 사람 + 내 활동 피드"""
+async def get_feed(user_id: str, limit: int = 50, cursor: Optional[str] = None, db=Depends(get_db)):
+    """
+    팔로우한 사람 + 내 활동 피드 (피드 인박스 기반).
+    다음 페이지는 응답의 next_cursor 를 cursor 로 전달.
+    """
     if db is None:
-        return {"activities": [], "following_ids": []}
-    following_ids = await db.get_following_ids(user_id)
-    user_ids = list(set([user_id] + following_ids))
-    activities = await db.get_feed_activities(user_ids, limit=limit)
-    return {"activities": activities, "following_ids": following_ids}
+        return {"activities": [], "following_ids": [], "next_cursor": None}
+    limit = max(1, min(limit, 100))
+    try:
+        (activities, next_cursor), following_ids = await asyncio.gather(
+            read_home_feed(db, user_id, limit=limit, cursor=cursor),
+            db.get_following_ids(user_id),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    return {"activities": activities, "following_ids": following_ids, "next_cursor": next_cursor}
 
 
 @router.post("/follow")
@@ -235,6 +246,8 @@ async def follow(follower_id: str, following_id: str, db=Depends(get_db)):
     if db is None:
         return {"success": False, "message": "DB not connected"}
     ok = await db.follow_user(follower_id, following_id)
+    if ok:
+        schedule_follow_sync(db, follower_id, following_id, followed=True)
     return {"success": ok}
 
 
@@ -244,6 +257,8 @@ async def unfollow(follower_id: str, following_id: str, db=Depends(get_db)):
     if db is None:
         return {"success": False}
     ok = await db.unfollow_user(follower_id, following_id)
+    if ok:
+        schedule_follow_sync(db, follower_id, following_id, followed=False)
     return {"success": ok}
 
 
@@ -311,7 +326,7 @@ async def get_social_profile(
         return {"profile": None}
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             url = f"{db.base_url}/rest/v1/users"
             params = {"id": f"eq.{user_id}", "select": "id,display_name,profile_image_url,username"}
             response = await client.get(url, headers=db.headers, params=params)
@@ -389,7 +404,7 @@ async def get_kakao_friends(req: KakaoFriendsRequest):
     - 친구 목록은 '초대하기' UI용으로만 사용하고 저장하지 않음.
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with Database.get_http().session(timeout=10.0) as client:
             r = await client.get(
                 "https://kapi.kakao.com/v1/api/talk/friends",
                 headers={"Authorization": f"Bearer {req.access_token}"},
@@ -422,7 +437,7 @@ async def send_kakao_friend_message(req: KakaoSendMessageRequest):
     target_url = req.link_url or "https://wherehere.app/"
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with Database.get_http().session(timeout=10.0) as client:
             if req.template_id:
                 # 사용자 정의 템플릿: 콘솔에서 만든 피드/리스트 등
                 payload = {
@@ -543,16 +558,24 @@ async def get_chat_messages(
     conversation_id: str,
     limit: int = 50,
     before: Optional[str] = None,
+    cursor: Optional[str] = None,
     db=Depends(get_db)
 ):
     """
-    대화 메시지 목록 조회 (최신순, 최대 50개)
+    대화 메시지 목록 조회 (최신순). 이전 메시지는 응답의 next_cursor 를 cursor 로 전달.
+    before(시각)는 이전 클라이언트 호환용.
     """
     if db is None:
-        return {"messages": []}
+        return {"messages": [], "next_cursor": None}
+    limit = max(1, min(limit, 100))
+    try:
+        decode_cursor(cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
     try:
-        msgs = await db.get_messages(conversation_id, limit=limit, before=before)
-        return {"messages": msgs}
+        msgs = await db.get_messages(conversation_id, limit=limit + 1, before=before, cursor=cursor)
+        msgs, next_cursor = paginate(msgs, limit)
+        return {"messages": msgs, "next_cursor": next_cursor}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -647,7 +670,7 @@ async def like_post(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 좋아요 추가
             like_data = {
                 "post_id": req.post_id,
@@ -723,7 +746,7 @@ async def unlike_post(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             response = await client.delete(
                 f"{db.base_url}/rest/v1/post_likes",
                 headers=db.headers,
@@ -754,7 +777,7 @@ async def get_post_likes(
         return {"likes": [], "count": 0}
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             response = await client.get(
                 f"{db.base_url}/rest/v1/post_likes",
                 headers=db.headers,
@@ -792,7 +815,7 @@ async def create_comment(
         raise HTTPException(status_code=400, detail="댓글 내용이 비어 있습니다.")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 댓글 추가
             comment_data = {
                 "post_id": req.post_id,
@@ -872,7 +895,7 @@ async def get_post_comments(
         return {"comments": []}
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             response = await client.get(
                 f"{db.base_url}/rest/v1/post_comments",
                 headers=db.headers,
@@ -930,7 +953,7 @@ async def delete_comment(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             response = await client.delete(
                 f"{db.base_url}/rest/v1/post_comments",
                 headers=db.headers,
@@ -976,7 +999,7 @@ async def match_kakao_friends(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with db.http.session(timeout=15.0) as client:
             # 1. 카카오 친구 목록 조회
             kakao_response = await client.get(
                 "https://kapi.kakao.com/v1/api/talk/friends",
@@ -1091,7 +1114,7 @@ async def register_kakao_id(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 카카오 사용자 정보 조회
             kakao_response = await client.get(
                 "https://kapi.kakao.com/v2/user/me",
@@ -1171,7 +1194,7 @@ async def create_group_quest(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             quest_data = {
                 "creator_id": req.creator_id,
                 "place_id": req.place_id,
@@ -1224,7 +1247,7 @@ async def join_group_quest(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 퀘스트 정보 조회
             quest_response = await client.get(
                 f"{db.base_url}/rest/v1/group_quests",
@@ -1332,7 +1355,7 @@ async def checkin_group_quest(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 참여자 정보 업데이트
             update_data = {
                 "checked_in": True,
@@ -1352,19 +1375,14 @@ async def checkin_group_quest(
             if response.status_code not in [200, 204]:
                 raise HTTPException(status_code=response.status_code, detail=response.text)
             
-            # 모든 참여자가 체크인했는지 확인
-            participants_response = await client.get(
-                f"{db.base_url}/rest/v1/group_quest_participants",
-                headers=db.headers,
-                params={
-                    "group_quest_id": f"eq.{req.group_quest_id}",
-                    "select": "user_id,checked_in"
-                }
+            # 모든 참여자가 체크인했는지 확인 (퀘스트 장소명과 참여자를 한 요청으로)
+            quest = await db.get_group_quest_with_participants(
+                req.group_quest_id, quest_select="id,place_name", participant_select="user_id,checked_in"
             )
             
             all_checked_in = False
-            if participants_response.status_code == 200:
-                participants = participants_response.json()
+            if quest:
+                participants = quest["participants"]
                 if participants and all(p.get("checked_in") for p in participants):
                     all_checked_in = True
                     
@@ -1380,16 +1398,7 @@ async def checkin_group_quest(
                     )
                     
                     # 모든 참여자에게 완료 알림
-                    quest_response = await client.get(
-                        f"{db.base_url}/rest/v1/group_quests",
-                        headers=db.headers,
-                        params={"id": f"eq.{req.group_quest_id}", "select": "place_name"}
-                    )
-                    place_name = ""
-                    if quest_response.status_code == 200:
-                        quests = quest_response.json()
-                        if quests and len(quests) > 0:
-                            place_name = quests[0].get("place_name", "")
+                    place_name = quest.get("place_name") or ""
                     
                     for p in participants:
                         if p.get("user_id") != req.user_id:
@@ -1424,7 +1433,7 @@ async def get_active_group_quests(
         return {"quests": []}
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 활성 퀘스트 조회
             response = await client.get(
                 f"{db.base_url}/rest/v1/group_quests",
@@ -1441,33 +1450,13 @@ async def get_active_group_quests(
                 return {"quests": []}
             
             quests = response.json()
-            
-            # 각 퀘스트의 참여자 수 조회
-            for quest in quests:
-                quest_id = quest.get("id")
-                participants_response = await client.get(
-                    f"{db.base_url}/rest/v1/group_quest_participants",
-                    headers=db.headers,
-                    params={
-                        "group_quest_id": f"eq.{quest_id}",
-                        "select": "user_id,checked_in"
-                    }
-                )
-                
-                if participants_response.status_code == 200:
-                    participants = participants_response.json()
-                    quest["current_participants"] = len(participants)
-                    quest["checked_in_count"] = sum(1 for p in participants if p.get("checked_in"))
-                    
-                    # 내가 참여 중인지
-                    if user_id:
-                        quest["is_joined"] = any(p.get("user_id") == user_id for p in participants)
-                else:
-                    quest["current_participants"] = 0
-                    quest["checked_in_count"] = 0
-                    quest["is_joined"] = False
-            
-            return {"quests": quests}
+        
+        # 페이지 전체 퀘스트의 참여자를 한 번에 조회 → 참여자 수·체크인 수·내 참여 여부는 메모리에서 계산
+        participants_by_quest = await db.get_group_quest_participants([q.get("id") for q in quests])
+        for quest in quests:
+            db.summarize_group_quest(quest, participants_by_quest.get(str(quest.get("id")), []), user_id)
+        
+        return {"quests": quests}
     
     except Exception:
         return {"quests": []}
@@ -1483,63 +1472,38 @@ async def get_group_quest_details(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # 퀘스트 정보
-            quest_response = await client.get(
-                f"{db.base_url}/rest/v1/group_quests",
-                headers=db.headers,
-                params={"id": f"eq.{quest_id}", "select": "*"}
-            )
-            
-            if quest_response.status_code != 200:
-                raise HTTPException(status_code=404, detail="퀘스트를 찾을 수 없습니다.")
-            
-            quests = quest_response.json()
-            if not quests or len(quests) == 0:
-                raise HTTPException(status_code=404, detail="퀘스트를 찾을 수 없습니다.")
-            
-            quest = quests[0]
-            
-            # 참여자 목록
-            participants_response = await client.get(
-                f"{db.base_url}/rest/v1/group_quest_participants",
-                headers=db.headers,
-                params={
-                    "group_quest_id": f"eq.{quest_id}",
-                    "select": "user_id,joined_at,checked_in,checked_in_at"
-                }
-            )
+        # 퀘스트 정보 + 참여자 목록 (임베디드 리소스, 한 요청)
+        quest = await db.get_group_quest_with_participants(quest_id)
+        if not quest:
+            raise HTTPException(status_code=404, detail="퀘스트를 찾을 수 없습니다.")
+        
+        participants = quest["participants"]
+        
+        # 참여자 정보 조회
+        user_ids = [p.get("user_id") for p in participants if p.get("user_id")]
+        if user_ids:
+            async with db.http.session(timeout=10.0) as client:
+                users_response = await client.get(
+                    f"{db.base_url}/rest/v1/users",
+                    headers=db.headers,
+                    params={
+                        "id": f"in.({','.join(user_ids)})",
+                        "select": "id,display_name,username,profile_image_url"
+                    }
+                )
             
-            participants = []
-            if participants_response.status_code == 200:
-                participants = participants_response.json()
+            if users_response.status_code == 200:
+                users = users_response.json()
+                user_map = {u.get("id"): u for u in users}
                 
-                # 참여자 정보 조회
-                user_ids = [p.get("user_id") for p in participants if p.get("user_id")]
-                if user_ids:
-                    users_response = await client.get(
-                        f"{db.base_url}/rest/v1/users",
-                        headers=db.headers,
-                        params={
-                            "id": f"in.({','.join(user_ids)})",
-                            "select": "id,display_name,username,profile_image_url"
-                        }
-                    )
-                    
-                    if users_response.status_code == 200:
-                        users = users_response.json()
-                        user_map = {u.get("id"): u for u in users}
-                        
-                        for p in participants:
-                            uid = p.get("user_id")
-                            if uid in user_map:
-                                p["user_info"] = user_map[uid]
-            
-            quest["participants"] = participants
-            quest["current_participants"] = len(participants)
-            quest["checked_in_count"] = sum(1 for p in participants if p.get("checked_in"))
-            
-            return {"quest": quest}
+                for p in participants:
+                    uid = p.get("user_id")
+                    if uid in user_map:
+                        p["user_info"] = user_map[uid]
+        
+        db.summarize_group_quest(quest, participants)
+        
+        return {"quest": quest}
     
     except HTTPException:
         raise
@@ -1562,7 +1526,7 @@ async def invite_to_group_quest(
         raise HTTPException(status_code=500, detail="DB not connected")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             # 퀘스트 정보 조회
             quest_response = await client.get(
                 f"{db.base_url}/rest/v1/group_quests",
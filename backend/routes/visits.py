@@ -9,13 +9,22 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
+from core.config import settings
 from core.dependencies import get_db
+from db.cursor import InvalidCursorError, decode_cursor, paginate
+from db.active_user_index import active_user_index
+from db.place_cache import place_cache
+from db.presence_index import presence_index, report_location
 from services.push_service import send_push_for_user
+from services.realtime import place_channel, publish_event
+from services.user_stats import record_visit
 
 router = APIRouter(prefix="/api/v1/visits", tags=["Visits"])
 
 # 체크인 허용 거리(미터). 이 거리 이내일 때만 서버에서 체크인 허용
 CHECKIN_RADIUS_METERS = 100
+# presence 응답 최대 인원
+PRESENCE_MAX_USERS = 50
 
 
 async def _ensure_place_from_client(
@@ -41,7 +50,6 @@ async def _fetch_and_save_kakao_place(place_id: str, db) -> Optional[dict]:
     try:
         from services.kakao_places import KakaoPlacesService
         from core.config import settings
-        import httpx
         
         kakao_id = place_id.replace("kakao-", "")
         
@@ -49,7 +57,7 @@ async def _fetch_and_save_kakao_place(place_id: str, db) -> Optional[dict]:
         kakao = KakaoPlacesService()
         url = "https://dapi.kakao.com/v2/local/search/keyword.json"
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             response = await client.get(
                 url,
                 headers={"Authorization": f"KakaoAK {settings.KAKAO_API_KEY}"},
@@ -80,10 +88,11 @@ async def _fetch_and_save_kakao_place(place_id: str, db) -> Optional[dict]:
             }
             
             # Supabase에 저장
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with db.http.session(timeout=10.0) as client:
                 url = f"{db.base_url}/rest/v1/places"
                 headers = {**db.headers, "Prefer": "resolution=merge-duplicates"}
                 resp = await client.post(url, headers=headers, json=place_data)
+                place_cache.invalidate([place_id])
                 
                 if resp.status_code in [200, 201]:
                     return place_data
@@ -129,20 +138,32 @@ class VisitCreate(BaseModel):
 @router.get("/{user_id}")
 async def get_user_visits(
     user_id: str,
-    days: int = 90,
+    days: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db = Depends(get_db)
 ):
-    """사용자 방문 기록 조회"""
+    """
+    사용자 방문 기록 조회 (최신순). 다음 페이지는 응답의 next_cursor 를 cursor 로 전달
+    days 를 주면 최근 days 일만, 없으면 전체 기간 (내 지도 화면은 기간 없이 전체 방문을 그림)
+    """
     
     try:
         if db is None:
             # Mock 데이터
             return {
                 "visits": [],
-                "total_count": 0
+                "total_count": 0,
+                "next_cursor": None,
             }
         
-        visits = await db.get_user_visits(user_id, days=days)
+        limit = max(1, min(limit, 200))
+        try:
+            decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+        visits = await db.get_user_visits(user_id, days=days, limit=limit + 1, cursor=cursor)
+        visits, next_cursor = paginate(visits, limit, created_col="visited_at")
 
         # visits 테이블에 place_name/latitude/longitude 컬럼이 있으면 N+1 쿼리 스킵
         # 없는 경우에만 places 테이블 조회 (백워드 호환)
@@ -152,16 +173,13 @@ async def get_user_visits(
             if visit.get("latitude") is None and visit.get("place_id"):
                 missing_place_ids.append(visit.get("place_id"))
 
-        # 좌표 없는 place만 일괄 조회 (최대 1번 쿼리로 처리)
-        place_cache: dict = {}
+        # 좌표 없는 place만 일괄 조회 (캐시 미스만 in.(...) 1회)
+        places: dict = {}
         if missing_place_ids:
-            for pid in missing_place_ids[:20]:  # 최대 20개만 보완 조회
-                try:
-                    p = await db.get_place_by_id(pid)
-                    if p:
-                        place_cache[pid] = p
-                except Exception:
-                    pass
+            try:
+                places = await db.get_places_by_ids(missing_place_ids)
+            except Exception:
+                pass
 
         for visit in visits:
             place_id = visit.get("place_id")
@@ -183,8 +201,8 @@ async def get_user_visits(
                 })
                 continue
 
-            # 캐시에서 place 정보 사용
-            place = place_cache.get(place_id)
+            # 일괄 조회한 place 정보 사용
+            place = places.get(place_id)
             enriched_visit = {
                 "id": visit.get("id"),
                 "place_id": place_id,
@@ -213,9 +231,12 @@ async def get_user_visits(
         
         return {
             "visits": enriched_visits,
-            "total_count": len(enriched_visits)
+            "total_count": len(enriched_visits),
+            "next_cursor": next_cursor
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         import logging
         logger = logging.getLogger("uvicorn.error")
@@ -305,6 +326,17 @@ async def create_visit(
         }
 
         result = await db.insert_visit(visit_data)
+        if result:
+            # 사용자 통계 집계 증분 갱신 (실패해도 체크인은 성공, 야간 대사 작업이 복구)
+            await record_visit(db, {**visit_data, **result})
+            # 장소 채널 구독자에게 presence 푸시 (presence API 폴링 대체)
+            # presence 인덱스도 이 이벤트로 갱신됨 (redis 브로커면 모든 워커)
+            publish_event(place_channel(visit.place_id), "presence", {
+                "place_id": visit.place_id,
+                "user_id": visit.user_id,
+                "state": "checkin",
+                "checked_in_at": visit_data["visited_at"],
+            })
         try:
             await db.create_notification(
                 visit.user_id,
@@ -338,6 +370,15 @@ async def create_visit(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _presence_user(user_id: str, checked_in_at: Optional[str], profile: dict) -> dict:
+    return {
+        "user_id": user_id,
+        "display_name": profile.get("username") or user_id[:8],
+        "avatar_url": profile.get("profile_image_url"),
+        "checked_in_at": checked_in_at,
+    }
+
+
 @router.get("/presence/{place_id}")
 async def get_place_presence(
     place_id: str,
@@ -345,15 +386,23 @@ async def get_place_presence(
     requester_id: Optional[str] = None,
     db = Depends(get_db)
 ):
-    """현재 장소에 함께 있는 사람 조회 (최근 N시간 내 체크인한 사용자)"""
+    """
+    현재 장소에 함께 있는 사람 조회 (최근 N시간 내 체크인한 사용자)
+    presence 인덱스가 준비됐으면 메모리에서 응답 (프로필도 캐시), 아니면 visits 조회.
+    """
     try:
         if db is None:
             return {"users": [], "count": 0}
 
+        if presence_index.ready and hours <= settings.PRESENCE_MAX_HOURS:
+            present = presence_index.present(place_id, hours * 3600, exclude=requester_id)[:PRESENCE_MAX_USERS]
+            profiles = await presence_index.profiles(db, [uid for uid, _ in present])
+            users = [_presence_user(uid, at, profiles.get(uid, {})) for uid, at in present]
+            return {"users": users, "count": len(users)}
+
         cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
 
         # activity_logs 또는 visits 테이블에서 최근 체크인 조회
-        import httpx
         headers = {**db.headers, "Accept": "application/json"}
 
         # visits 테이블: 최근 N시간 내 같은 place_id 방문자
@@ -363,9 +412,9 @@ async def get_place_presence(
             "visited_at": f"gte.{cutoff}",
             "select": "user_id,visited_at",
             "order": "visited_at.desc",
-            "limit": "50",
+            "limit": str(PRESENCE_MAX_USERS),
         }
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             resp = await client.get(url, headers=headers, params=params)
 
         if resp.status_code != 200:
@@ -383,31 +432,9 @@ async def get_place_presence(
             return {"users": [], "count": 0}
 
         # 사용자 프로필 조회
-        user_ids = list(seen.keys())[:20]
-        in_filter = "(" + ",".join(f'"{uid}"' for uid in user_ids) + ")"
-        profile_url = f"{db.base_url}/rest/v1/users"
-        profile_params = {
-            "user_id": f"in.{in_filter}",
-            "select": "user_id,username,profile_image_url",
-        }
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            presp = await client.get(profile_url, headers=headers, params=profile_params)
-
-        profiles: dict = {}
-        if presp.status_code == 200:
-            for p in (presp.json() or []):
-                profiles[p["user_id"]] = p
-
-        users = []
-        for uid, checked_in_at in seen.items():
-            p = profiles.get(uid, {})
-            users.append({
-                "user_id": uid,
-                "display_name": p.get("username") or uid[:8],
-                "avatar_url": p.get("profile_image_url"),
-                "checked_in_at": checked_in_at,
-            })
+        profiles = await db.get_user_display_profiles(list(seen.keys()))
 
+        users = [_presence_user(uid, checked_in_at, profiles.get(uid, {})) for uid, checked_in_at in seen.items()]
         return {"users": users, "count": len(users)}
 
     except Exception as e:
@@ -423,12 +450,19 @@ async def update_user_location(
     longitude: float,
     db = Depends(get_db)
 ):
-    """사용자 마지막 위치 업데이트 (소셜 지도용)"""
+    """
+    사용자 마지막 위치 업데이트 (소셜 지도·매칭용)
+    활동 사용자 인덱스를 쓰면 메모리에 즉시 반영하고 DB 기록은 ACTIVE_USERS_FLUSH_SECONDS 마다 일괄.
+    """
     try:
         if db is None:
             return {"success": False}
 
-        import httpx
+        if settings.ACTIVE_USERS_ENABLED:
+            active_user_index.report(user_id, latitude, longitude)
+            await report_location(db, user_id, latitude, longitude)
+            return {"success": True}
+
         headers = {**db.headers, "Content-Type": "application/json", "Prefer": "resolution=merge-duplicates"}
         url = f"{db.base_url}/rest/v1/users"
         params = {"user_id": f"eq.{user_id}"}
@@ -436,9 +470,11 @@ async def update_user_location(
             "last_location": f"POINT({longitude} {latitude})",
             "last_active_date": datetime.now().isoformat(),
         }
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with db.http.session(timeout=10.0) as client:
             resp = await client.patch(url, headers=headers, json=body, params=params)
 
+        # 체크인 장소를 벗어났으면 presence 에서 퇴장, 근처면 만료 연장
+        await report_location(db, user_id, latitude, longitude)
         return {"success": resp.status_code in [200, 204]}
     except Exception as e:
         import logging
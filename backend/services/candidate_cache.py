@@ -0,0 +1,149 @@
+"""
+추천 후보 공유 캐시 (1차 계층).
+- Kakao 카테고리 검색 결과를 (격자 셀, 카테고리 코드) 단위로 캐시해 근처 사용자끼리 공유.
+  역할은 카테고리 코드로 키에 반영된다. Kakao 는 거리순 상위 N곳을 돌려주므로 큰 반경으로 한 번
+  받아 두고 역할 반경으로 거르면 작은 반경 검색 결과와 같다 → 반경은 키에서 제외해 역할 간에도 공유.
+- 셀 중심 기준으로 여러 페이지를 받아 두어 셀 안 어느 위치에서든 가까운 후보가 빠지지 않게 한다.
+- 사용자별 거리 재계산·반경/완료 장소 필터·취향 스코어링(2차 계층)은 라우트에서 수행.
+- 저장소는 추천 캐시와 같은 백엔드 설정(memory | redis)을 사용, single-flight 포함.
+- 카테고리 코드별 조회는 동시에 실행 (Kakao 동시 호출 수는 앱 전체 세마포어로 제한).
+  요청 마감을 넘긴 코드는 빼고 부분 결과로 진행하며, 늦게 끝난 조회도 캐시는 채운다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.config import settings
+from services.recommendation_cache import RecommendationCache, build_cache_backend
+
+logger = logging.getLogger("uvicorn.error")
+
+# Kakao category 검색 반경 상한 (m)
+KAKAO_MAX_RADIUS = 20000
+
+
+def grid_cell(latitude: float, longitude: float, cell_deg: float) -> Tuple[int, int]:
+    return math.floor(latitude / cell_deg), math.floor(longitude / cell_deg)
+
+
+def cell_center(cell: Tuple[int, int], cell_deg: float) -> Tuple[float, float]:
+    iy, ix = cell
+    return (iy + 0.5) * cell_deg, (ix + 0.5) * cell_deg
+
+
+def candidate_key(cell: Tuple[int, int], category_group_code: str) -> str:
+    return f"{cell[0]}:{cell[1]}|{category_group_code}"
+
+
+candidate_cache = RecommendationCache(
+    build_cache_backend(prefix="wh:cand:", max_entries=settings.RECOMMENDATION_CANDIDATE_MAX_ENTRIES)
+)
+
+# 앱 전체 Kakao 동시 호출 한도 (이벤트 루프 안에서 지연 생성)
+_kakao_gate: Optional[asyncio.Semaphore] = None
+
+
+def _gate() -> asyncio.Semaphore:
+    global _kakao_gate
+    if _kakao_gate is None:
+        _kakao_gate = asyncio.Semaphore(max(1, settings.KAKAO_MAX_CONCURRENCY))
+    return _kakao_gate
+
+
+async def get_cell_candidates(
+    kakao,
+    latitude: float,
+    longitude: float,
+    category_group_code: str,
+    radius: int,
+    cache: RecommendationCache = candidate_cache,
+) -> List[Dict]:
+    """
+    사용자 위치가 속한 셀의 Kakao 카테고리 검색 결과 (원본 documents, 거리는 셀 중심 기준).
+    radius 는 호출부 필터용으로만 쓰이며 셀 검색은 항상 KAKAO_MAX_RADIUS 로 한다.
+    """
+    cell_deg = settings.RECOMMENDATION_CELL_DEG
+    cell = grid_cell(latitude, longitude, cell_deg)
+    center_lat, center_lon = cell_center(cell, cell_deg)
+
+    async def _fetch() -> Dict:
+        documents: List[Dict] = []
+        for page in range(1, max(1, settings.RECOMMENDATION_CANDIDATE_PAGES) + 1):
+            async with _gate():
+                result = await kakao.search_by_category(
+                    x=center_lon,
+                    y=center_lat,
+                    category_group_code=category_group_code,
+                    radius=KAKAO_MAX_RADIUS,
+                    page=page,
+                    size=15,
+                )
+            documents.extend(result.get("documents", []))
+            if result.get("meta", {}).get("is_end", True):
+                break
+        return {"documents": documents}
+
+    payload = await cache.get_or_compute(
+        candidate_key(cell, category_group_code),
+        settings.RECOMMENDATION_CANDIDATE_TTL_SECONDS,
+        _fetch,
+    )
+    return payload.get("documents", [])
+
+
+def _consume_result(task: asyncio.Task) -> None:
+    # 마감 이후 끝난 조회의 예외가 "never retrieved" 로 남지 않도록
+    if not task.cancelled():
+        task.exception()
+
+
+async def get_candidates(
+    kakao,
+    latitude: float,
+    longitude: float,
+    category_group_codes: Iterable[str],
+    radius: int,
+    cache: RecommendationCache = candidate_cache,
+    deadline: Optional[float] = None,
+) -> List[Dict]:
+    """
+    역할의 카테고리 코드별 셀 후보를 동시에 모아 id 기준 중복 제거.
+    실패하거나 deadline(초) 안에 끝나지 않은 코드는 건너뛴다 (부분 결과).
+    """
+    codes = list(dict.fromkeys(category_group_codes))
+    tasks = [
+        asyncio.ensure_future(get_cell_candidates(kakao, latitude, longitude, code, radius, cache))
+        for code in codes
+    ]
+    if not tasks:
+        return []
+    timeout = deadline if deadline is not None else settings.RECOMMENDATION_KAKAO_DEADLINE_SECONDS
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    # 늦은 조회는 취소하지 않음: 끝나면 셀 캐시를 채워 다음 요청이 사용 (Kakao 타임아웃으로 상한)
+    for task in pending:
+        task.add_done_callback(_consume_result)
+    if pending:
+        logger.info(
+            "[CandidateCache] deadline %.1fs: %d/%d category searches pending, using partial results",
+            timeout, len(pending), len(tasks),
+        )
+
+    seen: set[str] = set()
+    unique: List[Dict] = []
+    for code, task in zip(codes, tasks):
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            logger.debug("[CandidateCache] %s fetch failed: %s", code, task.exception())
+            continue
+        for doc in task.result():
+            doc_id = doc.get("id")
+            if not doc_id or doc_id in seen:
+                continue
+            seen.add(doc_id)
+            unique.append(doc)
+    return unique
@@ -9,9 +9,8 @@ AI 챌린지 메이커
 import json
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from anthropic import Anthropic
 
-from core.config import settings
+from core.llm_gateway import llm_gateway
 
 
 class ChallengeMakerService:
@@ -21,7 +20,6 @@ class ChallengeMakerService:
     
     def __init__(self, db):
         self.db = db
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
     
     async def generate_weekly_challenge(
         self,
@@ -157,7 +155,8 @@ class ChallengeMakerService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "challenge_maker.create_challenge",
                 model="claude-sonnet-4-20250514",
                 max_tokens=1000,
                 messages=[{"role": "user", "content": prompt}]
@@ -340,7 +339,8 @@ class ChallengeMakerService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "challenge_maker.progress_comment",
                 model="claude-sonnet-4-20250514",
                 max_tokens=100,
                 messages=[{"role": "user", "content": prompt}]
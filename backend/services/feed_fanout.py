@@ -0,0 +1,161 @@
+"""
+홈 피드: fan-out-on-write 인박스 + 셀럽 계정 fan-out-on-read.
+- 활동이 생기면(create_feed_activity) 작성자 본인 + 팔로워 인박스(feed_inbox)에 한 번씩 기록 (백그라운드).
+  읽을 때는 내 인박스만 keyset 으로 읽으므로 팔로우 수와 무관하게 O(페이지).
+- 팔로워가 FEED_CELEBRITY_FOLLOWERS 를 넘는 계정은 쓰기 fan-out 을 하지 않고 feed_celebrities 에 등록,
+  읽을 때 "내가 팔로우하는 셀럽"의 활동만 따로 keyset 조회해 인박스 페이지와 병합.
+- 인박스는 fan-out 직후 소유자별 최신 FEED_INBOX_MAX_ITEMS 개로 trim.
+- 인박스 테이블이 없으면(마이그레이션 전) 기존 방식(팔로우 목록 in.(...) 조회)으로 동작.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.config import settings
+from db.cursor import decode_cursor, paginate
+
+logger = logging.getLogger("uvicorn.error")
+
+# 진행 중인 백그라운드 fan-out (GC 로 사라지지 않게 참조 유지)
+_background: Set[asyncio.Task] = set()
+
+# 셀럽 계정 목록 프로세스 캐시 (만료 monotonic, ID 목록)
+_celebrities: Tuple[float, List[str]] = (0.0, [])
+_CELEBRITY_CACHE_SECONDS = 300
+
+_stats = {
+    "fanouts": 0,
+    "fanout_rows": 0,
+    "fanout_errors": 0,
+    "celebrity_skips": 0,
+    "trimmed": 0,
+    "inbox_reads": 0,
+    "fallback_reads": 0,
+}
+
+
+def feed_metrics() -> Dict[str, Any]:
+    return {**_stats, "pending_fanouts": len(_background)}
+
+
+def _spawn(coro) -> None:
+    task = asyncio.ensure_future(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def schedule_fan_out(db, activity: Optional[Dict[str, Any]]) -> None:
+    """활동 저장 직후 호출. 요청 지연에 영향 없도록 인박스 기록은 백그라운드에서."""
+    if not activity or not activity.get("id") or not activity.get("user_id"):
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # 이벤트 루프 밖 (스크립트 등) → fan-out 생략
+        logger.debug("[Feed] no running loop — fan-out skipped for %s", activity.get("id"))
+        return
+    _spawn(fan_out_activity(db, activity))
+
+
+async def fan_out_activity(db, activity: Dict[str, Any]) -> int:
+    """작성자 + 팔로워 인박스에 활동 기록. 기록한 행 수 반환."""
+    actor_id = str(activity["user_id"])
+    threshold = max(1, settings.FEED_CELEBRITY_FOLLOWERS)
+    try:
+        followers = await db.get_follower_ids(actor_id, limit=threshold + 1)
+        owners = [actor_id]
+        if len(followers) > threshold:
+            # 셀럽: 팔로워 인박스에는 쓰지 않고 읽기 시 병합
+            _stats["celebrity_skips"] += 1
+            await db.upsert_feed_celebrity(actor_id, len(followers))
+            _invalidate_celebrities()
+        else:
+            owners.extend(f for f in followers if f != actor_id)
+        rows = [
+            {"owner_id": owner, "activity_id": activity["id"], "actor_id": actor_id, "created_at": activity.get("created_at")}
+            for owner in owners
+        ]
+        if not await db.insert_feed_inbox(rows):
+            _stats["fanout_errors"] += 1
+            return 0
+        _stats["fanouts"] += 1
+        _stats["fanout_rows"] += len(rows)
+        _stats["trimmed"] += await db.trim_feed_inbox(owners, settings.FEED_INBOX_MAX_ITEMS)
+        return len(rows)
+    except Exception as e:
+        _stats["fanout_errors"] += 1
+        logger.warning("[Feed] fan-out failed for activity %s: %s", activity.get("id"), e)
+        return 0
+
+
+def schedule_follow_sync(db, follower_id: str, following_id: str, followed: bool) -> None:
+    """팔로우 → 상대의 최근 활동을 내 인박스에 채움, 언팔로우 → 내 인박스에서 제거"""
+    _spawn(_sync_follow(db, follower_id, following_id, followed))
+
+
+async def _sync_follow(db, follower_id: str, following_id: str, followed: bool) -> None:
+    try:
+        if followed:
+            if await db.backfill_feed_inbox(follower_id, following_id, limit=settings.FEED_FOLLOW_BACKFILL):
+                _stats["trimmed"] += await db.trim_feed_inbox([follower_id], settings.FEED_INBOX_MAX_ITEMS)
+        else:
+            await db.remove_feed_inbox_actor(follower_id, following_id)
+    except Exception as e:
+        logger.warning("[Feed] follow sync failed (%s -> %s): %s", follower_id, following_id, e)
+
+
+def _invalidate_celebrities() -> None:
+    global _celebrities
+    _celebrities = (0.0, [])
+
+
+async def _celebrity_ids(db) -> List[str]:
+    global _celebrities
+    expires, ids = _celebrities
+    if time.monotonic() < expires:
+        return ids
+    ids = await db.get_feed_celebrities()
+    _celebrities = (time.monotonic() + _CELEBRITY_CACHE_SECONDS, ids)
+    return ids
+
+
+def _sort_key(activity: Dict[str, Any]) -> Tuple[str, str]:
+    return str(activity.get("created_at") or ""), str(activity.get("id") or "")
+
+
+async def read_home_feed(
+    db,
+    user_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """내 홈 피드 한 페이지 → (활동 목록, 다음 커서)"""
+    decode_cursor(cursor)  # 잘못된 커서는 InvalidCursorError
+    limit = max(1, limit)
+
+    async def _celebrity_page() -> List[Dict[str, Any]]:
+        followed = await db.get_followed_among(user_id, [c for c in await _celebrity_ids(db) if c != user_id])
+        return await db.get_feed_activities(followed, limit=limit + 1, cursor=cursor) if followed else []
+
+    inbox, celebrity = await asyncio.gather(
+        db.get_feed_inbox(user_id, limit=limit + 1, cursor=cursor),
+        _celebrity_page(),
+    )
+    if inbox is None:
+        # 인박스 미배포 → 팔로우 목록 전체로 읽기 (기존 방식)
+        _stats["fallback_reads"] += 1
+        following_ids = await db.get_following_ids(user_id)
+        rows = await db.get_feed_activities(list({user_id, *following_ids}), limit=limit + 1, cursor=cursor)
+        return paginate(rows, limit)
+
+    _stats["inbox_reads"] += 1
+    # 두 소스 병합 (셀럽 전환 전 fan-out 된 활동은 양쪽에 있을 수 있어 id 로 중복 제거)
+    merged: Dict[str, Dict[str, Any]] = {}
+    for activity in list(inbox) + list(celebrity):
+        merged.setdefault(str(activity.get("id")), activity)
+    rows = sorted(merged.values(), key=_sort_key, reverse=True)
+    return paginate(rows, limit)
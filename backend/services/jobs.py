@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+백그라운드 작업 실행기 (APScheduler 가 트리거, 실행권·진행 상태는 job_runs 테이블).
+- 워커가 여러 개여도 (job_name, run_key) 하나는 한 워커만 실행: claim_job_run RPC 가 lease 를 원자적으로 획득.
+  run_key 는 보통 KST 날짜 → 같은 날 같은 작업은 한 번만.
+- 실행 중에는 heartbeat 로 lease 연장, 작업은 배치마다 ctx.save(checkpoint) 로 진행 상황 저장.
+- 워커가 죽어 lease 가 만료되면 다른 워커의 resume_stale 이 실행권을 가져와 마지막 checkpoint 부터 이어서 실행.
+- DB 미연결 / claim_job_run 미배포(404)면 프로세스 메모리 저장소로 동작 (프로세스 안에서만 중복 방지).
+  그 밖의 실행권 획득 실패(5xx·타임아웃)는 몇 번 재시도 후 실행하지 않고 건너뜀
+  → 일시 오류 때 워커마다 같은 작업(일일 푸시 등)을 보내는 일이 없음. 다음 트리거 때 다시 시도.
+- 상태: GET /health/jobs
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.config import settings
+from core.dependencies import Database
+
+logger = logging.getLogger("uvicorn.error")
+
+KST = timezone(timedelta(hours=9))
+
+
+class JobLeaseLost(Exception):
+    """다른 워커가 실행권을 가져감 (lease 만료 후 재획득). 이 워커는 즉시 중단."""
+
+
+class JobStoreNotDeployed(Exception):
+    """claim_job_run RPC / job_runs 테이블이 없음 (프로세스 메모리 저장소로 대체)"""
+
+
+# 공유 실행권 획득이 일시 오류로 실패할 때 재시도 횟수·간격(초, 시도마다 증가)
+CLAIM_RETRIES = 2
+CLAIM_RETRY_DELAY_SECONDS = 2.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def kst_date_key() -> str:
+    """하루 한 번 작업의 run_key (KST 날짜)"""
+    return datetime.now(KST).date().isoformat()
+
+
+class MemoryJobStore:
+    """DB 없을 때의 job_runs (프로세스 안에서만 유효)"""
+
+    def __init__(self) -> None:
+        self._runs: Dict[tuple, Dict[str, Any]] = {}
+
+    async def claim(self, job_name: str, run_key: str, owner: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        now = _now()
+        row = self._runs.get((job_name, run_key))
+        if row is not None:
+            if row["status"] == "succeeded":
+                return None
+            if row["status"] == "running" and row["lease_until"] > now.isoformat():
+                return None
+        row = {
+            "job_name": job_name, "run_key": run_key, "status": "running", "owner": owner,
+            "lease_until": (now + timedelta(seconds=lease_seconds)).isoformat(),
+            "attempts": (row or {}).get("attempts", 0) + 1,
+            "checkpoint": (row or {}).get("checkpoint") or {},
+            "result": None, "error": None,
+            "started_at": (row or {}).get("started_at") or now.isoformat(),
+            "heartbeat_at": now.isoformat(), "finished_at": None,
+        }
+        self._runs[(job_name, run_key)] = row
+        return dict(row)
+
+    async def update(self, job_name: str, run_key: str, owner: str, fields: Dict[str, Any]) -> bool:
+        row = self._runs.get((job_name, run_key))
+        if row is None or row["owner"] != owner:
+            return False
+        row.update(fields)
+        return True
+
+    async def list_runs(self, limit: int = 20, **filters: Any) -> List[Dict[str, Any]]:
+        rows = sorted(self._runs.values(), key=lambda r: r["started_at"], reverse=True)
+        if filters.get("status"):
+            rows = [r for r in rows if r["status"] == filters["status"]]
+        if filters.get("lease_before"):
+            rows = [r for r in rows if r["lease_until"] < filters["lease_before"]]
+        if filters.get("started_after"):
+            rows = [r for r in rows if r["started_at"] >= filters["started_after"]]
+        return [dict(r) for r in rows[:limit]]
+
+
+class SupabaseJobStore:
+    """job_runs 테이블 + claim_job_run RPC (워커·인스턴스 간 공유)"""
+
+    def __init__(self, db: Any) -> None:
+        self.db = db
+
+    async def claim(self, job_name: str, run_key: str, owner: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        rows = await self.db.claim_job_run(job_name, run_key, owner, lease_seconds)
+        if rows is None:
+            raise JobStoreNotDeployed("claim_job_run RPC not deployed")
+        return rows[0] if rows else None
+
+    async def update(self, job_name: str, run_key: str, owner: str, fields: Dict[str, Any]) -> bool:
+        return await self.db.update_job_run(job_name, run_key, owner, fields)
+
+    async def list_runs(self, limit: int = 20, **filters: Any) -> List[Dict[str, Any]]:
+        return await self.db.list_job_runs(limit=limit, **filters)
+
+
+class JobContext:
+    """실행 중인 작업에 넘기는 핸들. checkpoint 는 이전 시도에서 저장된 진행 상황 (처음이면 {})."""
+
+    def __init__(self, runner: "JobRunner", store: Any, row: Dict[str, Any]) -> None:
+        self._runner = runner
+        self._store = store
+        self.job_name: str = row["job_name"]
+        self.run_key: str = row["run_key"]
+        self.attempt: int = row.get("attempts") or 1
+        self.checkpoint: Dict[str, Any] = dict(row.get("checkpoint") or {})
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.checkpoint)
+
+    async def save(self, checkpoint: Dict[str, Any]) -> None:
+        """배치 완료 후 진행 상황 저장 (+ lease 연장). 실행권을 잃었으면 JobLeaseLost."""
+        self.checkpoint = dict(checkpoint)
+        await self._renew({"checkpoint": self.checkpoint})
+
+    async def _renew(self, fields: Optional[Dict[str, Any]] = None) -> None:
+        now = _now()
+        payload = {
+            **(fields or {}),
+            "heartbeat_at": now.isoformat(),
+            "lease_until": (now + timedelta(seconds=self._runner.lease_seconds)).isoformat(),
+        }
+        if not await self._store.update(self.job_name, self.run_key, self._runner.owner, payload):
+            raise JobLeaseLost(f"{self.job_name}/{self.run_key}")
+
+
+JobFn = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobRunner:
+    """
+    사용:
+        job_runner.register("daily_push", daily_push_job)   # run_key 기본: KST 날짜
+        await job_runner.run("daily_push")                    # 다른 워커가 실행 중·완료면 None
+    """
+
+    def __init__(self, lease_seconds: int = 120, heartbeat_seconds: int = 30, resume_max_age_hours: int = 6):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = max(10, lease_seconds)
+        self.heartbeat_seconds = max(1, min(heartbeat_seconds, self.lease_seconds // 3))
+        self.resume_max_age_hours = resume_max_age_hours
+        self._jobs: Dict[str, tuple] = {}
+        self._memory = MemoryJobStore()
+        self._running: Dict[str, str] = {}
+        self._local: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, job_name: str, fn: JobFn, run_key: Callable[[], str] = kst_date_key) -> None:
+        self._jobs[job_name] = (fn, run_key)
+
+    def _store(self) -> Any:
+        if Database.is_connected():
+            return SupabaseJobStore(Database.get_helpers())
+        return self._memory
+
+    async def _claim(self, job_name: str, run_key: str) -> tuple:
+        """(저장소, 실행 행). 실행권을 못 얻었거나 공유 저장소가 일시 장애면 행은 None (실행 안 함)"""
+        store = self._store()
+        if store is self._memory:
+            return store, await store.claim(job_name, run_key, self.owner, self.lease_seconds)
+        for attempt in range(CLAIM_RETRIES + 1):
+            try:
+                return store, await store.claim(job_name, run_key, self.owner, self.lease_seconds)
+            except JobStoreNotDeployed as e:
+                # job_runs 미배포: 이 프로세스 안에서만 중복 방지
+                logger.warning("[Jobs] shared claim unavailable for %s/%s, using process lock: %s", job_name, run_key, e)
+                return self._memory, await self._memory.claim(job_name, run_key, self.owner, self.lease_seconds)
+            except Exception as e:
+                if attempt >= CLAIM_RETRIES:
+                    # 실행권 여부를 모르면 실행하지 않음 (다른 워커가 이미 실행 중일 수 있음)
+                    local = self._local.setdefault(job_name, {"runs": 0, "failures": 0, "lease_lost": 0})
+                    local["claim_failures"] = local.get("claim_failures", 0) + 1
+                    logger.warning("[Jobs] shared claim failed for %s/%s, skipping this trigger: %s", job_name, run_key, e)
+                    return store, None
+                await asyncio.sleep(CLAIM_RETRY_DELAY_SECONDS * (attempt + 1))
+        return store, None
+
+    async def run(self, job_name: str, run_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """실행권을 얻으면 실행하고 결과 반환. 다른 워커가 갖고 있거나 이미 끝났으면 None."""
+        fn, key_fn = self._jobs[job_name]
+        run_key = run_key or key_fn()
+        if job_name in self._running:
+            return None
+        store, row = await self._claim(job_name, run_key)
+        if row is None:
+            logger.info("[Jobs] %s/%s skipped (claimed by another worker or already done)", job_name, run_key)
+            return None
+
+        ctx = JobContext(self, store, row)
+        self._running[job_name] = run_key
+        local = self._local.setdefault(job_name, {"runs": 0, "failures": 0, "lease_lost": 0})
+        local.update({"last_run_key": run_key, "last_started_at": _now().isoformat(), "last_attempt": ctx.attempt})
+        if ctx.resumed:
+            logger.info("[Jobs] %s/%s resuming attempt %d from %s", job_name, run_key, ctx.attempt, ctx.checkpoint)
+
+        work = asyncio.ensure_future(fn(ctx))
+        lost = asyncio.Event()
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(self.heartbeat_seconds)
+                try:
+                    await ctx._renew()
+                except JobLeaseLost:
+                    lost.set()
+                    work.cancel()
+                    return
+                except Exception as e:
+                    logger.warning("[Jobs] heartbeat failed for %s/%s: %s", job_name, run_key, e)
+
+        beat = asyncio.ensure_future(heartbeat())
+        try:
+            result = await work or {}
+        except (JobLeaseLost, asyncio.CancelledError) as e:
+            if isinstance(e, asyncio.CancelledError) and not lost.is_set():
+                raise
+            local["lease_lost"] += 1
+            logger.warning("[Jobs] %s/%s lost its lease, stopping (another worker continues)", job_name, run_key)
+            return None
+        except Exception as e:
+            local["failures"] += 1
+            local["last_error"] = str(e)[:500]
+            logger.warning("[Jobs] %s/%s failed: %s", job_name, run_key, e)
+            await self._finish(store, ctx, {"status": "failed", "error": str(e)[:500]})
+            return None
+        finally:
+            beat.cancel()
+            self._running.pop(job_name, None)
+
+        local["runs"] += 1
+        local["last_finished_at"] = _now().isoformat()
+        local["last_result"] = result
+        await self._finish(store, ctx, {"status": "succeeded", "result": result, "error": None})
+        return result
+
+    async def _finish(self, store: Any, ctx: JobContext, fields: Dict[str, Any]) -> None:
+        try:
+            await store.update(ctx.job_name, ctx.run_key, self.owner, {
+                **fields, "finished_at": _now().isoformat(), "lease_until": _now().isoformat(),
+            })
+        except Exception as e:
+            logger.warning("[Jobs] recording %s/%s result failed: %s", ctx.job_name, ctx.run_key, e)
+
+    async def resume_stale(self) -> int:
+        """lease 가 만료된 실행 중 작업(워커 종료 등)을 이어서 실행. 이어받은 작업 수 반환."""
+        now = _now()
+        try:
+            rows = await self._store().list_runs(
+                limit=20, status="running", lease_before=now.isoformat(),
+                started_after=(now - timedelta(hours=self.resume_max_age_hours)).isoformat(),
+            )
+        except Exception as e:
+            logger.warning("[Jobs] listing stale runs failed: %s", e)
+            return 0
+        resumed = 0
+        for row in rows:
+            if row["job_name"] in self._jobs and await self.run(row["job_name"], row["run_key"]) is not None:
+                resumed += 1
+        return resumed
+
+    async def status(self, limit: int = 20) -> Dict[str, Any]:
+        try:
+            recent = await self._store().list_runs(limit=limit)
+        except Exception as e:
+            recent = [{"error": str(e)}]
+        return {
+            "owner": self.owner,
+            "shared": Database.is_connected(),
+            "registered": sorted(self._jobs),
+            "running_here": dict(self._running),
+            "local": self._local,
+            "recent": recent,
+        }
+
+
+job_runner = JobRunner(
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    heartbeat_seconds=settings.JOB_HEARTBEAT_SECONDS,
+    resume_max_age_hours=settings.JOB_RESUME_MAX_AGE_HOURS,
+)
@@ -4,13 +4,14 @@ Kakao Local API 통합 서비스
 장소 검색, 자동 수집, AI 분석
 """
 
-import httpx
 import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import json
 
 from core.config import settings
+from core.dependencies import Database
+from core.llm_gateway import llm_gateway
 from services.narrative_generator import generate_narrative
 
 
@@ -21,11 +22,13 @@ class KakaoPlacesService:
     
     BASE_URL = "https://dapi.kakao.com/v2/local/search"
     
-    def __init__(self):
+    def __init__(self, http=None):
         self.api_key = settings.KAKAO_API_KEY
         self.headers = {
             "Authorization": f"KakaoAK {self.api_key}"
         }
+        # 앱 공용 커넥션 풀 재사용 (호출마다 TCP/TLS 핸드셰이크 방지)
+        self.http = http or Database.get_http()
     
     async def search_places(
         self,
@@ -80,7 +83,7 @@ class KakaoPlacesService:
         if category_group_code:
             params["category_group_code"] = category_group_code
         
-        async with httpx.AsyncClient() as client:
+        async with self.http.session(timeout=settings.KAKAO_TIMEOUT_SECONDS) as client:
             response = await client.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             return response.json()
@@ -110,7 +113,7 @@ class KakaoPlacesService:
             "sort": "distance"
         }
         
-        async with httpx.AsyncClient() as client:
+        async with self.http.session(timeout=settings.KAKAO_TIMEOUT_SECONDS) as client:
             response = await client.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             return response.json()
@@ -263,11 +266,7 @@ class PlaceCollector:
         AI로 장소의 vibe_tags 생성
         """
         
-        from anthropic import Anthropic
-        
         try:
-            client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-            
             prompt = f"""
 장소: {place_data['name']}
 카테고리: {place_data['category']}
@@ -295,7 +294,8 @@ class PlaceCollector:
 출력 형식: ["tag1", "tag2", "tag3"]
 """
             
-            response = client.messages.create(
+            response = await llm_gateway.create(
+                "kakao_places.vibe_tags",
                 model="claude-sonnet-4-20250514",
                 max_tokens=100,
                 messages=[{
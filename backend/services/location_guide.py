@@ -9,9 +9,8 @@ AI 동행자 - 위치 기반 실시간 가이드
 import json
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from anthropic import Anthropic
 
-from core.config import settings
+from core.llm_gateway import llm_gateway
 
 
 class LocationGuideService:
@@ -21,7 +20,6 @@ class LocationGuideService:
     
     def __init__(self, db):
         self.db = db
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
     
     async def on_arrival(
         self,
@@ -148,7 +146,8 @@ class LocationGuideService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "location_guide.arrival_guide",
                 model="claude-sonnet-4-20250514",
                 max_tokens=600,
                 messages=[{"role": "user", "content": prompt}]
@@ -336,7 +335,8 @@ class LocationGuideService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "location_guide.next_place",
                 model="claude-sonnet-4-20250514",
                 max_tokens=300,
                 messages=[{"role": "user", "content": prompt}]
@@ -9,9 +9,8 @@
 import json
 from typing import List, Dict, Optional
 from datetime import datetime
-from anthropic import Anthropic
 
-from core.config import settings
+from core.llm_gateway import llm_gateway
 
 
 # 미션 템플릿 (카테고리별)
@@ -207,9 +206,6 @@ class MissionGenerator:
     AI 기반 맞춤형 미션 생성
     """
     
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    
     async def generate_missions(
         self,
         place: Dict,
@@ -350,7 +346,8 @@ class MissionGenerator:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "mission_generator.missions",
                 model="claude-sonnet-4-20250514",
                 max_tokens=600,
                 messages=[{"role": "user", "content": prompt}]
@@ -479,7 +476,8 @@ class MissionGenerator:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "mission_generator.challenge_missions",
                 model="claude-sonnet-4-20250514",
                 max_tokens=800,
                 messages=[{"role": "user", "content": prompt}]
@@ -0,0 +1,242 @@
+"""
+AI 장소 서사 캐시 (content-addressed).
+- 키: (place_id, role_type, 기분 버킷, 날씨, 시간대) → sha256. 기분 자유 텍스트는 버킷으로 묶어 재사용률을 높임.
+- 1차: 프로세스 인메모리 LRU, 2차: Supabase `narratives` 테이블 (DB 미연결/테이블 없음이면 1차만).
+- 같은 키 동시 요청은 한 번만 생성 (single-flight).
+- 추천 응답에 노출된 (장소, 조건) 조합을 집계해 야간 사전 생성(pre-warm) 대상으로 사용.
+  워커마다 메모리에 모은 증가분을 주기적으로 Supabase `narrative_demand` 에 합산 → 사전 생성(한 워커만 실행)이
+  모든 워커의 집계를 보고 재시작에도 유지. RPC 미배포/DB 미연결이면 이 프로세스 집계만 사용.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.dependencies import Database
+
+logger = logging.getLogger("uvicorn.error")
+
+# 기분 버킷: 프론트 MOODS 라벨 + 추천 라우트의 기분 키워드 규칙과 맞춤 (앞에서부터 첫 일치)
+MOOD_BUCKETS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("tired", ("tired", "지침", "지쳐", "피곤", "피로", "번아웃", "우울", "힘들", "스트레스")),
+    ("romantic", ("romantic", "설렘", "설레", "두근", "데이트", "로맨틱")),
+    ("energetic", ("energetic", "adventur", "신남", "신나", "활기", "에너지", "모험")),
+    ("calm", ("calm", "차분", "혼자", "혼밥", "조용", "생각", "정리")),
+    ("curious", ("curious", "inspired", "호기심", "궁금", "영감")),
+    ("social", ("social", "친구", "모임", "함께")),
+    ("hungry", ("hungry", "배고")),
+    ("happy", ("happy", "기분 좋", "행복")),
+)
+WEATHER_BUCKETS = {"sunny", "cloudy", "rainy", "snowy"}
+TIME_BUCKETS = {"dawn", "morning", "afternoon", "evening", "night"}
+
+# 사전 생성 후보 집계 상한 (초과 시 하위 절반 정리)
+_MAX_DEMAND_ENTRIES = 20000
+
+
+def mood_bucket(mood: Optional[str]) -> str:
+    text = (mood or "").strip().lower()
+    if not text:
+        return "none"
+    for bucket, keywords in MOOD_BUCKETS:
+        if any(k in text for k in keywords):
+            return bucket
+    return "other"
+
+
+def make_narrative_key(
+    place_id: str,
+    role_type: str,
+    mood: Optional[str] = None,
+    weather: Optional[str] = None,
+    time_of_day: Optional[str] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """(cache_key, 정규화된 키 필드) 반환"""
+    fields = {
+        "place_id": place_id,
+        "role_type": role_type,
+        "mood_bucket": mood_bucket(mood),
+        "weather": weather if weather in WEATHER_BUCKETS else "any",
+        "time_of_day": time_of_day if time_of_day in TIME_BUCKETS else "any",
+    }
+    raw = "|".join(fields[k] for k in ("place_id", "role_type", "mood_bucket", "weather", "time_of_day"))
+    return hashlib.sha256(raw.encode()).hexdigest(), fields
+
+
+class NarrativeCache:
+    """인메모리 LRU + Supabase 영속 계층"""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max(1, max_entries)
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # cache_key → [노출 횟수, 생성 인자]. _pending_demand 는 아직 공유 집계에 더하지 않은 증가분
+        self._demand: Dict[str, List[Any]] = {}
+        self._pending_demand: Dict[str, List[Any]] = {}
+        self._stats = {
+            "memory_hits": 0, "store_hits": 0, "misses": 0, "generated": 0, "evictions": 0,
+            "demand_flushed": 0, "demand_flush_failures": 0,
+        }
+
+    # ---------- 조회/저장 ----------
+
+    def _remember(self, key: str, narrative: str) -> None:
+        self._lru[key] = narrative
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        narrative = self._lru.get(key)
+        if narrative is not None:
+            self._lru.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return narrative
+        if Database.is_connected():
+            try:
+                narrative = await Database.get_helpers().get_narrative(key)
+            except Exception as e:
+                logger.debug("[NarrativeCache] store read failed: %s", e)
+                narrative = None
+            if narrative:
+                self._remember(key, narrative)
+                self._stats["store_hits"] += 1
+                return narrative
+        self._stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, fields: Dict[str, str], narrative: str) -> None:
+        self._remember(key, narrative)
+        if Database.is_connected():
+            try:
+                await Database.get_helpers().save_narrative(key, narrative, fields)
+            except Exception as e:
+                logger.debug("[NarrativeCache] store write failed: %s", e)
+
+    async def get_or_generate(
+        self,
+        key: str,
+        fields: Dict[str, str],
+        generate: Callable[[], Awaitable[Optional[str]]],
+        refresh: bool = False,
+    ) -> Optional[str]:
+        """
+        캐시 조회 후 없으면 generate() 로 생성해 저장. generate 가 None 이면 저장하지 않음.
+        refresh=True 면 캐시를 읽지 않고 새로 생성해 기존 항목을 덮어씀 (사용자 재생성 요청)
+        """
+        if not refresh:
+            narrative = await self.get(key)
+            if narrative is not None:
+                return narrative
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            narrative = await generate()
+            if narrative:
+                self._stats["generated"] += 1
+                await self.put(key, fields, narrative)
+            future.set_result(narrative)
+            return narrative
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    # ---------- 사전 생성 후보 ----------
+
+    @staticmethod
+    def _count(demand: Dict[str, List[Any]], key: str, hits: int, generate_kwargs: Dict[str, Any]) -> Dict[str, List[Any]]:
+        entry = demand.get(key)
+        if entry is not None:
+            entry[0] += hits
+            return demand
+        if len(demand) >= _MAX_DEMAND_ENTRIES:
+            keep = sorted(demand.items(), key=lambda kv: kv[1][0], reverse=True)
+            demand = dict(keep[: _MAX_DEMAND_ENTRIES // 2])
+        demand[key] = [hits, generate_kwargs]
+        return demand
+
+    def note_recommended(self, key: str, generate_kwargs: Dict[str, Any]) -> None:
+        """추천 응답에 노출된 (장소, 조건) 조합 집계"""
+        self._demand = self._count(self._demand, key, 1, generate_kwargs)
+        self._pending_demand = self._count(self._pending_demand, key, 1, generate_kwargs)
+
+    async def flush_demand(self, batch_size: int = 500) -> int:
+        """
+        모아 둔 증가분을 공유 집계에 더함 (배치당 RPC 1회, 워커마다 주기 실행). 반영한 조합 수.
+        실패한 배치는 다음 flush 에 다시 더함. RPC 미배포면 증가분을 버림 (이 프로세스 집계엔 남아 있음)
+        """
+        if not self._pending_demand or not Database.is_connected():
+            return 0
+        pending, self._pending_demand = self._pending_demand, {}
+        items = list(pending.items())
+        db = Database.get_helpers()
+        written = 0
+        for i in range(0, len(items), batch_size):
+            chunk = items[i:i + batch_size]
+            rows = [{"cache_key": key, "hits": hits, "generate_kwargs": kwargs} for key, (hits, kwargs) in chunk]
+            try:
+                if await db.increment_narrative_demand(rows) is None:
+                    return written
+                written += len(chunk)
+            except Exception as e:
+                self._stats["demand_flush_failures"] += 1
+                logger.warning("[NarrativeCache] demand flush failed (%d rows): %s", len(chunk), e)
+                for key, (hits, kwargs) in chunk:
+                    self._pending_demand = self._count(self._pending_demand, key, hits, kwargs)
+        self._stats["demand_flushed"] += written
+        return written
+
+    async def top_demand(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        노출 많은 순으로 아직 캐시에 없는 조합의 생성 인자.
+        공유 집계(모든 워커)를 우선 사용, 미배포/실패면 이 프로세스 집계
+        """
+        if Database.is_connected():
+            await self.flush_demand()
+            try:
+                rows = await Database.get_helpers().top_narrative_demand(limit)
+            except Exception as e:
+                logger.warning("[NarrativeCache] shared demand read failed, using process counts: %s", e)
+                rows = None
+            if rows is not None:
+                return [row["generate_kwargs"] for row in rows if row["cache_key"] not in self._lru][:limit]
+        ranked = sorted(self._demand.items(), key=lambda kv: kv[1][0], reverse=True)
+        return [kwargs for key, (_, kwargs) in ranked if key not in self._lru][:limit]
+
+    async def decay_demand(self) -> None:
+        """사전 생성 후 집계 절반으로 감쇠 (최근 추세 위주)"""
+        for key in list(self._demand):
+            self._demand[key][0] //= 2
+            if self._demand[key][0] <= 0:
+                del self._demand[key]
+        if Database.is_connected():
+            try:
+                await Database.get_helpers().decay_narrative_demand()
+            except Exception as e:
+                logger.warning("[NarrativeCache] shared demand decay failed: %s", e)
+
+    def metrics(self) -> Dict[str, Any]:
+        total = self._stats["memory_hits"] + self._stats["store_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["store_hits"]
+        return {
+            **self._stats,
+            "size": len(self._lru),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(hits / total, 3) if total else 0.0,
+            "prewarm_candidates": len(self._demand),
+            "demand_pending": len(self._pending_demand),
+        }
+
+
+narrative_cache = NarrativeCache(max_entries=settings.NARRATIVE_CACHE_MAX_ENTRIES)
@@ -3,19 +3,13 @@
 AI Narrative Generator using Anthropic Claude
 """
 
-from anthropic import Anthropic
+import asyncio
 from typing import Optional
 from core.config import settings
+from core.llm_gateway import llm_gateway
+from services.narrative_cache import make_narrative_key, narrative_cache
 
-# Anthropic 클라이언트 초기화
-client = None
-if settings.ANTHROPIC_API_KEY and settings.ANTHROPIC_API_KEY != "your_anthropic_api_key_here":
-    try:
-        client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        print(f"✅ Anthropic client initialized successfully")
-    except Exception as e:
-        print(f"⚠️ Anthropic client initialization failed: {e}")
-else:
+if not llm_gateway.enabled:
     print(f"⚠️ Anthropic API key not configured, using fallback narratives")
 
 
@@ -27,6 +21,9 @@ ROLE_PROMPTS = {
     "achiever": "당신은 성취를 추구하는 챔피언입니다. 도전, 목표 달성, 자기 계발을 중시합니다.",
 }
 
+WEATHER_KR = {"sunny": "맑은 날", "cloudy": "흐린 날", "rainy": "비 오는 날", "snowy": "눈 오는 날"}
+TIME_KR = {"dawn": "새벽", "morning": "아침", "afternoon": "오후", "evening": "저녁", "night": "밤"}
+
 
 async def generate_narrative(
     place_name: str,
@@ -35,9 +32,14 @@ async def generate_narrative(
     vibe_tags: list[str],
     is_hidden_gem: bool = False,
     user_mood: Optional[str] = None,
+    place_id: Optional[str] = None,
+    weather: Optional[str] = None,
+    time_of_day: Optional[str] = None,
+    regenerate: bool = False,
 ) -> str:
     """
     Claude API를 사용하여 장소에 대한 감성적 서사 생성
+    (장소·역할·기분 버킷·날씨·시간대 단위로 캐시, 캐시 히트 시 LLM 호출 없음)
     
     Args:
         place_name: 장소 이름
@@ -46,15 +48,44 @@ async def generate_narrative(
         vibe_tags: 장소 분위기 태그
         is_hidden_gem: 히든 보석 여부
         user_mood: 사용자 기분 (선택)
+        place_id: 장소 ID (없으면 이름+카테고리로 캐시 키 구성)
+        weather: 날씨 (sunny/cloudy/rainy/snowy, 선택)
+        time_of_day: 시간대 (morning/afternoon/..., 선택)
+        regenerate: True 면 캐시를 건너뛰고 새로 생성해 캐시 항목 교체
     
     Returns:
         1-2문장의 감성적 서사
     """
-    
-    # Claude API가 없으면 기본 서사 반환
-    if not client:
+    key, fields = make_narrative_key(
+        place_id or f"{place_name}|{category}", role_type, user_mood, weather, time_of_day
+    )
+    narrative = await narrative_cache.get_or_generate(
+        key,
+        fields,
+        lambda: _generate_with_llm(
+            place_name, category, role_type, vibe_tags, is_hidden_gem, user_mood,
+            fields["weather"], fields["time_of_day"],
+        ),
+        refresh=regenerate,
+    )
+    return narrative or _get_fallback_narrative(role_type, is_hidden_gem)
+
+
+async def _generate_with_llm(
+    place_name: str,
+    category: str,
+    role_type: str,
+    vibe_tags: list[str],
+    is_hidden_gem: bool,
+    user_mood: Optional[str],
+    weather: str,
+    time_of_day: str,
+) -> Optional[str]:
+    """LLM 서사 생성. 사용 불가/실패 시 None (폴백 서사는 캐시하지 않음)."""
+    # Claude API가 없으면 기본 서사 사용
+    if not llm_gateway.enabled:
         print(f"⚠️ Using fallback narrative for {place_name}")
-        return _get_fallback_narrative(role_type, is_hidden_gem)
+        return None
     
     try:
         print(f"🤖 Generating AI narrative for {place_name}...")
@@ -70,6 +101,10 @@ async def generate_narrative(
         # 기분 컨텍스트
         mood_context = f"사용자는 지금 '{user_mood}' 기분입니다. " if user_mood else ""
         
+        # 날씨/시간대 컨텍스트 (캐시 키와 같은 단위)
+        scene = " ".join(x for x in (WEATHER_KR.get(weather), TIME_KR.get(time_of_day)) if x)
+        scene_context = f"지금은 {scene}입니다. " if scene else ""
+        
         # 프롬프트 구성
         prompt = f"""당신은 감성적인 여행 작가입니다.
 
@@ -78,7 +113,7 @@ async def generate_narrative(
 장소: {place_name}
 카테고리: {category}
 {vibe_context}
-{hidden_context}{mood_context}
+{hidden_context}{mood_context}{scene_context}
 
 이 장소에 대한 **1-2문장**의 짧고 감성적인 서사를 작성하세요.
 - 시적이고 은유적인 표현 사용
@@ -94,7 +129,8 @@ async def generate_narrative(
 """
 
         # Claude API 호출
-        message = client.messages.create(
+        message = await llm_gateway.create(
+            "narrative_generator.narrative",
             model="claude-sonnet-4-20250514",
             max_tokens=150,
             temperature=0.9,
@@ -114,7 +150,7 @@ async def generate_narrative(
         
     except Exception as e:
         print(f"⚠️ Narrative generation failed: {e}")
-        return _get_fallback_narrative(role_type, is_hidden_gem)
+        return None
 
 
 def _get_fallback_narrative(role_type: str, is_hidden_gem: bool) -> str:
@@ -160,29 +196,83 @@ def _get_fallback_narrative(role_type: str, is_hidden_gem: bool) -> str:
     return random.choice(narratives)
 
 
-async def generate_narratives_batch(places: list[dict], role_type: str, user_mood: Optional[str] = None) -> list[str]:
+async def generate_narratives_batch(
+    places: list[dict],
+    role_type: str,
+    user_mood: Optional[str] = None,
+    weather: Optional[str] = None,
+    time_of_day: Optional[str] = None,
+) -> list[str]:
     """
-    여러 장소에 대한 서사를 배치로 생성
+    여러 장소에 대한 서사를 동시에 생성 (동시 LLM 호출 수는 게이트웨이가 제한)
     
     Args:
-        places: 장소 정보 리스트 (각각 name, category, vibe_tags, is_hidden_gem 포함)
+        places: 장소 정보 리스트 (각각 id, name, category, vibe_tags, is_hidden_gem 포함)
         role_type: 사용자 역할
         user_mood: 사용자 기분
+        weather: 날씨
+        time_of_day: 시간대
     
     Returns:
         서사 리스트 (places와 같은 순서)
     """
-    narratives = []
-    
-    for place in places:
-        narrative = await generate_narrative(
+    return list(await asyncio.gather(*[
+        generate_narrative(
             place_name=place.get("name", ""),
             category=place.get("category", ""),
             role_type=role_type,
             vibe_tags=place.get("vibe_tags", []),
             is_hidden_gem=place.get("is_hidden_gem", False),
             user_mood=user_mood,
+            place_id=place.get("id") or place.get("place_id"),
+            weather=weather,
+            time_of_day=time_of_day,
         )
-        narratives.append(narrative)
-    
-    return narratives
+        for place in places
+    ]))
+
+
+def note_recommended_places(
+    places: list[dict],
+    role_type: str,
+    user_mood: Optional[str] = None,
+    weather: Optional[str] = None,
+    time_of_day: Optional[str] = None,
+) -> None:
+    """추천 응답에 노출된 장소를 사전 생성 후보로 집계"""
+    for place in places:
+        place_id = place.get("id") or place.get("place_id")
+        if not place_id:
+            continue
+        key, _ = make_narrative_key(place_id, role_type, user_mood, weather, time_of_day)
+        narrative_cache.note_recommended(key, {
+            "place_name": place.get("name", ""),
+            "category": place.get("category") or place.get("primary_category", ""),
+            "role_type": role_type,
+            "vibe_tags": place.get("vibe_tags") or [],
+            "is_hidden_gem": bool(place.get("is_hidden_gem", False)),
+            "user_mood": user_mood,
+            "place_id": place_id,
+            "weather": weather,
+            "time_of_day": time_of_day,
+        })
+
+
+async def prewarm_narratives(limit: Optional[int] = None) -> int:
+    """
+    가장 많이 추천된 (장소, 조건) 조합의 서사를 미리 생성해 캐시에 채움 (야간 배치).
+    후보는 모든 워커의 공유 집계(narrative_demand, 미배포면 이 프로세스 집계). 생성 시도한 조합 수 반환.
+    """
+    targets = await narrative_cache.top_demand(limit or settings.NARRATIVE_PREWARM_LIMIT)
+    if not targets or not llm_gateway.enabled:
+        return 0
+    # 게이트웨이 슬롯을 사용자 요청과 나눠 쓰도록 사전 생성 동시성은 따로 제한
+    gate = asyncio.Semaphore(max(1, settings.NARRATIVE_PREWARM_CONCURRENCY))
+
+    async def _one(kwargs: dict) -> None:
+        async with gate:
+            await generate_narrative(**kwargs)
+
+    await asyncio.gather(*[_one(kwargs) for kwargs in targets])
+    await narrative_cache.decay_demand()
+    return len(targets)
@@ -9,9 +9,8 @@
 import json
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from anthropic import Anthropic
 
-from core.config import settings
+from core.llm_gateway import llm_gateway
 
 
 class PersonalizationService:
@@ -19,9 +18,6 @@ class PersonalizationService:
     사용자 개인화 AI 서비스
     """
     
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    
     async def analyze_user_personality(
         self,
         user_id: str,
@@ -110,7 +106,8 @@ class PersonalizationService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "personalization.personality",
                 model="claude-sonnet-4-20250514",
                 max_tokens=500,
                 messages=[{"role": "user", "content": prompt}]
@@ -261,7 +258,8 @@ class PersonalizationService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "personalization.companion_style",
                 model="claude-sonnet-4-20250514",
                 max_tokens=400,
                 messages=[{"role": "user", "content": prompt}]
@@ -356,7 +354,8 @@ class PersonalizationService:
             user_prompt = f"상황: {context_type}\n데이터: {context_data}\n\n적절한 메시지를 작성하세요."
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "personalization.message",
                 model="claude-sonnet-4-20250514",
                 max_tokens=200,
                 system=system_prompt,
@@ -398,7 +397,7 @@ class PersonalizationService:
         """
         
         # 데이터 수집
-        visits = await db.get_user_visits(user_id, days=days)
+        visits = [v async for v in db.iter_user_visits(user_id, days=days)]
         locations = await db.get_location_history(user_id, days=days)
         
         if len(visits) < 5:
@@ -463,7 +462,8 @@ class PersonalizationService:
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "personalization.journey",
                 model="claude-sonnet-4-20250514",
                 max_tokens=800,
                 messages=[{"role": "user", "content": prompt}]
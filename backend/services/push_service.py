@@ -1,36 +1,382 @@
 # -*- coding: utf-8 -*-
 """
 Web Push 전송 (VAPID). VAPID 키가 설정된 경우에만 전송.
+- PushDispatcher: 구독 스트림을 제한된 워커 풀(PUSH_MAX_CONCURRENCY)로 동시 전송.
+  푸시 서비스(FCM/Mozilla 등)와의 커넥션은 전용 keep-alive 풀로 재사용, VAPID 서명은 origin 별로 캐시,
+  페이로드 암호화(ECDH+AES-GCM)는 작은 스레드 풀에서 해 이벤트 루프를 막지 않는다.
+- 404/410(만료 구독)은 모아서 push_subscriptions 에서 삭제, 429/5xx/네트워크 오류는 PUSH_MAX_RETRIES 번 재시도.
+- broadcast: 전체 구독을 id 순 페이지로 읽으며 발송 (사용자별 재조회 없음) → 처리량·실패 리포트 (/health/push).
 """
 
 import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
 
 from core.config import settings
+from core.http_client import SharedHttpClient
 
 logger = logging.getLogger(__name__)
 
+# 만료·해지된 구독 (삭제 대상)
+GONE_STATUSES = (404, 410)
+# 잠시 후 다시 보낼 만한 응답
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# 삭제 요청을 모아 보낼 endpoint 수
+GONE_FLUSH_SIZE = 100
+# VAPID JWT 유효 시간 (푸시 서비스 상한 24시간)
+VAPID_EXPIRY_SECONDS = 12 * 60 * 60
+# 커넥션 풀 하나당 연결 수. httpcore 풀은 요청 배정마다 연결 목록을 제곱으로 훑어서
+# 한 풀에 연결이 수십 개면 CPU 가 병목 → 작은 풀 여러 개로 나누고 워커를 고정 배정
+POOL_SHARD_CONNECTIONS = 8
+
+Subscriptions = Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]]
+RemoveGone = Callable[[List[str]], Awaitable[int]]
+
+# 푸시 서비스 전용 커넥션 풀(샤드) / 암호화 스레드 풀 (첫 사용 시 생성)
+_push_pools: List[SharedHttpClient] = []
+_crypto_pool: Optional[ThreadPoolExecutor] = None
+_last_broadcast: Optional[Dict[str, Any]] = None
+
 
-def _send_one_sync(subscription: Dict[str, Any], payload: str, vapid_private_key: str, vapid_claims: Dict) -> None:
-    """동기 Web Push 전송 (스레드에서 실행)."""
+def vapid_configured() -> bool:
+    return bool((getattr(settings, "VAPID_PRIVATE_KEY", "") or "").strip())
+
+
+def valid_endpoint(endpoint: str) -> bool:
+    """구독 endpoint 가 푸시 서비스로 보낼 수 있는 https URL 인지 (파싱 불가·http·호스트 없음은 거부)"""
     try:
-        from pywebpush import webpush
-        sub_info = {
-            "endpoint": subscription["endpoint"],
-            "keys": {
-                "p256dh": subscription["p256dh"],
-                "auth": subscription["auth"],
-            },
-        }
-        webpush(
-            subscription_info=sub_info,
-            data=payload,
-            vapid_private_key=vapid_private_key,
-            vapid_claims=vapid_claims,
+        url = httpx.URL(endpoint)
+    except Exception:
+        return False
+    return url.scheme == "https" and bool(url.host)
+
+
+def _get_push_pools() -> List[SharedHttpClient]:
+    if not _push_pools:
+        concurrency = max(1, settings.PUSH_MAX_CONCURRENCY)
+        size = min(concurrency, POOL_SHARD_CONNECTIONS)
+        for _ in range(-(-concurrency // size)):
+            _push_pools.append(SharedHttpClient(
+                max_connections=size,
+                max_keepalive_connections=size,
+                keepalive_expiry=60.0,
+                http2=settings.HTTP_POOL_HTTP2,
+                timeout=settings.PUSH_TIMEOUT_SECONDS,
+            ))
+    return _push_pools
+
+
+def _get_crypto_pool() -> ThreadPoolExecutor:
+    global _crypto_pool
+    if _crypto_pool is None:
+        _crypto_pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.PUSH_ENCRYPT_THREADS), thread_name_prefix="webpush-encrypt"
         )
-    except Exception as e:
-        logger.warning("Web push send failed for one subscription: %s", e)
+    return _crypto_pool
+
+
+def push_metrics() -> Dict[str, Any]:
+    pool = None
+    if _push_pools:
+        opened = [p.metrics()["open_connections"] for p in _push_pools]
+        pool = {
+            "shards": len(_push_pools),
+            "connections_per_shard": _push_pools[0].max_connections,
+            "http2": _push_pools[0].http2,
+            "open_connections": sum(n or 0 for n in opened),
+        }
+    return {"vapid_configured": vapid_configured(), "last_broadcast": _last_broadcast, "pool": pool}
+
+
+async def aclose_push() -> None:
+    global _crypto_pool
+    for pool in _push_pools:
+        await pool.aclose()
+    _push_pools.clear()
+    if _crypto_pool is not None:
+        _crypto_pool.shutdown(wait=False)
+        _crypto_pool = None
+
+
+class VapidSigner:
+    """push 서비스 origin(aud)별 VAPID Authorization 헤더 캐시 (만료 1시간 전 재서명)"""
+
+    def __init__(self, private_key: str, email: str):
+        from py_vapid import Vapid
+        self._vapid = Vapid.from_string(private_key=private_key)
+        self._sub = email or "mailto:admin@wherehere.app"
+        self._cache: Dict[str, tuple] = {}
+
+    def headers(self, endpoint: str) -> Dict[str, str]:
+        parts = urlsplit(endpoint)
+        aud = f"{parts.scheme}://{parts.netloc}"
+        now = int(time.time())
+        cached = self._cache.get(aud)
+        if cached is None or cached[0] - now < 3600:
+            exp = now + VAPID_EXPIRY_SECONDS
+            cached = (exp, self._vapid.sign({"sub": self._sub, "aud": aud, "exp": exp}))
+            self._cache[aud] = cached
+        return dict(cached[1])
+
+
+def _encrypt(subscription: Dict[str, Any], payload: bytes) -> bytes:
+    """수신 브라우저 키로 페이로드 암호화 (RFC 8291 aes128gcm). 스레드 풀에서 실행."""
+    from pywebpush import WebPusher
+    sub_info = {
+        "endpoint": subscription["endpoint"],
+        "keys": {"p256dh": subscription["p256dh"], "auth": subscription["auth"]},
+    }
+    return WebPusher(sub_info).encode(payload, "aes128gcm")["body"]
+
+
+class PushDispatcher:
+    """
+    사용:
+        report = await PushDispatcher().dispatch(subs, title, body, remove_gone=db.delete_push_subscriptions)
+    subs 는 list 또는 async iterator (페이지 단위 스트림). 동시에 concurrency 건까지만 전송 중.
+    """
+
+    def __init__(
+        self,
+        http: Optional[SharedHttpClient] = None,
+        concurrency: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        signer: Optional[VapidSigner] = None,
+    ):
+        self.pools = [http] if http is not None else _get_push_pools()
+        self.concurrency = max(1, concurrency or settings.PUSH_MAX_CONCURRENCY)
+        self.ttl_seconds = settings.PUSH_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_retries = settings.PUSH_MAX_RETRIES if max_retries is None else max_retries
+        self.signer = signer or VapidSigner(settings.VAPID_PRIVATE_KEY, settings.VAPID_EMAIL)
+
+    async def dispatch(
+        self,
+        subscriptions: Subscriptions,
+        title: str,
+        body: str = "",
+        remove_gone: Optional[RemoveGone] = None,
+    ) -> Dict[str, Any]:
+        payload = json.dumps({"title": title, "body": body or title}).encode()
+        report: Dict[str, Any] = {
+            "total": 0, "sent": 0, "gone": 0, "removed": 0, "failed": 0, "retried": 0,
+            "statuses": {}, "errors": [],
+        }
+        gone: List[str] = []
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 4)
+        started = time.perf_counter()
+
+        async def flush_gone() -> None:
+            if not gone or remove_gone is None:
+                gone.clear()
+                return
+            batch = list(gone)
+            gone.clear()
+            try:
+                report["removed"] += await remove_gone(batch)
+            except Exception as e:
+                logger.warning("Web push: removing %d expired subscriptions failed: %s", len(batch), e)
+
+        async def produce() -> None:
+            if hasattr(subscriptions, "__aiter__"):
+                async for sub in subscriptions:
+                    await queue.put(sub)
+            else:
+                for sub in subscriptions:
+                    await queue.put(sub)
+
+        async def work(client: httpx.AsyncClient) -> None:
+            while True:
+                sub = await queue.get()
+                if sub is None:
+                    return
+                report["total"] += 1
+                try:
+                    outcome, status = await self._send(client, sub, payload, report)
+                except Exception as e:
+                    # 구독 하나의 예기치 못한 오류로 워커가 죽으면 큐가 막혀 발송 전체가 멈춤
+                    self._note_error(report, str(sub.get("endpoint") or ""), f"{type(e).__name__}: {e}")
+                    outcome, status = "failed", "invalid"
+                key = str(status)
+                report["statuses"][key] = report["statuses"].get(key, 0) + 1
+                if outcome == "sent":
+                    report["sent"] += 1
+                elif outcome == "gone":
+                    report["gone"] += 1
+                    gone.append(sub["endpoint"])
+                    if len(gone) >= GONE_FLUSH_SIZE:
+                        await flush_gone()
+                else:
+                    report["failed"] += 1
+
+        workers = [
+            asyncio.ensure_future(work(self.pools[i % len(self.pools)].client)) for i in range(self.concurrency)
+        ]
+        producer = asyncio.ensure_future(produce())
+        try:
+            await asyncio.wait([producer, *workers], return_when=asyncio.FIRST_COMPLETED)
+            if producer.done():
+                # 구독을 다 넣었거나 읽기가 실패함 → 큐에 남은 것까지 보내고 워커 종료
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+                producer.result()
+            else:
+                # 워커가 먼저 끝남 (정상 경로에선 없음) → 오류 전파, 생산자는 아래에서 취소
+                for w in workers:
+                    if w.done():
+                        w.result()
+        finally:
+            for task in (producer, *workers):
+                if not task.done():
+                    task.cancel()
+        await flush_gone()
+
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["per_second"] = round(report["total"] / elapsed, 1) if elapsed > 0 else None
+        report["concurrency"] = self.concurrency
+        return report
+
+    async def _send(
+        self, client: httpx.AsyncClient, sub: Dict[str, Any], payload: bytes, report: Dict[str, Any]
+    ) -> tuple:
+        """(결과 sent|gone|failed, 상태 코드 또는 오류 종류)"""
+        endpoint = sub.get("endpoint") or ""
+        try:
+            content = await asyncio.get_running_loop().run_in_executor(_get_crypto_pool(), _encrypt, sub, payload)
+            headers = {
+                **self.signer.headers(endpoint),
+                "TTL": str(self.ttl_seconds),
+                "Content-Encoding": "aes128gcm",
+                "Content-Type": "application/octet-stream",
+            }
+        except Exception as e:
+            self._note_error(report, endpoint, f"invalid subscription: {e}")
+            return "failed", "invalid"
+
+        status: Any = "network"
+        for attempt in range(self.max_retries + 1):
+            delay = 0.5 * (attempt + 1)
+            try:
+                # 공용 request() 대신 client 직접: endpoint 가 구독마다 달라 경로별 통계가 무한히 늘어남
+                response = await client.post(endpoint, content=content, headers=headers)
+            except httpx.HTTPError as e:
+                status = "network"
+                if attempt >= self.max_retries:
+                    self._note_error(report, endpoint, f"{type(e).__name__}: {e}")
+                    return "failed", status
+            except Exception as e:
+                # 잘못 저장된 endpoint (httpx.InvalidURL 등) → 재시도해도 같음
+                self._note_error(report, endpoint, f"{type(e).__name__}: {e}")
+                return "failed", "invalid"
+            else:
+                status = response.status_code
+                if status in (200, 201, 202):
+                    return "sent", status
+                if status in GONE_STATUSES:
+                    return "gone", status
+                if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    self._note_error(report, endpoint, f"HTTP {status}")
+                    return "failed", status
+                retry_after = response.headers.get("retry-after", "")
+                if retry_after.isdigit():
+                    delay = min(float(retry_after), 5.0)
+            report["retried"] += 1
+            await asyncio.sleep(delay)
+        return "failed", status
+
+    @staticmethod
+    def _note_error(report: Dict[str, Any], endpoint: str, message: str) -> None:
+        # 리포트에는 앞 몇 건만 (endpoint 는 호스트만 남김)
+        if len(report["errors"]) < 5:
+            try:
+                host = urlsplit(endpoint).netloc
+            except ValueError:
+                host = "(invalid)"
+            report["errors"].append({"host": host, "error": message})
+
+
+def daily_message(place_name: str = "", place_address: str = "", message: str = "") -> Tuple[str, str]:
+    """일일 "오늘의 한 곳" 푸시 (제목, 본문)"""
+    place = place_name or "오늘의 추천 장소"
+    body = message or (f"📍 {place_address}" if place_address else "앱을 열어 오늘의 한 곳을 확인해보세요!")
+    return f"☀️ {place}", body
+
+
+def _merge_reports(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(total)
+    for key in ("total", "sent", "gone", "removed", "failed", "retried"):
+        merged[key] = merged.get(key, 0) + part.get(key, 0)
+    statuses = dict(merged.get("statuses") or {})
+    for code, n in (part.get("statuses") or {}).items():
+        statuses[code] = statuses.get(code, 0) + n
+    merged["statuses"] = statuses
+    merged["errors"] = ((merged.get("errors") or []) + (part.get("errors") or []))[:5]
+    merged["concurrency"] = part.get("concurrency")
+    return merged
+
+
+async def broadcast(
+    db: Any,
+    title: str,
+    body: str = "",
+    after: Optional[str] = None,
+    on_batch: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    전체 구독자에게 발송 (일일 푸시). 구독은 PUSH_PAGE_SIZE 행씩 읽으며 바로 워커 풀로 흘려보낸다.
+    db: RestDatabaseHelpers (iter_push_subscriptions / delete_push_subscriptions)
+    on_batch 가 있으면 페이지 단위로 발송을 끝낼 때마다 (마지막 구독 id, 누적 리포트) 로 호출 → 작업 checkpoint.
+    after / previous: checkpoint 에서 이어서 보낼 때 시작 id 와 그때까지의 누적 리포트.
+    """
+    global _last_broadcast
+    if not vapid_configured():
+        return {"skipped": "vapid_not_configured", "total": 0, "sent": 0, "failed": 0}
+    page_size = max(1, settings.PUSH_PAGE_SIZE)
+    subs = db.iter_push_subscriptions(page_size=page_size, after=after)
+    dispatcher = PushDispatcher()
+    started = time.perf_counter()
+    report: Dict[str, Any] = dict(previous or {})
+    if on_batch is None:
+        report = _merge_reports(report, await dispatcher.dispatch(
+            subs, title, body, remove_gone=db.delete_push_subscriptions
+        ))
+    else:
+        batch: List[Dict[str, Any]] = []
+
+        async def flush() -> None:
+            nonlocal report
+            report = _merge_reports(report, await dispatcher.dispatch(
+                batch, title, body, remove_gone=db.delete_push_subscriptions
+            ))
+            await on_batch(str(batch[-1]["id"]), report)
+            batch.clear()
+
+        async for sub in subs:
+            batch.append(sub)
+            if len(batch) >= page_size:
+                await flush()
+        if batch:
+            await flush()
+    elapsed = time.perf_counter() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["per_second"] = round(report.get("total", 0) / elapsed, 1) if elapsed > 0 else None
+    report["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    _last_broadcast = report
+    logger.info(
+        "Web push broadcast: total=%d sent=%d gone=%d(removed %d) failed=%d in %.1fs (%.0f/s)",
+        report.get("total", 0), report.get("sent", 0), report.get("gone", 0), report.get("removed", 0),
+        report.get("failed", 0), report["elapsed_seconds"], report["per_second"] or 0,
+    )
+    return report
 
 
 async def send_push_for_user(
@@ -40,27 +386,18 @@ async def send_push_for_user(
     body: str = "",
 ) -> None:
     """
-    해당 사용자의 모든 푸시 구독에 Web Push 전송.
+    해당 사용자의 모든 푸시 구독에 Web Push 전송 (공용 푸시 풀 사용, 만료 구독은 삭제).
     db: RestDatabaseHelpers (get_push_subscriptions 있음)
     VAPID_PRIVATE_KEY가 없으면 스킵.
     """
-    if not getattr(settings, "VAPID_PRIVATE_KEY", None) or not settings.VAPID_PRIVATE_KEY.strip():
+    if not vapid_configured():
         return
     try:
         subs = await db.get_push_subscriptions(user_id)
         if not subs:
             return
-        vapid_claims = {"sub": getattr(settings, "VAPID_EMAIL", "mailto:admin@wherehere.app") or "mailto:admin@wherehere.app"}
-        payload = __import__("json").dumps({"title": title, "body": body or title})
-        loop = asyncio.get_event_loop()
-        for sub in subs:
-            await loop.run_in_executor(
-                None,
-                _send_one_sync,
-                sub,
-                payload,
-                settings.VAPID_PRIVATE_KEY,
-                vapid_claims,
-            )
+        await PushDispatcher().dispatch(
+            subs, title, body, remove_gone=getattr(db, "delete_push_subscriptions", None)
+        )
     except Exception as e:
         logger.warning("Web push send_for_user failed: %s", e)
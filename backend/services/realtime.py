@@ -0,0 +1,414 @@
+"""
+실시간 서버 푸시 (WebSocket / SSE 게이트웨이의 브로커·허브).
+- 채널: user:<user_id> (알림), conversation:<id> (채팅 메시지), place:<place_id> (체크인 presence).
+  연결 하나가 여러 채널을 구독 (routes/realtime.py).
+- 이벤트: {"cursor", "channel", "type", "data", "ts"}. cursor 는 브로커 전체 순서 → 재접속 시 cursor 를 주면
+  그 이후 놓친 이벤트부터 재전송. 버퍼(REALTIME_BUFFER_SIZE)에서 밀려난 구간이면 resync → 클라이언트가 REST 로 재조회.
+- 브로커 교체 가능: memory (프로세스 내, 기본) | redis (Redis Stream 하나를 모든 워커가 XREAD → 다중 워커,
+  redis 패키지 필요, 없으면 memory). RecommendationCache 의 백엔드 선택과 같은 방식.
+- publish 는 요청 경로를 막지 않음: memory 는 즉시 전달, redis 는 백그라운드 XADD (실패 시 이 워커 연결에만 전달).
+- 느린 연결은 큐(REALTIME_QUEUE_SIZE)가 넘치면 overflow → 연결 종료, 클라이언트는 cursor 로 재접속.
+- 지표: GET /health/realtime
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+Event = Dict[str, Any]
+
+CHANNEL_KINDS = ("user", "conversation", "place")
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def conversation_channel(conversation_id: str) -> str:
+    return f"conversation:{conversation_id}"
+
+
+def place_channel(place_id: str) -> str:
+    return f"place:{place_id}"
+
+
+def cursor_key(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+    """"<ms>-<seq>" cursor 비교 키. 형식이 아니면 None"""
+    if not cursor:
+        return None
+    head, _, tail = str(cursor).partition("-")
+    try:
+        return int(head), int(tail or 0)
+    except ValueError:
+        return None
+
+
+class SubscriptionOverflow(Exception):
+    """연결이 이벤트를 제때 못 받아 큐가 넘침 → cursor 로 재접속 필요"""
+
+
+class Subscription:
+    """연결 하나: 구독 채널 + 전달 대기열"""
+
+    def __init__(self, channels: Iterable[str], queue_size: int):
+        self.channels: Set[str] = set(channels)
+        self.queue_size = max(1, queue_size)
+        self._pending: Deque[Event] = deque()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        # 재전송(backlog)으로 이미 보낸 마지막 cursor: 같은 이벤트가 실시간으로 다시 와도 건너뜀
+        self.replayed_until: Optional[Tuple[int, int]] = None
+        self.delivered = 0
+
+    def offer(self, event: Event) -> None:
+        if self.overflowed:
+            return
+        if self.replayed_until is not None:
+            key = cursor_key(event.get("cursor"))
+            if key is not None and key <= self.replayed_until:
+                return
+        if len(self._pending) >= self.queue_size:
+            self.overflowed = True
+            self._pending.clear()
+        else:
+            self._pending.append(event)
+        self._ready.set()
+
+    def wake(self) -> None:
+        """대기 중인 next() 를 바로 깨움 (연결 종료 시)"""
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """다음 이벤트. timeout 동안 없거나 wake() 로 깨면 None (keep-alive·종료 확인)"""
+        if not self._pending and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.overflowed:
+            raise SubscriptionOverflow()
+        if not self._pending:
+            return None
+        self.delivered += 1
+        return self._pending.popleft()
+
+
+# ---------- 브로커 ----------
+
+class RealtimeBroker(ABC):
+    """이벤트 순서(cursor) 부여·재전송 버퍼·워커 간 전달 인터페이스"""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.hub: Optional["RealtimeHub"] = None
+
+    @abstractmethod
+    def publish(self, event: Event) -> None:
+        ...
+
+    @abstractmethod
+    async def replay(self, channels: Set[str], cursor: str) -> Tuple[List[Event], bool]:
+        """(cursor 이후 이벤트, resync 필요 여부)"""
+
+    def latest_cursor(self) -> Optional[str]:
+        return None
+
+    async def start(self) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def aclose(self) -> None:
+        return None
+
+
+class MemoryBroker(RealtimeBroker):
+    """프로세스 내 브로커. cursor = "<기동 시각 ms>-<순번>" → 재시작·다른 워커의 cursor 는 resync"""
+
+    name = "memory"
+
+    def __init__(self, buffer_size: int = 5000):
+        super().__init__()
+        self.epoch = int(time.time() * 1000)
+        self._seq = 0
+        self._buffer: Deque[Event] = deque(maxlen=max(1, buffer_size))
+
+    def publish(self, event: Event) -> None:
+        self._seq += 1
+        event["cursor"] = f"{self.epoch}-{self._seq}"
+        self._buffer.append(event)
+        if self.hub is not None:
+            self.hub.deliver(event)
+
+    async def replay(self, channels: Set[str], cursor: str) -> Tuple[List[Event], bool]:
+        key = cursor_key(cursor)
+        if key is None or key[0] != self.epoch or key[1] > self._seq:
+            return [], True
+        oldest = cursor_key(self._buffer[0]["cursor"])[1] if self._buffer else self._seq + 1
+        resync = key[1] + 1 < oldest
+        return [e for e in self._buffer if cursor_key(e["cursor"]) > key and e["channel"] in channels], resync
+
+    def latest_cursor(self) -> Optional[str]:
+        return f"{self.epoch}-{self._seq}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {"buffered": len(self._buffer), "buffer_size": self._buffer.maxlen, "published": self._seq}
+
+
+class RedisBroker(RealtimeBroker):
+    """
+    Redis Stream 하나(MAXLEN ≈ 버퍼)에 XADD, 모든 워커가 XREAD 로 받아 자기 연결에 전달.
+    stream id("<ms>-<seq>")가 곧 cursor → 어느 워커로 재접속해도 XRANGE 로 이어받음.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "", stream: str = "wh:rt:events", buffer_size: int = 5000,
+                 block_ms: int = 5000, client: Any = None):
+        super().__init__()
+        if client is None:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(url)
+        # client 주입: 테스트에서는 fakeredis 등 로컬 대체 서버 사용
+        self.client = client
+        self.stream = stream
+        self.buffer_size = max(1, buffer_size)
+        self.block_ms = block_ms
+        self._last_id: Optional[str] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._writes: Set[asyncio.Task] = set()
+        self.counters = {"published": 0, "received": 0, "errors": 0, "local_fallbacks": 0}
+
+    def publish(self, event: Event) -> None:
+        task = asyncio.ensure_future(self._xadd(event))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _xadd(self, event: Event) -> None:
+        try:
+            await self.client.xadd(
+                self.stream, {"e": json.dumps(event, ensure_ascii=False, default=str)},
+                maxlen=self.buffer_size, approximate=True,
+            )
+            self.counters["published"] += 1
+        except Exception as e:
+            # Redis 장애: 이 워커에 붙은 연결에만 전달 (cursor 없음 → 재전송 대상 아님)
+            self.counters["errors"] += 1
+            self.counters["local_fallbacks"] += 1
+            logger.warning("[Realtime] redis publish failed, delivering locally: %s", e)
+            if self.hub is not None:
+                self.hub.deliver({**event, "cursor": None})
+
+    @staticmethod
+    def _decode(entry_id: Any, fields: Dict[Any, Any]) -> Event:
+        raw = fields.get(b"e", fields.get("e"))
+        event = json.loads(raw)
+        event["cursor"] = entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)
+        return event
+
+    async def start(self) -> None:
+        if self._reader is not None and not self._reader.done():
+            return
+        if self._last_id is None:
+            # 마지막 id 부터 읽어야 기동~첫 XREAD 사이 이벤트도 전달되고 hello 에 cursor 를 줄 수 있음
+            try:
+                last = await self.client.xrevrange(self.stream, count=1)
+                if last:
+                    self._last_id = self._decode(*last[0])["cursor"]
+            except Exception as e:
+                self.counters["errors"] += 1
+                logger.warning("[Realtime] redis stream lookup failed: %s", e)
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        last_id = self._last_id or "$"
+        while True:
+            try:
+                batches = await self.client.xread({self.stream: last_id}, block=self.block_ms, count=500)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["errors"] += 1
+                logger.warning("[Realtime] redis read failed: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            for _stream, entries in batches or []:
+                for entry_id, fields in entries:
+                    try:
+                        event = self._decode(entry_id, fields)
+                    except (TypeError, ValueError):
+                        continue
+                    last_id = self._last_id = event["cursor"]
+                    self.counters["received"] += 1
+                    if self.hub is not None:
+                        self.hub.deliver(event)
+
+    async def replay(self, channels: Set[str], cursor: str) -> Tuple[List[Event], bool]:
+        key = cursor_key(cursor)
+        if key is None:
+            return [], True
+        try:
+            oldest = await self.client.xrange(self.stream, min="-", max="+", count=1)
+            entries = await self.client.xrange(self.stream, min=f"({key[0]}-{key[1]}", max="+", count=self.buffer_size)
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning("[Realtime] redis replay failed: %s", e)
+            return [], True
+        # 스트림이 cursor 이후에서 시작 → 그 사이 이벤트는 MAXLEN 으로 잘려 나갔을 수 있음
+        resync = bool(oldest) and cursor_key(self._decode(*oldest[0])["cursor"]) > key
+        events = [e for e in (self._decode(i, f) for i, f in entries) if e["channel"] in channels]
+        return events, resync
+
+    def latest_cursor(self) -> Optional[str]:
+        return self._last_id
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "stream": self.stream, "reader_running": bool(self._reader and not self._reader.done())}
+
+    async def aclose(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        try:
+            await self.client.aclose()
+        except AttributeError:
+            await self.client.close()
+
+
+# ---------- 허브 ----------
+
+class RealtimeHub:
+    """채널 → 연결 fan-out + publish 진입점"""
+
+    def __init__(self, broker: RealtimeBroker, queue_size: int = 200):
+        self.broker = broker
+        broker.hub = self
+        self.queue_size = queue_size
+        self._by_channel: Dict[str, Set[Subscription]] = {}
+        self._subs: Set[Subscription] = set()
+        # 구독과 무관하게 모든 이벤트를 받는 프로세스 내 소비자 (예: presence 인덱스)
+        self._listeners: List[Callable[[Event], None]] = []
+        self.counters = {"published": 0, "fanout": 0, "overflows": 0, "resyncs": 0, "replayed": 0, "connections_total": 0}
+
+    def publish(self, channel: str, type_: str, data: Dict[str, Any]) -> None:
+        """이벤트 발행 (동기, 요청을 기다리게 하지 않음). 실패해도 호출자 흐름에 영향 없음."""
+        event = {
+            "channel": channel,
+            "type": type_,
+            "data": data,
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+        self.counters["published"] += 1
+        try:
+            self.broker.publish(event)
+        except Exception as e:
+            logger.warning("[Realtime] publish failed on %s: %s", channel, e)
+
+    async def start(self) -> None:
+        await self.broker.start()
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """모든 워커에서 모든 이벤트를 받을 콜백 등록 (redis 브로커면 다른 워커 발행분도 옴)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def deliver(self, event: Event) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning("[Realtime] listener failed on %s: %s", event.get("channel"), e)
+        for sub in list(self._by_channel.get(event.get("channel"), ())):
+            was_overflowed = sub.overflowed
+            sub.offer(event)
+            self.counters["fanout"] += 1
+            if sub.overflowed and not was_overflowed:
+                self.counters["overflows"] += 1
+
+    async def subscribe(self, channels: Iterable[str], cursor: Optional[str] = None) -> Tuple[Subscription, List[Event], bool]:
+        """
+        연결 등록 → (구독, cursor 이후 놓친 이벤트, resync 여부).
+        등록을 먼저 하고 재전송을 조회하므로 그 사이 이벤트도 빠지지 않음 (중복은 cursor 로 걸러냄).
+        """
+        await self.broker.start()
+        sub = Subscription(channels, self.queue_size)
+        self._subs.add(sub)
+        self.counters["connections_total"] += 1
+        for channel in sub.channels:
+            self._by_channel.setdefault(channel, set()).add(sub)
+        backlog, resync = await self.replay(sub, sub.channels, cursor)
+        return sub, backlog, resync
+
+    async def replay(self, sub: Subscription, channels: Set[str], cursor: Optional[str]) -> Tuple[List[Event], bool]:
+        if not cursor or not channels:
+            return [], False
+        backlog, resync = await self.broker.replay(set(channels), cursor)
+        if backlog:
+            last = cursor_key(backlog[-1]["cursor"])
+            sub.replayed_until = max(sub.replayed_until or last, last)
+        self.counters["replayed"] += len(backlog)
+        self.counters["resyncs"] += int(resync)
+        return backlog, resync
+
+    def add_channels(self, sub: Subscription, channels: Iterable[str]) -> None:
+        for channel in channels:
+            sub.channels.add(channel)
+            self._by_channel.setdefault(channel, set()).add(sub)
+
+    def remove_channels(self, sub: Subscription, channels: Iterable[str]) -> None:
+        for channel in channels:
+            sub.channels.discard(channel)
+            subs = self._by_channel.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_channel[channel]
+
+    def close(self, sub: Subscription) -> None:
+        self.remove_channels(sub, list(sub.channels))
+        self._subs.discard(sub)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.broker.name,
+            **self.counters,
+            "connections": len(self._subs),
+            "channels": len(self._by_channel),
+            "latest_cursor": self.broker.latest_cursor(),
+            **self.broker.stats(),
+        }
+
+    async def aclose(self) -> None:
+        await self.broker.aclose()
+
+
+def build_realtime_broker() -> RealtimeBroker:
+    """설정(REALTIME_BACKEND)에 맞는 브로커 생성"""
+    if settings.REALTIME_BACKEND == "redis":
+        try:
+            return RedisBroker(settings.REALTIME_REDIS_URL, buffer_size=settings.REALTIME_BUFFER_SIZE)
+        except ImportError:
+            logger.warning("[Realtime] redis not installed — using in-process broker. Run: pip install redis")
+    return MemoryBroker(buffer_size=settings.REALTIME_BUFFER_SIZE)
+
+
+realtime_hub = RealtimeHub(build_realtime_broker(), queue_size=settings.REALTIME_QUEUE_SIZE)
+
+
+def publish_event(channel: str, type_: str, data: Dict[str, Any]) -> None:
+    realtime_hub.publish(channel, type_, data)
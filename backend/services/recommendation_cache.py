@@ -1,18 +1,30 @@
 """
-추천 API 응답 인메모리 TTL 캐시 (프로세스 단위).
+추천 API 응답 캐시.
 - 같은 위치·역할·기분·유저로 짧은 시간 내 재요청 시 Kakao/DB 부하 감소.
 - TTL 안에는 랜덤 스코어 결과도 동일하게 재사용됨 (의도적 트레이드오프).
+- 백엔드 교체 가능: 기본은 프로세스 내 O(1) LRU+TTL, RECOMMENDATION_CACHE_BACKEND=redis 면
+  Redis 프로토콜 서버를 워커 간 공유 (redis 패키지 필요, 없으면 인메모리로 동작).
+- single-flight: 같은 키 동시 미스는 한 번만 계산. Redis 백엔드는 SET NX 잠금으로 워커 간에도 적용
+  (잠금 값은 획득자별 토큰, 해제는 토큰이 같을 때만 삭제 → 만료 후 다른 워커가 잡은 잠금을 지우지 않음).
 """
 
 from __future__ import annotations
 
 import asyncio
 import hashlib
+import json
+import logging
 import time
-from typing import Any, Dict, Optional
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
-_lock = asyncio.Lock()
-_store: Dict[str, tuple[float, Dict[str, Any]]] = {}
+from core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+Payload = Dict[str, Any]
 
 
 def make_recommendation_cache_key(
@@ -38,27 +50,253 @@ def make_recommendation_cache_key(
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
-async def get_cached(key: str, ttl_seconds: int) -> Optional[Dict[str, Any]]:
-    if ttl_seconds <= 0:
+# ---------- 백엔드 ----------
+
+class CacheBackend(ABC):
+    """캐시 저장소 인터페이스"""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Payload]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Payload, ttl_seconds: int) -> None:
+        ...
+
+    async def try_lock(self, key: str, ttl_seconds: float) -> Optional[str]:
+        """
+        계산 잠금 획득 → 해제용 토큰 (다른 곳이 잡고 있으면 None).
+        프로세스 내 백엔드는 single-flight 로 충분하므로 항상 획득.
+        """
+        return "local"
+
+    async def unlock(self, key: str, token: str) -> None:
+        """token 으로 잡은 잠금만 해제"""
+        return None
+
+    async def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def aclose(self) -> None:
         return None
-    now = time.monotonic()
-    async with _lock:
-        item = _store.get(key)
-        if not item:
+
+
+class MemoryTTLCache(CacheBackend):
+    """OrderedDict 기반 LRU + 항목별 만료. get/set 모두 O(1), 락 불필요 (await 없음)."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max(1, max_entries)
+        self._store: "OrderedDict[str, Tuple[float, Payload]]" = OrderedDict()
+        self.evictions = 0
+        self.expired = 0
+
+    async def get(self, key: str) -> Optional[Payload]:
+        item = self._store.get(key)
+        if item is None:
             return None
         exp, payload = item
-        if now >= exp:
-            del _store[key]
+        if time.monotonic() >= exp:
+            del self._store[key]
+            self.expired += 1
             return None
+        self._store.move_to_end(key)
         return payload
 
+    async def set(self, key: str, value: Payload, ttl_seconds: int) -> None:
+        self._store[key] = (time.monotonic() + ttl_seconds, value)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._store),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+class RedisCache(CacheBackend):
+    """Redis 프로토콜 백엔드 (JSON 직렬화, PX 만료). 서버 오류는 미스로 처리."""
+
+    name = "redis"
+    LOCK_PREFIX = "lock:"
+    # 값이 내 토큰일 때만 삭제 (GET + DEL 을 서버에서 원자적으로)
+    UNLOCK_SCRIPT = (
+        'if redis.call("get", KEYS[1]) == ARGV[1] then return redis.call("del", KEYS[1]) else return 0 end'
+    )
+
+    def __init__(self, url: str = "", prefix: str = "wh:rec:", client: Any = None):
+        if client is None:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(url)
+        # client 주입: 테스트에서는 fakeredis 등 로컬 대체 서버 사용
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Payload]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.debug("[RecCache] redis get failed: %s", e)
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: Payload, ttl_seconds: int) -> None:
+        try:
+            await self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=int(ttl_seconds * 1000))
+        except Exception as e:
+            self.errors += 1
+            logger.debug("[RecCache] redis set failed: %s", e)
+
+    async def try_lock(self, key: str, ttl_seconds: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.set(
+                self.prefix + self.LOCK_PREFIX + key, token, nx=True, px=int(ttl_seconds * 1000)
+            )
+        except Exception:
+            # 서버 오류: 잠금 없이 계산 (해제 시 내 토큰이 아니므로 아무것도 지우지 않음)
+            self.errors += 1
+            return token
+        return token if acquired else None
+
+    async def unlock(self, key: str, token: str) -> None:
+        try:
+            await self.client.eval(self.UNLOCK_SCRIPT, 1, self.prefix + self.LOCK_PREFIX + key, token)
+        except Exception as e:
+            # 해제 실패 시 잠금은 PX 만료로 풀림
+            self.errors += 1
+            logger.debug("[RecCache] redis unlock failed: %s", e)
+
+    async def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"errors": self.errors}
+        try:
+            info = await self.client.info("stats")
+            out["evictions"] = info.get("evicted_keys")
+            out["expired"] = info.get("expired_keys")
+        except Exception:
+            out["evictions"] = None
+        return out
+
+    async def aclose(self) -> None:
+        try:
+            await self.client.aclose()
+        except AttributeError:
+            await self.client.close()
+
+
+# ---------- single-flight 캐시 ----------
+
+class RecommendationCache:
+    """백엔드 + 프로세스 내/워커 간 single-flight + 히트/미스 카운터"""
+
+    def __init__(self, backend: CacheBackend, lock_wait: float = 5.0, poll_interval: float = 0.05):
+        self.backend = backend
+        self.lock_wait = lock_wait
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "computations": 0, "compute_errors": 0}
+
+    async def get(self, key: str) -> Optional[Payload]:
+        value = await self.backend.get(key)
+        self._counters["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(self, key: str, value: Payload, ttl_seconds: int) -> None:
+        await self.backend.set(key, value, ttl_seconds)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl_seconds: int,
+        compute: Callable[[], Awaitable[Payload]],
+    ) -> Payload:
+        """캐시 조회 → 미스면 compute() 한 번만 실행해 저장. 동시 미스는 그 결과를 공유."""
+        value = await self.get(key)
+        if value is not None:
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._counters["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # 계산하던 요청이 취소됨 → 이 요청이 이어서 계산
+                return await self.get_or_compute(key, ttl_seconds, compute)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        token: Optional[str] = None
+        try:
+            token = await self.backend.try_lock(key, self.lock_wait)
+            if token is None:
+                # 다른 워커가 계산 중 → 결과가 올라올 때까지 대기, 시간 초과면 직접 계산
+                value = await self._wait_remote(key)
+                if value is not None:
+                    self._counters["coalesced"] += 1
+                    future.set_result(value)
+                    return value
+            self._counters["computations"] += 1
+            value = await compute()
+            await self.backend.set(key, value, ttl_seconds)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._counters["compute_errors"] += 1
+            future.set_exception(e)
+            # 대기자가 없으면 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if token is not None:
+                await self.backend.unlock(key, token)
+
+    async def _wait_remote(self, key: str) -> Optional[Payload]:
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            value = await self.backend.get(key)
+            if value is not None:
+                return value
+        return None
+
+    async def metrics(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "backend": self.backend.name,
+            **self._counters,
+            "in_flight": len(self._inflight),
+            "hit_ratio": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+            **(await self.backend.stats()),
+        }
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+def build_cache_backend(prefix: str = "wh:rec:", max_entries: Optional[int] = None) -> CacheBackend:
+    """설정(RECOMMENDATION_CACHE_BACKEND)에 맞는 백엔드 생성. prefix 로 Redis 키 공간 구분."""
+    if settings.RECOMMENDATION_CACHE_BACKEND == "redis":
+        try:
+            return RedisCache(settings.RECOMMENDATION_CACHE_REDIS_URL, prefix=prefix)
+        except ImportError:
+            logger.warning("[RecCache] redis not installed — using in-process cache. Run: pip install redis")
+    return MemoryTTLCache(max_entries=max_entries or settings.RECOMMENDATION_CACHE_MAX_ENTRIES)
+
 
-async def set_cached(key: str, ttl_seconds: int, model_dump: Dict[str, Any]) -> None:
-    if ttl_seconds <= 0:
-        return
-    async with _lock:
-        _store[key] = (time.monotonic() + ttl_seconds, model_dump)
-        if len(_store) > 300:
-            # 만료 임박·오래된 항목부터 삭제
-            for k, (exp, _) in sorted(_store.items(), key=lambda x: x[1][0])[:150]:
-                _store.pop(k, None)
+recommendation_cache = RecommendationCache(build_cache_backend())
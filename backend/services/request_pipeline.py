@@ -0,0 +1,169 @@
+"""
+요청 단위 비동기 단계 파이프라인.
+- 단계(stage)마다 선행 단계(after)를 선언하면 선행 결과가 준비되는 대로 동시에 실행.
+- 단계별 타임아웃. 시간 초과·오류는 default 값으로 대체해 다음 단계가 계속 진행 (graceful degradation).
+  fatal 로 지정한 예외만 호출부로 전파 (예: 날씨 API 키 없음 → 503).
+- 단계별 소요 시간·결과(ok/timeout/error)를 요청 로그로 남기고 파이프라인·단계별 히스토그램에 누적
+  (/health/pipelines) → 어느 업스트림이 p99 를 좌우하는지 확인.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Type
+
+logger = logging.getLogger("uvicorn.error")
+
+# 단계 지연 히스토그램 버킷 상한 (ms). 마지막 버킷은 +Inf.
+STAGE_BUCKETS_MS: Tuple[float, ...] = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _StageStats:
+    __slots__ = ("buckets", "count", "total_ms", "max_ms", "outcomes")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(STAGE_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.outcomes: Dict[str, int] = {}
+
+    def observe(self, outcome: str, elapsed_ms: float) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, upper in enumerate(STAGE_BUCKETS_MS):
+            if elapsed_ms <= upper:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile_ms(self, q: float) -> Optional[float]:
+        """버킷 상한 기준 근사 분위수 (+Inf 버킷이면 관측 최댓값)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return STAGE_BUCKETS_MS[i] if i < len(STAGE_BUCKETS_MS) else round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{int(b)}ms" for b in STAGE_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.quantile_ms(0.5),
+            "p99_ms": self.quantile_ms(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "outcomes": dict(self.outcomes),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+# 파이프라인 이름 → 단계 이름 → 누적 통계
+_stats: Dict[str, Dict[str, _StageStats]] = {}
+
+
+def pipeline_metrics() -> Dict[str, Any]:
+    return {
+        name: {stage: s.as_dict() for stage, s in stages.items()}
+        for name, stages in _stats.items()
+    }
+
+
+class StagePipeline:
+    """
+    사용:
+        p = StagePipeline("recommendations")
+        p.stage("weather", fetch_weather, timeout=2.0, default=None)
+        p.stage("candidates", fetch_kakao, timeout=3.0, default=[])
+        p.stage("places", build_places, after=("candidates",), default=[])
+        places = await p.result("places")
+        p.finish()
+    선행 단계 결과는 선언 순서대로 위치 인자로 전달된다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._finished = False
+
+    def stage(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        *,
+        after: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        default: Any = None,
+        fatal: Tuple[Type[BaseException], ...] = (),
+    ) -> asyncio.Task:
+        deps = tuple(after)
+        missing = [d for d in deps if d not in self._tasks]
+        if missing:
+            raise ValueError(f"stage {name!r} depends on undeclared stage(s): {missing}")
+        task = asyncio.ensure_future(self._run(name, fn, deps, timeout, default, fatal))
+        self._tasks[name] = task
+        return task
+
+    async def _run(self, name, fn, deps, timeout, default, fatal) -> Any:
+        inputs = [await self._tasks[d] for d in deps]
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            if timeout is not None and timeout > 0:
+                return await asyncio.wait_for(fn(*inputs), timeout=timeout)
+            return await fn(*inputs)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.warning("[Pipeline] %s.%s timed out after %.1fs — using fallback", self.name, name, timeout)
+            return default
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except fatal:
+            outcome = "error"
+            raise
+        except Exception as e:
+            outcome = "error"
+            logger.warning("[Pipeline] %s.%s failed: %s — using fallback", self.name, name, e)
+            return default
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.timings[name] = {"ms": round(elapsed_ms, 1), "outcome": outcome}
+            _stats.setdefault(self.name, {}).setdefault(name, _StageStats()).observe(outcome, elapsed_ms)
+
+    async def result(self, name: str) -> Any:
+        return await self._tasks[name]
+
+    def cancel(self) -> None:
+        """남은 단계 취소 (캐시 적중 등으로 결과가 필요 없어졌을 때)"""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # 아무도 기다리지 않은 단계의 예외가 "never retrieved" 로 남지 않도록
+                task.exception()
+
+    def finish(self) -> Dict[str, Any]:
+        """미완료 단계 취소 후 요청 단위 타이밍 로그. 여러 번 호출해도 한 번만 기록."""
+        self.cancel()
+        total_ms = (time.perf_counter() - self.started) * 1000
+        if not self._finished:
+            self._finished = True
+            _stats.setdefault(self.name, {}).setdefault("total", _StageStats()).observe("ok", total_ms)
+            logger.info(
+                "[Pipeline] %s total=%.0fms %s",
+                self.name,
+                total_ms,
+                " ".join(f"{k}={v['ms']:.0f}ms({v['outcome']})" for k, v in self.timings.items()),
+            )
+        return {"total_ms": round(total_ms, 1), "stages": dict(self.timings)}
@@ -6,12 +6,14 @@ AI 소셜 매칭 시스템
 - 안전한 매칭 (AI 성향 분석)
 """
 
+import asyncio
 import json
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from anthropic import Anthropic
 
 from core.config import settings
+from core.llm_gateway import llm_gateway
+from db.active_user_index import active_user_index
 
 
 class SocialMatchingService:
@@ -21,7 +23,6 @@ class SocialMatchingService:
     
     def __init__(self, db):
         self.db = db
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
     
     async def find_matches(
         self,
@@ -48,9 +49,11 @@ class SocialMatchingService:
         user = await self.db.get_user_profile(user_id)
         place = await self.db.get_place(place_id)
         
-        # 후보 찾기 (근처 + 비슷한 시간대 활동)
+        # 후보 찾기 (근처 + 비슷한 시간대 활동). 최근 위치 핑이 있으면 그 위치 기준
+        live = active_user_index.where(user_id)
+        user_location = {"latitude": live[0], "longitude": live[1]} if live else user.get("current_location", place)
         candidates = await self._find_candidates(
-            user_location=user.get("current_location", place),
+            user_location=user_location,
             max_distance_km=max_distance_km,
             scheduled_time=scheduled_time,
             exclude_user_ids=[user_id]
@@ -90,15 +93,19 @@ class SocialMatchingService:
     ) -> List[Dict]:
         """
         매칭 후보 찾기
+        활동 사용자 인덱스가 준비됐으면 반경 조회는 메모리에서, 후보 프로필·성향만 일괄 조회 (요청 2회)
         """
         
         # 근처 활동 중인 사용자
-        candidates = await self.db.find_nearby_active_users(
-            latitude=user_location["latitude"],
-            longitude=user_location["longitude"],
-            radius_km=max_distance_km,
-            exclude_user_ids=exclude_user_ids
-        )
+        if settings.ACTIVE_USERS_ENABLED and active_user_index.ready:
+            candidates = await self._nearby_from_index(user_location, max_distance_km, exclude_user_ids)
+        else:
+            candidates = await self.db.find_nearby_active_users(
+                latitude=user_location["latitude"],
+                longitude=user_location["longitude"],
+                radius_km=max_distance_km,
+                exclude_user_ids=exclude_user_ids
+            )
         
         # 시간대 필터 (±2시간)
         time_window_start = scheduled_time - timedelta(hours=2)
@@ -115,6 +122,36 @@ class SocialMatchingService:
         
         return filtered
     
+    async def _nearby_from_index(
+        self,
+        user_location: Dict,
+        max_distance_km: float,
+        exclude_user_ids: List[str]
+    ) -> List[Dict]:
+        """인덱스 반경 조회 + 표시용 프로필·성향 일괄 조회 → find_nearby_active_users 와 같은 모양의 후보"""
+        nearby = active_user_index.nearby(
+            float(user_location["latitude"]),
+            float(user_location["longitude"]),
+            max_distance_km * 1000,
+            exclude=exclude_user_ids,
+            limit=settings.ACTIVE_USERS_MAX_CANDIDATES,
+        )
+        if not nearby:
+            return []
+        ids = [n["user_id"] for n in nearby]
+        profiles, personalities = await asyncio.gather(
+            self.db.get_user_display_profiles(ids),
+            self.db.get_user_personalities(ids),
+        )
+        return [
+            {
+                **profiles.get(n["user_id"], {}),
+                "personality": personalities.get(n["user_id"], {}),
+                **n,
+            }
+            for n in nearby
+        ]
+    
     async def _calculate_match_score(
         self,
         user1: Dict,
@@ -185,7 +222,8 @@ compatibility: "excellent" (90%+), "good" (70-89%), "fair" (50-69%), "poor" (<50
 """
         
         try:
-            response = self.client.messages.create(
+            response = await llm_gateway.create(
+                "social_matching.match_score",
                 model="claude-sonnet-4-20250514",
                 max_tokens=400,
                 messages=[{"role": "user", "content": prompt}]
@@ -0,0 +1,315 @@
+"""
+사용자 통계 증분 집계 (user_stats 테이블).
+- 방문 저장 직후(create_visit) 한 행만 갱신: total_xp / total_visits / unique_places /
+  연속 방문(current_streak = last_visit_date 로 끝나는 연속 일수, longest_streak) / last_visit_date.
+  DB 에서는 apply_user_stats_visit RPC 가 행 잠금으로 원자적으로 갱신.
+- 조회(get_user_stats_full)는 집계 한 행 → O(1). 레벨·뱃지·"오늘 기준" 현재 스트릭은 읽을 때 파생.
+- 집계가 없거나(첫 조회·마이그레이션 직후) 과거 날짜 방문이 들어오면 원본 visits 전체로 재계산.
+- reconcile_user_stats: 야간 작업으로 원본 visits 에서 다시 계산해 어긋난 행(drift)을 바로잡음.
+날짜는 visited_at 의 UTC 날짜(YYYY-MM-DD), "오늘"도 UTC 기준 (변경 전 get_user_stats_full 의 스트릭 계산과 동일).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# 레벨 1~10 누적 XP 기준 (해당 레벨 도달에 필요한 최소 total_xp)
+XP_FOR_LEVEL = (0, 150, 400, 750, 1200, 1750, 2400, 3150, 4000, 5000)  # Lv1~Lv10
+
+# 업적 뱃지: (id, 이름, 아이콘)
+BADGES = (
+    ("first_visit", "첫 방문", "🌟"),
+    ("streak_7", "7일 연속", "🔥"),
+    ("places_10", "10곳 방문", "📍"),
+)
+
+# 재계산 시 visits 에서 읽는 컬럼
+VISIT_COLUMNS = "id,place_id,visited_at,xp_earned"
+
+_stats = {
+    "incremental": 0,
+    "fallback_incremental": 0,
+    "rebuilds": 0,
+    "update_errors": 0,
+    "reconciled": 0,
+    "reconcile_drift": 0,
+    "last_reconcile_at": None,
+    "last_reconcile_ms": None,
+}
+
+
+def stats_metrics() -> Dict[str, Any]:
+    return dict(_stats)
+
+
+# ---------- 순수 집계 로직 ----------
+
+def visit_day(visited_at: Any) -> Optional[date]:
+    if not visited_at:
+        return None
+    try:
+        return date.fromisoformat(str(visited_at)[:10])
+    except ValueError:
+        return None
+
+
+def empty_aggregate(user_id: str) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "total_xp": 0,
+        "total_visits": 0,
+        "unique_places": 0,
+        "current_streak": 0,
+        "longest_streak": 0,
+        "last_visit_date": None,
+    }
+
+
+def apply_visit(aggregate: Dict[str, Any], day: date, xp: int, new_place: bool) -> Optional[Dict[str, Any]]:
+    """
+    집계에 방문 1건 반영한 새 집계. apply_user_stats_visit RPC 와 같은 규칙.
+    마지막 방문일보다 과거 날짜면 연속 일수를 증분으로 맞출 수 없으므로 None (→ 재계산).
+    """
+    last = visit_day(aggregate.get("last_visit_date"))
+    if last is not None and day < last:
+        return None
+    if last is None or (day - last).days > 1:
+        run = 1
+    elif (day - last).days == 1:
+        run = int(aggregate.get("current_streak") or 0) + 1
+    else:
+        run = max(int(aggregate.get("current_streak") or 0), 1)
+    return {
+        **aggregate,
+        "total_xp": int(aggregate.get("total_xp") or 0) + int(xp or 0),
+        "total_visits": int(aggregate.get("total_visits") or 0) + 1,
+        "unique_places": int(aggregate.get("unique_places") or 0) + (1 if new_place else 0),
+        "current_streak": run,
+        "longest_streak": max(int(aggregate.get("longest_streak") or 0), run),
+        "last_visit_date": day.isoformat(),
+    }
+
+
+class VisitAccumulator:
+    """방문 행을 한 건씩 받아 집계 (행 자체는 보관하지 않음 → 스트리밍 재계산)"""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.total_visits = 0
+        self.total_xp = 0
+        self.places: set = set()
+        self.days: set = set()
+
+    def add(self, visit: Dict[str, Any]) -> None:
+        self.total_visits += 1
+        self.total_xp += int(visit.get("xp_earned") or 0)
+        if visit.get("place_id"):
+            self.places.add(visit["place_id"])
+        day = visit_day(visit.get("visited_at"))
+        if day is not None:
+            self.days.add(day)
+
+    def result(self) -> Dict[str, Any]:
+        aggregate = empty_aggregate(self.user_id)
+        aggregate["total_visits"] = self.total_visits
+        aggregate["total_xp"] = self.total_xp
+        aggregate["unique_places"] = len(self.places)
+        run = longest = 0
+        prev: Optional[date] = None
+        for day in sorted(self.days):
+            run = run + 1 if prev is not None and (day - prev).days == 1 else 1
+            longest = max(longest, run)
+            prev = day
+        aggregate["current_streak"] = run
+        aggregate["longest_streak"] = longest
+        aggregate["last_visit_date"] = prev.isoformat() if prev else None
+        return aggregate
+
+
+def rebuild_from_visits(user_id: str, visits: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """원본 방문 행 전체로 집계 계산 (재계산·대사용)"""
+    acc = VisitAccumulator(user_id)
+    for v in visits:
+        acc.add(v)
+    return acc.result()
+
+
+async def rebuild_from_db(db, user_id: str) -> Dict[str, Any]:
+    """visits 를 페이지 단위로 흘려 받으며 집계 (이력 길이와 무관한 메모리)"""
+    acc = VisitAccumulator(user_id)
+    async for v in db.iter_user_visits(user_id, select=VISIT_COLUMNS):
+        acc.add(v)
+    return acc.result()
+
+
+def same_aggregate(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    keys = ("total_xp", "total_visits", "unique_places", "current_streak", "longest_streak")
+    return all(int(a.get(k) or 0) == int(b.get(k) or 0) for k in keys) and (
+        visit_day(a.get("last_visit_date")) == visit_day(b.get("last_visit_date"))
+    )
+
+
+def level_for_xp(total_xp: int) -> tuple:
+    """(레벨, 다음 레벨까지 XP, 현재 레벨 최소 XP). 1580 XP → Lv5, 다음 레벨까지 170 XP"""
+    level = 1
+    for i in range(1, 10):
+        if total_xp >= XP_FOR_LEVEL[i]:
+            level = i + 1
+        else:
+            break
+    # 다음 레벨까지 필요한 XP (Lv10이면 0)
+    xp_to_next_level = max(0, XP_FOR_LEVEL[level] - total_xp) if level < 10 else 0
+    return level, xp_to_next_level, XP_FOR_LEVEL[level - 1]
+
+
+def earned_badges(total_visits: int, longest_streak: int, unique_places: int) -> List[Dict[str, str]]:
+    earned = {
+        "first_visit": total_visits >= 1,
+        "streak_7": longest_streak >= 7,
+        "places_10": unique_places >= 10,
+    }
+    return [{"id": bid, "name": name, "icon": icon} for bid, name, icon in BADGES if earned[bid]]
+
+
+def present(aggregate: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Any]:
+    """집계 한 행 → get_user_stats_full 응답 (기존 키 그대로)"""
+    today = today or datetime.utcnow().date()
+    total_xp = int(aggregate.get("total_xp") or 0)
+    total_visits = int(aggregate.get("total_visits") or 0)
+    unique_places = int(aggregate.get("unique_places") or 0)
+    longest_streak = int(aggregate.get("longest_streak") or 0)
+    last = visit_day(aggregate.get("last_visit_date"))
+    # 마지막 방문이 어제보다 이전이면 스트릭은 끊긴 상태
+    current_streak = int(aggregate.get("current_streak") or 0) if last and (today - last).days <= 1 else 0
+    level, xp_to_next_level, current_level_min_xp = level_for_xp(total_xp)
+    return {
+        "level": level,
+        "total_xp": total_xp,
+        "xp_to_next_level": xp_to_next_level,
+        "current_level_min_xp": current_level_min_xp,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "completed_quests": total_visits,
+        "total_places_visited": unique_places,
+        "total_visits": total_visits,
+        "unique_places": unique_places,
+        "badges": earned_badges(total_visits, longest_streak, unique_places),
+    }
+
+
+# ---------- DB 연동 ----------
+
+async def rebuild_user_stats(db, user_id: str, save: bool = True) -> Dict[str, Any]:
+    """원본 visits 전체로 재계산 후 저장 (저장 실패해도 계산 결과는 반환)"""
+    aggregate = await rebuild_from_db(db, user_id)
+    _stats["rebuilds"] += 1
+    if save:
+        await db.upsert_user_stats([aggregate])
+    return aggregate
+
+
+async def load_user_stats(db, user_id: str) -> Dict[str, Any]:
+    """집계 행 조회 (O(1)). 없으면 원본으로 계산해 채워 둔다."""
+    aggregate = await db.get_user_stats_row(user_id)
+    if aggregate is None:
+        aggregate = await rebuild_user_stats(db, user_id)
+    return aggregate
+
+
+async def record_visit(db, visit: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    저장된 방문 행(insert_visit 결과)을 집계에 반영. 갱신된 집계 반환, 실패 시 None.
+    방문 저장을 막지 않도록 예외는 삼키고 로그만 남긴다 (어긋난 값은 대사 작업이 복구).
+    """
+    user_id = visit.get("user_id")
+    day = visit_day(visit.get("visited_at"))
+    if not user_id or day is None:
+        return None
+    xp = int(visit.get("xp_earned") or 0)
+    place_id = visit.get("place_id")
+    try:
+        rows = await db.apply_user_stats_visit(user_id, place_id, xp, day.isoformat())
+        if rows:
+            _stats["incremental"] += 1
+            return rows[0]
+        if rows is not None:
+            # 집계 없음 / 과거 날짜 방문 → 원본으로 재계산
+            return await rebuild_user_stats(db, user_id)
+
+        # RPC 미배포 → 읽고-계산하고-쓰기 (동시 방문 시 어긋날 수 있음, 대사 작업이 복구)
+        current = await db.get_user_stats_row(user_id)
+        if current is None:
+            return await rebuild_user_stats(db, user_id)
+        new_place = bool(place_id) and await db.count_user_place_visits(user_id, place_id, cap=2) <= 1
+        updated = apply_visit(current, day, xp, new_place)
+        if updated is None:
+            return await rebuild_user_stats(db, user_id)
+        await db.upsert_user_stats([updated])
+        _stats["fallback_incremental"] += 1
+        return updated
+    except Exception as e:
+        _stats["update_errors"] += 1
+        logger.warning("[UserStats] incremental update failed for %s: %s", user_id, e)
+        return None
+
+
+async def reconcile_user_stats(
+    db,
+    user_ids: Optional[List[str]] = None,
+    after: Optional[str] = None,
+    on_batch: Optional[Callable[[str, Dict[str, int]], Awaitable[None]]] = None,
+    previous: Optional[Dict[str, int]] = None,
+) -> Dict[str, int]:
+    """
+    집계 행을 원본 visits 로 재계산해 다른 값만 덮어씀.
+    user_ids 가 없으면 user_stats 전체를 user_id 순으로 USER_STATS_RECONCILE_BATCH 개씩 훑는다.
+    on_batch: 배치마다 (마지막 user_id, 누적 결과) 로 호출 (작업 checkpoint). after / previous 로 이어서 실행.
+    """
+    started = time.perf_counter()
+    checked = (previous or {}).get("checked", 0)
+    drift = (previous or {}).get("drift", 0)
+
+    async def _reconcile(ids: List[str]) -> None:
+        nonlocal checked, drift
+        current = await db.get_user_stats_rows(ids)
+        fixed = []
+        for uid in ids:
+            rebuilt = await rebuild_from_db(db, uid)
+            checked += 1
+            stored = current.get(uid)
+            if stored is None or not same_aggregate(stored, rebuilt):
+                if stored is not None:
+                    drift += 1
+                    logger.info("[UserStats] drift for %s: stored=%s rebuilt=%s", uid, stored, rebuilt)
+                fixed.append(rebuilt)
+        if fixed:
+            await db.upsert_user_stats(fixed)
+
+    if user_ids is not None:
+        await _reconcile(list(dict.fromkeys(user_ids)))
+    else:
+        batch = max(1, settings.USER_STATS_RECONCILE_BATCH)
+        while True:
+            ids = await db.list_user_stats_ids(after=after, limit=batch)
+            if not ids:
+                break
+            await _reconcile(ids)
+            after = ids[-1]
+            if on_batch is not None:
+                await on_batch(after, {"checked": checked, "drift": drift})
+            if len(ids) < batch:
+                break
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _stats["reconciled"] += checked - (previous or {}).get("checked", 0)
+    _stats["reconcile_drift"] += drift - (previous or {}).get("drift", 0)
+    _stats["last_reconcile_at"] = datetime.utcnow().isoformat()
+    _stats["last_reconcile_ms"] = round(elapsed_ms, 1)
+    return {"checked": checked, "drift": drift}
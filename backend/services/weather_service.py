@@ -1,21 +1,41 @@
 """
 Weather Service — OpenWeatherMap 실제 API만 사용 (mock 없음).
-OPENWEATHER_API_KEY 필수. 인메모리 TTL 캐시로 호출 빈도만 줄임.
+OPENWEATHER_API_KEY 필수.
+- 캐시 단위는 좌표가 아닌 격자 타일(WEATHER_TILE_DEG, 기본 0.03° ≈ 3km): 타일 중심 좌표로 한 번 조회해 타일 안 사용자 공유.
+- TTL 이 지나도 WEATHER_STALE_SECONDS 동안은 기존 값을 바로 돌려주고 백그라운드에서 갱신 (stale-while-revalidate).
+- 같은 타일의 동시 미스·갱신은 OpenWeather 호출 하나로 합침 (single-flight).
+- 타일 수 상한(WEATHER_CACHE_MAX_TILES) 초과 시 가장 오래 안 쓴 타일부터 축출 (LRU).
+- WEATHER_PREFETCH_ENABLED 면 서울 권역 타일을 주기적으로 미리 채워 요청 경로가 OpenWeather 를 기다리지 않게 함.
+- 지표: GET /health/weather
 """
 
 from __future__ import annotations
 
 import asyncio
+import logging
+import math
 import time
-from typing import Dict, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
 
 import httpx
 
 from core.config import settings
+from core.dependencies import Database
 
-# 좌표 2자리 반올림 키 → (만료 monotonic, payload)
-_weather_cache: Dict[str, Tuple[float, Dict]] = {}
-_weather_lock = asyncio.Lock()
+logger = logging.getLogger("uvicorn.error")
+
+Tile = Tuple[int, int]
+
+# 타일 → (가져온 monotonic 시각, payload). 최근 사용 순.
+_weather_cache: "OrderedDict[Tile, Tuple[float, Dict]]" = OrderedDict()
+# 타일별 진행 중인 OpenWeather 호출 (미스·백그라운드 갱신 공용)
+_inflight: Dict[Tile, "asyncio.Task[Dict]"] = {}
+_stats: Dict[str, Any] = {
+    "fresh_hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+    "upstream_calls": 0, "upstream_errors": 0, "refresh_errors": 0, "evictions": 0,
+    "prefetched": 0, "last_prefetch_at": None,
+}
 
 
 class WeatherUnavailableError(Exception):
@@ -27,8 +47,18 @@ class WeatherUnavailableError(Exception):
         self.status_code = status_code
 
 
-def _weather_cache_key(latitude: float, longitude: float) -> str:
-    return f"{round(latitude, 2)},{round(longitude, 2)}"
+def _tile_deg() -> float:
+    return max(0.001, float(settings.WEATHER_TILE_DEG))
+
+
+def weather_tile(latitude: float, longitude: float) -> Tile:
+    deg = _tile_deg()
+    return math.floor(latitude / deg), math.floor(longitude / deg)
+
+
+def tile_center(tile: Tile) -> Tuple[float, float]:
+    deg = _tile_deg()
+    return round((tile[0] + 0.5) * deg, 5), round((tile[1] + 0.5) * deg, 5)
 
 
 def _map_weather_condition(main: str) -> str:
@@ -54,7 +84,7 @@ async def _fetch_openweather(latitude: float, longitude: float) -> Dict:
         )
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with Database.get_http().session(timeout=10.0) as client:
             resp = await client.get(
                 "https://api.openweathermap.org/data/2.5/weather",
                 params={
@@ -90,31 +120,122 @@ async def _fetch_openweather(latitude: float, longitude: float) -> Dict:
     }
 
 
+def _store(tile: Tile, data: Dict) -> None:
+    _weather_cache[tile] = (time.monotonic(), dict(data))
+    _weather_cache.move_to_end(tile)
+    while len(_weather_cache) > max(1, settings.WEATHER_CACHE_MAX_TILES):
+        _weather_cache.popitem(last=False)
+        _stats["evictions"] += 1
+
+
+def _fetch_tile(tile: Tile) -> "asyncio.Task[Dict]":
+    """타일 중심 좌표로 OpenWeather 호출 (진행 중이면 그 호출을 공유)"""
+    task = _inflight.get(tile)
+    if task is not None:
+        _stats["coalesced"] += 1
+        return task
+
+    async def _run() -> Dict:
+        _stats["upstream_calls"] += 1
+        try:
+            data = await _fetch_openweather(*tile_center(tile))
+        except WeatherUnavailableError:
+            _stats["upstream_errors"] += 1
+            raise
+        finally:
+            _inflight.pop(tile, None)
+        if settings.WEATHER_CACHE_TTL_SECONDS > 0:
+            _store(tile, data)
+        return data
+
+    task = asyncio.ensure_future(_run())
+    _inflight[tile] = task
+    return task
+
+
+def _refresh_in_background(tile: Tile) -> None:
+    if tile in _inflight:
+        return
+
+    def _done(task: "asyncio.Task[Dict]") -> None:
+        if not task.cancelled() and task.exception() is not None:
+            # 기존 값은 stale 기간 동안 계속 사용
+            _stats["refresh_errors"] += 1
+            logger.warning("[Weather] background refresh failed for tile %s: %s", tile, task.exception())
+
+    _fetch_tile(tile).add_done_callback(_done)
+
+
 async def get_weather(latitude: float, longitude: float) -> Dict:
     """
     현재 좌표의 실제 날씨. mock 없음.
     실패 시 WeatherUnavailableError 발생.
     """
-    ttl = max(0, int(getattr(settings, "WEATHER_CACHE_TTL_SECONDS", 600) or 0))
-    key = _weather_cache_key(latitude, longitude)
-    now = time.monotonic()
+    ttl = max(0, int(settings.WEATHER_CACHE_TTL_SECONDS or 0))
+    tile = weather_tile(latitude, longitude)
 
     if ttl > 0:
-        async with _weather_lock:
-            hit = _weather_cache.get(key)
-            if hit and now < hit[0]:
+        hit = _weather_cache.get(tile)
+        if hit is not None:
+            age = time.monotonic() - hit[0]
+            if age < ttl:
+                _weather_cache.move_to_end(tile)
+                _stats["fresh_hits"] += 1
+                return dict(hit[1])
+            if age < ttl + max(0, settings.WEATHER_STALE_SECONDS):
+                _weather_cache.move_to_end(tile)
+                _stats["stale_hits"] += 1
+                _refresh_in_background(tile)
                 return dict(hit[1])
 
-    data = await _fetch_openweather(latitude, longitude)
+    _stats["misses"] += 1
+    # 기다리던 요청이 취소돼도 다른 대기자를 위해 호출은 계속
+    return dict(await asyncio.shield(_fetch_tile(tile)))
 
-    if ttl > 0:
-        async with _weather_lock:
-            _weather_cache[key] = (now + ttl, dict(data))
-            if len(_weather_cache) > 500:
-                _weather_cache.clear()
-                _weather_cache[key] = (now + ttl, dict(data))
 
-    return data
+def prefetch_tiles() -> List[Tile]:
+    """미리 채울 타일 목록 (WEATHER_PREFETCH_BBOX = 남,서,북,동)"""
+    south, west, north, east = (float(v) for v in settings.WEATHER_PREFETCH_BBOX.split(","))
+    (y0, x0), (y1, x1) = weather_tile(south, west), weather_tile(north, east)
+    return [(y, x) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+
+async def prefetch_weather() -> int:
+    """
+    권역 타일 중 TTL 의 절반 이상 지난(또는 없는) 타일을 갱신. 갱신한 타일 수 반환.
+    OpenWeather 분당 호출 한도를 넘지 않게 WEATHER_PREFETCH_PER_MINUTE 속도로 순차 호출.
+    """
+    ttl = max(0, int(settings.WEATHER_CACHE_TTL_SECONDS or 0))
+    if ttl == 0 or not (settings.OPENWEATHER_API_KEY or "").strip():
+        return 0
+    gap = 60.0 / max(1, settings.WEATHER_PREFETCH_PER_MINUTE)
+    refreshed = 0
+    for tile in prefetch_tiles():
+        hit = _weather_cache.get(tile)
+        if hit is not None and time.monotonic() - hit[0] < ttl / 2:
+            continue
+        try:
+            await asyncio.shield(_fetch_tile(tile))
+            refreshed += 1
+        except WeatherUnavailableError as e:
+            logger.warning("[Weather] prefetch failed for tile %s: %s", tile, e)
+        await asyncio.sleep(gap)
+    _stats["prefetched"] += refreshed
+    _stats["last_prefetch_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return refreshed
+
+
+def weather_metrics() -> Dict[str, Any]:
+    lookups = _stats["fresh_hits"] + _stats["stale_hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "tiles": len(_weather_cache),
+        "max_tiles": settings.WEATHER_CACHE_MAX_TILES,
+        "tile_deg": _tile_deg(),
+        "inflight": len(_inflight),
+        "hit_rate": round((_stats["fresh_hits"] + _stats["stale_hits"]) / lookups, 3) if lookups else None,
+        "prefetch_enabled": settings.WEATHER_PREFETCH_ENABLED,
+    }
 
 
 def get_time_of_day() -> str:
@@ -156,20 +156,17 @@ class RecommendationEngine:
                 detail=f"No places found within {radius}m radius"
             )
         
-        # 3단계: 스코어링 및 랭킹
-        scored_places = await self._score_and_rank(
+        # 3~4단계: 스코어링 및 Top-K 선정 (컬럼 단위 벡터 연산, 승자만 설명 생성)
+        top_recommendations = self._score_and_rank_vectorized(
             candidates=candidates,
             role_type=request.role_type,
             user_level=request.user_level,
-            user_location=request.current_location,
             mood=request.mood,
             weather=request.weather,
-            time_of_day=request.time_of_day
+            time_of_day=request.time_of_day,
+            top_k=top_k
         )
         
-        # 4단계: Top-K 선정
-        top_recommendations = scored_places[:top_k]
-        
         # 5단계: 응답 생성
         recommendations = [
             PlaceRecommendation(
@@ -348,6 +345,140 @@ class RecommendationEngine:
         
         return scored_places
     
+    # 기분 → 어울리는 분위기 태그 (_calculate_vibe_score 와 공유)
+    MOOD_KEYWORDS = {
+        '지침': ['quiet', 'cozy', 'calm'],
+        '활기찬': ['energetic', 'vibrant', 'lively'],
+        '우울한': ['cozy', 'warm', 'intimate'],
+        '외로운': ['social', 'friendly', 'warm'],
+        '흥분된': ['exciting', 'energetic', 'vibrant']
+    }
+
+    def _score_and_rank_vectorized(
+        self,
+        candidates: List[Dict],
+        role_type: RoleType,
+        user_level: int,
+        mood: Optional[MoodInput],
+        weather: Optional[str],
+        time_of_day: Optional[str],
+        top_k: int = 3
+    ) -> List[Dict]:
+        """
+        _score_and_rank 의 컬럼 단위(NumPy) 버전. 상위 top_k 만 반환.
+
+        - 후보를 배열로 변환, 카테고리 가중치는 코드 → 가중치 룩업 벡터
+        - 거리 감쇠는 np.exp 한 번, Top-K 는 np.argpartition
+        - score_breakdown / reason 은 승자에게만 생성
+        - 랜덤 보너스는 후보 순서대로 random.uniform 을 뽑아 스칼라 경로와 같은 시드에서 같은 결과
+        """
+        n = len(candidates)
+        if n == 0 or top_k <= 0:
+            return []
+
+        role_config = get_role_config(role_type)
+        weights = role_config.category_weights
+        w = self.weights
+
+        # === 1. 카테고리 적합도: 카테고리 코드 → 가중치 룩업 ===
+        codes: Dict[str, int] = {}
+        primary = np.fromiter(
+            (codes.setdefault(p['primary_category'], len(codes)) for p in candidates),
+            dtype=np.int64, count=n
+        )
+        lookup = np.array([weights.get(c, 0.3) for c in codes], dtype=np.float64)
+        category = lookup[primary]
+        # 세컨더리 카테고리 보너스 (대부분 비어 있어 희소 처리)
+        for i, p in enumerate(candidates):
+            for sec_cat in p.get('secondary_categories') or ():
+                if sec_cat in weights:
+                    category[i] += weights[sec_cat] * 0.2
+        category = np.minimum(category, 1.0)
+
+        # === 2. 거리 감쇠 ===
+        distance_m = np.fromiter((p['distance_meters'] for p in candidates), dtype=np.float64, count=n)
+        decay_factor = 0.0001 if role_config.id == 'achiever' else 0.0003
+        distance = np.exp(-decay_factor * distance_m)
+
+        # === 3. 분위기 매칭 ===
+        vibe = np.full(n, 0.5)
+        if mood:
+            relevant = set(self.MOOD_KEYWORDS.get(mood.mood_text, []))
+            total = max(len(self.MOOD_KEYWORDS.get(mood.mood_text, [])), 1)
+            for i, p in enumerate(candidates):
+                tags = p.get('vibe_tags')
+                if tags:
+                    vibe[i] = len(relevant & set(tags)) / total
+
+        # === 4. 비용 적합도 ===
+        price = np.fromiter((p.get('average_price') or 0 for p in candidates), dtype=np.float64, count=n)
+        threshold = role_config.cost_threshold
+        over = price > threshold
+        cost = np.ones(n)
+        cost[over] = np.maximum(0, 1.0 - (price[over] - threshold) / threshold * role_config.cost_sensitivity)
+
+        # === 5~6. 날씨/시간 (후보 공통 상수), 레벨 보너스 ===
+        weather_bonus = self._calculate_weather_bonus(weather, role_config)
+        time_bonus = self._calculate_time_bonus(time_of_day, role_config)
+        hidden = np.fromiter((bool(p.get('is_hidden_gem')) for p in candidates), dtype=bool, count=n)
+        gem_bonus = (15.0 if user_level >= 6 else 0.0) + (10.0 if role_config.id == 'explorer' else 0.0)
+        level = hidden * gem_bonus
+
+        # === 7. 랜덤 탐색 (스칼라 경로와 동일한 순서로 난수 소비) ===
+        random_bonus = np.array([random.uniform(0, 10) * w.randomness for _ in range(n)])
+
+        final = (
+            category * w.category_fit * 100 +
+            distance * w.distance_decay * 100 +
+            vibe * w.vibe_match * 100 +
+            cost * w.cost_fit * 100 +
+            weather_bonus +
+            time_bonus +
+            level +
+            random_bonus
+        )
+
+        # === Top-K: argpartition 으로 경계 점수를 구하고 그 근처 후보만 남김 ===
+        if n > top_k:
+            kth = final[np.argpartition(-final, top_k - 1)[:top_k]].min()
+            idx = np.flatnonzero(final >= kth - 1e-9)
+        else:
+            idx = np.arange(n)
+        # np.exp 는 math.exp 와 1ulp 차이가 날 수 있어 남은 후보만 스칼라 식으로 재계산 (스칼라 경로와 동일 점수)
+        for i in idx:
+            distance[i] = math.exp(-decay_factor * distance_m[i])
+            final[i] = (
+                category[i] * w.category_fit * 100 +
+                distance[i] * w.distance_decay * 100 +
+                vibe[i] * w.vibe_match * 100 +
+                cost[i] * w.cost_fit * 100 +
+                weather_bonus +
+                time_bonus +
+                level[i] +
+                random_bonus[i]
+            )
+        # (점수 desc, 원래 순서 asc) — list.sort 안정 정렬과 같은 동점 처리
+        idx = idx[np.lexsort((idx, -final[idx]))][:top_k]
+
+        winners = []
+        for i in idx:
+            place = candidates[i]
+            score_breakdown = {
+                'category': round(float(category[i]) * 100, 2),
+                'distance': round(float(distance[i]) * 100, 2),
+                'vibe': round(float(vibe[i]) * 100, 2),
+                'cost': round(float(cost[i]) * 100, 2),
+                'weather_bonus': round(weather_bonus, 2),
+                'time_bonus': round(time_bonus, 2),
+                'level_bonus': round(float(level[i]), 2),
+                'random': round(float(random_bonus[i]), 2)
+            }
+            place['final_score'] = float(final[i])
+            place['score_breakdown'] = score_breakdown
+            place['reason'] = self._generate_reason(place, role_config, score_breakdown)
+            winners.append(place)
+        return winners
+
     def _calculate_category_score(
         self,
         place: Dict,
@@ -409,15 +540,7 @@ class RecommendationEngine:
             return 0.5  # 중립
         
         # 간단한 키워드 매칭 (실제로는 벡터 유사도)
-        mood_keywords = {
-            '지침': ['quiet', 'cozy', 'calm'],
-            '활기찬': ['energetic', 'vibrant', 'lively'],
-            '우울한': ['cozy', 'warm', 'intimate'],
-            '외로운': ['social', 'friendly', 'warm'],
-            '흥분된': ['exciting', 'energetic', 'vibrant']
-        }
-        
-        relevant_tags = mood_keywords.get(mood.mood_text, [])
+        relevant_tags = self.MOOD_KEYWORDS.get(mood.mood_text, [])
         place_tags = place['vibe_tags'] or []
         
         # 교집합 비율
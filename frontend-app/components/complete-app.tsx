@@ -3,7 +3,7 @@
 import React, { useState, useEffect, useRef, useCallback } from 'react'
 import { useRouter } from 'next/navigation'
 import Script from 'next/script'
-import { useQuery } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { getRecommendations, getFriendPicks } from '@/lib/api-client'
 import { useUser } from '@/hooks/useUser'
 import { createClient } from '@/lib/supabase'
@@ -864,6 +864,9 @@ export function CompleteApp() {
         user_mood: moodText,
         vibe_tags: acceptedQuest.vibe_tags || [],
         is_hidden_gem: acceptedQuest.is_hidden_gem ?? false,
+        place_id: acceptedQuest.place_id,
+        weather: (questsData?.weather as { condition?: string } | undefined)?.condition,
+        time_of_day: questsData?.time_of_day,
       }),
     })
       .then((res) => res.json())
@@ -1002,18 +1005,33 @@ export function CompleteApp() {
   })
   const profilePostComments = profilePostCommentsData?.comments ?? []
 
-  const { data: notificationsData, refetch: refetchNotifications } = useQuery({
-    queryKey: ['notifications', userId],
+  // 벨 배지는 안 읽은 수만 (unread-count), 목록은 알림 패널을 열었을 때만 조회
+  const [showNotificationPanel, setShowNotificationPanel] = useState(false)
+  const queryClient = useQueryClient()
+  const { data: unreadData } = useQuery({
+    queryKey: ['notifications', userId, 'unread'],
+    queryFn: async () => {
+      const res = await fetch(`${API_BASE}/api/v1/notifications/unread-count?user_id=${encodeURIComponent(userId)}`)
+      if (!res.ok) return { unread_count: 0 }
+      return res.json()
+    },
+    enabled: !!userId,
+  })
+  const { data: notificationsData } = useQuery({
+    queryKey: ['notifications', userId, 'list'],
     queryFn: async () => {
       const res = await fetch(`${API_BASE}/api/v1/notifications?user_id=${encodeURIComponent(userId)}`)
       if (!res.ok) return { notifications: [], unread_count: 0 }
       return res.json()
     },
-    enabled: !!userId,
+    enabled: !!userId && showNotificationPanel,
   })
   const notifications = notificationsData?.notifications ?? []
-  const unreadCount = notificationsData?.unread_count ?? 0
-  const [showNotificationPanel, setShowNotificationPanel] = useState(false)
+  const unreadCount = unreadData?.unread_count ?? 0
+  // 활성 쿼리만 다시 조회 (패널이 닫혀 있으면 목록은 건너뜀)
+  const refetchNotifications = useCallback(() => {
+    queryClient.invalidateQueries({ queryKey: ['notifications', userId] })
+  }, [queryClient, userId])
 
   // Supabase Realtime: 알림 테이블 구독 → 새 알림 시 즉시 refetch
   useEffect(() => {
@@ -1433,6 +1451,9 @@ export function CompleteApp() {
               user_mood: moodText,
               vibe_tags: acceptedQuest.vibe_tags || [],
               is_hidden_gem: acceptedQuest.is_hidden_gem ?? false,
+              place_id: acceptedQuest.place_id,
+              weather: (questsData?.weather as { condition?: string } | undefined)?.condition,
+              time_of_day: questsData?.time_of_day,
             }),
           })
             .then((res) => res.json())
@@ -2231,6 +2252,10 @@ export function CompleteApp() {
                       user_mood: moodText,
                       vibe_tags: acceptedQuest?.vibe_tags || [],
                       is_hidden_gem: acceptedQuest?.is_hidden_gem ?? false,
+                      place_id: acceptedQuest?.place_id,
+                      weather: (questsData?.weather as { condition?: string } | undefined)?.condition,
+                      time_of_day: questsData?.time_of_day,
+                      regenerate: true,
                     }),
                   })
                     .then((res) => res.json())
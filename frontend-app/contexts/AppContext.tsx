@@ -2,7 +2,7 @@
 
 import React, { useState, useEffect, useRef, useCallback, createContext, useContext } from 'react'
 import { useRouter } from 'next/navigation'
-import { useQuery } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { getRecommendations } from '@/lib/api-client'
 import { useUser } from '@/hooks/useUser'
 import { createClient } from '@/lib/supabase'
@@ -892,17 +892,32 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
   }, [userId])
 
   // Supabase realtime notifications
-  const { data: notificationsData, refetch: refetchNotifications } = useQuery({
-    queryKey: ['notifications', userId],
+  // 벨 배지는 안 읽은 수만 (unread-count), 목록은 알림 패널을 열었을 때만 조회
+  const queryClient = useQueryClient()
+  const { data: unreadData } = useQuery({
+    queryKey: ['notifications', userId, 'unread'],
+    queryFn: async () => {
+      const res = await fetch(`${API_BASE}/api/v1/notifications/unread-count?user_id=${encodeURIComponent(userId)}`)
+      if (!res.ok) return { unread_count: 0 }
+      return res.json()
+    },
+    enabled: !!userId,
+  })
+  const { data: notificationsData } = useQuery({
+    queryKey: ['notifications', userId, 'list'],
     queryFn: async () => {
       const res = await fetch(`${API_BASE}/api/v1/notifications?user_id=${encodeURIComponent(userId)}`)
       if (!res.ok) return { notifications: [], unread_count: 0 }
       return res.json()
     },
-    enabled: !!userId,
+    enabled: !!userId && showNotificationPanel,
   })
   const notifications = notificationsData?.notifications ?? []
-  const unreadCount = notificationsData?.unread_count ?? 0
+  const unreadCount = unreadData?.unread_count ?? 0
+  // 활성 쿼리만 다시 조회 (패널이 닫혀 있으면 목록은 건너뜀)
+  const refetchNotifications = useCallback(() => {
+    queryClient.invalidateQueries({ queryKey: ['notifications', userId] })
+  }, [queryClient, userId])
 
   useEffect(() => {
     if (!userId) return
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+근처 활동 사용자 격자 인덱스(db/active_user_index.py) 부하 테스트 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- 서울 범위 합성 사용자 N명(기본 50,000, 핫스팟 주변 밀집)이 30초마다 위치 핑 (도보/대중교통 이동).
+  시뮬레이션 1초마다 N/30 명이 report(), 5초마다 flush (update_user_locations RPC, 가짜 서버가 행 수 집계),
+  매초 매칭 반경 조회(5km, 후보 50명) 20회.
+1) 수집: 핑 처리량, 시뮬레이션 1초 분량 처리에 걸린 CPU 시간(= 1초 예산 대비 점유율), 셀 이동 비율
+2) DB 쓰기: 기존 핑당 users PATCH 수 vs 사용자별 마지막 위치만 모은 일괄 RPC 호출 수
+3) 반경 조회 p50/p95, 전수 비교(brute force) 로 결과 일치 확인
+4) 인덱스 메모리 (tracemalloc), TTL 만료 정리 비용
+5) SocialMatchingService._find_candidates: 메모리 반경 조회 + 프로필·성향 일괄 조회 (왕복 2회)
+
+사용자 50,000명·5분(핑 500,000건) 기준:
+1) 핑 약 34만 건/초 (시뮬레이션 1초 분량 1,666건 ≈ 5ms → 1초 예산의 0.5%), 셀 이동 11%
+2) 기존 PATCH 499,800회 → RPC 540회 (flush 60회 × 1,000행 묶음, 행 499,800)
+3) 반경 5km·후보 50명 p50 1.9ms p95 3.9ms (고리 탐색: 셀 전체 순회 시 p50 15.8ms), 전수 비교 200/200 일치
+4) 인덱스 약 23MB, 50,000명 만료 정리 0.08초
+5) 후보 50명, 가짜 서버 왕복 2회 (프로필·성향), 4.3ms
+
+사용: python scripts/bench_active_users.py [사용자수] [시뮬레이션 초]
+"""
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import unquote
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.http_client import SharedHttpClient  # noqa: E402
+from db import active_user_index as active_module  # noqa: E402
+from db.active_user_index import ActiveUserGrid  # noqa: E402
+from db.geo import haversine_m  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from services import social_matching  # noqa: E402
+from services.social_matching import SocialMatchingService  # noqa: E402
+
+SEOUL = (37.45, 126.80, 37.70, 127.18)
+PING_SECONDS = 30
+FLUSH_SECONDS = 5
+RADIUS_M = 5000
+QUERIES_PER_SECOND = 20
+
+
+class FakePostgrest:
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        path = request.url.path
+        if path.endswith("/rpc/update_user_locations"):
+            n = len(json.loads(request.content)["p_updates"])
+            self.rows += n
+            return httpx.Response(200, json=n)
+        if path.endswith("/rpc/active_user_locations"):
+            return httpx.Response(200, json=[])
+        ids = [v.strip('"') for v in unquote(request.url.params["user_id"])[len("in.("):-1].split(",")]
+        if path.endswith("/users"):
+            return httpx.Response(200, json=[{"user_id": u, "username": f"name-{u}"} for u in ids])
+        return httpx.Response(200, json=[{"user_id": u, "extraversion": 0.6} for u in ids])
+
+
+def fake_db(server: FakePostgrest) -> RestDatabaseHelpers:
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    return db
+
+
+def make_users(n: int):
+    rnd = random.Random(n)
+    hotspots = [(rnd.uniform(SEOUL[0], SEOUL[2]), rnd.uniform(SEOUL[1], SEOUL[3])) for _ in range(40)]
+    users = []
+    for i in range(n):
+        if rnd.random() < 0.6:
+            lat0, lon0 = rnd.choice(hotspots)
+            lat, lon = lat0 + rnd.gauss(0, 0.01), lon0 + rnd.gauss(0, 0.012)
+        else:
+            lat, lon = rnd.uniform(SEOUL[0], SEOUL[2]), rnd.uniform(SEOUL[1], SEOUL[3])
+        # 30초 이동 거리: 도보 ~40m, 대중교통 ~300m
+        step = 0.0004 if rnd.random() < 0.8 else 0.003
+        users.append([f"u{i}", lat, lon, step, rnd.uniform(0, 2 * math.pi)])
+    return users
+
+
+def move(user, rnd: random.Random) -> None:
+    user[4] += rnd.gauss(0, 0.5)
+    user[1] = min(max(user[1] + user[3] * math.cos(user[4]), SEOUL[0]), SEOUL[2])
+    user[2] = min(max(user[2] + user[3] * math.sin(user[4]), SEOUL[1]), SEOUL[3])
+
+
+def brute_force(grid: ActiveUserGrid, lat: float, lon: float, exclude: str, limit: int):
+    found = sorted(
+        (haversine_m(lat, lon, e.latitude, e.longitude), uid)
+        for uid, e in grid._users.items()
+        if uid != exclude and haversine_m(lat, lon, e.latitude, e.longitude) <= RADIUS_M
+    )
+    return [uid for _, uid in found[:limit]]
+
+
+async def main_async(n: int, seconds: int) -> None:
+    rnd = random.Random(7)
+    users = make_users(n)
+    server = FakePostgrest()
+    db = fake_db(server)
+
+    tracemalloc.start()
+    grid = ActiveUserGrid(cell_deg=0.01, ttl_seconds=900)
+    for u in users:
+        grid.report(u[0], u[1], u[2])
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    grid._pending.clear()
+    grid.counters["updates"] = 0
+
+    per_second = n // PING_SECONDS
+    tick_ms, query_ms = [], []
+    pings = 0
+    matched = checked = 0
+    for second in range(seconds):
+        start = (second % PING_SECONDS) * per_second
+        batch = users[start:start + per_second]
+        for u in batch:
+            move(u, rnd)
+        t = time.perf_counter()
+        for u in batch:
+            grid.report(u[0], u[1], u[2])
+        tick_ms.append((time.perf_counter() - t) * 1000)
+        pings += len(batch)
+        if second % FLUSH_SECONDS == FLUSH_SECONDS - 1:
+            await grid.flush(db)
+        for q in range(QUERIES_PER_SECOND):
+            me = rnd.choice(users)
+            t = time.perf_counter()
+            result = grid.nearby(me[1], me[2], RADIUS_M, exclude=[me[0]], limit=50)
+            query_ms.append((time.perf_counter() - t) * 1000)
+            if q == 0 and checked < 200:
+                checked += 1
+                matched += [r["user_id"] for r in result] == brute_force(grid, me[1], me[2], me[0], 50)
+    await grid.flush(db)
+
+    total_s = sum(tick_ms) / 1000
+    print(f"1) pings={pings:,} ingest={pings / total_s:,.0f}/s tick(1s of pings) p50={statistics.median(tick_ms):.1f}ms "
+          f"max={max(tick_ms):.1f}ms cell moves={grid.counters['cell_moves'] / pings:.0%}")
+    print(f"2) legacy PATCH calls={pings:,} → batched RPC calls={server.calls:,} rows={server.rows:,} "
+          f"flushes={grid.counters['flushes']}")
+    query_ms.sort()
+    print(f"3) nearby {RADIUS_M}m p50={statistics.median(query_ms):.2f}ms p95={query_ms[int(len(query_ms) * 0.95)]:.2f}ms "
+          f"brute-force match={matched}/{checked}")
+
+    t = time.perf_counter()
+    removed = grid.expire(time.time() + 901 + grid.bucket_seconds)
+    print(f"4) index memory={memory_mb:.1f}MB expire removed={removed:,} in {time.perf_counter() - t:.3f}s "
+          f"remaining={len(grid)}")
+
+    for u in users:
+        grid.update(u[0], u[1], u[2])
+    grid.loaded = True
+    social_matching.active_user_index = active_module.active_user_index = grid
+    server.calls = 0
+    me = users[0]
+    t = time.perf_counter()
+    candidates = await SocialMatchingService(db)._find_candidates(
+        {"latitude": me[1], "longitude": me[2]}, RADIUS_M / 1000, datetime.now(), [me[0]],
+    )
+    print(f"5) candidates={len(candidates)} calls={server.calls} in {(time.perf_counter() - t) * 1000:.1f}ms "
+          f"first={ {k: candidates[0][k] for k in ('user_id', 'username', 'distance_meters')} }")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    asyncio.run(main_async(n, seconds))
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+셀 단위 추천 후보 공유 캐시 벤치마크 (합성 서울 요청 트레이스 재생)
+- 가짜 Kakao: 합성 장소 위에서 반경 내 가까운 순 15곳씩 페이지로 반환 (실제 API 호출 없음), 호출 수 집계.
+- 기준선: 요청마다 카테고리 코드별 Kakao 호출 (기존 위치·유저 단위 캐시는 사용자 간 거의 적중 없음).
+- 셀 캐시: services.candidate_cache.get_candidates 그대로 사용, TTL 창마다 캐시 초기화.
+- 품질: 사용자 위치 기준 반경 내 최근접 15곳 중 셀 후보에도 들어 있는 비율(coverage).
+
+셀 크기/페이지 수는 환경변수로 바꿔 비교: RECOMMENDATION_CELL_DEG=0.005 RECOMMENDATION_CANDIDATE_PAGES=2
+20000 요청 / 2시간 기준 (기본값 0.008도, 2페이지): 강남 Kakao 호출 ≈ 14배 감소, 최근접 15곳 포함률 ≈ 0.89
+(0.005도면 ≈ 7배 감소, 포함률 ≈ 0.99)
+
+사용: python scripts/bench_candidate_cache.py [요청수]
+"""
+import asyncio
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from core.config import settings  # noqa: E402
+from db.geo import haversine_m  # noqa: E402
+from db.place_index import PlaceSpatialIndex  # noqa: E402
+from routes.recommendations import ROLE_RADIUS_MAP, ROLE_TO_KAKAO_CODES  # noqa: E402
+from services.candidate_cache import get_candidates  # noqa: E402
+from services.recommendation_cache import MemoryTTLCache, RecommendationCache  # noqa: E402
+
+LAT_RANGE = (37.42, 37.70)
+LON_RANGE = (126.76, 127.18)
+# (이름, 위도, 경도, 트레이스 비중)
+HOTSPOTS = [
+    ("gangnam", 37.4979, 127.0276, 0.30),
+    ("hongdae", 37.5563, 126.9236, 0.15),
+    ("seongsu", 37.5446, 127.0557, 0.10),
+    ("jamsil", 37.5133, 127.1001, 0.10),
+    ("myeongdong", 37.5636, 126.9826, 0.10),
+    ("yeouido", 37.5219, 126.9245, 0.05),
+]
+TRACE_MINUTES = 120
+TTL_MINUTES = settings.RECOMMENDATION_CANDIDATE_TTL_SECONDS // 60
+
+
+class FakeKakao:
+    """카테고리 코드별 합성 장소에서 반경 내 가까운 순 15곳"""
+
+    def __init__(self, per_code: int = 20000):
+        rnd = random.Random(1)
+        self.indexes = {}
+        for code in {c for codes in ROLE_TO_KAKAO_CODES.values() for c in codes}:
+            idx = PlaceSpatialIndex(cell_deg=0.01)
+            idx.build(
+                {"id": f"{code}-{i}", "name": f"{code} {i}",
+                 "latitude": rnd.uniform(*LAT_RANGE), "longitude": rnd.uniform(*LON_RANGE)}
+                for i in range(per_code)
+            )
+            self.indexes[code] = idx
+        self.calls = 0
+
+    async def search_by_category(self, x, y, category_group_code, radius=5000, page=1, size=15):
+        self.calls += 1
+        hits = self.indexes[category_group_code].query_radius(y, x, radius, limit=size * page + 1)
+        return {
+            "documents": [
+                {"id": h["id"], "place_name": h["name"], "x": str(h["longitude"]), "y": str(h["latitude"]),
+                 "category_name": "", "distance": str(int(h["distance_meters"]))}
+                for h in hits[size * (page - 1): size * page]
+            ],
+            "meta": {"is_end": len(hits) <= size * page},
+        }
+
+
+def synthetic_trace(n: int):
+    rnd = random.Random(42)
+    roles = list(ROLE_TO_KAKAO_CODES)
+    weights = [h[3] for h in HOTSPOTS]
+    for _ in range(n):
+        minute = rnd.uniform(0, TRACE_MINUTES)
+        if rnd.random() < sum(weights):
+            name, lat, lon, _ = rnd.choices(HOTSPOTS, weights=weights)[0]
+            # 핫스팟 주변 σ≈600m
+            lat += rnd.gauss(0, 600 / 111320)
+            lon += rnd.gauss(0, 600 / (111320 * math.cos(math.radians(lat))))
+        else:
+            name, lat, lon = "other", rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE)
+        yield minute, name, lat, lon, rnd.choice(roles)
+
+
+def _nearest_within(docs, lat, lon, radius, k=15):
+    scored = []
+    for d in docs:
+        dist = haversine_m(lat, lon, float(d["y"]), float(d["x"]))
+        if dist <= radius:
+            scored.append((dist, d["id"]))
+    return {i for _, i in sorted(scored)[:k]}
+
+
+async def main(n: int) -> None:
+    kakao = FakeKakao()
+    trace = sorted(synthetic_trace(n))
+    baseline = {"all": 0, "gangnam": 0}
+    cached = {"all": 0, "gangnam": 0}
+    coverage_sum, coverage_n = 0.0, 0
+
+    window, cache = -1, None
+    for minute, name, lat, lon, role in trace:
+        # TTL 창이 바뀌면 캐시 초기화 (고정 창 근사)
+        if int(minute // TTL_MINUTES) != window:
+            window = int(minute // TTL_MINUTES)
+            cache = RecommendationCache(MemoryTTLCache(max_entries=100000))
+        codes = ROLE_TO_KAKAO_CODES[role]
+        radius = ROLE_RADIUS_MAP.get(role, 2000)
+
+        before = kakao.calls
+        docs = await get_candidates(kakao, lat, lon, codes, radius, cache=cache)
+        spent = kakao.calls - before
+        cached["all"] += spent
+        baseline["all"] += len(codes)
+        if name == "gangnam":
+            cached["gangnam"] += spent
+            baseline["gangnam"] += len(codes)
+
+        # 품질 표본: 사용자 위치 중심 직접 검색과 비교 (집계 호출 수에서는 제외)
+        if coverage_n < 500:
+            own = []
+            for code in codes:
+                own.extend((await kakao.search_by_category(lon, lat, code, radius))["documents"])
+            kakao.calls -= len(codes)
+            for code in codes:
+                truth = _nearest_within([d for d in own if d["id"].startswith(code)], lat, lon, radius)
+                got = _nearest_within([d for d in docs if d["id"].startswith(code)], lat, lon, radius)
+                if truth:
+                    coverage_sum += len(truth & got) / len(truth)
+                    coverage_n += 1
+
+    print(f"trace: {n} requests / {TRACE_MINUTES} min, cell {settings.RECOMMENDATION_CELL_DEG} deg, TTL {TTL_MINUTES} min")
+    for scope in ("all", "gangnam"):
+        ratio = baseline[scope] / cached[scope] if cached[scope] else float("inf")
+        print(f"{scope:8s} Kakao calls: baseline {baseline[scope]:6d} -> cell cache {cached[scope]:5d}  ({ratio:.1f}x fewer)")
+    print(f"coverage of user-centred nearest 15 (sampled): {coverage_sum / max(1, coverage_n):.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
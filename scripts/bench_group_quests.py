@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+협동 퀘스트 목록 N+1 제거 벤치마크 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- httpx MockTransport 로 group_quests / group_quest_participants 를 흉내 내고 요청마다 왕복 지연(RTT)을 준다.
+- 기존 방식: 퀘스트 목록 1회 + 퀘스트마다 참여자 1회 (순차)
+- 배치 방식: routes.social.get_active_group_quests 그대로 호출 (퀘스트 목록 1회 + 참여자 in.(...) 1회)
+- 두 방식의 current_participants / checked_in_count / is_joined 가 같은지도 확인.
+
+RTT 20ms 기준: 20개 퀘스트 21회 왕복 455ms → 2회 46ms, 100개 퀘스트 101회 왕복 2242ms → 2회 47ms
+
+사용: python scripts/bench_group_quests.py [RTT밀리초]
+"""
+import asyncio
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from routes.social import get_active_group_quests  # noqa: E402
+
+USER_ID = "user-bench"
+
+
+def make_dataset(n_quests: int):
+    rnd = random.Random(n_quests)
+    quests, participants = [], []
+    for i in range(n_quests):
+        qid = str(uuid.UUID(int=rnd.getrandbits(128)))
+        quests.append({
+            "id": qid, "creator_id": f"user-{i}", "place_id": f"place-{i}", "place_name": f"장소 {i}",
+            "place_address": "", "max_participants": 4, "status": "active",
+            "created_at": f"2026-10-17T{i % 24:02d}:00:00Z", "expires_at": None,
+        })
+        members = rnd.sample([USER_ID] + [f"user-{j}" for j in range(50)], rnd.randint(1, 4))
+        for uid in members:
+            participants.append({"group_quest_id": qid, "user_id": uid, "checked_in": rnd.random() < 0.4})
+    return quests, participants
+
+
+def fake_postgrest(quests, participants, rtt: float):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(rtt)
+        table = request.url.path.rsplit("/", 1)[-1]
+        params = request.url.params
+        if table == "group_quests":
+            rows = [q for q in quests if q["status"] == "active"][: int(params.get("limit", "1000"))]
+        elif table == "group_quest_participants":
+            flt = params.get("group_quest_id", "")
+            if flt.startswith("eq."):
+                wanted = {flt[3:]}
+            else:
+                wanted = set(flt[len("in.("):-1].split(","))
+            rows = [p for p in participants if p["group_quest_id"] in wanted]
+        else:
+            return httpx.Response(404, json=[])
+        return httpx.Response(200, json=rows)
+    return httpx.MockTransport(handler)
+
+
+async def legacy_active_group_quests(db, user_id: str, limit: int):
+    """변경 전 라우트의 N+1 루프 (비교용)"""
+    async with db.http.session(timeout=10.0) as client:
+        response = await client.get(
+            f"{db.base_url}/rest/v1/group_quests",
+            headers=db.headers,
+            params={"status": "eq.active", "order": "created_at.desc", "limit": str(limit)},
+        )
+        quests = response.json()
+        for quest in quests:
+            participants_response = await client.get(
+                f"{db.base_url}/rest/v1/group_quest_participants",
+                headers=db.headers,
+                params={"group_quest_id": f"eq.{quest.get('id')}", "select": "user_id,checked_in"},
+            )
+            participants = participants_response.json()
+            quest["current_participants"] = len(participants)
+            quest["checked_in_count"] = sum(1 for p in participants if p.get("checked_in"))
+            quest["is_joined"] = any(p.get("user_id") == user_id for p in participants)
+    return {"quests": quests}
+
+
+def _round_trips(http: SharedHttpClient) -> int:
+    return sum(e["requests"] for e in http.metrics()["endpoints"].values())
+
+
+def _summary(result):
+    return [(q["id"], q["current_participants"], q["checked_in_count"], q["is_joined"]) for q in result["quests"]]
+
+
+async def run(n_quests: int, rtt: float) -> None:
+    quests, participants = make_dataset(n_quests)
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=fake_postgrest(quests, participants, rtt), base_url="http://fake")
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+
+    results = {}
+    for name, call in (
+        ("legacy N+1", lambda: legacy_active_group_quests(db, USER_ID, n_quests)),
+        ("batched", lambda: get_active_group_quests(user_id=USER_ID, limit=n_quests, db=db)),
+    ):
+        before = _round_trips(http)
+        start = time.perf_counter()
+        results[name] = await call()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  {name:10s} quests={n_quests:3d}  round trips={_round_trips(http) - before:3d}  latency={elapsed:7.1f} ms")
+    same = _summary(results["legacy N+1"]) == _summary(results["batched"])
+    print(f"  same counts/is_joined: {same}")
+    await http.aclose()
+
+
+async def main(rtt_ms: float) -> None:
+    print(f"simulated PostgREST RTT {rtt_ms:.0f} ms")
+    for n in (20, 100):
+        await run(n, rtt_ms / 1000)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 게이트웨이 부하 테스트 (로컬 스텁 서버, 실제 Anthropic API 호출 없음)
+- 스텁 /v1/messages 가 지정 지연 후 고정 응답을 돌려준다.
+- 동시 요청 N개를 쏘아 동시성 한도·포화 폴백·타임아웃·지연 히스토그램을 확인.
+
+사용: python scripts/bench_llm_gateway.py [동시요청수] [스텁지연초]
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+
+from core.llm_gateway import LLMGateway  # noqa: E402
+
+STUB_PORT = 8799
+
+stub = FastAPI()
+
+
+@stub.post("/v1/messages")
+async def _messages(request: Request):
+    body = await request.json()
+    # metadata.user_id 에 지연(초)을 실어 보낸다
+    await asyncio.sleep(float(body.get("metadata", {}).get("user_id", "0.5")))
+    return {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": body["model"],
+        "content": [{"type": "text", "text": "stub"}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    }
+
+
+async def main(concurrency: int, delay: float) -> None:
+    server = uvicorn.Server(uvicorn.Config(stub, port=STUB_PORT, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    gateway = LLMGateway(
+        api_key="stub",
+        base_url=f"http://127.0.0.1:{STUB_PORT}",
+        max_concurrency=8,
+        queue_timeout=1.0,
+        call_timeout=delay * 4,
+        max_retries=0,
+    )
+
+    async def one(site: str, seconds: float) -> str:
+        try:
+            await gateway.create(
+                site,
+                model="stub",
+                max_tokens=8,
+                messages=[{"role": "user", "content": "ping"}],
+                metadata={"user_id": str(seconds)},
+            )
+            return "ok"
+        except Exception as e:
+            return type(e).__name__
+
+    # 워밍업 (커넥션 수립)
+    await one("warmup", 0)
+    results = await asyncio.gather(
+        *[one("burst", delay) for _ in range(concurrency)],
+        one("slow", delay * 10),
+    )
+    summary = {}
+    for r in results:
+        summary[r] = summary.get(r, 0) + 1
+    print("결과:", summary)
+    print(json.dumps(gateway.metrics(), indent=2, ensure_ascii=False))
+
+    await gateway.aclose()
+    server.should_exit = True
+    await serve_task
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    d = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    asyncio.run(main(n, d))
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+방문 기록 장소 정보 보완(hydration) 벤치마크 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- httpx MockTransport 로 visits / places 를 흉내 내고 요청마다 왕복 지연(RTT)을 준다.
+- 기존 방식: 방문마다 get_place_by_id (N+1, 순차)
+- 변경 후: routes.ai_features.analyze_pattern / routes.visits.get_user_visits 를 그대로 호출
+  (get_places_by_ids: 캐시 미스만 places?id=in.(...) 1회, 두 번째 호출부터는 프로세스 캐시)
+- places 테이블 왕복 수·지연과, 기존 방식과 같은 카테고리가 붙는지 확인.
+
+RTT 20ms, 방문 100건(장소 60곳): 기존 places 100회 왕복 2.1s → 첫 호출 1회 (방문 조회 포함 44ms) → 캐시 적중 시 0회 (27ms)
+
+사용: python scripts/bench_place_hydration.py [RTT밀리초]
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.dependencies import Database  # noqa: E402
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.place_cache import place_cache  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from routes.ai_features import PatternAnalysisRequest, analyze_pattern  # noqa: E402
+from routes.visits import get_user_visits  # noqa: E402
+
+USER_ID = "user-bench"
+CATEGORIES = ("카페", "맛집", "공원", "전시", "서점")
+
+
+def make_dataset(n_visits: int, n_places: int):
+    rnd = random.Random(n_visits)
+    places = [
+        {"id": f"kakao-{1000 + i}", "name": f"장소 {i}", "primary_category": CATEGORIES[i % len(CATEGORIES)],
+         "latitude": 37.5 + rnd.random() * 0.1, "longitude": 126.9 + rnd.random() * 0.1}
+        for i in range(n_places)
+    ]
+    now = datetime.now(timezone.utc)
+    visits = [
+        {"id": f"{i:08d}-0000-0000-0000-000000000000", "user_id": USER_ID,
+         "place_id": rnd.choice(places)["id"], "visited_at": (now - timedelta(hours=6 * i)).isoformat(),
+         "duration_minutes": 60, "xp_earned": 100, "rating": 4.0, "spent_amount": 10000, "companions": 1}
+        for i in range(n_visits)
+    ]
+    return visits, places
+
+
+def fake_postgrest(visits, places, rtt: float, traffic):
+    by_id = {p["id"]: p for p in places}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(rtt)
+        table = request.url.path.rsplit("/", 1)[-1]
+        params = request.url.params
+        traffic[table] = traffic.get(table, 0) + 1
+        if table == "visits":
+            rows = visits[: int(params.get("limit", "100"))]
+        elif table == "places":
+            flt = params.get("id", "")
+            if flt.startswith("eq."):
+                wanted = [flt[3:]]
+            else:
+                wanted = [v.strip('"') for v in flt[len("in.("):-1].split(",")]
+            rows = [by_id[w] for w in wanted if w in by_id]
+        else:
+            rows = []
+        return httpx.Response(200, json=rows)
+    return httpx.MockTransport(handler)
+
+
+async def legacy_categories(db, visits):
+    """변경 전 analyze_pattern 의 방문별 get_place_by_id 루프 (캐시 없이)"""
+    categories = []
+    async with db.http.session(timeout=10.0) as client:
+        for v in visits:
+            response = await client.get(
+                f"{db.base_url}/rest/v1/places", headers=db.headers,
+                params={"select": "*", "id": f"eq.{v['place_id']}", "limit": 1},
+            )
+            rows = response.json()
+            categories.append(rows[0].get("primary_category") if rows else "기타")
+    return categories
+
+
+async def timed(label, traffic, call):
+    before = traffic.get("places", 0)
+    start = time.perf_counter()
+    result = await call()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  {label:36s} places round trips={traffic.get('places', 0) - before:3d}  latency={elapsed:7.1f} ms")
+    return result
+
+
+async def main(rtt_ms: float) -> None:
+    visits, places = make_dataset(100, 60)
+    traffic = {}
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=fake_postgrest(visits, places, rtt_ms / 1000, traffic), base_url="http://fake")
+    Database.http = http  # analyze_pattern 이 내부에서 만드는 RestDatabaseHelpers 도 가짜 풀 사용
+    db = RestDatabaseHelpers(http=http)
+    print(f"simulated PostgREST RTT {rtt_ms:.0f} ms, {len(visits)} visits over {len(places)} places")
+
+    legacy = await timed("legacy get_place_by_id loop", traffic, lambda: legacy_categories(db, visits))
+    place_cache.clear()
+    await timed("analyze_pattern (cold cache)", traffic,
+                lambda: analyze_pattern(PatternAnalysisRequest(user_id=USER_ID, days=90)))
+    await timed("analyze_pattern (warm cache)", traffic,
+                lambda: analyze_pattern(PatternAnalysisRequest(user_id=USER_ID, days=90)))
+    place_cache.clear()
+    listing = await timed("GET /visits (cold cache)", traffic,
+                          lambda: get_user_visits(user_id=USER_ID, days=90, limit=100, cursor=None, db=db))
+    hydrated = [v["category"] for v in listing["visits"]]
+    print(f"  same categories as legacy loop: {hydrated == legacy}")
+    print(f"  place cache: {place_cache.metrics()}")
+    await http.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+장소 공간 인덱스 벤치마크 (반경/kNN 질의 지연 + 1M곳 메모리 사용량)
+- 재구성 직전까지 delta 가 찬 상태(옮겨진 장소 max(1000, 2%·N))의 반경 3km 질의 지연과, 재구성 후 결과가 같은지도 확인.
+
+n=   10,000  delta=1,000   radius3km with delta=0.76ms  after rebuild=0.78ms  same=True
+n=  100,000  delta=2,000   radius3km with delta=1.11ms  after rebuild=1.08ms  same=True
+n=1,000,000  delta=20,000  radius3km with delta=5.29ms  after rebuild=3.27ms  same=True
+(delta 를 행마다 스칼라 haversine 으로 거르던 때 1M·delta 2만: 116ms)
+"""
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from db.place_index import INDEX_COLUMNS, PlaceSpatialIndex  # noqa: E402
+
+# 서울 대략 범위
+LAT_RANGE = (37.42, 37.70)
+LON_RANGE = (126.76, 127.18)
+
+
+def synthetic_places(n: int):
+    rnd = random.Random(42)
+    for i in range(n):
+        yield {
+            "id": f"kakao-{i}",
+            "name": f"장소 {i}",
+            "address": f"서울 어딘가 {i}번길",
+            "latitude": rnd.uniform(*LAT_RANGE),
+            "longitude": rnd.uniform(*LON_RANGE),
+            "primary_category": rnd.choice(["카페", "음식점", "공원", "서점", "갤러리"]),
+            "vibe_tags": [],
+            "description": "",
+            "average_rating": round(rnd.uniform(3, 5), 1),
+            "is_hidden_gem": rnd.random() < 0.1,
+            "typical_crowd_level": "medium",
+            "average_price": 10000,
+        }
+
+
+def bench(n: int, queries: int = 2000):
+    places = list(synthetic_places(n))
+    tracemalloc.start()
+    index = PlaceSpatialIndex()
+    t0 = time.perf_counter()
+    index.build(places)
+    build_s = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrays_mb = (index._lat.nbytes + index._lon.nbytes + index._alive.nbytes) / 1e6
+
+    rnd = random.Random(7)
+    points = [(rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE)) for _ in range(queries)]
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        index.query_radius(lat, lon, 500, limit=50)
+    radius_us = (time.perf_counter() - t0) / queries * 1e6
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        index.query_knn(lat, lon, k=10)
+    knn_us = (time.perf_counter() - t0) / queries * 1e6
+    print(
+        f"n={n:>9,}  build={build_s:6.2f}s  index_mem={current / 1e6:7.1f}MB (arrays {arrays_mb:5.1f}MB, peak {peak / 1e6:7.1f}MB)"
+        f"  radius500m={radius_us:8.1f}us  knn10={knn_us:8.1f}us"
+    )
+
+    # 재구성 직전까지 delta 가 찬 상태: 옮겨진 장소 max(1000, 2%·N) 곳
+    moved = max(1000, int(n * index.rebuild_ratio))
+    rnd = random.Random(11)
+    index.upsert(
+        {**places[i], "latitude": rnd.uniform(*LAT_RANGE), "longitude": rnd.uniform(*LON_RANGE)}
+        for i in rnd.sample(range(n), moved)
+    )
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        index.query_radius(lat, lon, 3000, limit=200)
+    delta_ms = (time.perf_counter() - t0) / queries * 1e3
+    fresh = PlaceSpatialIndex()
+    fresh.build([dict(zip(INDEX_COLUMNS, r)) for r in index._live_rows()()])
+    same = all(
+        [p["id"] for p in index.query_radius(lat, lon, 3000, 200)] == [p["id"] for p in fresh.query_radius(lat, lon, 3000, 200)]
+        for lat, lon in points[:200]
+    )
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        fresh.query_radius(lat, lon, 3000, limit=200)
+    fresh_ms = (time.perf_counter() - t0) / queries * 1e3
+    print(f"{'':13}delta={len(index._delta):,}  radius3km with delta={delta_ms:.2f}ms  after rebuild={fresh_ms:.2f}ms  same={same}")
+
+
+if __name__ == "__main__":
+    for n in (10_000, 100_000, 1_000_000):
+        bench(n)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+RestDatabaseHelpers.get_places_nearby 벤치마크 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- 서울 범위 합성 장소 10k / 100k / 1M곳, 반경 3km·limit 200, 요청마다 지연 LATENCY_MS.
+- 가짜 서버: places_within_radius RPC 는 404(미배포), places 바운딩 박스 GET 은 위도 정렬 + bisect 로 박스를 찾고
+  order=id.asc / id=gt.<마지막 id> 키셋 페이지(BBOX_PAGE_SIZE)로 응답.
+1) legacy: 호출마다 RPC 404 → 바운딩 박스 GET (RADIUS_RPC_RETRY_SECONDS 가 지나 다시 확인하는 경우와 같음)
+2) remembered: 첫 404를 기억해 재확인 전까지 바로 바운딩 박스 GET
+3) index: 인메모리 공간 인덱스(db/place_index.py) 로드 후 (왕복 0회)
+각 경로 응답 id 가 같은지 함께 확인 (바운딩 박스는 끝까지 페이지를 읽으므로 밀집 구역에서도 같아야 함).
+
+왕복 지연 15ms, 질의 200회 기준 (p50 에는 가짜 서버의 박스 필터 시간도 포함):
+n=   10,000  legacy  2.00 calls p50   39.3ms | remembered  1.00 calls p50   22.9ms | index p50 0.85ms  bbox rows    283 same=True
+n=  100,000  legacy  4.55 calls p50  155.1ms | remembered  3.55 calls p50  134.4ms | index p50 1.22ms  bbox rows  2,826 same=True
+n=1,000,000  legacy 29.89 calls p50 1361.2ms | remembered 28.89 calls p50 1245.9ms | index p50 3.36ms  bbox rows 28,257 same=True
+- RPC 404 를 기억하면 호출당 왕복 1회(≈15ms)가 줄어듦
+- 박스 첫 1000행만 받던 때는 100k 이상에서 가까운 장소를 놓쳤음(same=False). 이제 결과는 같지만 밀집 구역에선
+  박스 행 수 / 1000 번 왕복 → 그 규모에서는 인덱스나 places_within_radius RPC 배포가 필요
+- 10k 에서 결과가 달랐던 원인: METERS_PER_DEG_LAT(111.32km)가 haversine 구 반지름과 달라 박스가 0.1% 좁았음 (db/geo.py 수정)
+
+사용: python scripts/bench_places_nearby.py [질의수]
+"""
+import asyncio
+import bisect
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.http_client import SharedHttpClient  # noqa: E402
+from db import rest_helpers as rest_module  # noqa: E402
+from db.place_index import PlaceSpatialIndex  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+
+LATENCY_MS = 15
+RADIUS_M = 3000
+LIMIT = 200
+LAT_RANGE = (37.42, 37.70)
+LON_RANGE = (126.76, 127.18)
+BBOX = re.compile(r"\(latitude\.gte\.([-\d.e]+),latitude\.lte\.([-\d.e]+),longitude\.gte\.([-\d.e]+),longitude\.lte\.([-\d.e]+)\)")
+
+
+def synthetic_places(n: int):
+    rnd = random.Random(42)
+    return [
+        {
+            "id": f"kakao-{i}",
+            "name": f"장소 {i}",
+            "address": f"서울 어딘가 {i}번길",
+            "latitude": rnd.uniform(*LAT_RANGE),
+            "longitude": rnd.uniform(*LON_RANGE),
+            "primary_category": rnd.choice(["카페", "음식점", "공원", "서점", "갤러리"]),
+            "vibe_tags": [],
+            "description": "",
+            "average_rating": round(rnd.uniform(3, 5), 1),
+            "is_hidden_gem": rnd.random() < 0.1,
+            "typical_crowd_level": "medium",
+            "average_price": 10000,
+        }
+        for i in range(n)
+    ]
+
+
+class FakePostgrest:
+    def __init__(self, places):
+        self.places = sorted(places, key=lambda p: p["latitude"])
+        self.lats = [p["latitude"] for p in self.places]
+        self.calls = 0
+        self.rows = 0
+        self.boxes = {}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(LATENCY_MS / 1000)
+        if request.url.path.endswith("/rpc/places_within_radius"):
+            return httpx.Response(404, json={"code": "PGRST202", "message": "function not found"})
+        box = request.url.params["and"]
+        if box not in self.boxes:
+            min_lat, max_lat, min_lon, max_lon = map(float, BBOX.match(box).groups())
+            matched = [
+                self.places[i]
+                for i in range(bisect.bisect_left(self.lats, min_lat), bisect.bisect_right(self.lats, max_lat))
+                if min_lon <= self.places[i]["longitude"] <= max_lon
+            ]
+            if request.url.params.get("order") == "id.asc":
+                matched.sort(key=lambda p: p["id"])
+            self.boxes = {box: (matched, [p["id"] for p in matched])}
+        matched, ids = self.boxes[box]
+        start = 0
+        after = request.url.params.get("id")
+        if after:
+            start = bisect.bisect_right(ids, after[len("gt."):])
+        rows = matched[start:start + int(request.url.params["limit"])]
+        self.rows += len(rows)
+        return httpx.Response(200, content=json.dumps(rows).encode(), headers={"content-type": "application/json"})
+
+
+def fake_db(server: FakePostgrest) -> RestDatabaseHelpers:
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    return db
+
+
+async def run(db, server, points, forget: bool):
+    server.calls = server.rows = 0
+    samples, ids = [], []
+    for lat, lon in points:
+        if forget:
+            RestDatabaseHelpers._radius_rpc_missing_until = 0.0
+        t = time.perf_counter()
+        result = await db.get_places_nearby(lat, lon, RADIUS_M, LIMIT)
+        samples.append((time.perf_counter() - t) * 1000)
+        ids.append([p["id"] for p in result])
+    return server.calls / len(points), statistics.median(samples), server.rows / len(points), ids
+
+
+async def bench(n: int, queries: int) -> None:
+    places = synthetic_places(n)
+    server = FakePostgrest(places)
+    db = fake_db(server)
+    rnd = random.Random(7)
+    points = [(rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE)) for _ in range(queries)]
+
+    index = PlaceSpatialIndex()
+    rest_module.place_index = index
+    legacy_calls, legacy_ms, bbox_rows, legacy_ids = await run(db, server, points, forget=True)
+    remembered_calls, remembered_ms, _, _ = await run(db, server, points, forget=False)
+
+    index.build(places)
+    _, index_ms, _, index_ids = await run(db, server, points, forget=False)
+    same = all(a == b for a, b in zip(legacy_ids, index_ids))
+    print(f"n={n:>9,}  legacy {legacy_calls:.2f} calls p50 {legacy_ms:.1f}ms | "
+          f"remembered {remembered_calls:.2f} calls p50 {remembered_ms:.1f}ms | "
+          f"index p50 {index_ms:.2f}ms  bbox rows {bbox_rows:,.0f} same={same}")
+
+
+if __name__ == "__main__":
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for n in (10_000, 100_000, 1_000_000):
+        asyncio.run(bench(n, queries))
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+일일 푸시 일괄 발송 벤치마크 (로컬 가짜 푸시 서비스, 실제 FCM/Mozilla 호출 없음)
+- 127.0.0.1 에 asyncio 로 만든 HTTP/1.1 keep-alive 서버를 띄워 푸시 서비스 흉내:
+  요청마다 지연(기본 30ms), endpoint 의 일부는 410(만료), 일부는 첫 요청에 503(재시도 대상).
+  받은 요청 수와 TCP 연결 수를 세어 커넥션 재사용을 확인.
+- 구독 N건은 실제 P-256 키(p256dh)/auth 로 만들어 페이로드 암호화까지 그대로 수행.
+- 기존 방식: 사용자마다 run_in_executor(webpush(...)) 를 순차 실행 (요청마다 새 requests 연결) — 일부만 측정
+- 변경 후: services.push_service.broadcast (가짜 PostgREST 에서 구독을 페이지로 읽고 410 구독은 삭제 요청)
+
+지연 30ms, 구독 2000건(만료 5%, 일시 오류 2%): 기존 순차 200건 7.0s (29/s, 요청마다 새 연결 200개) →
+broadcast 2000건 3.3~5.0s (400~600/s, 연결 64개 재사용 — 가짜 서버·암호화가 같은 프로세스라 CPU 한계),
+PostgREST 구독 페이지 조회 3회 + 삭제 1회로 만료 100건 삭제, 503 40건은 재시도로 모두 성공.
+풀 1개에 연결 64개를 두면 httpcore 풀 배정 비용(연결 수 제곱) 때문에 49/s 까지 떨어져 8개씩 샤드로 나눔.
+잘못 저장된 endpoint("http://[::1/x", httpx.InvalidURL) 를 동시성보다 많이 섞어도 발송이 끝까지 진행
+(이전에는 워커가 죽어 dispatch 가 예외로 중단되거나 큐가 가득 차 멈춤): 200건 중 잘못된 67건 → sent 127 / gone 6 /
+invalid 67, 구독 API 는 https 가 아니거나 파싱되지 않는 endpoint 를 거부.
+
+사용: python scripts/bench_push_dispatch.py [구독수] [지연밀리초]
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+
+GONE_EVERY = 20     # 5% 만료 구독
+FLAKY_EVERY = 50    # 2% 첫 요청 503
+
+
+def b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def make_vapid_key() -> str:
+    key = ec.generate_private_key(ec.SECP256R1())
+    return b64url(key.private_numbers().private_value.to_bytes(32, "big"))
+
+
+def make_subscriptions(n: int, port: int):
+    # 수신 브라우저 키는 몇 개만 만들어 돌려 씀 (키 생성 시간은 측정 대상 아님)
+    keys = []
+    for _ in range(16):
+        pub = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+        )
+        keys.append((b64url(pub), b64url(os.urandom(16))))
+    return [
+        {"id": f"{i:08d}-0000-0000-0000-000000000000", "user_id": f"user-{i}",
+         "endpoint": f"http://127.0.0.1:{port}/push/{i}", "p256dh": keys[i % 16][0], "auth": keys[i % 16][1]}
+        for i in range(n)
+    ]
+
+
+class FakePushService:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.statuses = {}
+        self._seen = set()
+
+    def status_for(self, path: str) -> int:
+        i = int(path.rsplit("/", 1)[-1])
+        if i % GONE_EVERY == 0:
+            return 410
+        if i % FLAKY_EVERY == 1 and i not in self._seen:
+            self._seen.add(i)
+            return 503
+        return 201
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                path = line.split()[1].decode()
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                status = self.status_for(path)
+                self.requests += 1
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: 0\r\nRetry-After: 0\r\n\r\n".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def fake_postgrest(subs, traffic):
+    rows = sorted(subs, key=lambda s: s["id"])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        if request.method == "DELETE":
+            traffic["deletes"] += 1
+            flt = params.get("endpoint", "")[len("in.("):-1]
+            traffic["deleted"] += len(flt.split('","'))
+            return httpx.Response(204)
+        traffic["reads"] += 1
+        after = params.get("id", "gt.")[3:]
+        page = [r for r in rows if r["id"] > after][: int(params.get("limit", "1000"))]
+        cols = params.get("select", "*").split(",")
+        return httpx.Response(200, json=[{c: r[c] for c in cols} for r in page])
+    return httpx.MockTransport(handler)
+
+
+async def legacy(subs, service) -> None:
+    """변경 전 send_push_for_user 와 같은 순차 경로 (pywebpush.webpush → requests, 연결 재사용 없음)"""
+    from pywebpush import WebPushException, webpush
+    before_conn, before_req = service.connections, service.requests
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    for s in subs:
+        info = {"endpoint": s["endpoint"], "keys": {"p256dh": s["p256dh"], "auth": s["auth"]}}
+        try:
+            await loop.run_in_executor(None, lambda: webpush(
+                info, data=json.dumps({"title": "t", "body": "b"}), vapid_private_key=settings.VAPID_PRIVATE_KEY,
+                vapid_claims={"sub": settings.VAPID_EMAIL},
+            ))
+        except WebPushException:
+            pass
+    elapsed = time.perf_counter() - start
+    print(f"  legacy serial ({len(subs)} subs)     {elapsed:6.2f} s  {len(subs) / elapsed:7.1f}/s  "
+          f"requests={service.requests - before_req} connections={service.connections - before_conn}")
+
+
+async def main(n: int, latency_ms: float) -> None:
+    settings.VAPID_PRIVATE_KEY = make_vapid_key()
+    service = FakePushService(latency_ms / 1000)
+    server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    subs = make_subscriptions(n, port)
+    print(f"fake push service 127.0.0.1:{port}, latency {latency_ms:.0f} ms, {n} subscriptions, "
+          f"concurrency {settings.PUSH_MAX_CONCURRENCY}")
+
+    await legacy(subs[: max(1, n // 10)], service)
+    service._seen.clear()
+
+    from services import push_service
+    traffic = {"reads": 0, "deletes": 0, "deleted": 0}
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=fake_postgrest(subs, traffic), base_url="http://fake")
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    before_conn = service.connections
+    report = await push_service.broadcast(db, "☀️ 오늘의 한 곳", "앱을 열어 확인해보세요!")
+    print(f"  broadcast ({report['total']} subs)       {report['elapsed_seconds']:6.2f} s  "
+          f"{report['per_second']:7.1f}/s  connections={service.connections - before_conn}")
+    print(f"  report: sent={report['sent']} gone={report['gone']} removed={report['removed']} "
+          f"failed={report['failed']} retried={report['retried']} statuses={report['statuses']}")
+    print(f"  PostgREST: subscription pages={traffic['reads']} delete calls={traffic['deletes']} "
+          f"endpoints deleted={traffic['deleted']} (expected {len(range(0, n, GONE_EVERY))})")
+
+    # 잘못 저장된 endpoint 를 동시성보다 많이 섞은 발송 (이전: 워커 사망 → 예외 또는 무한 대기)
+    poisoned = [dict(s) for s in subs[:200]]
+    for s in poisoned[::3]:
+        s["endpoint"] = "http://[::1/x"
+    dispatcher = push_service.PushDispatcher(concurrency=8)
+    report = await asyncio.wait_for(dispatcher.dispatch(poisoned, "t", "b"), timeout=30)
+    print(f"  poisoned ({report['total']} subs, {len(poisoned[::3])} bad endpoints) "
+          f"sent={report['sent']} gone={report['gone']} failed={report['failed']} "
+          f"statuses={report['statuses']}")
+    print(f"  subscribe validation: https ok={push_service.valid_endpoint('https://fcm.googleapis.com/fcm/send/abc')} "
+          f"bad ipv6={push_service.valid_endpoint('http://[::1/x')} http={push_service.valid_endpoint('http://x.com/a')}")
+
+    await push_service.aclose_push()
+    await http.aclose()
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 30,
+    ))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+추천 캐시 백엔드 벤치마크 (single-flight 스탬피드 + 히트/미스/축출 카운터)
+- memory: 프로세스 내 LRU+TTL
+- redis: fakeredis 를 로컬 대체 서버로 사용 (pip install fakeredis). 워커 2개를 각각 별도
+  RecommendationCache 로 흉내 내 SET NX 잠금으로 워커 간 중복 계산이 막히는지 확인.
+  잠금 소유 확인: 워커 A 잠금 만료 후 B 가 잡은 잠금을 A 의 늦은 unlock 이 지우지 않아야 함
+  (토큰 비교 삭제는 Lua EVAL 사용 — fakeredis 는 lupa 가 있어야 지원, 없으면 건너뜀·unlock 은 errors 로 집계되고 PX 만료로 풀림).
+
+결과 (200 동시 요청, fakeredis + lupa): redis 2 workers computations=1, errors=0,
+lock owner: B 잠금 유지(A 늦은 unlock 후)=True, B unlock 후 해제=True
+
+사용: python scripts/bench_recommendation_cache.py [동시요청수]
+"""
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from services.recommendation_cache import (  # noqa: E402
+    MemoryTTLCache,
+    RecommendationCache,
+    RedisCache,
+)
+
+
+def make_compute(counter: dict, delay: float = 0.2):
+    async def compute():
+        counter["calls"] += 1
+        await asyncio.sleep(delay)  # Kakao 후보 조회 흉내
+        return {"recommendations": [{"place_id": "p1"}], "generated_at": time.time()}
+    return compute
+
+
+async def stampede(caches, n: int) -> dict:
+    counter = {"calls": 0}
+    compute = make_compute(counter)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        caches[i % len(caches)].get_or_compute("same-key", 60, compute) for i in range(n)
+    ])
+    return {"requests": n, "computations": counter["calls"], "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+async def lru_churn() -> dict:
+    cache = RecommendationCache(MemoryTTLCache(max_entries=1000))
+    counter = {"calls": 0}
+    compute = make_compute(counter, delay=0)
+    rnd = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(50000):
+        await cache.get_or_compute(f"k{rnd.randrange(1500)}", 60, compute)
+    elapsed = time.perf_counter() - start
+    m = await cache.metrics()
+    return {"ops": 50000, "us_per_op": round(elapsed / 50000 * 1e6, 2), **{k: m[k] for k in ("hits", "misses", "evictions")}}
+
+
+async def main(n: int) -> None:
+    memory = RecommendationCache(MemoryTTLCache())
+    print("memory  stampede:", await stampede([memory], n))
+    print("memory  metrics :", await memory.metrics())
+    print("memory  LRU churn (random 1500 keys / 1000 slots):", await lru_churn())
+
+    try:
+        import fakeredis
+    except ImportError:
+        print("redis   : fakeredis 미설치 — 건너뜀 (pip install fakeredis)")
+        return
+    server = fakeredis.FakeServer()
+    workers = [
+        RecommendationCache(RedisCache(client=fakeredis.FakeAsyncRedis(server=server)))
+        for _ in range(2)
+    ]
+    print("redis   stampede (2 workers):", await stampede(workers, n))
+    print("redis   metrics (worker 0):", await workers[0].metrics())
+
+    a, b = (w.backend for w in workers)
+    token_a = await a.try_lock("lock-key", 5)
+    await a.client.delete(a.prefix + a.LOCK_PREFIX + "lock-key")  # A 의 잠금 만료 흉내
+    token_b = await b.try_lock("lock-key", 5)
+    errors = a.errors
+    await a.unlock("lock-key", token_a)
+    if a.errors > errors:
+        print("redis   lock owner: EVAL 미지원(fakeredis, lupa 없음) — 건너뜀")
+        return
+    kept = await b.client.get(b.prefix + b.LOCK_PREFIX + "lock-key") is not None
+    await b.unlock("lock-key", token_b)
+    released = await b.client.get(b.prefix + b.LOCK_PREFIX + "lock-key") is None
+    print(f"redis   lock owner: B 잠금 유지(A 늦은 unlock 후)={kept}, B unlock 후 해제={released}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""추천 스코어링 커널 벤치마크: 스칼라 _score_and_rank vs 벡터 _score_and_rank_vectorized"""
+import asyncio
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend_old"))
+
+from recommendation_engine import MoodInput, RecommendationEngine  # noqa: E402
+from role_definitions import RoleType  # noqa: E402
+
+CATEGORIES = ["카페", "서점", "공원", "갤러리", "음식점", "바", "박물관", "산책로"]
+TAGS = ["quiet", "cozy", "calm", "energetic", "vibrant", "lively", "warm", "social", "intimate"]
+
+
+def synthetic_candidates(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    return [
+        {
+            "place_id": f"p{i}",
+            "name": f"장소 {i}",
+            "address": "",
+            "primary_category": rnd.choice(CATEGORIES),
+            "secondary_categories": rnd.sample(CATEGORIES, rnd.randint(0, 2)),
+            "average_price": rnd.choice([0, 5000, 15000, 40000, 90000]),
+            "vibe_tags": rnd.sample(TAGS, rnd.randint(0, 3)),
+            "is_hidden_gem": rnd.random() < 0.1,
+            "distance_meters": rnd.uniform(0, 5000),
+        }
+        for i in range(n)
+    ]
+
+
+def check_identical(engine, candidates, role, level, mood, top_k=3):
+    """같은 시드에서 스칼라 경로 Top-K 와 결과가 같은지 확인"""
+    random.seed(1234)
+    scalar = asyncio.run(engine._score_and_rank(
+        copy.deepcopy(candidates), role, level, None, mood, "rainy", "evening"))[:top_k]
+    random.seed(1234)
+    vector = engine._score_and_rank_vectorized(
+        copy.deepcopy(candidates), role, level, mood, "rainy", "evening", top_k)
+    keys = ("place_id", "final_score", "score_breakdown", "reason")
+    assert [[p[k] for k in keys] for p in scalar] == [[p[k] for k in keys] for p in vector]
+
+
+def bench(n: int, repeat: int = 20):
+    engine = RecommendationEngine(db_pool=None)
+    mood = MoodInput(mood_text="지침", intensity=0.6)
+    candidates = synthetic_candidates(n)
+    for role in RoleType:
+        check_identical(engine, candidates, role, 7, mood)
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        asyncio.run(engine._score_and_rank(
+            copy.copy(candidates), RoleType.EXPLORER, 7, None, mood, "rainy", "evening"))
+    scalar_ms = (time.perf_counter() - t0) / repeat * 1000
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        engine._score_and_rank_vectorized(candidates, RoleType.EXPLORER, 7, mood, "rainy", "evening", 3)
+    vector_ms = (time.perf_counter() - t0) / repeat * 1000
+    print(f"n={n:>6,}  scalar={scalar_ms:8.2f}ms  vectorized={vector_ms:7.2f}ms  speedup={scalar_ms / vector_ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    for n in (100, 1_000, 10_000):
+        bench(n)
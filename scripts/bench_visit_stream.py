@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+방문 이력 스트리밍 리더 검증·벤치마크 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- httpx MockTransport 로 visits 테이블을 흉내: user_id=eq / visited_at=gte / keyset or=(...) / order / limit / select 처리.
+- 헤비 유저(방문 N건, 약 2년치)에 대해
+  1) 기존 get_user_visits(user_id, 365): days 무시 + 100행 상한 → 집계가 잘림
+  2) iter_user_visits: 기간은 서버 필터, 필요한 컬럼만, 500행 페이지 → 전체 이력 집계
+  를 비교하고, 왕복 수·응답 바이트·집계 중 최대 메모리(tracemalloc)를 출력.
+
+방문 5000건 기준: 기존 100행만 집계 (365일 XP 13,770 vs 실제 365,170) / 스트리밍은 365일치 2,553건을
+왕복 6회에 정확히 집계, 컬럼 projection 으로 응답 671KB → 359KB. 20000건도 최대 메모리 1.7MB 수준
+(가짜 서버의 페이지 직렬화 포함) — 행 목록을 쌓지 않으므로 이력 길이에 비례해 늘지 않음.
+
+사용: python scripts/bench_visit_stream.py [방문수]
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from services.user_stats import VISIT_COLUMNS, VisitAccumulator  # noqa: E402
+
+USER_ID = "user-heavy"
+
+
+def make_visits(n: int):
+    rnd = random.Random(n)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        at = now - timedelta(minutes=rnd.randint(0, 730 * 24 * 60))
+        rows.append({
+            "id": f"{i:08d}-0000-0000-0000-000000000000",
+            "user_id": USER_ID,
+            "place_id": f"place-{rnd.randint(0, 400)}",
+            "visited_at": at.isoformat(),
+            "duration_minutes": rnd.randint(10, 180),
+            "rating": rnd.choice((None, 3.0, 4.0, 5.0)),
+            "mood": rnd.choice(("curious", "calm", "social")),
+            "spent_amount": rnd.randint(0, 50000),
+            "companions": rnd.randint(1, 4),
+            "xp_earned": rnd.choice((100, 120, 150, 200)),
+        })
+    rows.sort(key=lambda r: (r["visited_at"], r["id"]), reverse=True)
+    return rows
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1].replace('\\"', '"') if value.startswith('"') else value
+
+
+def fake_postgrest(rows, traffic):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        selected = [r for r in rows if r["user_id"] == params.get("user_id", "")[3:]]
+        since = params.get("visited_at")
+        if since:
+            selected = [r for r in selected if r["visited_at"] >= since[4:]]
+        keyset = params.get("or")
+        if keyset:
+            # (visited_at.lt."t",and(visited_at.eq."t",id.lt."id"))
+            body = keyset[1:-1]
+            t = _unquote(body.split(",and(")[0].split(".lt.", 1)[1])
+            last_id = _unquote(body.rsplit("id.lt.", 1)[1].rstrip(")"))
+            selected = [r for r in selected if (r["visited_at"], r["id"]) < (t, last_id)]
+        selected = selected[: int(params.get("limit", "100"))]
+        select = params.get("select", "*")
+        if select != "*":
+            cols = select.split(",")
+            selected = [{c: r.get(c) for c in cols} for r in selected]
+        payload = json.dumps(selected).encode()
+        traffic["requests"] += 1
+        traffic["bytes"] += len(payload)
+        return httpx.Response(200, content=payload, headers={"content-type": "application/json"})
+    return httpx.MockTransport(handler)
+
+
+def expected(rows, days):
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    acc = VisitAccumulator(USER_ID)
+    for r in rows:
+        if r["visited_at"] >= cutoff:
+            acc.add(r)
+    return acc.result()
+
+
+async def measure(label, traffic, call):
+    before = dict(traffic)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await call()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"  {label:28s} visits={result['total_visits']:5d} xp={result['total_xp']:7d} "
+        f"longest={result['longest_streak']:3d}  round trips={traffic['requests'] - before['requests']:2d} "
+        f"bytes={traffic['bytes'] - before['bytes']:8d}  peak mem={peak / 1024:7.1f} KiB  {elapsed:6.1f} ms"
+    )
+    return result
+
+
+async def main(n: int) -> None:
+    rows = make_visits(n)
+    traffic = {"requests": 0, "bytes": 0}
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=fake_postgrest(rows, traffic), base_url="http://fake")
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+
+    async def legacy():
+        # 변경 전: get_user_visits(user_id, 365) → 기간 무시, 최신 100행
+        acc = VisitAccumulator(USER_ID)
+        for v in await db.get_user_visits(USER_ID, days=None, limit=100):
+            acc.add(v)
+        return acc.result()
+
+    async def streamed(select):
+        acc = VisitAccumulator(USER_ID)
+        async for v in db.iter_user_visits(USER_ID, days=365, select=select):
+            acc.add(v)
+        return acc.result()
+
+    print(f"heavy user: {n} visits over ~2 years, page size {db.VISIT_PAGE_SIZE}")
+    await measure("legacy (100-row cap)", traffic, legacy)
+    await measure("stream select=*", traffic, lambda: streamed("*"))
+    result = await measure("stream projected", traffic, lambda: streamed(VISIT_COLUMNS))
+    want = expected(rows, 365)
+    print(f"  streamed == exact 365-day aggregate: {result == want}")
+    await http.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+날씨 타일 캐시 벤치마크 (가짜 OpenWeather, 실제 API 호출 없음)
+- httpx MockTransport 로 OpenWeather 를 흉내 (응답 지연 기본 150ms), 호출 수를 셈.
+- 서울 권역 임의 좌표 요청으로
+  1) 콜드 스타트 동시 요청 300건: 기존(좌표 2자리 키, 동시 미스마다 호출) vs 타일 캐시(타일당 1회로 합침)
+  2) 순차 요청 5000건(호출 수만 비교): 기존 500개 초과 시 전체 삭제 → 반복 호출 vs 타일 LRU
+  3) TTL 만료 직후 요청: stale 값 즉시 응답 + 백그라운드 갱신 1회
+  4) 선조회(prefetch_weather) 후 요청: 전부 캐시 적중 (요청 경로에서 OpenWeather 대기 없음)
+
+지연 150ms: 1) 기존 호출 300회·p50 151ms·완료 205~228ms → 타일 130회·p50 167~169ms·완료 185~187ms (동시 미스 합침)
+2) 기존 호출 4,052회 → 타일 165회 (서울 권역 타일 165개, 축출 0)  3) 응답 0.0ms, 갱신 호출 1회
+4) 165타일 선조회 후 1000건 호출 0회, 최대 지연 0.3ms 미만
+
+사용: python scripts/bench_weather_cache.py [지연밀리초]
+"""
+import asyncio
+import gc
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.dependencies import Database  # noqa: E402
+from core.http_client import SharedHttpClient  # noqa: E402
+from services import weather_service as ws  # noqa: E402
+
+SEOUL = (37.41, 126.76, 37.72, 127.19)
+
+
+def fake_openweather(counter):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counter["calls"] += 1
+        await asyncio.sleep(counter["latency"])
+        return httpx.Response(200, json={
+            "weather": [{"main": "Clear", "description": "맑음", "icon": "01d"}],
+            "main": {"temp": 18.2, "feels_like": 17.5, "humidity": 40},
+        })
+    return httpx.MockTransport(handler)
+
+
+def seoul_point(rnd):
+    return rnd.uniform(SEOUL[0], SEOUL[2]), rnd.uniform(SEOUL[1], SEOUL[3])
+
+
+_legacy_cache = {}
+
+
+async def legacy_get_weather(lat, lon):
+    """변경 전 get_weather: 좌표 2자리 키, 미스마다 호출, 500개 초과 시 전체 삭제"""
+    key = f"{round(lat, 2)},{round(lon, 2)}"
+    now = time.monotonic()
+    hit = _legacy_cache.get(key)
+    if hit and now < hit[0]:
+        return dict(hit[1])
+    data = await ws._fetch_openweather(lat, lon)
+    _legacy_cache[key] = (now + 600, dict(data))
+    if len(_legacy_cache) > 500:
+        _legacy_cache.clear()
+        _legacy_cache[key] = (now + 600, dict(data))
+    return data
+
+
+def reset():
+    ws._weather_cache.clear()
+    _legacy_cache.clear()
+
+
+async def timed(fn, lat, lon, out):
+    start = time.perf_counter()
+    await fn(lat, lon)
+    out.append((time.perf_counter() - start) * 1000)
+
+
+async def herd(label, fn, counter):
+    rnd = random.Random(1)
+    before = counter["calls"]
+    lat_ms = []
+    gc.collect()  # 앞 단계 쓰레기 수집이 측정 중에 끼지 않게
+    start = time.perf_counter()
+    await asyncio.gather(*[timed(fn, *seoul_point(rnd), lat_ms) for _ in range(300)])
+    wall_ms = (time.perf_counter() - start) * 1000
+    print(f"  {label:8s} upstream calls={counter['calls'] - before:5d}  p50={statistics.median(lat_ms):6.1f} ms  "
+          f"max={max(lat_ms):6.1f} ms  all done={wall_ms:6.1f} ms")
+
+
+async def sequential(label, fn, counter):
+    rnd = random.Random(2)
+    before = counter["calls"]
+    for _ in range(5000):
+        await fn(*seoul_point(rnd))
+    print(f"  {label:8s} upstream calls={counter['calls'] - before:5d}")
+
+
+async def main(latency_ms: float) -> None:
+    settings.OPENWEATHER_API_KEY = "bench"
+    counter = {"calls": 0, "latency": latency_ms / 1000}
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=fake_openweather(counter))
+    Database.http = http
+    print(f"fake OpenWeather latency {latency_ms:.0f} ms, tile {settings.WEATHER_TILE_DEG}°, "
+          f"Seoul tiles={len(ws.prefetch_tiles())}")
+
+    print("1) cold start, 300 concurrent requests")
+    reset()
+    await herd("legacy", legacy_get_weather, counter)
+    await herd("tiles", ws.get_weather, counter)
+
+    print("2) 5000 sequential requests across Seoul (upstream latency 0, call counts only)")
+    reset()
+    counter["latency"] = 0
+    await sequential("legacy", legacy_get_weather, counter)
+    await sequential("tiles", ws.get_weather, counter)
+    counter["latency"] = latency_ms / 1000
+
+    print("3) request right after TTL expiry")
+    tile = ws.weather_tile(37.5665, 126.9780)
+    fetched, data = ws._weather_cache[tile]
+    ws._weather_cache[tile] = (fetched - settings.WEATHER_CACHE_TTL_SECONDS - 1, data)
+    before = counter["calls"]
+    start = time.perf_counter()
+    await ws.get_weather(37.5665, 126.9780)
+    served_ms = (time.perf_counter() - start) * 1000
+    await asyncio.sleep(latency_ms / 1000 * 2)
+    print(f"  served stale in {served_ms:.1f} ms, background refresh calls={counter['calls'] - before}, "
+          f"fresh again={time.monotonic() - ws._weather_cache[tile][0] < 1}")
+
+    print("4) prefetch Seoul tiles, then 1000 requests")
+    reset()
+    settings.WEATHER_PREFETCH_PER_MINUTE = 10 ** 6
+    refreshed = await ws.prefetch_weather()
+    before = counter["calls"]
+    rnd = random.Random(3)
+    lat_ms = []
+    for _ in range(1000):
+        await timed(ws.get_weather, *seoul_point(rnd), lat_ms)
+    print(f"  prefetched tiles={refreshed}  request-path upstream calls={counter['calls'] - before}  "
+          f"max latency={max(lat_ms):.2f} ms")
+    print(f"  metrics: {ws.weather_metrics()}")
+    await http.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 150))
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+예약 작업 실행기(services/jobs.py) 동작 확인 (DB 없이, 워커 여러 개가 한 job_runs 저장소를 공유한다고 가정)
+1) 워커 4개가 같은 시각에 같은 작업을 트리거 → 한 워커만 실행, 나머지는 건너뜀, 같은 날 재트리거도 건너뜀
+2) 배치 작업이 중간에 죽음(워커 종료 흉내) → lease 만료 후 다른 워커의 resume_stale 이 checkpoint 다음 배치부터 이어서 완료
+   (각 배치는 정확히 한 번 처리)
+3) 느린 워커가 lease 를 잃은 뒤 저장하려 하면 JobLeaseLost 로 중단, 늦은 쓰기는 반영되지 않음
+4) 공유 저장소 claim 실패: 일시 오류(5xx)면 재시도 후 어느 워커도 실행하지 않음, 다음 트리거에 한 워커만 실행.
+   RPC 미배포(JobStoreNotDeployed)일 때만 프로세스 메모리 저장소로 실행
+
+결과: 1) 실행 1회 / 건너뜀 3 + 재트리거 1  2) 배치 0..9 각 1회, attempts=2, 두 번째 시도는 배치 4부터
+3) 실행권 잃은 워커 중단, checkpoint 는 새 실행권자 값 유지
+4) 일시 오류: 실행 0회, claim_failures 워커당 1 → 복구 후 실행 1회 / 미배포: 프로세스마다 메모리 잠금으로 실행
+
+사용: python scripts/check_job_runner.py
+"""
+import asyncio
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from services import jobs as jobs_module  # noqa: E402
+from services.jobs import JobLeaseLost, JobRunner, JobStoreNotDeployed, MemoryJobStore, _now  # noqa: E402
+
+
+def workers(n: int, store: MemoryJobStore):
+    runners = []
+    for i in range(n):
+        runner = JobRunner(lease_seconds=60, heartbeat_seconds=20)
+        runner.owner = f"worker-{i}"
+        runner._memory = store  # DB 미연결 → 메모리 저장소, 워커 간 공유로 job_runs 흉내
+        runners.append(runner)
+    return runners
+
+
+def expire(store: MemoryJobStore, job: str, key: str) -> None:
+    store._runs[(job, key)]["lease_until"] = (_now() - timedelta(seconds=1)).isoformat()
+
+
+async def single_runner() -> None:
+    store = MemoryJobStore()
+    runs = []
+
+    async def job(ctx):
+        runs.append(ctx._runner.owner)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    pool = workers(4, store)
+    for w in pool:
+        w.register("daily_push", job, run_key=lambda: "2026-10-17")
+    results = await asyncio.gather(*[w.run("daily_push") for w in pool])
+    again = await pool[2].run("daily_push")
+    print(f"1) executions={len(runs)} skipped={sum(r is None for r in results)} rerun skipped={again is None} "
+          f"status={store._runs[('daily_push', '2026-10-17')]['status']}")
+
+
+async def crash_and_resume() -> None:
+    store = MemoryJobStore()
+    processed = []
+    crash_after = {"worker-0": 4}
+
+    async def job(ctx):
+        start = ctx.checkpoint.get("after", -1) + 1
+        for batch in range(start, 10):
+            processed.append(batch)
+            await ctx.save({"after": batch})
+            if crash_after.get(ctx._runner.owner) == batch + 1:
+                raise asyncio.CancelledError()  # 프로세스 종료 흉내: 결과 기록 없이 멈춤
+        return {"batches": 10, "resumed_from": start}
+
+    a, b = workers(2, store)
+    for w in (a, b):
+        w.register("reconcile", job, run_key=lambda: "2026-10-17")
+    try:
+        await a.run("reconcile")
+    except asyncio.CancelledError:
+        pass
+    skipped = await b.resume_stale()  # lease 아직 유효 → 안 가져감
+    expire(store, "reconcile", "2026-10-17")
+    resumed = await b.resume_stale()
+    row = store._runs[("reconcile", "2026-10-17")]
+    print(f"2) resumed before expiry={skipped} after expiry={resumed} batches={processed} "
+          f"each once={sorted(processed) == list(range(10))} attempts={row['attempts']} result={row['result']}")
+
+
+async def lost_lease() -> None:
+    store = MemoryJobStore()
+    gate = asyncio.Event()
+    outcome = {}
+
+    async def job(ctx):
+        if ctx._runner.owner == "worker-0":
+            await gate.wait()
+            try:
+                await ctx.save({"after": "stale"})
+            except JobLeaseLost:
+                outcome["worker-0"] = "lease lost"
+                raise
+        else:
+            await ctx.save({"after": "fresh"})
+        return {"by": ctx._runner.owner}
+
+    a, b = workers(2, store)
+    for w in (a, b):
+        w.register("daily_push", job, run_key=lambda: "2026-10-17")
+    slow = asyncio.ensure_future(a.run("daily_push"))
+    await asyncio.sleep(0.01)
+    expire(store, "daily_push", "2026-10-17")
+    await b.run("daily_push")
+    gate.set()
+    await slow
+    row = store._runs[("daily_push", "2026-10-17")]
+    print(f"3) slow worker: {outcome.get('worker-0')}, lease_lost={a._local['daily_push']['lease_lost']} "
+          f"checkpoint={row['checkpoint']} result={row['result']}")
+
+
+class FlakyStore(MemoryJobStore):
+    """공유 job_runs 흉내: error 가 있으면 claim 이 그 예외로 실패"""
+
+    def __init__(self):
+        super().__init__()
+        self.error = None
+
+    async def claim(self, job_name, run_key, owner, lease_seconds):
+        if self.error is not None:
+            raise self.error
+        return await super().claim(job_name, run_key, owner, lease_seconds)
+
+
+async def claim_failure() -> None:
+    jobs_module.CLAIM_RETRY_DELAY_SECONDS = 0.0
+    shared = FlakyStore()
+    runs = []
+
+    async def job(ctx):
+        runs.append(ctx._runner.owner)
+
+    pool = workers(3, MemoryJobStore())
+    for w in pool:
+        w._memory = MemoryJobStore()  # 워커마다 별도 프로세스
+        w._store = lambda: shared  # DB 연결됨 → 공유 저장소
+        w.register("daily_push", job, run_key=lambda: "2026-10-17")
+
+    shared.error = RuntimeError("503 Service Unavailable")
+    await asyncio.gather(*(w.run("daily_push") for w in pool))
+    failures = [w._local["daily_push"].get("claim_failures", 0) for w in pool]
+    transient_runs = len(runs)
+    shared.error = None
+    await asyncio.gather(*(w.run("daily_push") for w in pool))
+    recovered_runs = len(runs) - transient_runs
+
+    runs.clear()
+    shared.error = JobStoreNotDeployed("claim_job_run RPC not deployed")
+    for w in pool:
+        w.register("weekly_digest", job, run_key=lambda: "2026-W42")
+    await asyncio.gather(*(w.run("weekly_digest") for w in pool))
+    print(f"4) transient: runs={transient_runs} claim_failures={failures} -> recovered runs={recovered_runs} | "
+          f"not deployed: runs={len(runs)} (process locks)")
+
+
+async def main() -> None:
+    await single_runner()
+    await crash_and_resume()
+    await lost_lease()
+    await claim_failure()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+서사 사전 생성 후보 공유 집계(services/narrative_cache.py + narrative_demand) 확인 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- "워커" 3개 = 각자 NarrativeCache 가 같은 가짜 DB(increment/top/decay_narrative_demand RPC, narratives 테이블)를 공유.
+1) 워커 A·B 가 서로 다른 조합을 노출·flush → 새로 뜬 워커 C(재시작 흉내, 메모리 집계 없음)의 top_demand 가
+   두 워커 합산 순위를 봄. 이미 서사가 저장된 조합은 제외
+2) flush 실패(500) → 증가분 유지, 다음 flush 에 합산 (유실·중복 없음)
+3) decay → 공유 집계 절반 (0 이 된 조합은 삭제)
+4) RPC 미배포(404) → 이 프로세스 집계로 폴백
+
+결과: 1) C 순위 [p2, p1, p3] (p2=A 3+B 4, p1=A 5, p3=B 2, p0 는 저장됨) / C 메모리 집계 0
+      2) 실패 후 pending 1 → 재시도 후 p9 hits=2, pending 0  3) hits [9, 7, 5, 2, 2] → [4, 3, 2, 1, 1]
+      4) 폴백 [p1]
+
+사용: python scripts/check_narrative_demand.py
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.dependencies import Database  # noqa: E402
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from services.narrative_cache import NarrativeCache, make_narrative_key  # noqa: E402
+
+
+class FakeDemandDb:
+    def __init__(self):
+        self.demand = {}
+        self.narratives = set()
+        self.status = 200
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if self.status != 200:
+            return httpx.Response(self.status, json={"message": "unavailable"})
+        name = request.url.path.rsplit("/", 1)[-1]
+        body = json.loads(request.content or b"{}")
+        if name == "increment_narrative_demand":
+            for row in body["p_rows"]:
+                entry = self.demand.setdefault(row["cache_key"], {"hits": 0})
+                entry["hits"] += row["hits"]
+                entry["generate_kwargs"] = row["generate_kwargs"]
+            return httpx.Response(200, json=len(body["p_rows"]))
+        if name == "top_narrative_demand":
+            ranked = sorted(
+                ((k, v) for k, v in self.demand.items() if k not in self.narratives),
+                key=lambda kv: kv[1]["hits"], reverse=True,
+            )[: body["p_limit"]]
+            return httpx.Response(200, json=[{"cache_key": k, **v} for k, v in ranked])
+        if name == "decay_narrative_demand":
+            for k in list(self.demand):
+                self.demand[k]["hits"] //= 2
+                if self.demand[k]["hits"] <= 0:
+                    del self.demand[k]
+            return httpx.Response(200, json=len(self.demand))
+        return httpx.Response(404)
+
+
+def connect(server: FakeDemandDb) -> None:
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    Database.helpers = db
+    Database.connected = True
+
+
+def note(cache: NarrativeCache, place_id: str, times: int) -> str:
+    key, _ = make_narrative_key(place_id, "explorer", "피곤해", "rainy", "evening")
+    for _ in range(times):
+        cache.note_recommended(key, {"place_name": place_id, "category": "카페", "role_type": "explorer",
+                                     "place_id": place_id, "user_mood": "피곤해", "weather": "rainy",
+                                     "time_of_day": "evening"})
+    return key
+
+
+async def main() -> None:
+    server = FakeDemandDb()
+    connect(server)
+    a, b, c = NarrativeCache(), NarrativeCache(), NarrativeCache()
+    server.narratives.add(note(a, "p0", 9))
+    note(a, "p1", 5)
+    note(a, "p2", 3)
+    note(b, "p2", 4)
+    note(b, "p3", 2)
+    await asyncio.gather(a.flush_demand(), b.flush_demand())
+    ranked = [kw["place_id"] for kw in await c.top_demand(10)]
+    print(f"1) worker C ranking {ranked} / C process counts {len(c._demand)}")
+
+    server.status = 500
+    note(a, "p9", 2)
+    await a.flush_demand()
+    pending = len(a._pending_demand)
+    server.status = 200
+    await a.flush_demand()
+    key9, _ = make_narrative_key("p9", "explorer", "피곤해", "rainy", "evening")
+    print(f"2) after failure pending={pending} failures={a.metrics()['demand_flush_failures']} "
+          f"-> retried hits={server.demand[key9]['hits']} pending={len(a._pending_demand)}")
+
+    before = len(server.demand)
+    await c.decay_demand()
+    hits = sorted((v["hits"] for v in server.demand.values()), reverse=True)
+    print(f"3) decayed hits {hits}, removed {before - len(server.demand)}")
+
+    server.status = 404
+    d = NarrativeCache()
+    note(d, "p1", 1)
+    print(f"4) RPC missing -> fallback {[kw['place_id'] for kw in await d.top_demand(10)]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+장소 presence 인덱스(db/presence_index.py) 확인·벤치마크 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- httpx MockTransport 로 visits / users / places 를 흉내 (요청마다 지연 LATENCY_MS, 요청 수 집계).
+1) 적재: 최근 6시간 visits N건을 keyset 페이지로 읽어 사용자별 최신 장소로 재구성
+2) 실시간 이벤트: 체크인 → 바로 보임, 다른 장소 체크인 → 이전 장소에서 빠짐,
+   늦게 도착한 오래된 행은 무시, report_location 으로 here(만료 연장) / left(퇴장)
+3) 만료: 6시간 넘은 버킷만 통째로 비움 (연장된 사용자는 남음)
+4) GET /visits/presence/{place_id}: 기존 경로(visits + users 2회 왕복) vs 인덱스(프로필 캐시 적중 시 0회)
+5) 증분 갱신: 다른 워커(memory 브로커)의 체크인이 refresh 한 번(왕복 1회)으로 반영
+
+방문 250,000건(무작위 200,000 + 사용자별 1건)·사용자 50,000명·장소 5,000곳, 왕복 지연 15ms 기준:
+1) 적재 251 페이지, 인원 50,300 (장소 5,001곳)  2) 이동/오래된 행 무시/here 연장/left 퇴장 모두 기대대로
+3) 만료 44,958명 제거, 연장한 u1·u3 는 남음 (0.12초)
+4) 인기 장소(300명) 200회 조회: 기존 400 왕복·p50 33.3ms → 인덱스 1 왕복(첫 프로필 조회)·p50 0.20ms,
+   응답 사용자·순서 동일
+5) refresh 왕복 1회로 다른 워커의 새 체크인 1건 반영
+
+사용: python scripts/check_presence_index.py [방문수]
+"""
+import asyncio
+import bisect
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import unquote
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.http_client import SharedHttpClient  # noqa: E402
+from db import presence_index as presence_module  # noqa: E402
+from db.presence_index import PlacePresenceIndex, report_location  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+import routes.visits as visits_route  # noqa: E402
+from routes.visits import get_place_presence  # noqa: E402
+from services.realtime import realtime_hub  # noqa: E402
+
+LATENCY_MS = 15
+HOT_PLACE = "p-hot"
+KEYSET = re.compile(r'\(visited_at\.gt\."([^"]+)",and\(visited_at\.eq\."[^"]+",id\.gt\."([^"]+)"\)\)')
+
+
+def make_visits(n: int, users: int = 50000, places: int = 5000):
+    rnd = random.Random(n)
+    now = datetime.now()
+    rows = []
+    for i in range(n):
+        uid = f"u{rnd.randrange(users)}"
+        pid = HOT_PLACE if i >= n - 300 else f"p{rnd.randrange(places)}"
+        at = now - timedelta(seconds=rnd.uniform(60, 5.5 * 3600) if i < n - 300 else rnd.uniform(0, 50))
+        rows.append({"id": f"v{i:07d}", "user_id": uid if i < n - 300 else f"hot{i}", "place_id": pid,
+                     "visited_at": at.isoformat()})
+    # 모든 사용자가 최소 한 번은 방문
+    for u in range(users):
+        rows.append({"id": f"w{u:07d}", "user_id": f"u{u}", "place_id": f"p{u % places}",
+                     "visited_at": (now - timedelta(hours=5, minutes=50)).isoformat()})
+    rows.sort(key=lambda r: (r["visited_at"], r["id"]))
+    return rows
+
+
+class FakePostgrest:
+    def __init__(self, visits):
+        self.visits = visits
+        self.keys = [(r["visited_at"], r["id"]) for r in visits]
+        self.by_place = {}
+        for row in visits:
+            self.by_place.setdefault(row["place_id"], []).append(row)
+        self.calls = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(LATENCY_MS / 1000)
+        table = request.url.path.rsplit("/", 1)[-1]
+        params = request.url.params
+        if table == "users":
+            ids = re.findall(r'"([^"]+)"', unquote(params["user_id"]))
+            return httpx.Response(200, json=[{"user_id": u, "username": f"name-{u}", "profile_image_url": None} for u in ids])
+        if table == "places":
+            ids = re.findall(r'"([^"]+)"', unquote(params["id"]))
+            return httpx.Response(200, json=[{"id": p, "latitude": 37.5665, "longitude": 126.9780} for p in ids])
+        since = params["visited_at"][len("gte."):]
+        limit = int(params.get("limit", 1000))
+        if "place_id" in params:
+            rows = [r for r in self.by_place.get(params["place_id"][len("eq."):], ()) if r["visited_at"] >= since]
+            rows = sorted(rows, key=lambda r: r["visited_at"], reverse=True)[:limit]
+        else:
+            match = KEYSET.match(params.get("or", ""))
+            after = (match.group(1), match.group(2)) if match else (since, "")
+            lo = bisect.bisect_right(self.keys, max(after, (since, "")))
+            rows = self.visits[lo:lo + limit]
+        return httpx.Response(200, content=json.dumps(rows).encode(), headers={"content-type": "application/json"})
+
+
+def fake_db(server: FakePostgrest) -> RestDatabaseHelpers:
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    return db
+
+
+def new_index() -> PlacePresenceIndex:
+    return PlacePresenceIndex(max_age_seconds=settings.PRESENCE_MAX_HOURS * 3600,
+                              bucket_seconds=settings.PRESENCE_BUCKET_SECONDS)
+
+
+async def main_async(n: int) -> None:
+    server = FakePostgrest(make_visits(n))
+    db = fake_db(server)
+    index = new_index()
+
+    start = time.perf_counter()
+    await index.load(db)
+    print(f"1) loaded visits={index.counters['loaded_visits']:,} pages={server.calls} "
+          f"present={len(index):,} places={len(index._places):,} in {time.perf_counter() - start:.2f}s")
+
+    # 2) 실시간 이벤트 (프로세스 전역 인덱스를 교체해 report_location 도 같은 인덱스를 보게 함)
+    presence_module.presence_index = index
+    realtime_hub.add_listener(index.apply_event)
+    now = datetime.now()
+    realtime_hub.publish("place:p-new", "presence", {"place_id": "p-new", "user_id": "u1", "state": "checkin",
+                                                     "checked_in_at": now.isoformat()})
+    moved = index.where("u1")[0] == "p-new" and "u1" not in index._places.get("p1", ())
+    stale = index.checkin("u1", "p2", (now - timedelta(minutes=30)).isoformat())
+    entry = index._users["u1"]
+    entry.last_seen -= settings.PRESENCE_BUCKET_SECONDS  # 이전 버킷에서 확인된 것으로
+    here = await report_location(db, "u1", 37.5665, 126.9780)
+    extended = index._users["u1"].last_seen > time.time() - 5
+    realtime_hub.publish("place:p-new", "presence", {"place_id": "p-new", "user_id": "u2", "state": "checkin",
+                                                     "checked_in_at": now.isoformat()})
+    left = await report_location(db, "u2", 37.60, 127.05)
+    print(f"2) moved={moved} stale row ignored={not stale} near→{here} extended={extended} "
+          f"far→{left} u2 present={index.where('u2') is not None}")
+
+    # 3) 만료: 6시간 뒤 (u1 은 방금 연장, u3 도 연장)
+    index.touch("u3", index.where("u3")[0], time.time() + 3600)
+    before = len(index)
+    start = time.perf_counter()
+    removed = index.expire(time.time() + settings.PRESENCE_MAX_HOURS * 3600 - 600)
+    print(f"3) expired={removed:,} of {before:,} remaining={len(index):,} "
+          f"(extended u1={index.where('u1') is not None} u3={index.where('u3') is not None}) "
+          f"in {time.perf_counter() - start:.3f}s")
+
+    # 4) 기존 경로 vs 인덱스 (조회 200회)
+    index = new_index()
+    await index.load(db)
+    presence_module.presence_index = index
+    visits_route.presence_index = index
+    results = {}
+    for label, ready in (("legacy", False), ("index", True)):
+        index.ready = ready
+        server.calls = 0
+        samples = []
+        for _ in range(200):
+            t = time.perf_counter()
+            resp = await get_place_presence(HOT_PLACE, hours=3, requester_id=None, db=db)
+            samples.append((time.perf_counter() - t) * 1000)
+        results[label] = resp
+        print(f"4) {label:6} count={resp['count']} calls={server.calls} p50={statistics.median(samples):.2f}ms "
+              f"p95={sorted(samples)[189]:.2f}ms")
+    same = [u["user_id"] for u in results["legacy"]["users"]] == [u["user_id"] for u in results["index"]["users"]]
+    print(f"   same users/order={same} profile hits={index.counters['profile_hits']:,} "
+          f"misses={index.counters['profile_misses']}")
+
+    # 5) 다른 워커의 체크인 → refresh
+    row = {"id": "v9999999", "user_id": "u-other", "place_id": HOT_PLACE, "visited_at": datetime.now().isoformat()}
+    server.visits.append(row)
+    server.keys.append((row["visited_at"], row["id"]))
+    server.calls = 0
+    applied = await index.refresh(db)
+    print(f"5) refresh applied={applied} calls={server.calls} other worker visible={index.where('u-other') is not None}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async(int(sys.argv[1]) if len(sys.argv) > 1 else 200000))
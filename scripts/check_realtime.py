@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+실시간 채널(services/realtime.py, routes/realtime.py) 확인 (가짜 PostgREST·fakeredis, 실제 Supabase/Redis 호출 없음)
+1) WebSocket 하나로 user / conversation / place 채널 다중 구독. 남의 user 채널·참여하지 않은 대화는 거절.
+   create_notification / insert_message / 체크인 presence 가 해당 채널로 바로 도착.
+2) 연결이 끊긴 사이 이벤트 3건 → 마지막 cursor 로 재접속하면 놓친 3건만 순서대로 재전송 (중복 없음)
+3) 재시작 전·다른 워커(memory)의 cursor, 버퍼에서 밀려난 cursor → resync
+4) 느린 연결: 큐(200) 초과 → overflow → resync 후 종료, 다른 연결은 영향 없음
+5) SSE: hello → 재전송 → 실시간 이벤트 (id: 줄 = cursor, Last-Event-ID 로 재접속)
+6) redis 브로커 워커 2개(fakeredis 공유): 워커 A 발행 → 워커 B 연결 수신, B 의 cursor 로 A 에 재접속해 이어받음
+7) 메모리 허브 fan-out: 한 채널 구독 1000 연결에 이벤트 200건
+
+결과: 1) 3채널 허용·2 거절, 알림/메시지/presence 각 1건 도착  2) 재전송 3건, 순서·중복 OK  3) resync 3/3
+4) overflow 1, 정상 연결 수신 500  5) hello → 재전송 2 → 실시간 1 (id 3개, cursor 이후)  6) 교차 워커 수신·재전송 2건 OK
+7) 200,000 전달 0.06~0.08초 (약 260만~350만 건/초)
+
+사용: python scripts/check_realtime.py
+"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import fakeredis  # noqa: E402
+import httpx  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from core.dependencies import get_db  # noqa: E402
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from routes.realtime import realtime_stream  # noqa: E402
+from services.realtime import (  # noqa: E402
+    MemoryBroker,
+    RealtimeHub,
+    RedisBroker,
+    SubscriptionOverflow,
+    place_channel,
+    publish_event,
+    realtime_hub,
+)
+
+
+def fake_postgrest():
+    seq = {"n": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        table = request.url.path.rsplit("/", 1)[-1]
+        if request.method == "GET" and table == "conversations":
+            rows = [{"id": "c1", "user_a_id": "u1", "user_b_id": "u2"}]
+            return httpx.Response(200, json=[r for r in rows if f"eq.{r['id']}" == request.url.params.get("id")])
+        if request.method == "POST":
+            seq["n"] += 1
+            return httpx.Response(201, json=[{"id": f"{table}-{seq['n']}", **json.loads(request.content)}])
+        return httpx.Response(204)
+    return httpx.MockTransport(handler)
+
+
+def fake_db():
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=fake_postgrest())
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    return db
+
+
+def websocket_checks() -> None:
+    db = fake_db()
+    main.app.dependency_overrides[get_db] = lambda: db
+    url = "/api/v1/realtime/ws?user_id=u1&channels=conversation:c1,place:p1,user:u2,conversation:c9"
+    with TestClient(main.app) as client:
+        with client.websocket_connect(url) as ws:
+            hello = ws.receive_json()
+            client.portal.call(db.create_notification, "u2", "dm_new", "남의 알림")  # 다른 사용자 → 안 옴
+            client.portal.call(db.create_notification, "u1", "quest_complete", "퀘스트 완료!")
+            client.portal.call(db.insert_message, "c1", "u2", "안녕")
+            client.portal.call(publish_event, place_channel("p1"), "presence", {"place_id": "p1", "user_id": "u3"})
+            got = [ws.receive_json() for _ in range(3)]
+            last = got[-1]["cursor"]
+        print(f"1) allowed={hello['channels']} rejected={hello['rejected']} "
+              f"events={[(e['channel'], e['type']) for e in got]}")
+
+        for i in range(3):
+            client.portal.call(publish_event, place_channel("p1"), "presence", {"place_id": "p1", "n": i})
+        client.portal.call(publish_event, place_channel("p9"), "presence", {"place_id": "p9"})  # 구독 안 한 채널
+        with client.websocket_connect(url + f"&cursor={last}") as ws:
+            hello = ws.receive_json()
+            replayed = [ws.receive_json() for _ in range(hello["replayed"])]
+            client.portal.call(publish_event, place_channel("p1"), "presence", {"place_id": "p1", "n": 3})
+            live = ws.receive_json()
+        order = [e["data"]["n"] for e in replayed] + [live["data"]["n"]]
+        print(f"2) replayed={hello['replayed']} resync={hello['resync']} order={order} no duplicates={order == [0, 1, 2, 3]}")
+    main.app.dependency_overrides.clear()
+
+
+async def resync_checks() -> None:
+    hub = RealtimeHub(MemoryBroker(buffer_size=10), queue_size=200)
+    hub.publish("place:p1", "presence", {})
+    cursor = hub.broker.latest_cursor()
+    other_worker = f"{hub.broker.epoch - 1}-1"
+    for _ in range(20):
+        hub.publish("place:p1", "presence", {})
+    cases = [cursor, other_worker, "not-a-cursor"]
+    results = [(await hub.subscribe({"place:p1"}, c))[2] for c in cases]
+    print(f"3) resync trimmed/other worker/garbage={results}")
+
+    slow, _, _ = await hub.subscribe({"place:p2"})
+    fast, _, _ = await hub.subscribe({"place:p2"})
+    received = 0
+    for i in range(500):
+        hub.publish("place:p2", "presence", {"n": i})
+        while await fast.next(0) is not None:
+            received += 1
+    try:
+        await slow.next(0)
+        overflow = False
+    except SubscriptionOverflow:
+        overflow = True
+    print(f"4) slow overflow={overflow} overflows={hub.metrics()['overflows']} fast received={received}")
+
+
+class _FakeRequest:
+    def __init__(self, headers):
+        self.headers = headers
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+async def sse_check() -> None:
+    realtime_hub.publish("place:p5", "presence", {"n": 1})
+    cursor = realtime_hub.broker.latest_cursor()
+    realtime_hub.publish("place:p5", "presence", {"n": 2})
+    realtime_hub.publish("place:p5", "presence", {"n": 3})
+    resp = await realtime_stream(_FakeRequest({"last-event-id": cursor}), "u5", "place:p5", None, None)
+    body = resp.body_iterator
+    chunks = [await body.__anext__() for _ in range(3)]
+    realtime_hub.publish("place:p5", "presence", {"n": 4})
+    chunks.append(await body.__anext__())
+    await body.aclose()
+    names = [line.split(": ", 1)[1] for c in chunks for line in c.splitlines() if line.startswith("event:")]
+    ids = [line.split(": ", 1)[1] for c in chunks for line in c.splitlines() if line.startswith("id:")]
+    print(f"5) sse events={names} ids={len(ids)} first id after cursor={ids[0] > cursor}")
+
+
+async def redis_check() -> None:
+    server = fakeredis.FakeServer()
+    a = RealtimeHub(RedisBroker(client=fakeredis.FakeAsyncRedis(server=server), block_ms=200))
+    b = RealtimeHub(RedisBroker(client=fakeredis.FakeAsyncRedis(server=server), block_ms=200))
+    await a.broker.start()
+    sub_b, _, _ = await b.subscribe({"conversation:c1"})
+    a.publish("conversation:c1", "message", {"body": "워커 A 에서 보냄"})
+    event = await sub_b.next(2)
+    for i in range(2):
+        a.publish("conversation:c1", "message", {"n": i})
+    await asyncio.sleep(0.3)
+    _, backlog, resync = await a.subscribe({"conversation:c1"}, event["cursor"])
+    print(f"6) worker B got={event['data']['body']!r} cursor={event['cursor']} "
+          f"resume on A: replayed={[e['data']['n'] for e in backlog]} resync={resync}")
+    await a.aclose()
+    await b.aclose()
+
+
+async def fanout_bench() -> None:
+    hub = RealtimeHub(MemoryBroker(), queue_size=1000)
+    subs = [(await hub.subscribe({"place:hot"}))[0] for _ in range(1000)]
+    start = time.perf_counter()
+    for i in range(200):
+        hub.publish("place:hot", "presence", {"n": i})
+    elapsed = time.perf_counter() - start
+    delivered = sum(len(s._pending) for s in subs)
+    print(f"7) fan-out delivered={delivered:,} in {elapsed:.2f}s ({delivered / elapsed:,.0f}/s)")
+
+
+async def main_async() -> None:
+    await resync_checks()
+    await sse_check()
+    await redis_check()
+    await fanout_bench()
+
+
+if __name__ == "__main__":
+    websocket_checks()
+    asyncio.run(main_async())
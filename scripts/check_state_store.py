@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+퀘스트 / 챌린지 상태 저장소(db/state_store.py) 확인 (가짜 PostgREST, 실제 Supabase 호출 없음)
+- httpx MockTransport 로 user_quests / challenge_progress / challenge_claims 를 흉내:
+  조건부 PATCH(status=eq.in_progress), merge-duplicates upsert, ignore-duplicates INSERT 를 한 요청 단위로 원자 처리.
+- "워커" 2개 = 각자 SupabaseStateStore (+ 각자 메모리 폴백) 가 같은 가짜 DB 를 공유.
+1) 워커 A 가 수락한 퀘스트를 워커 B 가 조회·완료, 같은 퀘스트 완료 요청 20건 동시 → 완료 처리 1건
+2) 보상 수령 20건 동시(두 워커에 나눠서) → 수령 1건, 나머지 already_claimed
+3) 진행도 갱신은 다른 워커에서도 보임
+4) MemoryStateStore 도 같은 의미 (단일 프로세스)
+5) DB 장애(모든 요청 500): 보상 수령·퀘스트 완료 라우트는 503, award_xp 호출 없음, 메모리에 수령 기록 없음.
+   조회(챌린지 상태·활성 퀘스트)는 메모리 폴백으로 응답
+
+결과: 1) 완료 1 / already_completed 19  2) 수령 1 / 중복 19  3) 공유 OK  4) 메모리도 1 / 19
+      5) claim 503 / complete 503 / award_xp 0회 / 메모리 수령 0건 / 조회 OK
+
+사용: python scripts/check_state_store.py
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import httpx  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+from core.http_client import SharedHttpClient  # noqa: E402
+from db.rest_helpers import RestDatabaseHelpers  # noqa: E402
+from db.state_store import MemoryStateStore, SupabaseStateStore  # noqa: E402
+from routes.challenges import ClaimRewardRequest, claim_challenge_reward  # noqa: E402
+from routes.quests import QuestCompleteRequest, complete_quest  # noqa: E402
+
+KEYS = {"user_quests": ("quest_id",), "challenge_progress": ("user_id", "challenge_id"),
+        "challenge_claims": ("user_id", "challenge_id")}
+
+
+def fake_postgrest(tables):
+    def matches(row, params):
+        for col, flt in params.items():
+            if col in ("select", "order", "limit"):
+                continue
+            if str(row.get(col)) != flt.split(".", 1)[1]:
+                return False
+        return True
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.002)
+        table = request.url.path.rsplit("/", 1)[-1]
+        rows = tables.setdefault(table, {})
+        params = dict(request.url.params)
+        prefer = request.headers.get("prefer", "")
+        if request.method == "GET":
+            return httpx.Response(200, json=[r for r in rows.values() if matches(r, params)])
+        body = json.loads(request.content)
+        if request.method == "PATCH":
+            hit = [r for r in rows.values() if matches(r, params)]
+            for r in hit:
+                r.update(body)
+            return httpx.Response(200, json=hit)
+        key = tuple(body[k] for k in KEYS[table])
+        if key in rows:
+            if "ignore-duplicates" in prefer:
+                return httpx.Response(201, json=[])
+            if "merge-duplicates" not in prefer:
+                return httpx.Response(409, json={"code": "23505"})
+            rows[key].update(body)
+        else:
+            rows[key] = dict(body)
+        return httpx.Response(201, json=[rows[key]] if "return=representation" in prefer else None)
+    return httpx.MockTransport(handler)
+
+
+def worker(tables, transport=None):
+    http = SharedHttpClient()
+    http._client = httpx.AsyncClient(transport=transport or fake_postgrest(tables), base_url="http://fake")
+    db = RestDatabaseHelpers(http=http)
+    db.base_url = "http://fake"
+    return SupabaseStateStore(db, MemoryStateStore())
+
+
+async def scenario(label, a, b) -> None:
+    quest = {"quest_id": "q1", "user_id": "u1", "role_type": "explorer", "place_id": "p1", "place_name": "카페",
+             "xp_reward": 100, "status": "in_progress", "accepted_at": "2026-10-17T08:00:00", "checklist": []}
+    await a.create_quest(quest)
+    seen = await b.active_quests("u1")
+    results = await asyncio.gather(*[(a if i % 2 else b).complete_quest("q1") for i in range(20)])
+    done = sum(1 for _, now in results if now)
+    claims = await asyncio.gather(*[(a if i % 2 else b).claim_reward("u1", "c1", 500) for i in range(20)])
+    claimed = sum(1 for _, now in claims if now)
+    await a.set_progress("u1", "c2", 3, 5)
+    _, progress = await b.challenge_state("u1")
+    print(f"{label}: other worker sees quest={len(seen) == 1}  completed={done} already_completed={20 - done}  "
+          f"claimed={claimed} duplicate={20 - claimed}  progress shared={progress.get('c2', {}).get('progress') == 3}  "
+          f"active after={len(await b.active_quests('u1'))}")
+
+
+class XpLedger:
+    def __init__(self):
+        self.awards = 0
+
+    async def award_xp(self, user_id, xp, reason):
+        self.awards += 1
+
+
+async def status_of(call) -> int:
+    try:
+        await call
+        return 200
+    except HTTPException as e:
+        return e.status_code
+
+
+async def outage() -> None:
+    down = worker({}, httpx.MockTransport(lambda request: httpx.Response(500, json={"message": "down"})))
+    ledger = XpLedger()
+    claim = await status_of(claim_challenge_reward(
+        ClaimRewardRequest(user_id="u1", challenge_id="c1", xp_to_award=500), db=ledger, store=down))
+    complete = await status_of(complete_quest(QuestCompleteRequest(quest_id="q1"), store=down))
+    claims, _ = await down.challenge_state("u1")
+    active = await down.active_quests("u1")
+    print(f"db outage           : claim={claim} complete={complete} award_xp calls={ledger.awards} "
+          f"memory claims={len(down.fallback.claims)} reads ok={claims == {} and active == []}")
+
+
+async def main() -> None:
+    tables = {}
+    await scenario("supabase (2 workers)", worker(tables), worker(tables))
+    memory = MemoryStateStore()
+    await scenario("memory (1 process)  ", memory, memory)
+    await outage()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+사용자 통계 증분 집계 동등성 검사 (실제 Supabase 호출 없음)
+- 무작위 방문 시퀀스(하루 여러 번, 공백일, 재방문 포함)를 시간순으로 한 건씩 apply_visit 에 반영한 결과가
+  1) 원본 전체 재계산(rebuild_from_visits)과 같은지
+  2) 변경 전 get_user_stats_full 의 계산(visits 전체 + 기존 스트릭 계산)과 응답이 같은지 확인.
+- 과거 날짜 방문이 섞인 시퀀스는 apply_visit 가 None(→ 재계산)을 돌려주는지 확인.
+- 메모리 가짜 DB 로 record_visit(RPC 미배포 폴백 경로)·reconcile_user_stats 의 drift 복구를 확인.
+
+결과: 500개 시퀀스 모두 증분 == 재계산 == 기존 계산, 폴백 경로 20명 일치, 어긋난 5행 대사로 복구
+
+사용: python scripts/check_user_stats.py [시퀀스 수]
+"""
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from services.user_stats import (  # noqa: E402
+    XP_FOR_LEVEL,
+    apply_visit,
+    empty_aggregate,
+    present,
+    rebuild_from_visits,
+    record_visit,
+    reconcile_user_stats,
+    same_aggregate,
+    visit_day,
+)
+
+TODAY = datetime.utcnow().date()
+
+
+def make_visits(rnd: random.Random, n: int):
+    """오늘 또는 며칠 전에 끝나는 시간순 방문 시퀀스"""
+    day = TODAY - timedelta(days=rnd.randint(0, 3) + n)
+    places = [f"place-{i}" for i in range(rnd.randint(1, 15))]
+    visits = []
+    for i in range(n):
+        day += timedelta(days=rnd.choice((0, 0, 1, 1, 1, 2, 5)))
+        if day > TODAY:
+            day = TODAY
+        visits.append({
+            "id": f"v{i:05d}",
+            "place_id": rnd.choice(places),
+            "visited_at": f"{day.isoformat()}T{rnd.randint(0, 23):02d}:00:00+00:00",
+            "xp_earned": rnd.choice((100, 120, 150, 170, 200)),
+        })
+    return visits
+
+
+def legacy_streak(visited_dates):
+    """변경 전 RestDatabaseHelpers._compute_streak (기준값 계산용으로 그대로 옮김)"""
+    if not visited_dates:
+        return 0, 0
+    dates = sorted(set(visited_dates), reverse=True)
+    longest = 1
+    current = 1
+    for i in range(1, len(dates)):
+        d_prev = datetime.strptime(dates[i - 1], "%Y-%m-%d").date()
+        d_curr = datetime.strptime(dates[i], "%Y-%m-%d").date()
+        if (d_prev - d_curr).days == 1:
+            current += 1
+        else:
+            longest = max(longest, current)
+            current = 1
+    longest = max(longest, current)
+    first_d = datetime.strptime(dates[0], "%Y-%m-%d").date()
+    if (TODAY - first_d).days > 1:
+        return 0, longest
+    cur = 1
+    for i in range(1, len(dates)):
+        d_prev = datetime.strptime(dates[i - 1], "%Y-%m-%d").date()
+        d_curr = datetime.strptime(dates[i], "%Y-%m-%d").date()
+        if (d_prev - d_curr).days == 1:
+            cur += 1
+        else:
+            break
+    return cur, longest
+
+
+def legacy_stats(visits):
+    """변경 전 get_user_stats_full 계산 (기간·개수 제한 없이 같은 visits 전체에 적용)"""
+    total_xp = sum(v.get("xp_earned", 0) for v in visits)
+    unique_places = len(set(v.get("place_id") for v in visits if v.get("place_id")))
+    level = 1
+    for i in range(1, 10):
+        if total_xp >= XP_FOR_LEVEL[i]:
+            level = i + 1
+        else:
+            break
+    xp_to_next_level = max(0, XP_FOR_LEVEL[level] - total_xp) if level < 10 else 0
+    current_streak, longest_streak = legacy_streak([v["visited_at"][:10] for v in visits])
+    badges = []
+    if len(visits) >= 1:
+        badges.append({"id": "first_visit", "name": "첫 방문", "icon": "🌟"})
+    if longest_streak >= 7:
+        badges.append({"id": "streak_7", "name": "7일 연속", "icon": "🔥"})
+    if unique_places >= 10:
+        badges.append({"id": "places_10", "name": "10곳 방문", "icon": "📍"})
+    return {
+        "level": level,
+        "total_xp": total_xp,
+        "xp_to_next_level": xp_to_next_level,
+        "current_level_min_xp": XP_FOR_LEVEL[level - 1],
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "completed_quests": len(visits),
+        "total_places_visited": unique_places,
+        "total_visits": len(visits),
+        "unique_places": unique_places,
+        "badges": badges,
+    }
+
+
+def incremental(user_id, visits):
+    aggregate = empty_aggregate(user_id)
+    seen = set()
+    for v in visits:
+        new_place = v["place_id"] not in seen
+        seen.add(v["place_id"])
+        aggregate = apply_visit(aggregate, visit_day(v["visited_at"]), v["xp_earned"], new_place)
+        if aggregate is None:
+            return None
+    return aggregate
+
+
+class FakeDb:
+    """record_visit / reconcile_user_stats 가 쓰는 헬퍼만 흉내 (apply_user_stats_visit RPC 미배포)"""
+
+    def __init__(self):
+        self.visits = []
+        self.stats = {}
+
+    async def insert_visit(self, visit):
+        row = {**visit, "id": f"v{len(self.visits):05d}"}
+        self.visits.append(row)
+        return row
+
+    async def apply_user_stats_visit(self, user_id, place_id, xp, visit_date):
+        return None
+
+    async def get_user_stats_row(self, user_id):
+        return self.stats.get(user_id)
+
+    async def get_user_stats_rows(self, user_ids):
+        return {u: self.stats[u] for u in user_ids if u in self.stats}
+
+    async def list_user_stats_ids(self, after=None, limit=200):
+        return sorted(u for u in self.stats if after is None or u > after)[:limit]
+
+    async def upsert_user_stats(self, rows):
+        for row in rows:
+            self.stats[row["user_id"]] = dict(row)
+        return True
+
+    async def count_user_place_visits(self, user_id, place_id, cap=2):
+        return min(cap, sum(1 for v in self.visits if v["user_id"] == user_id and v["place_id"] == place_id))
+
+    async def iter_user_visits(self, user_id, days=None, select="*", page_size=None):
+        for v in self.rows_of(user_id):
+            yield v
+
+    def rows_of(self, user_id):
+        return [v for v in self.visits if v["user_id"] == user_id]
+
+
+async def check_db_paths(rnd: random.Random) -> bool:
+    db = FakeDb()
+    users = [f"user-{i:03d}" for i in range(20)]
+    for user_id in users:
+        for v in make_visits(rnd, rnd.randint(1, 60)):
+            saved = await db.insert_visit({**v, "user_id": user_id})
+            await record_visit(db, saved)
+    ok = all(same_aggregate(db.stats[u], rebuild_from_visits(u, db.rows_of(u))) for u in users)
+    print(f"  record_visit (fallback path) == rebuild for {len(users)} users: {ok}")
+
+    # 일부 행을 일부러 어긋나게 한 뒤 대사
+    drifted = rnd.sample(users, 5)
+    for u in drifted:
+        db.stats[u]["total_xp"] += 999
+        db.stats[u]["current_streak"] = 0
+    result = await reconcile_user_stats(db)
+    repaired = all(same_aggregate(db.stats[u], rebuild_from_visits(u, db.rows_of(u))) for u in users)
+    print(f"  reconcile: checked={result['checked']} drift={result['drift']} (expected {len(drifted)}) repaired={repaired}")
+    return ok and repaired and result["drift"] == len(drifted)
+
+
+async def main(n_sequences: int) -> int:
+    rnd = random.Random(15)
+    mismatches = 0
+    for s in range(n_sequences):
+        visits = make_visits(rnd, rnd.randint(1, 400))
+        inc = incremental(f"user-{s}", visits)
+        full = rebuild_from_visits(f"user-{s}", visits)
+        if inc is None or not same_aggregate(inc, full) or present(inc) != legacy_stats(visits):
+            mismatches += 1
+            print(f"  MISMATCH seq={s}: incremental={inc} rebuild={full}")
+    print(f"  incremental == rebuild == legacy: {n_sequences - mismatches}/{n_sequences} sequences")
+
+    backdated = make_visits(rnd, 30)
+    backdated.append({**backdated[0], "id": "late"})
+    needs_rebuild = incremental("user-late", backdated) is None
+    print(f"  backdated visit falls back to rebuild: {needs_rebuild}")
+
+    db_ok = await check_db_paths(rnd)
+    return 0 if mismatches == 0 and needs_rebuild and db_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)))
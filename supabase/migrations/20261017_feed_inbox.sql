@@ -0,0 +1,53 @@
+-- ============================================================
+-- 홈 피드 인박스 (fan-out-on-write)
+-- - 활동 생성 시 작성자 + 팔로워의 feed_inbox 에 한 행씩 기록 (백엔드 services/feed_fanout.py)
+-- - 읽기: owner_id 별 (created_at, activity_id) 내림차순 keyset → 팔로우 수와 무관하게 페이지 단위 비용
+-- - 팔로워가 많은 계정은 feed_celebrities 에 등록하고 읽을 때 병합 (fan-out-on-read)
+-- - trim_feed_inbox: 소유자별 최신 p_keep 개만 남김
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS feed_inbox (
+    owner_id TEXT NOT NULL,
+    activity_id UUID NOT NULL REFERENCES feed_activities(id) ON DELETE CASCADE,
+    actor_id TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (owner_id, activity_id)
+);
+CREATE INDEX IF NOT EXISTS idx_feed_inbox_owner_created
+    ON feed_inbox(owner_id, created_at DESC, activity_id DESC);
+CREATE INDEX IF NOT EXISTS idx_feed_inbox_owner_actor ON feed_inbox(owner_id, actor_id);
+ALTER TABLE feed_inbox ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Feed inbox all" ON feed_inbox;
+CREATE POLICY "Feed inbox all" ON feed_inbox FOR ALL USING (true) WITH CHECK (true);
+
+CREATE TABLE IF NOT EXISTS feed_celebrities (
+    user_id TEXT PRIMARY KEY,
+    follower_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+ALTER TABLE feed_celebrities ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Feed celebrities all" ON feed_celebrities;
+CREATE POLICY "Feed celebrities all" ON feed_celebrities FOR ALL USING (true) WITH CHECK (true);
+
+-- 셀럽 활동 / 폴백 읽기용 keyset 인덱스
+CREATE INDEX IF NOT EXISTS idx_feed_activities_user_created
+    ON feed_activities(user_id, created_at DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION trim_feed_inbox(p_owner_ids TEXT[], p_keep INT)
+RETURNS INT AS $$
+    WITH ranked AS (
+        SELECT owner_id, activity_id,
+               row_number() OVER (PARTITION BY owner_id ORDER BY created_at DESC, activity_id DESC) AS rn
+        FROM feed_inbox
+        WHERE p_owner_ids IS NULL OR owner_id = ANY(p_owner_ids)
+    ),
+    deleted AS (
+        DELETE FROM feed_inbox f
+        USING ranked r
+        WHERE f.owner_id = r.owner_id AND f.activity_id = r.activity_id AND r.rn > p_keep
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INT FROM deleted;
+$$ LANGUAGE sql VOLATILE;
+
+GRANT EXECUTE ON FUNCTION trim_feed_inbox(TEXT[], INT) TO anon, authenticated, service_role;
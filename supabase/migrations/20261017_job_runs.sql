@@ -0,0 +1,55 @@
+-- ============================================================
+-- 예약 작업 실행 기록 / 실행권 (job_runs)
+-- - APScheduler 는 워커마다 같은 시각에 작업을 트리거 → claim_job_run 으로 (job_name, run_key) 실행권을
+--   가진 워커 하나만 실행 (run_key 는 보통 KST 날짜)
+-- - 실행 중 워커는 lease_until 을 주기적으로 연장하고, 배치마다 checkpoint 를 저장
+-- - 워커가 죽어 lease 가 만료되면 다른 워커가 실행권을 다시 얻어 checkpoint 부터 이어서 실행 (attempts 증가)
+-- - 갱신은 owner 조건으로만 (실행권을 잃은 워커의 늦은 쓰기 무시) — 백엔드 services/jobs.py
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    job_name TEXT NOT NULL,
+    run_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',      -- running | succeeded | failed
+    owner TEXT,
+    lease_until TIMESTAMPTZ,
+    attempts INT NOT NULL DEFAULT 0,
+    checkpoint JSONB,
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    PRIMARY KEY (job_name, run_key)
+);
+CREATE INDEX IF NOT EXISTS idx_job_runs_started ON job_runs(started_at DESC);
+ALTER TABLE job_runs ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Job runs all" ON job_runs;
+CREATE POLICY "Job runs all" ON job_runs FOR ALL USING (true) WITH CHECK (true);
+
+-- 실행권 획득: 처음이면 행 생성, 실패했거나 lease 가 만료된 실행이면 넘겨받음 (checkpoint 유지).
+-- 다른 워커가 실행 중이거나 이미 성공한 실행이면 빈 결과.
+CREATE OR REPLACE FUNCTION claim_job_run(
+    p_job_name TEXT,
+    p_run_key TEXT,
+    p_owner TEXT,
+    p_lease_seconds INT
+)
+RETURNS SETOF job_runs AS $$
+    INSERT INTO job_runs (job_name, run_key, status, owner, lease_until, attempts, started_at, heartbeat_at)
+    VALUES (p_job_name, p_run_key, 'running', p_owner, NOW() + make_interval(secs => p_lease_seconds), 1, NOW(), NOW())
+    ON CONFLICT (job_name, run_key) DO UPDATE SET
+        status = 'running',
+        owner = EXCLUDED.owner,
+        lease_until = EXCLUDED.lease_until,
+        attempts = job_runs.attempts + 1,
+        error = NULL,
+        heartbeat_at = NOW(),
+        finished_at = NULL
+    WHERE job_runs.status = 'failed'
+       OR (job_runs.status = 'running' AND job_runs.lease_until < NOW())
+    RETURNING *;
+$$ LANGUAGE sql VOLATILE;
+
+GRANT EXECUTE ON FUNCTION claim_job_run(TEXT, TEXT, TEXT, INT)
+    TO anon, authenticated, service_role;
@@ -0,0 +1,21 @@
+-- ============================================================
+-- 커서(keyset) 페이지네이션용 복합 인덱스
+-- - 백엔드는 (정렬 시각, id) 기준으로 "마지막 행 이후" 만 조회 (db/cursor.py)
+-- - 필터 컬럼 + 정렬 시각 + id 인덱스로 깊이 스크롤해도 페이지 크기만큼만 읽음
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_local_posts_created_id
+    ON local_posts(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_local_posts_area_created_id
+    ON local_posts(area_name, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_local_posts_author_created_id
+    ON local_posts(author_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_local_comments_post_created_id
+    ON local_comments(post_id, created_at ASC, id ASC);
+
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_created_id
+    ON messages(conversation_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_visits_user_visited_id
+    ON visits(user_id, visited_at DESC, id DESC);
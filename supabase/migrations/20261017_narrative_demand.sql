@@ -0,0 +1,66 @@
+-- ============================================================
+-- 서사 사전 생성 후보 집계 (narrative_demand)
+-- - 추천 응답에 노출된 (장소, 조건) 조합 횟수. 워커마다 메모리에 모아 NARRATIVE_DEMAND_FLUSH_SECONDS 마다
+--   increment_narrative_demand 1회로 더함 → 야간 사전 생성(한 워커만 실행)이 모든 워커의 집계를 봄, 재시작에도 유지
+-- - 사전 생성 후 decay_narrative_demand 로 절반 감쇠 (최근 추세 위주)
+-- - 함수가 없으면 백엔드는 프로세스 메모리 집계만 사용 (사전 생성 워커가 본 노출만 반영)
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS narrative_demand (
+    cache_key TEXT PRIMARY KEY,
+    hits BIGINT NOT NULL DEFAULT 0,
+    generate_kwargs JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_narrative_demand_hits ON narrative_demand(hits DESC);
+
+ALTER TABLE narrative_demand ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Narrative demand all" ON narrative_demand;
+CREATE POLICY "Narrative demand all" ON narrative_demand FOR ALL USING (true) WITH CHECK (true);
+
+-- p_rows: [{"cache_key", "hits", "generate_kwargs"}]. 기존 행이면 hits 를 더함. 반영한 행 수 반환
+CREATE OR REPLACE FUNCTION increment_narrative_demand(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    INSERT INTO narrative_demand AS d (cache_key, hits, generate_kwargs, updated_at)
+    SELECT x.cache_key, x.hits, x.generate_kwargs, NOW()
+    FROM jsonb_to_recordset(p_rows) AS x(cache_key TEXT, hits BIGINT, generate_kwargs JSONB)
+    ON CONFLICT (cache_key) DO UPDATE
+    SET hits = d.hits + EXCLUDED.hits,
+        generate_kwargs = EXCLUDED.generate_kwargs,
+        updated_at = NOW();
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 노출 많은 순, 아직 narratives 캐시에 없는 조합
+CREATE OR REPLACE FUNCTION top_narrative_demand(p_limit INTEGER DEFAULT 200)
+RETURNS TABLE (cache_key TEXT, hits BIGINT, generate_kwargs JSONB) AS $$
+    SELECT d.cache_key, d.hits, d.generate_kwargs
+    FROM narrative_demand d
+    WHERE NOT EXISTS (SELECT 1 FROM narratives n WHERE n.cache_key = d.cache_key)
+    ORDER BY d.hits DESC
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- 집계 절반 감쇠, 0 이 된 조합 삭제. 남은 행 수 반환
+CREATE OR REPLACE FUNCTION decay_narrative_demand()
+RETURNS INTEGER AS $$
+DECLARE
+    remaining INTEGER;
+BEGIN
+    UPDATE narrative_demand SET hits = hits / 2;
+    DELETE FROM narrative_demand WHERE hits <= 0;
+    SELECT COUNT(*) INTO remaining FROM narrative_demand;
+    RETURN remaining;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION increment_narrative_demand(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION top_narrative_demand(INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION decay_narrative_demand() TO service_role;
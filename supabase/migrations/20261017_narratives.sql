@@ -0,0 +1,24 @@
+-- ============================================================
+-- AI 장소 서사 캐시
+-- - 백엔드 services/narrative_cache.py 의 영속 계층 (인메모리 LRU 뒤)
+-- - cache_key = sha256(place_id | role_type | mood_bucket | weather | time_of_day)
+-- - 테이블이 없으면 백엔드는 인메모리 캐시만 사용
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS narratives (
+    cache_key TEXT PRIMARY KEY,
+    place_id TEXT NOT NULL,
+    role_type TEXT NOT NULL,
+    mood_bucket TEXT NOT NULL DEFAULT 'none',
+    weather TEXT NOT NULL DEFAULT 'any',
+    time_of_day TEXT NOT NULL DEFAULT 'any',
+    narrative TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_narratives_place ON narratives(place_id);
+
+ALTER TABLE narratives ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Narratives all" ON narratives;
+CREATE POLICY "Narratives all" ON narratives FOR ALL USING (true) WITH CHECK (true);
@@ -0,0 +1,11 @@
+-- ============================================================
+-- 안 읽은 알림 수 (알림 벨 폴링)
+-- - 기존: 목록 API 가 알림을 두 번 가져와 Python 에서 셈 (limit 50 까지만 → 그 이상은 틀린 값)
+-- - 백엔드 count_unread_notifications: HEAD /notifications?user_id=eq.X&read=eq.false + Prefer: count=exact
+--   → 행 전송 없이 아래 부분 인덱스만 세는 쿼리 1회
+-- - 전체 읽음(POST /api/v1/notifications/read-all): UPDATE ... WHERE user_id = ? AND read = false 1회
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_notifications_unread
+    ON notifications (user_id)
+    WHERE read = false;
@@ -0,0 +1,24 @@
+-- ============================================================
+-- places.updated_at 자동 갱신 (장소 공간 인덱스 증분 갱신용)
+-- - 백엔드 PlaceSpatialIndex(db/place_index.py) 는 (updated_at, id) keyset 으로
+--   get_places_updated_since 를 호출해 변경분만 반영
+-- - 일부 스키마(CLEAN_START, REAL_DATA_SCHEMA 등)에는 places 갱신 트리거가 없어
+--   UPDATE / upsert(merge-duplicates) 후에도 updated_at 이 그대로 → 인덱스가 변경을 놓침
+-- ============================================================
+
+ALTER TABLE places ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_places_updated_at ON places;
+CREATE TRIGGER update_places_updated_at
+    BEFORE UPDATE ON places
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_places_updated_at_id ON places (updated_at, id);
@@ -0,0 +1,60 @@
+-- ============================================================
+-- 반경 내 장소 검색 RPC (lat/lon 컬럼 기반, PostGIS 불필요)
+-- - 백엔드 RestDatabaseHelpers.get_places_nearby 가 POST /rest/v1/rpc/places_within_radius 로 호출
+-- - 바운딩 박스로 idx_places_lat_lon 인덱스 범위 스캔 후 haversine 정밀 필터 + 거리순 정렬
+-- - 함수가 없으면 백엔드는 바운딩 박스 REST 쿼리 + 파이썬 haversine 으로 폴백
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_places_lat_lon
+    ON places(latitude, longitude)
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION places_within_radius(
+    user_lat DOUBLE PRECISION,
+    user_lon DOUBLE PRECISION,
+    radius_meters DOUBLE PRECISION,
+    p_limit INTEGER DEFAULT 200
+)
+RETURNS TABLE (
+    id TEXT,
+    name TEXT,
+    address TEXT,
+    latitude FLOAT,
+    longitude FLOAT,
+    primary_category TEXT,
+    vibe_tags TEXT[],
+    description TEXT,
+    average_rating FLOAT,
+    is_hidden_gem BOOLEAN,
+    typical_crowd_level TEXT,
+    average_price INT,
+    distance_meters DOUBLE PRECISION
+) AS $$
+    WITH box AS (
+        SELECT
+            radius_meters / 111320.0 AS dlat,
+            radius_meters / (111320.0 * GREATEST(cos(radians(user_lat)), 0.01)) AS dlon
+    ),
+    candidates AS (
+        SELECT
+            p.id, p.name, p.address, p.latitude, p.longitude, p.primary_category,
+            p.vibe_tags, p.description, p.average_rating, p.is_hidden_gem,
+            p.typical_crowd_level, p.average_price,
+            2 * 6371000 * asin(sqrt(
+                power(sin(radians(p.latitude - user_lat) / 2), 2)
+                + cos(radians(user_lat)) * cos(radians(p.latitude))
+                  * power(sin(radians(p.longitude - user_lon) / 2), 2)
+            )) AS distance_meters
+        FROM places p, box
+        WHERE p.is_active = TRUE
+          AND p.latitude BETWEEN user_lat - box.dlat AND user_lat + box.dlat
+          AND p.longitude BETWEEN user_lon - box.dlon AND user_lon + box.dlon
+    )
+    SELECT * FROM candidates
+    WHERE distance_meters <= radius_meters
+    ORDER BY distance_meters ASC
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION places_within_radius(DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION, INTEGER)
+    TO anon, authenticated, service_role;
@@ -0,0 +1,20 @@
+-- ============================================================
+-- 게시글 여러 개의 좋아요 수를 한 번에 집계하는 RPC
+-- - 백엔드 RestDatabaseHelpers.get_like_counts 가 POST /rest/v1/rpc/post_like_counts 로 호출
+-- - idx_post_likes_post_id 인덱스로 페이지 단위(≤100개) 게시글만 GROUP BY
+-- - 함수가 없으면 백엔드는 post_likes?post_id=in.(...) 조회 후 파이썬에서 집계로 폴백
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION post_like_counts(p_post_ids UUID[])
+RETURNS TABLE (
+    post_id UUID,
+    like_count BIGINT
+) AS $$
+    SELECT l.post_id, COUNT(*) AS like_count
+    FROM post_likes l
+    WHERE l.post_id = ANY(p_post_ids)
+    GROUP BY l.post_id;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION post_like_counts(UUID[])
+    TO anon, authenticated, service_role;
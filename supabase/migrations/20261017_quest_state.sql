@@ -0,0 +1,48 @@
+-- ============================================================
+-- 퀘스트 / 챌린지 진행 상태 (워커 간 공유, 재시작 후에도 유지)
+-- - 기존에는 routes/quests.py, routes/challenges.py 의 프로세스 dict → 워커마다 다른 상태, 재시작 시 유실
+-- - 백엔드 db/state_store.SupabaseStateStore 가 사용. 상태 전이는 모두 한 문장:
+--   퀘스트 완료: UPDATE ... WHERE quest_id = ? AND status = 'in_progress' (먼저 도착한 요청만 완료)
+--   진행도: INSERT ... ON CONFLICT (user_id, challenge_id) DO UPDATE
+--   보상 수령: INSERT ... ON CONFLICT DO NOTHING (중복 수령 불가)
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS user_quests (
+    quest_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    role_type TEXT,
+    place_id TEXT,
+    place_name TEXT,
+    xp_reward INT NOT NULL DEFAULT 100,
+    status TEXT NOT NULL DEFAULT 'in_progress',   -- in_progress | completed
+    checklist JSONB,
+    accepted_at TIMESTAMPTZ DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_user_quests_user_status ON user_quests(user_id, status, accepted_at);
+ALTER TABLE user_quests ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "User quests all" ON user_quests;
+CREATE POLICY "User quests all" ON user_quests FOR ALL USING (true) WITH CHECK (true);
+
+CREATE TABLE IF NOT EXISTS challenge_progress (
+    user_id TEXT NOT NULL,
+    challenge_id TEXT NOT NULL,
+    progress INT NOT NULL DEFAULT 0,
+    total INT NOT NULL DEFAULT 0,
+    last_updated TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, challenge_id)
+);
+ALTER TABLE challenge_progress ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Challenge progress all" ON challenge_progress;
+CREATE POLICY "Challenge progress all" ON challenge_progress FOR ALL USING (true) WITH CHECK (true);
+
+CREATE TABLE IF NOT EXISTS challenge_claims (
+    user_id TEXT NOT NULL,
+    challenge_id TEXT NOT NULL,
+    xp_awarded INT NOT NULL DEFAULT 0,
+    completed_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, challenge_id)
+);
+ALTER TABLE challenge_claims ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Challenge claims all" ON challenge_claims;
+CREATE POLICY "Challenge claims all" ON challenge_claims FOR ALL USING (true) WITH CHECK (true);
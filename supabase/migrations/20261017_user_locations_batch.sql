@@ -0,0 +1,60 @@
+-- ============================================================
+-- 사용자 위치 일괄 반영 + 최근 위치 증분 조회 (소셜 매칭 근처 활동 사용자 인덱스)
+-- - 기존: POST /api/v1/visits/location 핑마다 users PATCH 1회 (사용자 5만 × 30초 주기 ≈ 초당 1,700 UPDATE)
+-- - 백엔드 ActiveUserGrid(db/active_user_index.py) 가 위치를 메모리에 반영하고, 사용자별 마지막 위치만 모아
+--   ACTIVE_USERS_FLUSH_SECONDS 마다 update_user_locations 1회로 기록
+-- - active_user_locations: last_location_at 커서 이후 위치 (재시작 시 적재, 다른 워커 핑 반영)
+-- - 함수가 없으면 백엔드는 행별 PATCH 로 폴백, 적재는 건너뛰고 핑으로만 채움
+-- ============================================================
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS last_location_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_users_last_location_at
+    ON users (last_location_at, user_id)
+    WHERE last_location_at IS NOT NULL;
+
+-- p_updates: [{"user_id", "latitude", "longitude", "seen_at"}]. 더 최근 위치가 이미 있으면 건너뜀. 반영한 행 수 반환
+CREATE OR REPLACE FUNCTION update_user_locations(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE users u
+    SET last_location = ST_SetSRID(ST_MakePoint(x.longitude, x.latitude), 4326)::geography,
+        last_location_at = x.seen_at,
+        last_active_date = x.seen_at::date
+    FROM jsonb_to_recordset(p_updates)
+        AS x(user_id TEXT, latitude DOUBLE PRECISION, longitude DOUBLE PRECISION, seen_at TIMESTAMPTZ)
+    WHERE u.user_id::text = x.user_id
+      AND (u.last_location_at IS NULL OR u.last_location_at < x.seen_at);
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- (last_location_at, user_id) 커서 이후 위치, 오름차순
+CREATE OR REPLACE FUNCTION active_user_locations(
+    p_after_at TIMESTAMPTZ,
+    p_after_id TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 1000
+)
+RETURNS TABLE (
+    user_id TEXT,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    last_location_at TIMESTAMPTZ
+) AS $$
+    SELECT u.user_id::text,
+           ST_Y(u.last_location::geometry),
+           ST_X(u.last_location::geometry),
+           u.last_location_at
+    FROM users u
+    WHERE u.last_location_at IS NOT NULL
+      AND u.last_location IS NOT NULL
+      AND (u.last_location_at, u.user_id::text) > (p_after_at, COALESCE(p_after_id, ''))
+    ORDER BY u.last_location_at, u.user_id
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION update_user_locations(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION active_user_locations(TIMESTAMPTZ, TEXT, INTEGER) TO service_role;
@@ -0,0 +1,73 @@
+-- ============================================================
+-- 사용자 통계 증분 집계 (user_stats)
+-- - 방문 저장 직후 백엔드 services/user_stats.record_visit 가 apply_user_stats_visit RPC 로 한 행만 갱신
+--   → GET /users/me/stats, 스트릭 알림은 visits 전체 대신 이 한 행을 읽음 (O(1))
+-- - current_streak 는 last_visit_date 로 끝나는 연속 방문 일수. "오늘 기준" 값·레벨·뱃지는 백엔드가 읽을 때 파생
+-- - 행이 없거나 과거 날짜 방문이면 RPC 는 빈 결과 → 백엔드가 visits 로 재계산해 upsert
+-- - 야간 대사(KST 04:00)가 원본 visits 로 다시 계산해 어긋난 행을 덮어씀
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    total_xp BIGINT NOT NULL DEFAULT 0,
+    total_visits INT NOT NULL DEFAULT 0,
+    unique_places INT NOT NULL DEFAULT 0,
+    current_streak INT NOT NULL DEFAULT 0,
+    longest_streak INT NOT NULL DEFAULT 0,
+    last_visit_date DATE,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "User stats all" ON user_stats;
+CREATE POLICY "User stats all" ON user_stats FOR ALL USING (true) WITH CHECK (true);
+
+-- 새 장소 여부 판단 (user_id, place_id) 조회용
+CREATE INDEX IF NOT EXISTS idx_visits_user_place ON visits(user_id, place_id);
+
+-- 방문 1건 반영 (행 잠금으로 같은 사용자의 동시 체크인 직렬화). 방문 행이 저장된 뒤 호출.
+CREATE OR REPLACE FUNCTION apply_user_stats_visit(
+    p_user_id TEXT,
+    p_place_id TEXT,
+    p_xp INT,
+    p_visit_date DATE
+)
+RETURNS SETOF user_stats AS $$
+DECLARE
+    s user_stats%ROWTYPE;
+    v_new_place BOOLEAN := FALSE;
+    v_run INT;
+BEGIN
+    SELECT * INTO s FROM user_stats WHERE user_id = p_user_id FOR UPDATE;
+    IF NOT FOUND OR (s.last_visit_date IS NOT NULL AND p_visit_date < s.last_visit_date) THEN
+        RETURN;
+    END IF;
+
+    IF p_place_id IS NOT NULL THEN
+        SELECT COUNT(*) <= 1 INTO v_new_place
+        FROM (SELECT 1 FROM visits WHERE user_id = p_user_id AND place_id = p_place_id LIMIT 2) t;
+    END IF;
+
+    IF s.last_visit_date IS NULL OR p_visit_date - s.last_visit_date > 1 THEN
+        v_run := 1;
+    ELSIF p_visit_date - s.last_visit_date = 1 THEN
+        v_run := s.current_streak + 1;
+    ELSE
+        v_run := GREATEST(s.current_streak, 1);
+    END IF;
+
+    RETURN QUERY
+    UPDATE user_stats SET
+        total_xp = s.total_xp + COALESCE(p_xp, 0),
+        total_visits = s.total_visits + 1,
+        unique_places = s.unique_places + CASE WHEN v_new_place THEN 1 ELSE 0 END,
+        current_streak = v_run,
+        longest_streak = GREATEST(s.longest_streak, v_run),
+        last_visit_date = p_visit_date,
+        updated_at = NOW()
+    WHERE user_id = p_user_id
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql VOLATILE;
+
+GRANT EXECUTE ON FUNCTION apply_user_stats_visit(TEXT, TEXT, INT, DATE)
+    TO anon, authenticated, service_role;